@@ -0,0 +1,499 @@
+"""
+Agent Runtime Benchmarks
+
+Run from the backend directory:
+
+    python -m agents.agent_benchmark idle --agents 1000 --seconds 10
+    python -m agents.agent_benchmark intake --tasks 5000 --work 0.002
+    python -m agents.agent_benchmark journal --history 1000 10000 100000
+    python -m agents.agent_benchmark recommend --patterns 100000 --queries 1000
+    python -m agents.agent_benchmark registry --files 1000 5000
+
+``idle`` starts many agents with empty queues in one process and reports
+the CPU time used and the number of event loop wake-ups while they sit
+idle, for the current BaseAgent (without and with background work on the
+shared timer service) and for agents/base.py as it was at a git ref
+(default: the first commit).
+
+``intake`` queues tasks that each await for ``--work`` seconds on one
+agent and reports how long the agent takes to drain them with the
+default one-at-a-time runtime and with batch draining and bounded
+concurrency.
+
+``journal`` records a growing history of learning points and then times
+saving the next ``--new`` points, starting a new engine on the saved data
+and the first access to its learning window (loaded lazily by the
+journal-backed engine), for the current SelfImprovementEngine and for
+agents/self_improvement.py at a git ref, which rewrote pickle files.
+
+``recommend`` fills an engine with ``--patterns`` optimization patterns
+and reports get_recommendation latency, and separately times one pattern
+discovery and confidence update cycle over ``--points`` learning points,
+for the indexed engine and the scanning one at a git ref. The recommended
+pattern ids are compared between the two.
+
+``registry`` writes ``--files`` agent definition files and times
+ClaudeAgentInterface discovery without a parse cache (cold) and with one
+(warm), a refresh after ``--modify`` files changed, and a capability
+lookup, against agents/claude_agent_interface.py at a git ref, which
+parsed every file on each discovery.
+
+Results are printed as JSON.
+"""
+
+import argparse
+import asyncio
+import gc
+import importlib.util
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict
+
+from . import base as current
+from . import claude_agent_interface
+from . import self_improvement
+
+def load_baseline(ref: str, filename: str = "base.py"):
+    """Import ``filename`` from this package as it was at git ``ref``, or None if git can't provide it"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        top = subprocess.run(["git", "rev-parse", "--show-toplevel"], cwd=here,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        path = os.path.relpath(os.path.join(here, filename), top)
+        source = subprocess.run(["git", "show", f"{ref}:{path}"], cwd=here,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    spec = importlib.util.spec_from_loader(f"agents._baseline_{os.path.splitext(filename)[0]}", loader=None)
+    module = importlib.util.module_from_spec(spec)
+    module.__package__ = "agents"
+    sys.modules[spec.name] = module
+    exec(compile(source, f"{ref}:{path}", "exec"), module.__dict__)
+    return module
+
+def root_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-list", "--max-parents=0", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.split()[0]
+    except (OSError, subprocess.CalledProcessError, IndexError):
+        return "HEAD"
+
+def make_agent_class(module, work_seconds: float = 0.0, **runtime):
+    """A BaseAgent subclass from ``module`` whose tasks only sleep ``work_seconds``"""
+
+    async def process_task(self, task):
+        if work_seconds:
+            await asyncio.sleep(work_seconds)
+        return {"status": "completed"}
+
+    async def background_work(self):
+        pass
+
+    namespace = {"process_task": process_task, **runtime}
+    if runtime.get("background_interval"):
+        namespace["background_work"] = background_work
+    return type("BenchAgent", (module.BaseAgent,), namespace)
+
+class WakeupCounter:
+    """Counts event loop iterations that actually waited on the selector"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.selector = loop._selector
+        self.original = self.selector.select
+        self.count = 0
+
+        def select(timeout=None):
+            self.count += 1
+            return self.original(timeout)
+
+        self.selector.select = select
+
+    def close(self):
+        self.selector.select = self.original
+
+async def time_idle(module, agents: int, seconds: float, **runtime) -> Dict[str, Any]:
+    """CPU time and wake-ups of ``agents`` idle agents over ``seconds``"""
+    agent_class = make_agent_class(module, **runtime)
+    swarm = [agent_class(f"agent_{i}", module.AgentRole.BUILDER, module.AgentDomain.BACKEND)
+             for i in range(agents)]
+    running = [asyncio.create_task(agent.start()) for agent in swarm]
+    await asyncio.sleep(0.5)  # let every loop reach its idle wait
+
+    counter = WakeupCounter(asyncio.get_running_loop())
+    cpu_started, wall_started = time.process_time(), time.perf_counter()
+    await asyncio.sleep(seconds)
+    cpu, wall = time.process_time() - cpu_started, time.perf_counter() - wall_started
+    counter.close()
+
+    for agent in swarm:
+        await agent.stop()
+    _, pending = await asyncio.wait(running, timeout=2)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*running, return_exceptions=True)
+
+    return {
+        "agents": agents,
+        "cpu_percent": cpu / wall * 100,
+        "cpu_ms_per_second": cpu / wall * 1000,
+        "wakeups_per_second": counter.count / wall
+    }
+
+async def run_idle_benchmark(args) -> Dict[str, Any]:
+    ref = args.baseline_ref or root_commit()
+    results: Dict[str, Any] = {"seconds": args.seconds}
+    results["current"] = await time_idle(current, args.agents, args.seconds)
+    results["current_with_background_work"] = {
+        "background_interval_s": args.background_interval,
+        **await time_idle(current, args.agents, args.seconds, background_interval=args.background_interval,
+                          background_delay=0.0)
+    }
+
+    baseline = load_baseline(ref)
+    results["baseline_ref"] = ref if baseline is not None else None
+    if baseline is not None:
+        results["baseline"] = await time_idle(baseline, args.agents, args.seconds)
+    return results
+
+async def time_intake(tasks: int, work_seconds: float, **runtime) -> Dict[str, Any]:
+    agent = make_agent_class(current, work_seconds, **runtime)(
+        "intake", current.AgentRole.BUILDER, current.AgentDomain.BACKEND
+    )
+    agent.logger.disabled = True
+    for i in range(tasks):
+        agent.task_queue.put_nowait(current.AgentTask(id=str(i), type="bench", priority=1, description="bench"))
+
+    started = time.perf_counter()
+    runner = asyncio.create_task(agent.start())
+    while agent.metrics.tasks_completed + agent.metrics.tasks_failed < tasks:
+        await asyncio.sleep(0.005)
+    elapsed = time.perf_counter() - started
+    await agent.stop()
+    await runner
+
+    return {
+        **runtime,
+        "seconds": elapsed,
+        "tasks_per_second": tasks / elapsed
+    }
+
+async def run_intake_benchmark(args) -> Dict[str, Any]:
+    return {
+        "tasks": args.tasks,
+        "work_s": args.work,
+        "sequential": await time_intake(args.tasks, args.work),
+        "batched_concurrent": await time_intake(args.tasks, args.work, task_batch_size=args.batch_size,
+                                                max_concurrent_tasks=args.max_concurrent)
+    }
+
+AGENT_NAMES = ["apollo", "hermes", "ares", "dionysus", "nike", "athena-ux", "hephaestus-frontend",
+               "prometheus-frontend", "athena-api", "hephaestus-backend", "prometheus-backend",
+               "performance_analyst", "ux_researcher", "innovation_specialist"]
+
+def record_points(engine, rng: random.Random, count: int):
+    for _ in range(count):
+        engine.record_learning_point(
+            agent_name=rng.choice(AGENT_NAMES),
+            task_type=rng.choice(["optimization", "analysis", "verification"]),
+            parameters={"target": rng.choice(["api", "ui", "db"]), "batch_size": rng.choice([16, 32, 64]),
+                        "threshold": round(rng.random(), 2)},
+            outcome="success" if rng.random() < 0.8 else "failure",
+            performance_delta={"latency": rng.gauss(5, 3), "throughput": rng.gauss(3, 2)},
+            execution_time=rng.expovariate(1.0)
+        )
+
+def directory_bytes(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+def time_journal(module, history: int, new: int, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    journaled = hasattr(module, "LearningJournal")
+    with tempfile.TemporaryDirectory() as directory:
+        engine = module.SelfImprovementEngine(directory)
+        record_points(engine, rng, history)
+        engine.save_learning_data()
+        if journaled:
+            engine.journal.flush()
+
+        # What the event loop pays to record and save the next points
+        started = time.perf_counter()
+        record_points(engine, rng, new)
+        engine.save_learning_data()
+        save_seconds = time.perf_counter() - started
+
+        written_seconds = save_seconds
+        if journaled:
+            engine.journal.flush()
+            written_seconds = time.perf_counter() - started
+            engine.journal.close()
+        size = directory_bytes(directory)
+
+        started = time.perf_counter()
+        reloaded = module.SelfImprovementEngine(directory)
+        startup_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        loaded = len(reloaded.learning_points)
+        first_access_seconds = time.perf_counter() - started
+        if journaled:
+            reloaded.journal.close()
+
+    return {
+        "history": history,
+        "save_ms_on_loop": save_seconds * 1000,
+        "save_ms_until_written": written_seconds * 1000,
+        "startup_ms": startup_seconds * 1000,
+        "first_access_ms": first_access_seconds * 1000,
+        "points_loaded": loaded,
+        "disk_mb": size / 1e6
+    }
+
+async def run_journal_benchmark(args) -> Dict[str, Any]:
+    ref = args.baseline_ref or root_commit()
+    self_improvement.logger.setLevel("WARNING")
+    results: Dict[str, Any] = {"new_points_per_save": args.new}
+    results["current"] = [time_journal(self_improvement, history, args.new, args.seed) for history in args.history]
+
+    baseline = load_baseline(ref, "self_improvement.py")
+    results["baseline_ref"] = ref if baseline is not None else None
+    if baseline is not None:
+        results["baseline"] = [time_journal(baseline, history, args.new, args.seed) for history in args.history]
+    return results
+
+TASK_PARAMETERS = {
+    "target": ["api", "ui", "db", "cache", "queue", "auth", "search", "feed"],
+    "strategy": ["lazy", "eager", "batched", "streamed", "sharded"],
+    "region": ["us", "eu", "ap", "sa"],
+    "batch_size": [8, 16, 32, 64, 128, 256],
+    "workers": [1, 2, 4, 8, 16],
+    "threshold": [round(0.05 * i, 2) for i in range(1, 20)],
+    "timeout": [0.5, 1.0, 2.0, 5.0, 10.0, 30.0],
+    "compression": [True, False]
+}
+
+def random_parameters(rng: random.Random, count: int) -> Dict[str, Any]:
+    return {key: rng.choice(TASK_PARAMETERS[key]) for key in rng.sample(sorted(TASK_PARAMETERS), count)}
+
+def fill_patterns(module, engine, patterns: int, task_types: int, seed: int):
+    rng = random.Random(seed)
+    for i in range(patterns):
+        pattern = module.OptimizationPattern(
+            pattern_id=f"pattern_{i}",
+            task_type=f"task_{i % task_types}",
+            conditions=random_parameters(rng, rng.randint(2, 4)),
+            actions={},
+            success_rate=1.0,
+            average_improvement=rng.uniform(0, 20),
+            usage_count=0,
+            last_used=datetime.now(),
+            confidence_score=round(rng.uniform(0.5, 1.0), 3)
+        )
+        if hasattr(engine, "add_optimization_pattern"):
+            engine.add_optimization_pattern(pattern)
+        else:
+            engine.optimization_patterns[pattern.pattern_id] = pattern
+
+def time_recommendations(module, args) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = module.SelfImprovementEngine(directory)
+        started = time.perf_counter()
+        fill_patterns(module, engine, args.patterns, args.task_types, args.seed)
+        fill_seconds = time.perf_counter() - started
+
+        rng = random.Random(args.seed + 1)
+        queries = [(f"task_{rng.randrange(args.task_types)}", random_parameters(rng, rng.randint(2, 5)))
+                   for _ in range(args.queries)]
+        latencies = []
+        recommended = []
+        gc.disable()
+        for task_type, context in queries:
+            started = time.perf_counter()
+            recommendation = engine.get_recommendation("bench", task_type, context)
+            latencies.append(time.perf_counter() - started)
+            recommended.append(recommendation["pattern_id"] if recommendation else None)
+        gc.enable()
+
+        if hasattr(engine, "journal"):
+            engine.journal.close()
+
+    latencies.sort()
+    return {
+        "patterns": args.patterns,
+        "build_seconds": fill_seconds,
+        "latency_ms_p50": latencies[len(latencies) // 2] * 1000,
+        "latency_ms_p99": latencies[int(len(latencies) * 0.99)] * 1000,
+        "latency_ms_mean": sum(latencies) / len(latencies) * 1000,
+        "matched": sum(1 for pattern_id in recommended if pattern_id),
+        "recommended": recommended
+    }
+
+def time_learning_cycle(module, args) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        engine = module.SelfImprovementEngine(directory)
+        for _ in range(args.points):
+            engine.record_learning_point(
+                agent_name=rng.choice(AGENT_NAMES),
+                task_type=f"task_{rng.randrange(args.task_types)}",
+                parameters=random_parameters(rng, 2),
+                outcome="success" if rng.random() < 0.8 else "failure",
+                performance_delta={"latency": rng.gauss(5, 3)},
+                execution_time=rng.uniform(0.5, 1.5)
+            )
+
+        cycles = []
+        for _ in range(2):
+            started = time.perf_counter()
+            asyncio.run(engine.discover_patterns())
+            asyncio.run(engine.update_pattern_confidence())
+            cycles.append(time.perf_counter() - started)
+        patterns = len(engine.optimization_patterns)
+
+        if hasattr(engine, "journal"):
+            engine.journal.close()
+
+    return {
+        "points": args.points,
+        "patterns_found": patterns,
+        "first_cycle_ms": cycles[0] * 1000,
+        "next_cycle_ms": cycles[1] * 1000
+    }
+
+async def run_recommend_benchmark(args) -> Dict[str, Any]:
+    ref = args.baseline_ref or root_commit()
+    self_improvement.logger.setLevel("WARNING")
+    baseline = load_baseline(ref, "self_improvement.py")
+    if baseline is not None:
+        baseline.logger.setLevel("WARNING")
+
+    results: Dict[str, Any] = {"queries": args.queries, "task_types": args.task_types}
+    current_results = await asyncio.to_thread(time_recommendations, self_improvement, args)
+    results["current"] = {**current_results, "learning_cycle": await asyncio.to_thread(time_learning_cycle, self_improvement, args)}
+    results["baseline_ref"] = ref if baseline is not None else None
+    if baseline is not None:
+        baseline_results = await asyncio.to_thread(time_recommendations, baseline, args)
+        results["baseline"] = {**baseline_results, "learning_cycle": await asyncio.to_thread(time_learning_cycle, baseline, args)}
+        results["same_recommendations"] = sum(
+            a == b for a, b in zip(current_results["recommended"], baseline_results["recommended"])
+        )
+        del results["baseline"]["recommended"]
+    del results["current"]["recommended"]
+    return results
+
+TOOLS = ["Read", "Write", "Edit", "Bash", "Grep", "Glob", "WebFetch", "WebSearch", "Task", "TodoWrite"]
+DEPARTMENTS = ["frontend", "backend", "ux", "api", "orchestrator"]
+
+def write_agent_file(directory: str, i: int, rng: random.Random, revision: int = 0):
+    name = f"agent-{i}-{rng.choice(DEPARTMENTS)}"
+    body = "\n".join(f"- Responsibility {j} of {name}, revision {revision}." for j in range(80))
+    with open(os.path.join(directory, f"{name}.md"), "w") as f:
+        f.write(f"---\nname: {name}\ndescription: Benchmark agent {i} (revision {revision})\n"
+                f"tools: {', '.join(rng.sample(TOOLS, 4))}\n---\n\n# {name}\n\n{body}\n")
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+def time_registry(files: int, modify: int, lookups: int, baseline, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as root:
+        agents_dir = os.path.join(root, ".claude", "agents")
+        os.makedirs(agents_dir)
+        for i in range(files):
+            write_agent_file(agents_dir, i, rng)
+        paths = sorted(os.listdir(agents_dir))
+
+        results: Dict[str, Any] = {"files": files}
+        interface, results["cold_discovery_ms"] = timed(claude_agent_interface.ClaudeAgentInterface, root)
+        _, results["warm_discovery_ms"] = timed(claude_agent_interface.ClaudeAgentInterface, root)
+        _, results["unchanged_refresh_ms"] = timed(interface._discover_agents)
+
+        for path in rng.sample(paths, modify):
+            with open(os.path.join(agents_dir, path), "a") as f:
+                f.write("\n- One more responsibility.\n")
+        changes, results["refresh_after_changes_ms"] = timed(interface._discover_agents)
+        results["changed_agents"] = len(changes.changed)
+
+        _, results["capability_lookup_us"] = timed(
+            lambda: [interface.find_agents(capability=rng.choice(TOOLS)) for _ in range(lookups)]
+        )
+        results["capability_lookup_us"] *= 1000 / lookups
+        results["registry"] = interface.registry.get_stats()
+
+        if baseline is not None:
+            old, results["baseline_discovery_ms"] = timed(baseline.ClaudeAgentInterface, root)
+            _, results["baseline_rediscovery_ms"] = timed(old._discover_agents)
+            _, results["baseline_capability_lookup_us"] = timed(
+                lambda: [[agent for agent in old.agents.values() if tool in agent.tools]
+                         for tool in (rng.choice(TOOLS) for _ in range(lookups))]
+            )
+            results["baseline_capability_lookup_us"] *= 1000 / lookups
+    return results
+
+async def run_registry_benchmark(args) -> Dict[str, Any]:
+    ref = args.baseline_ref or root_commit()
+    claude_agent_interface.logger.setLevel("WARNING")
+    baseline = load_baseline(ref, "claude_agent_interface.py")
+    if baseline is not None:
+        baseline.logger.setLevel("WARNING")
+    return {
+        "baseline_ref": ref if baseline is not None else None,
+        "runs": [time_registry(files, args.modify, args.lookups, baseline, args.seed) for files in args.files]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent runtime benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    idle = commands.add_parser("idle", help="CPU time and wake-ups of idle agents")
+    idle.add_argument("--agents", type=int, default=1000)
+    idle.add_argument("--seconds", type=float, default=10.0)
+    idle.add_argument("--background-interval", type=float, default=5.0,
+                      help="background_work interval for the second current run")
+    idle.add_argument("--baseline-ref", default=None, help="git ref of the baseline (default: first commit)")
+    idle.set_defaults(run=run_idle_benchmark)
+
+    intake = commands.add_parser("intake", help="time for one agent to drain queued tasks")
+    intake.add_argument("--tasks", type=int, default=5000)
+    intake.add_argument("--work", type=float, default=0.002, help="seconds each task awaits")
+    intake.add_argument("--batch-size", type=int, default=32)
+    intake.add_argument("--max-concurrent", type=int, default=16)
+    intake.set_defaults(run=run_intake_benchmark)
+
+    journal = commands.add_parser("journal", help="learning data save latency and startup time as history grows")
+    journal.add_argument("--history", type=int, nargs="+", default=[1000, 10000, 100000])
+    journal.add_argument("--new", type=int, default=100, help="points recorded between saves")
+    journal.add_argument("--seed", type=int, default=7)
+    journal.add_argument("--baseline-ref", default=None, help="git ref of the baseline (default: first commit)")
+    journal.set_defaults(run=run_journal_benchmark)
+
+    recommend = commands.add_parser("recommend", help="recommendation latency and learning cycle time")
+    recommend.add_argument("--patterns", type=int, default=100000)
+    recommend.add_argument("--task-types", type=int, default=10)
+    recommend.add_argument("--queries", type=int, default=1000)
+    recommend.add_argument("--points", type=int, default=10000, help="learning points for the learning cycle")
+    recommend.add_argument("--seed", type=int, default=7)
+    recommend.add_argument("--baseline-ref", default=None, help="git ref of the baseline (default: first commit)")
+    recommend.set_defaults(run=run_recommend_benchmark)
+
+    registry = commands.add_parser("registry", help="agent definition discovery and lookup time")
+    registry.add_argument("--files", type=int, nargs="+", default=[1000, 5000])
+    registry.add_argument("--modify", type=int, default=10, help="files changed before the incremental refresh")
+    registry.add_argument("--lookups", type=int, default=1000)
+    registry.add_argument("--seed", type=int, default=7)
+    registry.add_argument("--baseline-ref", default=None, help="git ref of the baseline (default: first commit)")
+    registry.set_defaults(run=run_registry_benchmark)
+
+    args = parser.parse_args()
+    results = asyncio.run(args.run(args))
+    print(json.dumps({"benchmark": args.command, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""
+Agent Registry - cached, incrementally reloaded Claude Code agent definitions
+
+Parsed definitions are kept in a JSON cache in the user's cache directory
+(``$XDG_CACHE_HOME`` or ``~/.cache``, one file per agents directory,
+outside the project tree), keyed by file path and validated by
+modification time and size, then by content hash. On discovery only files that are new or whose stat changed
+are read, and only files whose content hash changed are parsed again.
+
+``refresh`` re-stats the directory and reports which agents were added,
+changed or removed; ``start_watching`` polls it on the shared timer
+service. Agents are indexed by capability (tools and any ``capabilities``
+listed in the frontmatter) and by department. A refresh builds new
+indexes and swaps them in whole, so lookups on the event loop never see
+a half-updated index while ``refresh`` runs in a worker thread.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .timer_service import timer_service
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+# Department implied by the last part of an agent name (e.g. "athena-ux")
+NAME_SUFFIX_DEPARTMENTS = {
+    "frontend": "frontend",
+    "ux": "frontend",
+    "backend": "backend",
+    "api": "backend",
+    "orchestrator": "orchestration"
+}
+
+def parse_agent_definition(content: str, default_name: str) -> Optional[Dict[str, Any]]:
+    """Fields of an agent definition from its YAML frontmatter, or None without frontmatter"""
+
+    if not content.startswith("---"):
+        return None
+    end_marker = content.find("---", 3)
+    if end_marker == -1:
+        return None
+    frontmatter = content[3:end_marker].strip()
+
+    # Parse YAML frontmatter manually (simple parser)
+    agent_data = {}
+    for line in frontmatter.split("\n"):
+        if ":" in line:
+            key, value = line.split(":", 1)
+            key = key.strip()
+            value = value.strip()
+
+            if key in ("tools", "capabilities"):
+                agent_data[key] = [item.strip() for item in value.split(",") if item.strip()]
+            else:
+                agent_data[key] = value
+
+    name = agent_data.get("name", default_name)
+    department = agent_data.get("department") or agent_data.get("domain")
+    if not department:
+        department = NAME_SUFFIX_DEPARTMENTS.get(name.rsplit("-", 1)[-1])
+
+    return {
+        "name": name,
+        "description": agent_data.get("description", ""),
+        "tools": agent_data.get("tools", []),
+        "department": department.lower() if department else None,
+        "capabilities": agent_data.get("capabilities", [])
+    }
+
+@dataclass
+class CachedDefinition:
+    """Parse cache entry of one agent file"""
+    mtime_ns: int
+    size: int
+    digest: str
+    definition: Optional[Dict[str, Any]]   # None when the file has no frontmatter
+
+@dataclass
+class RegistryChanges:
+    """Agent names affected by one refresh"""
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+def default_cache_path(agents_dir: str) -> str:
+    """Parse cache for ``agents_dir`` in the user's cache directory; losing it only costs a full parse"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    key = hashlib.sha1(os.path.abspath(agents_dir).encode()).hexdigest()[:16]
+    return os.path.join(cache_home, "coinlink", "agent-registry", f"{key}.json")
+
+class AgentRegistry:
+    """Agent definitions of one directory with a persisted parse cache and lookup indexes"""
+
+    def __init__(self, agents_dir: str, cache_path: Optional[str] = None):
+        self.agents_dir = agents_dir
+        self.cache_path = cache_path or default_cache_path(agents_dir)
+
+        self._cache: Dict[str, CachedDefinition] = self._load_cache()
+        self._definitions: Dict[str, Dict[str, Any]] = {}    # name -> definition
+        self._paths: Dict[str, str] = {}                      # name -> file path
+        # (by capability, by department); values are dicts used as insertion-ordered
+        # sets of names. Replaced as a whole by refresh, never modified in place.
+        self._indexes: Tuple[Dict[str, Dict[str, None]], Dict[str, Dict[str, None]]] = ({}, {})
+        self._watch_timer = None
+
+        # Statistics
+        self.refreshes = 0
+        self.files_read = 0
+        self.files_parsed = 0
+        self.last_refresh_seconds = 0.0
+
+    # Parse cache
+
+    def _load_cache(self) -> Dict[str, CachedDefinition]:
+        try:
+            with open(self.cache_path, "r") as f:
+                data = json.load(f)
+            if data.get("version") != CACHE_VERSION:
+                return {}
+            return {path: CachedDefinition(**entry) for path, entry in data["files"].items()}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Ignoring agent registry cache {self.cache_path}: {e}")
+            return {}
+
+    def _save_cache(self):
+        try:
+            # Private to the user: another account must not be able to plant definitions
+            os.makedirs(os.path.dirname(self.cache_path), mode=0o700, exist_ok=True)
+            temporary = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+                # json.dumps uses the C encoder; json.dump to a file does not
+                f.write(json.dumps({
+                    "version": CACHE_VERSION,
+                    "files": {path: entry.__dict__ for path, entry in self._cache.items()}
+                }))
+            os.replace(temporary, self.cache_path)
+        except Exception as e:
+            logger.warning(f"Could not write agent registry cache {self.cache_path}: {e}")
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """(mtime_ns, size) of every agent file"""
+        files = {}
+        with os.scandir(self.agents_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".md") and entry.is_file():
+                    stat = entry.stat()
+                    files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def _cached_definition(self, path: str, mtime_ns: int, size: int) -> Tuple[CachedDefinition, bool]:
+        """Cache entry for ``path`` and whether it had to be updated"""
+
+        entry = self._cache.get(path)
+        if entry is not None and entry.mtime_ns == mtime_ns and entry.size == size:
+            return entry, False
+
+        with open(path, "rb") as f:
+            raw = f.read()
+        self.files_read += 1
+        digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+        if entry is not None and entry.digest == digest:
+            # Touched but unchanged
+            entry.mtime_ns, entry.size = mtime_ns, size
+            return entry, True
+
+        definition = parse_agent_definition(raw.decode("utf-8"), os.path.splitext(os.path.basename(path))[0])
+        self.files_parsed += 1
+        entry = self._cache[path] = CachedDefinition(mtime_ns, size, digest, definition)
+        return entry, True
+
+    # Refresh
+
+    def refresh(self) -> RegistryChanges:
+        """Bring the registry up to date with the directory"""
+
+        started = time.perf_counter()
+        changes = RegistryChanges()
+
+        try:
+            files = self._scan()
+        except FileNotFoundError:
+            logger.warning(f"Agents directory not found: {self.agents_dir}")
+            files = {}
+
+        cache_dirty = False
+        definitions: Dict[str, Dict[str, Any]] = {}
+        paths: Dict[str, str] = {}
+        for path in sorted(files):
+            try:
+                entry, updated = self._cached_definition(path, *files[path])
+            except Exception as e:
+                logger.error(f"Error parsing agent file {path}: {e}")
+                continue
+            cache_dirty |= updated
+            if entry.definition is not None:
+                name = entry.definition["name"]
+                if name in paths:
+                    logger.warning(f"Agent {name} in {path} replaces the one in {paths[name]}")
+                definitions[name] = entry.definition
+                paths[name] = path
+
+        for path in set(self._cache) - set(files):
+            del self._cache[path]
+            cache_dirty = True
+        if cache_dirty:
+            self._save_cache()
+
+        for name, definition in definitions.items():
+            previous = self._definitions.get(name)
+            if previous is None:
+                changes.added.append(name)
+            elif previous != definition:
+                changes.changed.append(name)
+        changes.removed.extend(set(self._definitions) - set(definitions))
+
+        # Each assignment swaps in a complete object, so concurrent lookups see the old or the new state
+        if changes:
+            self._indexes = self._build_indexes(definitions)
+        self._definitions = definitions
+        self._paths = paths
+        self.refreshes += 1
+        self.last_refresh_seconds = time.perf_counter() - started
+        return changes
+
+    @staticmethod
+    def _build_indexes(definitions: Dict[str, Dict[str, Any]]):
+        """Fresh (by capability, by department) indexes of ``definitions``"""
+        by_capability: Dict[str, Dict[str, None]] = defaultdict(dict)
+        by_department: Dict[str, Dict[str, None]] = defaultdict(dict)
+        for name, definition in definitions.items():
+            for capability in set(definition["tools"]) | set(definition["capabilities"]):
+                by_capability[capability.lower()][name] = None
+            if definition["department"]:
+                by_department[definition["department"]][name] = None
+        return dict(by_capability), dict(by_department)
+
+    # Watching
+
+    def start_watching(self, interval: float = 5.0, on_change=None):
+        """Refresh every ``interval`` seconds off the event loop; ``on_change(changes)`` is called when something changed"""
+
+        async def poll():
+            changes = await asyncio.to_thread(self.refresh)
+            if changes and on_change is not None:
+                on_change(changes)
+
+        self.stop_watching()
+        self._watch_timer = timer_service.call_every(interval, poll)
+
+    def stop_watching(self):
+        if self._watch_timer is not None:
+            timer_service.cancel(self._watch_timer)
+            self._watch_timer = None
+
+    # Lookup
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        return self._definitions.get(name)
+
+    def path_of(self, name: str) -> Optional[str]:
+        return self._paths.get(name)
+
+    def names(self) -> List[str]:
+        return list(self._definitions)
+
+    def find(self, capability: Optional[str] = None, department: Optional[str] = None) -> List[str]:
+        """Names of agents with ``capability`` and/or in ``department`` (case-insensitive)"""
+
+        if capability is None and department is None:
+            return self.names()
+        by_capability, by_department = self._indexes
+        with_capability = by_capability.get(capability.lower(), {}) if capability is not None else None
+        in_department = by_department.get(department.lower(), {}) if department is not None else None
+        if with_capability is None:
+            return list(in_department)
+        if in_department is None:
+            return list(with_capability)
+        return [name for name in with_capability if name in in_department]
+
+    def get_stats(self) -> Dict[str, Any]:
+        by_capability, by_department = self._indexes
+        return {
+            "agents": len(self._definitions),
+            "cached_files": len(self._cache),
+            "capabilities": len(by_capability),
+            "departments": sorted(by_department),
+            "refreshes": self.refreshes,
+            "files_read": self.files_read,
+            "files_parsed": self.files_parsed,
+            "last_refresh_seconds": self.last_refresh_seconds,
+            "watching": self._watch_timer is not None
+        }
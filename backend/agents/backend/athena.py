@@ -18,6 +18,8 @@ logger = logging.getLogger(__name__)
 class AthenaAPI(SpecializedAgent):
     """API verifier for ensuring backend optimization quality and API reliability"""
     
+    background_interval = 1080  # seconds between background checks
+    
     def __init__(self):
         super().__init__(
             name="athena-api",
@@ -1078,23 +1080,15 @@ class AthenaAPI(SpecializedAgent):
         """Background work for continuous API monitoring"""
         
         # Perform periodic API health checks
-        current_time = datetime.now()
-        
-        if not hasattr(self, '_last_api_check') or (current_time - self._last_api_check).total_seconds() > 1080:
-            try:
-                # Quick API health assessment
-                api_health = await self._quick_api_health_check()
-                
-                # Log any API concerns
-                if api_health["concerns"]:
-                    self.logger.warning(f"API concerns detected: {api_health['concerns']}")
-                
-                self._last_api_check = current_time
-                
-            except Exception as e:
-                self.logger.error(f"Error in background API monitoring: {e}")
-        
-        await asyncio.sleep(1)
+        try:
+            # Quick API health assessment
+            api_health = await self._quick_api_health_check()
+            
+            # Log any API concerns
+            if api_health["concerns"]:
+                self.logger.warning(f"API concerns detected: {api_health['concerns']}")
+        except Exception as e:
+            self.logger.error(f"Error in background API monitoring: {e}")
     
     async def _quick_api_health_check(self) -> Dict[str, Any]:
         """Quick API health assessment"""
@@ -19,6 +19,8 @@ logger = logging.getLogger(__name__)
 class HephaestusBackend(SpecializedAgent):
     """Backend builder for implementing API and infrastructure optimizations"""
     
+    background_interval = 720  # seconds between background checks
+    
     def __init__(self):
         super().__init__(
             name="hephaestus-backend",
@@ -1031,22 +1033,14 @@ class HephaestusBackend(SpecializedAgent):
         """Background work for continuous backend optimization monitoring"""
         
         # Monitor for backend optimization opportunities
-        current_time = datetime.now()
-        
-        if not hasattr(self, '_last_backend_optimization_check') or (current_time - self._last_backend_optimization_check).total_seconds() > 720:
-            try:
-                # Check for backend performance degradations
-                await self._monitor_backend_performance_degradations()
-                
-                # Check for optimization opportunities
-                await self._identify_backend_optimization_opportunities()
-                
-                self._last_backend_optimization_check = current_time
-                
-            except Exception as e:
-                self.logger.error(f"Error in background backend optimization monitoring: {e}")
-        
-        await asyncio.sleep(1)
+        try:
+            # Check for backend performance degradations
+            await self._monitor_backend_performance_degradations()
+            
+            # Check for optimization opportunities
+            await self._identify_backend_optimization_opportunities()
+        except Exception as e:
+            self.logger.error(f"Error in background backend optimization monitoring: {e}")
     
     async def _monitor_backend_performance_degradations(self):
         """Monitor for backend performance degradations"""
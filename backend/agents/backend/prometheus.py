@@ -18,6 +18,8 @@ logger = logging.getLogger(__name__)
 class PrometheusBackend(SpecializedAgent):
     """Backend strategist for analyzing API performance and planning optimizations"""
     
+    background_interval = 420  # seconds between background checks
+    
     def __init__(self):
         super().__init__(
             name="prometheus-backend",
@@ -1304,24 +1306,15 @@ class PrometheusBackend(SpecializedAgent):
         """Background work for continuous backend analysis"""
         
         # Perform lightweight backend monitoring
-        current_time = datetime.now()
-        
-        # Check if it's time for periodic analysis
-        if not hasattr(self, '_last_backend_analysis') or (current_time - self._last_backend_analysis).total_seconds() > 420:
-            try:
-                # Quick backend health check
-                health_check = await self._quick_backend_health_check()
-                
-                # Record any concerning trends
-                if health_check["concerns"]:
-                    self.logger.warning(f"Backend concerns detected: {health_check['concerns']}")
-                
-                self._last_backend_analysis = current_time
-                
-            except Exception as e:
-                self.logger.error(f"Error in background backend analysis: {e}")
-        
-        await asyncio.sleep(1)
+        try:
+            # Quick backend health check
+            health_check = await self._quick_backend_health_check()
+            
+            # Record any concerning trends
+            if health_check["concerns"]:
+                self.logger.warning(f"Backend concerns detected: {health_check['concerns']}")
+        except Exception as e:
+            self.logger.error(f"Error in background backend analysis: {e}")
     
     async def _quick_backend_health_check(self) -> Dict[str, Any]:
         """Quick backend health assessment"""
@@ -12,6 +12,8 @@ from dataclasses import dataclass, field
 from datetime import datetime
 import json
 
+from .timer_service import timer_service
+
 logger = logging.getLogger(__name__)
 
 class AgentRole(Enum):
@@ -51,8 +53,25 @@ class AgentMetrics:
     last_active: Optional[datetime] = None
     learning_rate: float = 0.0
 
+_STOP = object()  # queued by stop() to wake an idle execution loop
+
 class BaseAgent(ABC):
-    """Base class for all CoinLink agents"""
+    """Base class for all CoinLink agents
+    
+    The execution loop sleeps on the task queue, so an idle agent does not
+    wake up at all. Periodic background work is opt-in and runs on the
+    shared timer service. Subclasses can tune the runtime with:
+    
+    - background_interval: seconds between background_work runs (None: never)
+    - background_delay: seconds before the first run
+    - task_batch_size: queued tasks taken per wake-up and passed to execute_batch
+    - max_concurrent_tasks: tasks of this agent allowed to run at once
+    """
+    
+    background_interval: Optional[float] = None
+    background_delay: float = 0.0
+    task_batch_size: int = 1
+    max_concurrent_tasks: int = 1
     
     def __init__(self, 
                  name: str,
@@ -68,6 +87,11 @@ class BaseAgent(ABC):
         self.running = False
         self.learning_data = []
         
+        # Runtime
+        self.timer_service = timer_service
+        self._task_slots = asyncio.Semaphore(max(1, self.max_concurrent_tasks))
+        self._in_flight: set = set()
+        
         # Set up logging
         self.logger = logging.getLogger(f"agent.{name}")
         
@@ -82,26 +106,60 @@ class BaseAgent(ABC):
     async def stop(self):
         """Stop the agent"""
         self.running = False
+        self.task_queue.put_nowait(_STOP)
         self.logger.info(f"Agent {self.name} stopping...")
     
     async def execution_loop(self):
         """Main agent execution loop"""
-        while self.running:
-            try:
-                # Check for new tasks
+        background = None
+        if self.background_interval:
+            background = self.timer_service.call_every(
+                self.background_interval, self.background_work, delay=self.background_delay
+            )
+        
+        try:
+            while self.running:
                 try:
-                    task = await asyncio.wait_for(
-                        self.task_queue.get(), 
-                        timeout=1.0
-                    )
-                    await self.execute_task(task)
-                except asyncio.TimeoutError:
-                    # No task available, do background work
-                    await self.background_work()
-                    
-            except Exception as e:
-                self.logger.error(f"Error in execution loop: {e}")
-                await asyncio.sleep(1)
+                    # Sleep until a task arrives, then take what else is already queued
+                    batch = await self.next_batch()
+                    if batch:
+                        await self.execute_batch(batch)
+                        
+                except Exception as e:
+                    self.logger.error(f"Error in execution loop: {e}")
+                    await asyncio.sleep(1)
+        finally:
+            if background is not None:
+                self.timer_service.cancel(background)
+            if self._in_flight:
+                await asyncio.gather(*self._in_flight, return_exceptions=True)
+    
+    async def next_batch(self) -> List[AgentTask]:
+        """Wait for a task, then drain up to task_batch_size queued tasks"""
+        batch = [await self.task_queue.get()]
+        while len(batch) < self.task_batch_size and not self.task_queue.empty():
+            batch.append(self.task_queue.get_nowait())
+        return [task for task in batch if task is not _STOP]
+    
+    async def execute_batch(self, tasks: List[AgentTask]):
+        """Execute a batch of tasks; override to handle a batch as a whole"""
+        if self.max_concurrent_tasks <= 1:
+            for task in tasks:
+                await self.execute_task(task)
+            return
+        
+        # Start each task once a slot is free; the loop keeps taking tasks meanwhile
+        for task in tasks:
+            await self._task_slots.acquire()
+            running = asyncio.create_task(self._execute_in_slot(task))
+            self._in_flight.add(running)
+            running.add_done_callback(self._in_flight.discard)
+    
+    async def _execute_in_slot(self, task: AgentTask):
+        try:
+            await self.execute_task(task)
+        finally:
+            self._task_slots.release()
     
     async def execute_task(self, task: AgentTask):
         """Execute a single task"""
@@ -143,9 +201,8 @@ class BaseAgent(ABC):
         pass
     
     async def background_work(self):
-        """Background work when no tasks are queued"""
-        # Default: sleep briefly
-        await asyncio.sleep(0.1)
+        """Periodic background work, run every background_interval seconds"""
+        pass
     
     async def assign_task(self, task: AgentTask):
         """Assign a task to this agent"""
@@ -193,6 +250,7 @@ class BaseAgent(ABC):
             "domain": self.domain.value,
             "running": self.running,
             "queue_size": self.task_queue.qsize(),
+            "in_flight": len(self._in_flight),
             "metrics": {
                 "tasks_completed": self.metrics.tasks_completed,
                 "tasks_failed": self.metrics.tasks_failed,
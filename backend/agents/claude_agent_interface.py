@@ -10,9 +10,11 @@ import logging
 import subprocess
 from typing import Dict, Any, List, Optional
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
+from .agent_registry import AgentRegistry, RegistryChanges, parse_agent_definition
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -24,6 +26,8 @@ class AgentInfo:
     file_path: str
     status: str = "available"
     last_invoked: Optional[datetime] = None
+    department: Optional[str] = None
+    capabilities: List[str] = field(default_factory=list)
 
 @dataclass
 class AgentTask:
@@ -45,65 +49,84 @@ class ClaudeAgentInterface:
         self.agents_dir = os.path.join(self.project_root, ".claude", "agents")
         self.agents: Dict[str, AgentInfo] = {}
         self.active_tasks: Dict[str, AgentTask] = {}
+        self.last_discovery: Optional[datetime] = None
+        
+        # Parsed definitions are cached on disk and indexed by capability/department
+        self.registry = AgentRegistry(self.agents_dir)
         
         # Load agents on initialization
         self._discover_agents()
     
-    def _discover_agents(self):
-        """Discover available Claude Code agents"""
+    def _discover_agents(self) -> RegistryChanges:
+        """Discover available Claude Code agents (only new or changed files are parsed)"""
+        changes = RegistryChanges()
         try:
             if not os.path.exists(self.agents_dir):
                 logger.warning(f"Agents directory not found: {self.agents_dir}")
-                return
+                return changes
             
-            for file_path in Path(self.agents_dir).glob("*.md"):
-                agent_info = self._parse_agent_file(file_path)
-                if agent_info:
-                    self.agents[agent_info.name] = agent_info
-                    logger.info(f"Discovered agent: {agent_info.name}")
+            changes = self.registry.refresh()
+            self._apply_registry_changes(changes)
+            self.last_discovery = datetime.now()
             
             logger.info(f"Total agents discovered: {len(self.agents)}")
             
         except Exception as e:
             logger.error(f"Error discovering agents: {e}")
+        
+        return changes
+    
+    def _apply_registry_changes(self, changes: RegistryChanges):
+        """Update ``self.agents`` from the registry, keeping runtime state of changed agents"""
+        for name in changes.removed:
+            self.agents.pop(name, None)
+        
+        for name in changes.added + changes.changed:
+            agent_info = self._agent_info(self.registry.get(name), self.registry.path_of(name))
+            previous = self.agents.get(name)
+            if previous is not None:
+                agent_info.status = previous.status
+                agent_info.last_invoked = previous.last_invoked
+            self.agents[name] = agent_info
+        
+        if changes:
+            logger.info(f"Agents discovered: {len(changes.added)}, updated: {len(changes.changed)}, "
+                        f"removed: {len(changes.removed)}")
+    
+    @staticmethod
+    def _agent_info(definition: Dict[str, Any], file_path: str) -> AgentInfo:
+        return AgentInfo(
+            name=definition["name"],
+            description=definition["description"],
+            tools=list(definition["tools"]),
+            file_path=file_path,
+            department=definition["department"],
+            capabilities=list(definition["capabilities"])
+        )
     
     def _parse_agent_file(self, file_path: Path) -> Optional[AgentInfo]:
         """Parse agent markdown file to extract agent information"""
         try:
-            content = file_path.read_text()
-            
-            # Extract YAML frontmatter
-            if content.startswith("---"):
-                end_marker = content.find("---", 3)
-                if end_marker != -1:
-                    frontmatter = content[3:end_marker].strip()
-                    
-                    # Parse YAML frontmatter manually (simple parser)
-                    agent_data = {}
-                    for line in frontmatter.split("\n"):
-                        if ":" in line:
-                            key, value = line.split(":", 1)
-                            key = key.strip()
-                            value = value.strip()
-                            
-                            if key == "tools":
-                                # Parse tools list
-                                agent_data[key] = [tool.strip() for tool in value.split(",")]
-                            else:
-                                agent_data[key] = value
-                    
-                    return AgentInfo(
-                        name=agent_data.get("name", file_path.stem),
-                        description=agent_data.get("description", ""),
-                        tools=agent_data.get("tools", []),
-                        file_path=str(file_path)
-                    )
+            definition = parse_agent_definition(file_path.read_text(), file_path.stem)
+            if definition:
+                return self._agent_info(definition, str(file_path))
             
         except Exception as e:
             logger.error(f"Error parsing agent file {file_path}: {e}")
         
         return None
     
+    def start_watching(self, interval: float = 5.0):
+        """Poll the agents directory and apply added, changed and removed definitions"""
+        self.registry.start_watching(interval, on_change=self._apply_registry_changes)
+    
+    def stop_watching(self):
+        self.registry.stop_watching()
+    
+    def find_agents(self, capability: Optional[str] = None, department: Optional[str] = None) -> List[AgentInfo]:
+        """Agents with a tool/capability and/or in a department, from the registry indexes"""
+        return [self.agents[name] for name in self.registry.find(capability, department) if name in self.agents]
+    
     async def invoke_agent(self, agent_name: str, task_description: str, parameters: Dict[str, Any] = None) -> Dict[str, Any]:
         """Invoke a Claude Code agent via Task tool"""
         try:
@@ -178,6 +201,7 @@ class ClaudeAgentInterface:
                 "name": agent.name,
                 "description": agent.description,
                 "tools": agent.tools,
+                "department": agent.department,
                 "status": agent.status,
                 "last_invoked": agent.last_invoked.isoformat() if agent.last_invoked else None
             }
@@ -199,6 +223,8 @@ class ClaudeAgentInterface:
             "name": agent.name,
             "description": agent.description,
             "tools": agent.tools,
+            "department": agent.department,
+            "capabilities": agent.capabilities,
             "status": agent.status,
             "active_tasks": active_tasks,
             "last_invoked": agent.last_invoked.isoformat() if agent.last_invoked else None,
@@ -218,7 +244,8 @@ class ClaudeAgentInterface:
             "active_tasks": active_tasks,
             "completed_tasks": completed_tasks,
             "agents_directory": self.agents_dir,
-            "last_discovery": datetime.now().isoformat()
+            "last_discovery": self.last_discovery.isoformat() if self.last_discovery else None,
+            "registry": self.registry.get_stats()
         }
     
     def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
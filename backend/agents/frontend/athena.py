@@ -18,6 +18,8 @@ logger = logging.getLogger(__name__)
 class AthenaUX(SpecializedAgent):
     """UX verifier for ensuring optimization quality and user experience"""
     
+    background_interval = 900  # seconds between background checks
+    
     def __init__(self):
         super().__init__(
             name="athena-ux",
@@ -1153,23 +1155,15 @@ class AthenaUX(SpecializedAgent):
         """Background work for continuous UX monitoring"""
         
         # Perform periodic UX health checks
-        current_time = datetime.now()
-        
-        if not hasattr(self, '_last_ux_check') or (current_time - self._last_ux_check).total_seconds() > 900:
-            try:
-                # Quick UX health assessment
-                ux_health = await self._quick_ux_health_check()
-                
-                # Log any UX concerns
-                if ux_health["concerns"]:
-                    self.logger.warning(f"UX concerns detected: {ux_health['concerns']}")
-                
-                self._last_ux_check = current_time
-                
-            except Exception as e:
-                self.logger.error(f"Error in background UX monitoring: {e}")
-        
-        await asyncio.sleep(1)
+        try:
+            # Quick UX health assessment
+            ux_health = await self._quick_ux_health_check()
+            
+            # Log any UX concerns
+            if ux_health["concerns"]:
+                self.logger.warning(f"UX concerns detected: {ux_health['concerns']}")
+        except Exception as e:
+            self.logger.error(f"Error in background UX monitoring: {e}")
     
     async def _quick_ux_health_check(self) -> Dict[str, Any]:
         """Quick UX health assessment"""
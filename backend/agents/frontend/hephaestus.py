@@ -20,6 +20,8 @@ logger = logging.getLogger(__name__)
 class HephaestusFrontend(SpecializedAgent):
     """Frontend builder for implementing optimizations and improvements"""
     
+    background_interval = 600  # seconds between background checks
+    
     def __init__(self):
         super().__init__(
             name="hephaestus-frontend",
@@ -986,22 +988,14 @@ class HephaestusFrontend(SpecializedAgent):
         """Background work for continuous optimization monitoring"""
         
         # Monitor for optimization opportunities
-        current_time = datetime.now()
-        
-        if not hasattr(self, '_last_optimization_check') or (current_time - self._last_optimization_check).total_seconds() > 600:
-            try:
-                # Check for performance degradations
-                await self._monitor_performance_degradations()
-                
-                # Check for optimization opportunities
-                await self._identify_optimization_opportunities()
-                
-                self._last_optimization_check = current_time
-                
-            except Exception as e:
-                self.logger.error(f"Error in background optimization monitoring: {e}")
-        
-        await asyncio.sleep(1)
+        try:
+            # Check for performance degradations
+            await self._monitor_performance_degradations()
+            
+            # Check for optimization opportunities
+            await self._identify_optimization_opportunities()
+        except Exception as e:
+            self.logger.error(f"Error in background optimization monitoring: {e}")
     
     async def _monitor_performance_degradations(self):
         """Monitor for performance degradations"""
@@ -18,6 +18,8 @@ logger = logging.getLogger(__name__)
 class PrometheusFrontend(SpecializedAgent):
     """Frontend strategist for analyzing user experience and planning optimizations"""
     
+    background_interval = 300  # seconds between background checks
+    
     def __init__(self):
         super().__init__(
             name="prometheus-frontend",
@@ -786,24 +788,15 @@ class PrometheusFrontend(SpecializedAgent):
         """Background work for continuous frontend analysis"""
         
         # Perform lightweight monitoring
-        current_time = datetime.now()
-        
-        # Check if it's time for periodic analysis
-        if not hasattr(self, '_last_analysis') or (current_time - self._last_analysis).total_seconds() > 300:
-            try:
-                # Quick health check
-                health_check = await self._quick_frontend_health_check()
-                
-                # Record any concerning trends
-                if health_check["concerns"]:
-                    self.logger.warning(f"Frontend concerns detected: {health_check['concerns']}")
-                
-                self._last_analysis = current_time
-                
-            except Exception as e:
-                self.logger.error(f"Error in background analysis: {e}")
-        
-        await asyncio.sleep(1)
+        try:
+            # Quick health check
+            health_check = await self._quick_frontend_health_check()
+            
+            # Record any concerning trends
+            if health_check["concerns"]:
+                self.logger.warning(f"Frontend concerns detected: {health_check['concerns']}")
+        except Exception as e:
+            self.logger.error(f"Error in background analysis: {e}")
     
     async def _quick_frontend_health_check(self) -> Dict[str, Any]:
         """Quick frontend health assessment"""
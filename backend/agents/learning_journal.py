@@ -0,0 +1,265 @@
+"""
+Learning journal - append-only persistence for the self-improvement engine
+
+Learning points, per-agent performance history and optimization patterns
+are stored as JSON rows in a sqlite file in WAL mode. Writes are queued
+and applied by a background writer thread in batched transactions, so
+recording never blocks the event loop and each save costs only the
+records added or changed since the last one.
+
+Compaction trims points and history to the same limits the engine keeps in
+memory and checkpoints the WAL. Loading reads only the newest rows within
+those limits through the primary key (history also one agent at a time),
+so loading time does not grow with how long the journal has been written to.
+"""
+
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_STOP = ("stop",)
+
+class LearningJournal:
+    """Append-only sqlite journal written by a background thread.
+
+    - ``append_point`` / ``append_history`` / ``put_patterns`` /
+      ``delete_patterns`` only queue the write.
+    - ``compact`` deletes all but the newest ``max_points`` points and
+      ``max_history_per_agent`` history entries per agent; it also runs
+      after every ``compact_every`` appended points.
+    - ``flush`` waits until everything queued so far is written.
+    """
+
+    def __init__(self,
+                 path: str,
+                 max_points: int = 10000,
+                 max_history_per_agent: int = 1000,
+                 compact_every: int = 5000,
+                 batch_size: int = 1000):
+        self.path = path
+        self.max_points = max_points
+        self.max_history_per_agent = max_history_per_agent
+        self.compact_every = compact_every
+        self.batch_size = batch_size
+
+        self._queue: queue.Queue = queue.Queue()
+        self._appended_since_compaction = 0
+
+        # Statistics (updated by the writer thread)
+        self.written = 0
+        self.batches = 0
+        self.compactions = 0
+        self.last_compaction_seconds = 0.0
+
+        self._ready = threading.Event()
+        self._writer = threading.Thread(target=self._run, name="learning-journal", daemon=True)
+        self._writer.start()
+        self._ready.wait()
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript("""
+            CREATE TABLE IF NOT EXISTS learning_points (
+                id INTEGER PRIMARY KEY,
+                agent_name TEXT NOT NULL,
+                task_type TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                record TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS performance_history (
+                id INTEGER PRIMARY KEY,
+                agent_name TEXT NOT NULL,
+                record TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_performance_history_agent ON performance_history (agent_name, id);
+            CREATE TABLE IF NOT EXISTS optimization_patterns (
+                pattern_id TEXT PRIMARY KEY,
+                record TEXT NOT NULL
+            );
+        """)
+        return db
+
+    # Writes (queued)
+
+    def append_point(self, record: Dict[str, Any]):
+        self._queue.put(("point", record))
+
+    def append_history(self, agent_name: str, record: Dict[str, Any]):
+        self._queue.put(("history", agent_name, record))
+
+    def put_patterns(self, records: Dict[str, Dict[str, Any]]):
+        """Insert or replace patterns by id"""
+        if records:
+            self._queue.put(("patterns", records))
+
+    def delete_patterns(self, pattern_ids: Iterable[str]):
+        pattern_ids = list(pattern_ids)
+        if pattern_ids:
+            self._queue.put(("delete_patterns", pattern_ids))
+
+    def compact(self):
+        self._queue.put(("compact",))
+
+    def flush(self):
+        """Block until every queued write has been applied"""
+        self._queue.join()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+
+    # Writer thread
+
+    def _run(self):
+        try:
+            db = self._connect()
+        except sqlite3.Error as e:
+            logger.error(f"Learning journal disabled, cannot open {self.path}: {e}")
+            db = None
+        self._ready.set()
+
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = _STOP in batch
+            try:
+                if db is not None:
+                    self._apply(db, [op for op in batch if op is not _STOP])
+            except sqlite3.Error as e:
+                logger.error(f"Error writing learning journal: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                break
+
+        if db is not None:
+            db.close()
+
+    def _apply(self, db: sqlite3.Connection, batch: List[tuple]):
+        compact = False
+        with db:
+            for op in batch:
+                kind = op[0]
+                if kind == "point":
+                    record = op[1]
+                    db.execute(
+                        "INSERT INTO learning_points (agent_name, task_type, timestamp, record) VALUES (?, ?, ?, ?)",
+                        (record["agent_name"], record["task_type"], record["timestamp"],
+                         json.dumps(record, default=str))
+                    )
+                    self._appended_since_compaction += 1
+                elif kind == "history":
+                    db.execute("INSERT INTO performance_history (agent_name, record) VALUES (?, ?)",
+                               (op[1], json.dumps(op[2], default=str)))
+                elif kind == "patterns":
+                    db.executemany("INSERT OR REPLACE INTO optimization_patterns VALUES (?, ?)",
+                                   [(pattern_id, json.dumps(record, default=str))
+                                    for pattern_id, record in op[1].items()])
+                elif kind == "delete_patterns":
+                    db.executemany("DELETE FROM optimization_patterns WHERE pattern_id = ?",
+                                   [(pattern_id,) for pattern_id in op[1]])
+                elif kind == "compact":
+                    compact = True
+            self.written += len(batch)
+            self.batches += 1
+
+        if compact or self._appended_since_compaction >= self.compact_every:
+            self._compact(db)
+
+    def _compact(self, db: sqlite3.Connection):
+        started = time.perf_counter()
+        with db:
+            db.execute("""
+                DELETE FROM learning_points WHERE id <= (
+                    SELECT id FROM learning_points ORDER BY id DESC LIMIT 1 OFFSET ?
+                )
+            """, (self.max_points,))
+            agents = [row[0] for row in db.execute("SELECT DISTINCT agent_name FROM performance_history")]
+            for agent_name in agents:
+                db.execute("""
+                    DELETE FROM performance_history WHERE agent_name = ? AND id <= (
+                        SELECT id FROM performance_history WHERE agent_name = ? ORDER BY id DESC LIMIT 1 OFFSET ?
+                    )
+                """, (agent_name, agent_name, self.max_history_per_agent))
+        db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._appended_since_compaction = 0
+        self.compactions += 1
+        self.last_compaction_seconds = time.perf_counter() - started
+
+    # Reads
+
+    def _read(self, sql: str, params: tuple = ()) -> List[tuple]:
+        try:
+            db = sqlite3.connect(self.path)
+            try:
+                return db.execute(sql, params).fetchall()
+            finally:
+                db.close()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading learning journal: {e}")
+            return []
+
+    @staticmethod
+    def _decode(records: List[str]) -> List[Any]:
+        # One decoder call for all rows is much cheaper than one per row
+        return json.loads("[" + ",".join(records) + "]")
+
+    def load_points(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Newest ``limit`` (default: max_points) points, oldest first"""
+        rows = self._read("SELECT record FROM learning_points ORDER BY id DESC LIMIT ?",
+                          (limit or self.max_points,))
+        return self._decode([row[0] for row in reversed(rows)])
+
+    def load_history(self, limit_per_agent: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Newest entries per agent, oldest first"""
+        rows = self._read("""
+            SELECT agent_name, record FROM (
+                SELECT id, agent_name, record,
+                       ROW_NUMBER() OVER (PARTITION BY agent_name ORDER BY id DESC) AS newest
+                FROM performance_history
+            ) WHERE newest <= ? ORDER BY id
+        """, (limit_per_agent or self.max_history_per_agent,))
+        history: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for (agent_name, _), record in zip(rows, self._decode([row[1] for row in rows])):
+            history[agent_name].append(record)
+        return history
+
+    def load_agent_history(self, agent_name: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Newest entries of one agent, oldest first"""
+        rows = self._read("SELECT record FROM performance_history WHERE agent_name = ? ORDER BY id DESC LIMIT ?",
+                          (agent_name, limit or self.max_history_per_agent))
+        return self._decode([row[0] for row in reversed(rows)])
+
+    def load_patterns(self) -> Dict[str, Dict[str, Any]]:
+        return {pattern_id: json.loads(record)
+                for pattern_id, record in self._read("SELECT pattern_id, record FROM optimization_patterns")}
+
+    def is_empty(self) -> bool:
+        return not any(self._read(f"SELECT 1 FROM {table} LIMIT 1")
+                       for table in ("learning_points", "performance_history", "optimization_patterns"))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+            "compactions": self.compactions,
+            "last_compaction_seconds": self.last_compaction_seconds
+        }
@@ -38,6 +38,8 @@ class HeliosMasterOrchestrator(BaseAgent):
         self.frontend_swarm: Optional[AgentSwarm] = None
         self.backend_swarm: Optional[AgentSwarm] = None
         self.optimization_cycle_duration = 300  # 5 minutes
+        self.background_interval = self.optimization_cycle_duration  # background_work runs one cycle
+        self.background_delay = self.optimization_cycle_duration
         self.emergency_threshold = 0.5  # Health score below which emergency mode activates
         self.optimization_queue = PriorityQueue()
         self.last_health_check = datetime.now()
@@ -71,13 +73,9 @@ class HeliosMasterOrchestrator(BaseAgent):
             raise ValueError(f"Unknown task type: {task_type}")
     
     async def background_work(self):
-        """Continuous orchestration work"""
-        # Check if it's time for a new optimization cycle
-        time_since_last = (datetime.now() - self.last_health_check).total_seconds()
-        
-        if time_since_last >= self.optimization_cycle_duration:
-            await self.orchestrate_optimization_cycle()
-            self.last_health_check = datetime.now()
+        """Continuous orchestration work, one cycle every optimization_cycle_duration seconds"""
+        await self.orchestrate_optimization_cycle()
+        self.last_health_check = datetime.now()
     
     async def orchestrate_optimization_cycle(self) -> Dict[str, Any]:
         """Main orchestration cycle"""
@@ -0,0 +1,363 @@
+"""
+Pattern index - candidate retrieval and scoring for optimization patterns
+
+Patterns are partitioned by task type. Within a task type, each condition
+is posted under its key: string-like values under (key, value), numeric
+values in a per-key list sorted by value. A recommendation request only
+visits the postings for the keys in its context - exact values for
+strings, the value range that can come within 50% for numbers - and
+scores the candidates found there with numpy.
+
+PatternStats keeps the statistics of one group of similar learning points
+up to date as points enter and leave the learning window, so pattern
+discovery does not have to regroup every point on each cycle.
+"""
+
+import bisect
+import itertools
+import json
+import logging
+import math
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def parameter_group_key(parameters: Dict[str, Any]) -> str:
+    """Grouping key of a learning point: scalar parameters with floats rounded to 2 places"""
+    key_params = {}
+    for param_key, param_value in parameters.items():
+        if isinstance(param_value, (str, int, bool)):
+            key_params[param_key] = param_value
+        elif isinstance(param_value, float):
+            key_params[param_key] = round(param_value, 2)
+    return json.dumps(key_params, sort_keys=True)
+
+class PatternStats:
+    """Running statistics of one parameter group within the learning window.
+
+    Points can be removed as well as added, so the statistics always
+    describe the points currently in the window. Execution time variance
+    uses Welford's update.
+    """
+
+    __slots__ = ("count", "successes", "improvement_sum", "improvement_count",
+                 "execution_time_mean", "execution_time_m2")
+
+    def __init__(self):
+        self.count = 0
+        self.successes = 0
+        self.improvement_sum = 0.0
+        self.improvement_count = 0
+        self.execution_time_mean = 0.0
+        self.execution_time_m2 = 0.0
+
+    def add(self, point):
+        self.count += 1
+        if point.outcome == "success":
+            self.successes += 1
+        for delta in point.performance_delta.values():
+            if delta > 0:
+                self.improvement_sum += delta
+                self.improvement_count += 1
+
+        difference = point.execution_time - self.execution_time_mean
+        self.execution_time_mean += difference / self.count
+        self.execution_time_m2 += difference * (point.execution_time - self.execution_time_mean)
+
+    def remove(self, point):
+        if self.count <= 1:
+            self.__init__()
+            return
+        self.count -= 1
+        if point.outcome == "success":
+            self.successes -= 1
+        for delta in point.performance_delta.values():
+            if delta > 0:
+                self.improvement_sum -= delta
+                self.improvement_count -= 1
+
+        previous_mean = self.execution_time_mean
+        self.execution_time_mean = (previous_mean * (self.count + 1) - point.execution_time) / self.count
+        self.execution_time_m2 = max(
+            0.0,
+            self.execution_time_m2 - (point.execution_time - previous_mean) * (point.execution_time - self.execution_time_mean)
+        )
+
+    @property
+    def success_rate(self) -> float:
+        return self.successes / self.count if self.count else 0.0
+
+    @property
+    def average_improvement(self) -> float:
+        """Mean of all positive metric deltas"""
+        return self.improvement_sum / self.improvement_count if self.improvement_count else 0.0
+
+    @property
+    def execution_time_cv(self) -> float:
+        """Coefficient of variation of execution time (sample stdev / mean)"""
+        if self.count < 2 or self.execution_time_mean <= 0:
+            return 0.0
+        return math.sqrt(self.execution_time_m2 / (self.count - 1)) / self.execution_time_mean
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float))
+
+def _numeric_window(value: float) -> Tuple[float, float]:
+    """Values that can be within 50% of ``value`` lie in this range"""
+    return min(0.5 * value, 2 * value, value - 0.5), max(0.5 * value, 2 * value, value + 0.5)
+
+class _Posting:
+    """Slots (optionally sorted by a value) with cached numpy arrays"""
+
+    __slots__ = ("values", "slots", "_arrays")
+
+    def __init__(self):
+        self.values: List[float] = []
+        self.slots: List[int] = []
+        self._arrays: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def add(self, slot: int, value: float = 0.0):
+        position = bisect.bisect_right(self.values, value)
+        self.values.insert(position, value)
+        self.slots.insert(position, slot)
+        self._arrays = None
+
+    def remove(self, slot: int, value: float = 0.0):
+        low = bisect.bisect_left(self.values, value)
+        high = bisect.bisect_right(self.values, value)
+        position = self.slots.index(slot, low, high)
+        del self.values[position]
+        del self.slots[position]
+        self._arrays = None
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._arrays is None:
+            self._arrays = (np.array(self.values, dtype=np.float64), np.array(self.slots, dtype=np.int64))
+        return self._arrays
+
+class _TaskPatterns:
+    """Slot arrays and postings for the patterns of one task type"""
+
+    def __init__(self, capacity: int = 64):
+        self.patterns: List[Any] = [None] * capacity
+        self.conditions = np.zeros(capacity)
+        self.confidence = np.zeros(capacity)
+        self.order = np.zeros(capacity, dtype=np.int64)
+        self.free: List[int] = list(range(capacity - 1, -1, -1))
+        self.size = 0
+
+        self.exact: Dict[Tuple[str, Any], _Posting] = {}
+        self.numeric: Dict[str, _Posting] = {}
+        self.unconditional: Dict[int, None] = {}
+        self.unindexed: Dict[int, None] = {}   # conditions with unhashable or non-finite values
+
+    def allocate(self) -> int:
+        if not self.free:
+            capacity = len(self.patterns)
+            self.patterns.extend([None] * capacity)
+            self.conditions = np.concatenate([self.conditions, np.zeros(capacity)])
+            self.confidence = np.concatenate([self.confidence, np.zeros(capacity)])
+            self.order = np.concatenate([self.order, np.zeros(capacity, dtype=np.int64)])
+            self.free = list(range(2 * capacity - 1, capacity - 1, -1))
+        self.size += 1
+        return self.free.pop()
+
+    def release(self, slot: int):
+        self.patterns[slot] = None
+        self.free.append(slot)
+        self.size -= 1
+
+class PatternIndex:
+    """Optimization patterns indexed by task type and condition.
+
+    ``best_match`` returns the same pattern as scoring every pattern of the
+    task type with ``match_score`` and taking the highest confidence x match
+    among those above both thresholds (earliest added on ties). Conditions
+    that cannot be indexed are scored with ``match_score`` directly.
+    Confidence is copied into the index, so changes to a pattern's
+    ``confidence_score`` must be followed by ``update_confidence``.
+    """
+
+    def __init__(self, match_score: Callable[[Dict[str, Any], Dict[str, Any]], float]):
+        self.match_score = match_score
+        self._tasks: Dict[str, _TaskPatterns] = defaultdict(_TaskPatterns)
+        self._slots: Dict[str, Tuple[str, int]] = {}
+        self._order = itertools.count()
+
+        # Statistics
+        self.queries = 0
+        self.candidates_scored = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, pattern_id: str) -> bool:
+        return pattern_id in self._slots
+
+    def add(self, pattern):
+        """Index ``pattern``, replacing any pattern with the same id"""
+
+        self.remove(pattern.pattern_id)
+        task = self._tasks[pattern.task_type]
+        slot = task.allocate()
+        task.patterns[slot] = pattern
+        task.conditions[slot] = len(pattern.conditions)
+        task.confidence[slot] = pattern.confidence_score
+        task.order[slot] = next(self._order)
+        self._slots[pattern.pattern_id] = (pattern.task_type, slot)
+
+        if not pattern.conditions:
+            task.unconditional[slot] = None
+        elif not all(self._indexable(value) for value in pattern.conditions.values()):
+            task.unindexed[slot] = None
+        else:
+            for key, value in pattern.conditions.items():
+                if _is_number(value):
+                    task.numeric.setdefault(key, _Posting()).add(slot, float(value))
+                else:
+                    task.exact.setdefault((key, value), _Posting()).add(slot)
+
+    def remove(self, pattern_id: str):
+        location = self._slots.pop(pattern_id, None)
+        if location is None:
+            return
+        task_type, slot = location
+        task = self._tasks[task_type]
+        pattern = task.patterns[slot]
+
+        if slot in task.unconditional:
+            del task.unconditional[slot]
+        elif slot in task.unindexed:
+            del task.unindexed[slot]
+        else:
+            for key, value in pattern.conditions.items():
+                if _is_number(value):
+                    posting = task.numeric[key]
+                    posting.remove(slot, float(value))
+                    if not posting.slots:
+                        del task.numeric[key]
+                else:
+                    posting = task.exact[(key, value)]
+                    posting.remove(slot)
+                    if not posting.slots:
+                        del task.exact[(key, value)]
+
+        task.release(slot)
+        if not task.size:
+            del self._tasks[task_type]
+
+    def clear(self):
+        self._tasks.clear()
+        self._slots.clear()
+
+    def update_confidence(self, pattern):
+        location = self._slots.get(pattern.pattern_id)
+        if location is not None:
+            task_type, slot = location
+            self._tasks[task_type].confidence[slot] = pattern.confidence_score
+
+    @staticmethod
+    def _indexable(value: Any) -> bool:
+        if _is_number(value):
+            return math.isfinite(value)
+        try:
+            hash(value)
+        except TypeError:
+            return False
+        return True
+
+    def _candidates(self, task: _TaskPatterns, context: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """Slots that share a key with ``context`` and the match points each condition earns"""
+
+        slots = []
+        points = []
+        for key, value in context.items():
+            if _is_number(value):
+                posting = task.numeric.get(key)
+                if posting is None or not math.isfinite(value):
+                    continue
+                low, high = _numeric_window(value)
+                start = bisect.bisect_left(posting.values, low)
+                end = bisect.bisect_right(posting.values, high)
+                if start == end:
+                    continue
+                values, posting_slots = posting.arrays()
+                values = values[start:end]
+                difference = np.abs(values - value) / np.maximum(np.maximum(np.abs(values), abs(value)), 1)
+                slots.append(posting_slots[start:end])
+                points.append(np.where(values == value, 1.0,
+                                       np.where(difference < 0.2, 0.8,
+                                                np.where(difference < 0.5, 0.5, 0.0))))
+            else:
+                try:
+                    posting = task.exact.get((key, value))
+                except TypeError:
+                    continue
+                if posting is not None:
+                    posting_slots = posting.arrays()[1]
+                    slots.append(posting_slots)
+                    points.append(np.ones(len(posting_slots)))
+
+        if task.unconditional:
+            unconditional = np.fromiter(task.unconditional, dtype=np.int64, count=len(task.unconditional))
+            slots.append(unconditional)
+            points.append(np.zeros(len(unconditional)))
+
+        if not slots:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        candidates, positions = np.unique(np.concatenate(slots), return_inverse=True)
+        return candidates, np.bincount(positions, weights=np.concatenate(points))
+
+    def best_match(self,
+                   task_type: str,
+                   context: Dict[str, Any],
+                   min_confidence: float,
+                   min_match: float) -> Optional[Tuple[Any, float]]:
+        """Best (pattern, match score) with confidence >= ``min_confidence`` and match > ``min_match``"""
+
+        task = self._tasks.get(task_type)
+        if task is None:
+            return None
+        self.queries += 1
+
+        best: Optional[Tuple[float, int, int, float]] = None   # (-rank, order, slot, match)
+
+        candidates, points = self._candidates(task, context)
+        if len(candidates):
+            self.candidates_scored += len(candidates)
+            conditions = task.conditions[candidates]
+            scores = np.where(conditions > 0, points / np.maximum(conditions, 1), 1.0)
+            confidence = task.confidence[candidates]
+            eligible = np.flatnonzero((confidence >= min_confidence) & (scores > min_match))
+            if len(eligible):
+                ranks = confidence[eligible] * scores[eligible]
+                top = eligible[ranks == ranks.max()]
+                winner = top[np.argmin(task.order[candidates[top]])]
+                slot = int(candidates[winner])
+                best = (-float(ranks.max()), int(task.order[slot]), slot, float(scores[winner]))
+
+        for slot in task.unindexed:
+            pattern = task.patterns[slot]
+            if pattern.confidence_score < min_confidence:
+                continue
+            score = self.match_score(pattern.conditions, context)
+            if score > min_match:
+                entry = (-pattern.confidence_score * score, int(task.order[slot]), slot, score)
+                if best is None or entry < best:
+                    best = entry
+
+        if best is None:
+            return None
+        return task.patterns[best[2]], best[3]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "patterns": len(self._slots),
+            "task_types": len(self._tasks),
+            "unindexed": sum(len(task.unindexed) for task in self._tasks.values()),
+            "queries": self.queries,
+            "average_candidates": self.candidates_scored / self.queries if self.queries else 0.0
+        }
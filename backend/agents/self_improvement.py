@@ -1,11 +1,19 @@
 """
 Self-improvement engine for agent learning and adaptation
+
+Patterns are loaded from the learning journal when the engine is created.
+The learning window (recent points and the parameter group statistics
+built from them) is loaded on first use instead: ``start`` loads it off
+the event loop, and any earlier access loads it on demand. Performance
+history is loaded one agent at a time when that agent records a point,
+and in full only when all of it is read.
 """
 
 import asyncio
 import logging
+import threading
 from typing import Dict, Any, List, Optional, Tuple
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict
 from datetime import datetime, timedelta
 from collections import defaultdict, deque
 import statistics
@@ -13,6 +21,9 @@ import json
 import pickle
 import os
 
+from .learning_journal import LearningJournal
+from .pattern_index import PatternIndex, PatternStats, parameter_group_key
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -40,16 +51,47 @@ class OptimizationPattern:
     last_used: datetime
     confidence_score: float
 
+def _point_to_record(point: LearningPoint) -> Dict[str, Any]:
+    record = asdict(point)
+    record["timestamp"] = point.timestamp.isoformat()
+    return record
+
+def _point_from_record(record: Dict[str, Any]) -> LearningPoint:
+    return LearningPoint(**{**record, "timestamp": datetime.fromisoformat(record["timestamp"])})
+
+def _pattern_to_record(pattern: OptimizationPattern) -> Dict[str, Any]:
+    record = asdict(pattern)
+    record["last_used"] = pattern.last_used.isoformat()
+    return record
+
+def _pattern_from_record(record: Dict[str, Any]) -> OptimizationPattern:
+    return OptimizationPattern(**{**record, "last_used": datetime.fromisoformat(record["last_used"])})
+
 class SelfImprovementEngine:
     """Engine for agent self-improvement and learning"""
     
     def __init__(self, data_dir: str = "/tmp/agent_learning"):
         self.data_dir = data_dir
-        self.learning_points: deque = deque(maxlen=10000)
         self.optimization_patterns: Dict[str, OptimizationPattern] = {}
-        self.agent_performance_history: Dict[str, List[Dict]] = defaultdict(list)
         self.running = False
         
+        # Learning window and history, loaded from the journal on first access
+        self._learning_points: deque = deque(maxlen=10000)
+        self._window_loaded = False
+        self._window_lock = threading.Lock()
+        self._agent_performance_history: Dict[str, List[Dict]] = {}
+        self._history_loaded = False   # every agent's history is in memory
+        
+        # Patterns indexed for recommendations, and statistics of successful
+        # points per (task type, parameter group) kept up to date as points are recorded
+        self.pattern_index = PatternIndex(self.calculate_match_score)
+        self._pattern_groups: Dict[Tuple[str, str], PatternStats] = defaultdict(PatternStats)
+        self._changed_groups: set = set()
+        
+        # Patterns changed or removed since the last save
+        self._dirty_patterns: set = set()
+        self._removed_patterns: set = set()
+        
         # Learning parameters
         self.min_samples_for_pattern = 5
         self.pattern_confidence_threshold = 0.7
@@ -59,11 +101,38 @@ class SelfImprovementEngine:
         # Ensure data directory exists
         os.makedirs(data_dir, exist_ok=True)
         
-        # Load existing learning data
+        # Append-only journal, written from a background thread
+        self.journal = LearningJournal(
+            os.path.join(data_dir, "learning_journal.db"),
+            max_points=self._learning_points.maxlen,
+            max_history_per_agent=1000
+        )
+        
+        # Load existing patterns; the learning window follows on first use
         self.load_learning_data()
     
+    @property
+    def learning_points(self) -> deque:
+        self._ensure_window_loaded()
+        return self._learning_points
+    
+    @property
+    def agent_performance_history(self) -> Dict[str, List[Dict]]:
+        if not self._history_loaded:
+            # Agents already in memory may have entries the journal has not written yet
+            for agent, history in self.journal.load_history(1000).items():
+                self._agent_performance_history.setdefault(agent, history)
+            self._history_loaded = True
+        return self._agent_performance_history
+    
+    @property
+    def pattern_groups(self) -> Dict[Tuple[str, str], PatternStats]:
+        self._ensure_window_loaded()
+        return self._pattern_groups
+    
     async def start(self):
         """Start the self-improvement engine"""
+        await asyncio.to_thread(self._ensure_window_loaded)
         self.running = True
         logger.info("Self-improvement engine started")
         
@@ -74,6 +143,7 @@ class SelfImprovementEngine:
         """Stop the self-improvement engine"""
         self.running = False
         self.save_learning_data()
+        self.journal.close()
         logger.info("Self-improvement engine stopped")
     
     async def learning_loop(self):
@@ -89,8 +159,9 @@ class SelfImprovementEngine:
                 # Cleanup old data
                 await self.cleanup_old_data()
                 
-                # Save learning data periodically
+                # Save changed patterns and compact the journal
                 self.save_learning_data()
+                self.journal.compact()
                 
                 # Sleep for learning cycle interval
                 await asyncio.sleep(300)  # 5 minutes
@@ -120,83 +191,73 @@ class SelfImprovementEngine:
             context=context or {}
         )
         
+        if len(self.learning_points) == self.learning_points.maxlen:
+            self._untrack_point(self.learning_points[0])
         self.learning_points.append(learning_point)
+        self._track_point(learning_point)
+        self.journal.append_point(_point_to_record(learning_point))
         
         # Update agent performance history
-        self.agent_performance_history[agent_name].append({
+        history_entry = {
             "timestamp": learning_point.timestamp.isoformat(),
             "task_type": task_type,
             "outcome": outcome,
-            "performance_delta": performance_delta,
+            "performance_delta": dict(performance_delta),
             "execution_time": execution_time
-        })
+        }
+        history = self._agent_history(agent_name)
+        history.append(history_entry)
+        self.journal.append_history(agent_name, history_entry)
         
         # Keep only recent history per agent
-        if len(self.agent_performance_history[agent_name]) > 1000:
-            self.agent_performance_history[agent_name] = self.agent_performance_history[agent_name][-1000:]
+        if len(history) > 1000:
+            self._agent_performance_history[agent_name] = history[-1000:]
     
-    async def discover_patterns(self):
-        """Discover new optimization patterns from learning data"""
-        
-        # Group learning points by task type
-        task_groups = defaultdict(list)
-        for point in self.learning_points:
-            if point.outcome == "success":
-                task_groups[point.task_type].append(point)
-        
-        # Analyze each task type for patterns
-        for task_type, points in task_groups.items():
-            if len(points) >= self.min_samples_for_pattern:
-                await self.analyze_task_patterns(task_type, points)
+    def _agent_history(self, agent_name: str) -> List[Dict]:
+        """One agent's history, read from the journal the first time it is needed"""
+        history = self._agent_performance_history.get(agent_name)
+        if history is None:
+            history = [] if self._history_loaded else self.journal.load_agent_history(agent_name, 1000)
+            self._agent_performance_history[agent_name] = history
+        return history
     
-    async def analyze_task_patterns(self, task_type: str, points: List[LearningPoint]):
-        """Analyze patterns for a specific task type"""
-        
-        # Group by similar parameters
-        parameter_groups = defaultdict(list)
-        
-        for point in points:
-            # Create a simplified key for grouping
-            key_params = {}
-            for param_key, param_value in point.parameters.items():
-                if isinstance(param_value, (str, int, bool)):
-                    key_params[param_key] = param_value
-                elif isinstance(param_value, float):
-                    # Round floats for grouping
-                    key_params[param_key] = round(param_value, 2)
-            
-            key = json.dumps(key_params, sort_keys=True)
-            parameter_groups[key].append(point)
+    def _track_point(self, point: LearningPoint):
+        """Add a point entering the learning window to its parameter group"""
+        if point.outcome == "success":
+            group = (point.task_type, parameter_group_key(point.parameters))
+            self._pattern_groups[group].add(point)
+            self._changed_groups.add(group)
+    
+    def _untrack_point(self, point: LearningPoint):
+        """Remove a point leaving the learning window from its parameter group"""
+        if point.outcome == "success":
+            group = (point.task_type, parameter_group_key(point.parameters))
+            stats = self._pattern_groups[group]
+            stats.remove(point)
+            if not stats.count:
+                del self._pattern_groups[group]
+            self._changed_groups.add(group)
+    
+    async def discover_patterns(self):
+        """Discover new optimization patterns from parameter groups changed since the last cycle"""
         
-        # Create patterns from groups with sufficient samples
-        for param_key, group_points in parameter_groups.items():
-            if len(group_points) >= self.min_samples_for_pattern:
-                await self.create_optimization_pattern(task_type, param_key, group_points)
+        changed, self._changed_groups = self._changed_groups, set()
+        for task_type, param_key in changed:
+            stats = self.pattern_groups.get((task_type, param_key))
+            if stats is not None and stats.count >= self.min_samples_for_pattern:
+                await self.create_optimization_pattern(task_type, param_key, stats)
     
     async def create_optimization_pattern(self, 
                                         task_type: str, 
                                         param_key: str, 
-                                        points: List[LearningPoint]):
-        """Create an optimization pattern from a group of similar learning points"""
+                                        stats: PatternStats):
+        """Create an optimization pattern from the statistics of a group of similar learning points"""
         
-        # Calculate pattern statistics
-        success_count = sum(1 for p in points if p.outcome == "success")
-        success_rate = success_count / len(points)
-        
-        # Calculate average improvements
-        improvements = defaultdict(list)
-        for point in points:
-            for metric, delta in point.performance_delta.items():
-                if delta > 0:  # Only positive improvements
-                    improvements[metric].append(delta)
-        
-        average_improvement = 0
-        if improvements:
-            all_improvements = [imp for imps in improvements.values() for imp in imps]
-            average_improvement = statistics.mean(all_improvements) if all_improvements else 0
+        success_rate = stats.success_rate
+        average_improvement = stats.average_improvement
         
         # Calculate confidence score
-        confidence_score = self.calculate_confidence_score(points, success_rate, average_improvement)
+        confidence_score = self.calculate_confidence_score(stats, success_rate, average_improvement)
         
         if confidence_score >= self.pattern_confidence_threshold:
             # Create pattern
@@ -224,11 +285,24 @@ class SelfImprovementEngine:
                 confidence_score=confidence_score
             )
             
-            self.optimization_patterns[pattern_id] = pattern
+            self.add_optimization_pattern(pattern)
             logger.info(f"Created new optimization pattern: {pattern_id} (confidence: {confidence_score:.2f})")
     
+    def add_optimization_pattern(self, pattern: OptimizationPattern):
+        """Store and index a pattern, replacing any with the same id"""
+        self.optimization_patterns[pattern.pattern_id] = pattern
+        self.pattern_index.add(pattern)
+        self._dirty_patterns.add(pattern.pattern_id)
+        self._removed_patterns.discard(pattern.pattern_id)
+    
+    def remove_optimization_pattern(self, pattern_id: str):
+        del self.optimization_patterns[pattern_id]
+        self.pattern_index.remove(pattern_id)
+        self._dirty_patterns.discard(pattern_id)
+        self._removed_patterns.add(pattern_id)
+    
     def calculate_confidence_score(self, 
-                                 points: List[LearningPoint], 
+                                 stats: PatternStats, 
                                  success_rate: float, 
                                  average_improvement: float) -> float:
         """Calculate confidence score for a pattern"""
@@ -241,14 +315,12 @@ class SelfImprovementEngine:
         confidence += improvement_factor * 0.2
         
         # Boost confidence for more data points
-        sample_factor = min(1.0, len(points) / 20.0)  # Scale to 20 samples
+        sample_factor = min(1.0, stats.count / 20.0)  # Scale to 20 samples
         confidence += sample_factor * 0.1
         
         # Penalize for high variance in execution time
-        execution_times = [p.execution_time for p in points]
-        if len(execution_times) > 1:
-            cv = statistics.stdev(execution_times) / statistics.mean(execution_times)
-            variance_penalty = min(0.2, cv * 0.1)
+        if stats.count > 1:
+            variance_penalty = min(0.2, stats.execution_time_cv * 0.1)
             confidence -= variance_penalty
         
         return max(0.0, min(1.0, confidence))
@@ -256,23 +328,29 @@ class SelfImprovementEngine:
     async def update_pattern_confidence(self):
         """Update confidence scores for existing patterns"""
         
+        # Recent outcomes per task type, in one pass over the learning window
+        cutoff = datetime.now() - timedelta(days=7)
+        recent = defaultdict(lambda: [0, 0])  # task_type -> [points, successes]
+        for p in reversed(self.learning_points):
+            if p.timestamp <= cutoff:
+                break
+            counts = recent[p.task_type]
+            counts[0] += 1
+            counts[1] += p.outcome == "success"
+        
         for pattern in self.optimization_patterns.values():
-            # Find recent usage data
-            recent_points = [
-                p for p in self.learning_points
-                if p.task_type == pattern.task_type
-                and p.timestamp > datetime.now() - timedelta(days=7)
-            ]
-            
-            if recent_points:
+            counts = recent.get(pattern.task_type)
+            if counts:
                 # Recalculate confidence based on recent performance
-                recent_success_rate = sum(1 for p in recent_points if p.outcome == "success") / len(recent_points)
+                recent_success_rate = counts[1] / counts[0]
                 
                 # Update confidence with decay
                 pattern.confidence_score = (
                     pattern.confidence_score * self.memory_decay_factor +
                     recent_success_rate * (1 - self.memory_decay_factor)
                 )
+                self.pattern_index.update_confidence(pattern)
+                self._dirty_patterns.add(pattern.pattern_id)
     
     def get_recommendation(self, 
                          agent_name: str, 
@@ -280,26 +358,17 @@ class SelfImprovementEngine:
                          context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Get optimization recommendation for a task"""
         
-        # Find matching patterns
-        matching_patterns = []
-        for pattern in self.optimization_patterns.values():
-            if pattern.task_type == task_type and pattern.confidence_score >= self.pattern_confidence_threshold:
-                # Check if conditions match context
-                match_score = self.calculate_match_score(pattern.conditions, context)
-                if match_score > 0.7:  # 70% match threshold
-                    matching_patterns.append((pattern, match_score))
-        
-        if not matching_patterns:
+        # Best confidence x match score among confident patterns that match the context by over 70%
+        match = self.pattern_index.best_match(task_type, context, self.pattern_confidence_threshold, 0.7)
+        if match is None:
             return None
         
-        # Sort by confidence and match score
-        matching_patterns.sort(key=lambda x: x[0].confidence_score * x[1], reverse=True)
-        
-        best_pattern = matching_patterns[0][0]
+        best_pattern = match[0]
         
         # Update usage
         best_pattern.usage_count += 1
         best_pattern.last_used = datetime.now()
+        self._dirty_patterns.add(best_pattern.pattern_id)
         
         return {
             "pattern_id": best_pattern.pattern_id,
@@ -344,63 +413,93 @@ class SelfImprovementEngine:
                 patterns_to_remove.append(pattern_id)
         
         for pattern_id in patterns_to_remove:
-            del self.optimization_patterns[pattern_id]
+            self.remove_optimization_pattern(pattern_id)
             logger.info(f"Removed low-confidence pattern: {pattern_id}")
     
     def save_learning_data(self):
-        """Save learning data to disk"""
+        """Queue patterns changed since the last save; points and history are journaled as recorded"""
         try:
-            # Save learning points
-            learning_file = os.path.join(self.data_dir, "learning_points.pkl")
-            with open(learning_file, "wb") as f:
-                pickle.dump(list(self.learning_points), f)
-            
-            # Save patterns
-            patterns_file = os.path.join(self.data_dir, "patterns.pkl")
-            with open(patterns_file, "wb") as f:
-                pickle.dump(self.optimization_patterns, f)
-            
-            # Save performance history
-            history_file = os.path.join(self.data_dir, "performance_history.json")
-            with open(history_file, "w") as f:
-                # Convert to JSON-serializable format
-                history_data = {}
-                for agent, history in self.agent_performance_history.items():
-                    history_data[agent] = history
-                json.dump(history_data, f)
+            self.journal.put_patterns({
+                pattern_id: _pattern_to_record(self.optimization_patterns[pattern_id])
+                for pattern_id in self._dirty_patterns
+                if pattern_id in self.optimization_patterns
+            })
+            self.journal.delete_patterns(self._removed_patterns)
+            self._dirty_patterns = set()
+            self._removed_patterns = set()
             
         except Exception as e:
             logger.error(f"Error saving learning data: {e}")
     
     def load_learning_data(self):
-        """Load learning data from disk"""
+        """Load patterns from the journal, importing pre-journal files once"""
         try:
-            # Load learning points
-            learning_file = os.path.join(self.data_dir, "learning_points.pkl")
-            if os.path.exists(learning_file):
-                with open(learning_file, "rb") as f:
-                    points = pickle.load(f)
-                    self.learning_points.extend(points)
-            
-            # Load patterns
-            patterns_file = os.path.join(self.data_dir, "patterns.pkl")
-            if os.path.exists(patterns_file):
-                with open(patterns_file, "rb") as f:
-                    self.optimization_patterns = pickle.load(f)
+            if self.journal.is_empty():
+                self._import_legacy_files()
             
-            # Load performance history
-            history_file = os.path.join(self.data_dir, "performance_history.json")
-            if os.path.exists(history_file):
-                with open(history_file, "r") as f:
-                    history_data = json.load(f)
-                    for agent, history in history_data.items():
-                        self.agent_performance_history[agent] = history
+            self.optimization_patterns = {
+                pattern_id: _pattern_from_record(record)
+                for pattern_id, record in self.journal.load_patterns().items()
+            }
+            self.pattern_index.clear()
+            for pattern in self.optimization_patterns.values():
+                self.pattern_index.add(pattern)
             
-            logger.info(f"Loaded {len(self.learning_points)} learning points and {len(self.optimization_patterns)} patterns")
+            logger.info(f"Loaded {len(self.optimization_patterns)} patterns")
             
         except Exception as e:
             logger.error(f"Error loading learning data: {e}")
     
+    def _ensure_window_loaded(self):
+        """Load the newest points from the journal (bounded by the in-memory limits) once"""
+        if self._window_loaded:
+            return
+        with self._window_lock:
+            if self._window_loaded:
+                return
+            try:
+                self._learning_points.extend(
+                    _point_from_record(record) for record in self.journal.load_points(self._learning_points.maxlen)
+                )
+                for point in self._learning_points:
+                    self._track_point(point)
+                
+                logger.info(f"Loaded {len(self._learning_points)} learning points")
+                
+            except Exception as e:
+                logger.error(f"Error loading learning window: {e}")
+            self._window_loaded = True
+    
+    def _import_legacy_files(self):
+        """One-time import of the pickle/JSON files written before the journal"""
+        
+        learning_file = os.path.join(self.data_dir, "learning_points.pkl")
+        patterns_file = os.path.join(self.data_dir, "patterns.pkl")
+        history_file = os.path.join(self.data_dir, "performance_history.json")
+        
+        if os.path.exists(learning_file):
+            with open(learning_file, "rb") as f:
+                for point in pickle.load(f)[-self._learning_points.maxlen:]:
+                    self.journal.append_point(_point_to_record(point))
+        
+        if os.path.exists(patterns_file):
+            with open(patterns_file, "rb") as f:
+                patterns = pickle.load(f)
+                self.journal.put_patterns({
+                    pattern_id: _pattern_to_record(pattern) for pattern_id, pattern in patterns.items()
+                })
+        
+        if os.path.exists(history_file):
+            with open(history_file, "r") as f:
+                for agent, history in json.load(f).items():
+                    for entry in history[-1000:]:
+                        self.journal.append_history(agent, entry)
+        
+        self.journal.flush()
+        for path in (learning_file, patterns_file, history_file):
+            if os.path.exists(path):
+                os.replace(path, path + ".imported")
+    
     def get_learning_stats(self) -> Dict[str, Any]:
         """Get learning statistics"""
         
@@ -427,7 +526,10 @@ class SelfImprovementEngine:
             "high_confidence_patterns": sum(1 for p in self.optimization_patterns.values() if p.confidence_score >= 0.8),
             "agent_stats": agent_stats,
             "learning_rate": self.learning_rate,
-            "pattern_confidence_threshold": self.pattern_confidence_threshold
+            "pattern_confidence_threshold": self.pattern_confidence_threshold,
+            "pattern_index": self.pattern_index.get_stats(),
+            "parameter_groups": len(self.pattern_groups),
+            "journal": self.journal.get_stats()
         }
 
 
@@ -0,0 +1,130 @@
+"""
+Shared timer service for periodic agent background work
+
+All periodic callbacks live in one heap ordered by due time, and a single
+event-loop timer is armed for the earliest of them. Nothing wakes up
+between due times, so agents without due work cost no CPU. Callbacks due
+within ``slack`` seconds of each other run on the same wake-up.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class PeriodicTimer:
+    """A callback scheduled every ``interval`` seconds"""
+
+    __slots__ = ("interval", "callback", "due", "cancelled", "running", "runs", "overruns")
+
+    def __init__(self, interval: float, callback: Callable[[], Awaitable[Any]], due: float):
+        self.interval = interval
+        self.callback = callback
+        self.due = due
+        self.cancelled = False
+        self.running: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.overruns = 0   # times a run was skipped because the previous one had not finished
+
+class TimerService:
+    """One heap of periodic timers driven by a single ``loop.call_at``"""
+
+    def __init__(self, slack: float = 0.01):
+        self.slack = slack
+        self._heap: List[Tuple[float, int, PeriodicTimer]] = []
+        self._sequence = itertools.count()
+        self._armed: Optional[asyncio.TimerHandle] = None
+        self._armed_for = float("inf")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.active = 0
+        self.wakeups = 0
+
+    def call_every(self, interval: float, callback: Callable[[], Awaitable[Any]],
+                   delay: Optional[float] = None) -> PeriodicTimer:
+        """Run ``await callback()`` every ``interval`` seconds, first after ``delay`` (default: interval).
+
+        A run that is still going when the next one is due makes that next
+        run be skipped rather than overlap it.
+        """
+
+        if interval <= 0:
+            raise ValueError(f"Timer interval must be positive, got {interval}")
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # A new event loop (e.g. in tests): timers armed on the old one are gone
+            self._loop, self._heap, self._armed, self._armed_for, self.active = loop, [], None, float("inf"), 0
+
+        timer = PeriodicTimer(interval, callback, loop.time() + (interval if delay is None else delay))
+        heapq.heappush(self._heap, (timer.due, next(self._sequence), timer))
+        self.active += 1
+        self._arm()
+        return timer
+
+    def cancel(self, timer: PeriodicTimer):
+        """Stop future runs; a run in progress is left to finish"""
+        if not timer.cancelled:
+            timer.cancelled = True
+            self.active -= 1
+
+    def _arm(self):
+        heap = self._heap
+        while heap and heap[0][2].cancelled:
+            heapq.heappop(heap)
+        if not heap:
+            if self._armed is not None:
+                self._armed.cancel()
+                self._armed, self._armed_for = None, float("inf")
+            return
+
+        due = heap[0][0]
+        if self._armed is not None:
+            if self._armed_for <= due:
+                return
+            self._armed.cancel()
+        self._armed = self._loop.call_at(due, self._fire)
+        self._armed_for = due
+
+    def _fire(self):
+        self._armed, self._armed_for = None, float("inf")
+        self.wakeups += 1
+
+        now = self._loop.time()
+        heap = self._heap
+        due = []
+        while heap and heap[0][0] <= now + self.slack:
+            timer = heapq.heappop(heap)[2]
+            if not timer.cancelled:
+                due.append(timer)
+
+        for timer in due:
+            if timer.running is None or timer.running.done():
+                timer.running = self._loop.create_task(self._run(timer))
+            else:
+                timer.overruns += 1
+            # Keep the period without bursting to catch up after a stall
+            timer.due += timer.interval
+            if timer.due <= now:
+                timer.due = now + timer.interval
+            heapq.heappush(heap, (timer.due, next(self._sequence), timer))
+        self._arm()
+
+    async def _run(self, timer: PeriodicTimer):
+        try:
+            await timer.callback()
+            timer.runs += 1
+        except Exception as e:
+            logger.error(f"Timer callback {getattr(timer.callback, '__qualname__', timer.callback)} failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "timers": self.active,
+            "wakeups": self.wakeups,
+            "next_due_in": (self._heap[0][0] - self._loop.time()) if self._heap and self._loop else None
+        }
+
+# Global timer service instance
+timer_service = TimerService()
@@ -202,6 +202,9 @@ async def lifespan(app: FastAPI):
         
         logger.info(f"Agent system initialized with {len(claude_agents.agents)} agents")
         
+        # Pick up added, edited and removed agent definitions without a restart
+        claude_agents.start_watching()
+        
         # Start agent monitoring
         await agent_monitor.start_monitoring()
         logger.info("Agent monitoring system started")
@@ -332,7 +335,9 @@ async def lifespan(app: FastAPI):
     
     # Stop agent monitoring
     try:
+        from ..agents.claude_agent_interface import claude_agents
         from ..agents.monitoring import agent_monitor
+        claude_agents.stop_watching()
         await agent_monitor.stop_monitoring()
         logger.info("Agent monitoring stopped")
     except Exception as e:
@@ -523,6 +528,11 @@ async def custom_metrics():
         from ..db.database import get_db_stats
         db_stats = await get_db_stats()
         
+        # Get event loop stats
+        from ..observability import get_loop_monitor
+        loop_monitor = get_loop_monitor()
+        loop_stats = loop_monitor.get_stats() if loop_monitor else {}
+        
         return {
             "timestamp": datetime.now().isoformat(),
             "service": "coinlink-api",
@@ -538,6 +548,15 @@ async def custom_metrics():
                     "pool_size": db_stats.get("pool_size", 0),
                     "overflow": db_stats.get("overflow", 0)
                 },
+                "event_loop": {
+                    "lag_p50": loop_stats.get("lag_p50", 0.0),
+                    "lag_p95": loop_stats.get("lag_p95", 0.0),
+                    "lag_p99": loop_stats.get("lag_p99", 0.0),
+                    "lag_max": loop_stats.get("lag_max", 0.0),
+                    "slow_callbacks": loop_stats.get("slow_callbacks", 0),
+                    "recent_slow_callbacks": loop_stats.get("recent_slow_callbacks", []),
+                    "top_coroutines": loop_stats.get("top_coroutines", [])
+                },
                 "system": {
                     "uptime_seconds": int(datetime.now().timestamp()),
                     "routes_loaded": sum(1 for r in [
@@ -16,6 +16,7 @@ try:
     from ...rd.notification_system import email_notifier
     from ...rd.scheduler import rd_scheduler
     from ...rd.rd_orchestrator import rd_orchestrator
+    from ...rd.report_archive import report_archive
 except ImportError:
     # Fallback for production deployment
     import sys
@@ -28,6 +29,7 @@ except ImportError:
         from rd.notification_system import email_notifier
         from rd.scheduler import rd_scheduler
         from rd.rd_orchestrator import rd_orchestrator
+        from rd.report_archive import report_archive
     except ImportError:
         # Final fallback - disable R&D routes if modules not available
         rd_agents = None
@@ -366,18 +368,33 @@ async def prepare_production_handoff(innovation_id: str):
         raise HTTPException(status_code=500, detail=f"Error preparing handoff: {str(e)}")
 
 @router.post("/handoff/batch")
-async def process_batch_handoffs():
+async def process_batch_handoffs(limit: Optional[int] = None):
     """Process batch of innovations for production handoff"""
     try:
-        handoff_results = innovation_pipeline.process_batch_handoffs()
+        handoff_results = await innovation_pipeline.process_batch_handoffs(
+            limit=min(max(limit, 1), 5000) if limit is not None else None
+        )
         return {
             "handoffs_processed": len(handoff_results),
+            "handoffs_delivered": sum(1 for result in handoff_results if result["delivery"]["status"] == "delivered"),
             "handoff_packages": handoff_results,
             "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing batch handoffs: {str(e)}")
 
+@router.get("/handoff/metrics")
+async def get_handoff_metrics():
+    """Handoff throughput, per-department latency and retry queue statistics"""
+    try:
+        return {
+            "handoff_metrics": innovation_pipeline.get_handoff_metrics(),
+            "dead_letters": innovation_pipeline.handoff_executor.retry_queue.dead_letters(limit=20),
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting handoff metrics: {str(e)}")
+
 @router.post("/handoff/coordinate/{innovation_id}")
 async def coordinate_with_helios(innovation_id: str):
     """Coordinate with Helios for production integration"""
@@ -602,6 +619,11 @@ async def trigger_immediate_report(background_tasks: BackgroundTasks):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error triggering immediate report: {str(e)}")
 
+async def _send_and_archive_report(report_data: Dict[str, Any]):
+    """Email a 30-minute report and archive it once it has been sent"""
+    if await email_notifier.send_thirty_minute_report(report_data):
+        await rd_orchestrator.archive_report(report_data)
+
 @router.post("/reports/thirty-minute")
 async def generate_thirty_minute_report(background_tasks: BackgroundTasks):
     """Generate and send 30-minute R&D report"""
@@ -609,14 +631,12 @@ async def generate_thirty_minute_report(background_tasks: BackgroundTasks):
         # Generate report data
         report_data = await rd_orchestrator.generate_thirty_minute_report(
             include_delta=True,
-            last_report_data=rd_scheduler.last_report_data
+            last_report_data=rd_scheduler.last_report_data,
+            archive=False
         )
         
-        # Send email in background
-        background_tasks.add_task(
-            email_notifier.send_thirty_minute_report,
-            report_data
-        )
+        # Send email in background; the report is archived after it is sent
+        background_tasks.add_task(_send_and_archive_report, report_data)
         
         return {
             "status": "generated",
@@ -633,7 +653,8 @@ async def preview_thirty_minute_report():
     try:
         report_data = await rd_orchestrator.generate_thirty_minute_report(
             include_delta=True,
-            last_report_data=rd_scheduler.last_report_data
+            last_report_data=rd_scheduler.last_report_data,
+            archive=False
         )
         
         return {
@@ -644,6 +665,50 @@ async def preview_thirty_minute_report():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating report preview: {str(e)}")
 
+@router.get("/reports/thirty-minute/latest")
+async def get_latest_thirty_minute_report():
+    """Most recently generated 30-minute report, from the report archive"""
+    try:
+        report_data = report_archive.latest()
+        if report_data is None:
+            raise HTTPException(status_code=404, detail="No 30-minute reports archived yet")
+        return {
+            "status": "archived",
+            "report_data": report_data,
+            "timestamp": datetime.now().isoformat()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading archived report: {str(e)}")
+
+@router.get("/reports/history")
+async def get_report_history(limit: int = 20, before_id: Optional[int] = None):
+    """Summaries of archived reports, newest first; page with before_id"""
+    try:
+        reports = report_archive.history(limit=min(max(limit, 1), 200), before_id=before_id)
+        return {
+            "reports": reports,
+            "total_archived": report_archive.count(),
+            "next_before_id": reports[-1]["archive_id"] if reports else None,
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading report history: {str(e)}")
+
+@router.get("/reports/{archive_id}")
+async def get_archived_report(archive_id: int):
+    """One archived report"""
+    try:
+        report_data = report_archive.get(archive_id)
+        if report_data is None:
+            raise HTTPException(status_code=404, detail=f"Report {archive_id} not found")
+        return report_data
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading archived report: {str(e)}")
+
 # Specialized R&D Workflows
 
 @router.post("/workflows/competitive-intelligence")
@@ -15,12 +15,16 @@ async def rd_system_status():
         from ...rd.scheduler import rd_scheduler
         from ...rd.rd_orchestrator import rd_orchestrator
         from ...rd.notification_system import email_notifier
+        from ...rd.report_archive import report_archive
+        
+        last_report = report_archive.history(limit=1)
         
         return {
             "status": "available",
             "message": "R&D system modules loaded successfully",
             "scheduler_running": getattr(rd_scheduler, 'is_running', False),
             "email_recipient": getattr(email_notifier, 'default_recipient', 'unknown'),
+            "last_report": last_report[0] if last_report else None,
             "timestamp": datetime.now().isoformat()
         }
     except ImportError as e:
@@ -34,6 +34,9 @@ class Settings(BaseSettings):
     # Observability
     SENTRY_DSN: Optional[str] = Field(default=None, description="Sentry DSN for error tracking")
     PROMETHEUS_ENABLED: bool = Field(default=True, description="Enable Prometheus metrics")
+    LOOP_MONITOR_ENABLED: bool = Field(default=True, description="Sample event loop lag and report slow callbacks")
+    LOOP_SLOW_CALLBACK_THRESHOLD: float = Field(default=0.1, description="Loop stall in seconds reported as a slow callback")
+    LOOP_ATTRIBUTION_RATE: float = Field(default=0.1, description="Fraction of tasks timed per coroutine (0 disables)")
     
     # Rate Limiting
     RATE_LIMIT_GLOBAL: str = Field(default="100/minute", description="Global rate limit")
@@ -7,9 +7,6 @@ for critical growth metrics and opportunities.
 """
 
 import asyncio
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Union
 from dataclasses import dataclass, field
@@ -22,6 +19,11 @@ import os
 from .growth_metrics import growth_metrics_tracker, MetricType, AgentPerformance
 from .data_models import GrowthEvent, Lead, Opportunity, Deal
 
+try:
+    from ..notifications import OutboundMailer, SMTPTransport, LogTransport, default_spool_path
+except ImportError:  # growth imported as a top-level package
+    from notifications import OutboundMailer, SMTPTransport, LogTransport, default_spool_path
+
 class NotificationType(Enum):
     PERFORMANCE_ALERT = "performance_alert"
     OPPORTUNITY_CREATED = "opportunity_created"
@@ -87,7 +89,6 @@ class GrowthNotificationSystem:
         self.notification_channels: Dict[str, NotificationChannel] = {}
         self.active_alerts: Dict[str, GrowthAlert] = {}
         self.alert_history: List[GrowthAlert] = []
-        self.email_queue: asyncio.Queue = asyncio.Queue()
         self.webhook_queue: asyncio.Queue = asyncio.Queue()
         self.logger = logging.getLogger(__name__)
         
@@ -102,6 +103,7 @@ class GrowthNotificationSystem:
             "email_password": os.getenv("EMAIL_PASSWORD", ""),
             "from_email": os.getenv("FROM_EMAIL", "growth@coinlink.com")
         }
+        self._mailer: Optional[OutboundMailer] = None
         
         # Webhook configuration
         self.webhook_config = {
@@ -133,7 +135,8 @@ class GrowthNotificationSystem:
             config={
                 "recipients": ["shayan.bozorgmanesh@gmail.com"],
                 "subject_prefix": "📊 Growth Performance Update",
-                "template": "performance_report"
+                "template": "performance_report",
+                "digest_window": 300  # one email per recipient every 5 minutes
             },
             alert_types=[NotificationType.PERFORMANCE_ALERT, NotificationType.TARGET_MISSED, NotificationType.TARGET_ACHIEVED],
             min_severity=AlertSeverity.MEDIUM
@@ -146,7 +149,8 @@ class GrowthNotificationSystem:
             config={
                 "recipients": ["shayan.bozorgmanesh@gmail.com"],
                 "subject_prefix": "💰 Revenue Update",
-                "template": "revenue_alert"
+                "template": "revenue_alert",
+                "digest_window": 300
             },
             alert_types=[NotificationType.OPPORTUNITY_CREATED, NotificationType.DEAL_CLOSED, NotificationType.MILESTONE_REACHED],
             min_severity=AlertSeverity.LOW
@@ -223,11 +227,6 @@ class GrowthNotificationSystem:
     async def _send_email_notification(self, alert: GrowthAlert, channel: NotificationChannel):
         """Send email notification"""
         try:
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = f"{channel.config['subject_prefix']} - {alert.title}"
-            msg['From'] = self.email_config['from_email']
-            msg['To'] = ", ".join(channel.config['recipients'])
-            
             # Generate email content based on template
             if channel.config.get('template') == 'critical_alert':
                 content = self._generate_critical_alert_email(alert)
@@ -238,13 +237,15 @@ class GrowthNotificationSystem:
             else:
                 content = self._generate_basic_alert_email(alert)
             
-            msg.attach(MIMEText(content, 'html'))
-            
-            # Add to email queue for async processing
-            await self.email_queue.put({
-                'msg': msg,
-                'recipients': channel.config['recipients']
-            })
+            # Spool for background delivery; digest channels coalesce per recipient
+            digest_window = channel.config.get('digest_window')
+            await self.mailer.send(
+                channel.config['recipients'],
+                f"{channel.config['subject_prefix']} - {alert.title}",
+                content,
+                digest_key=channel.channel_id if digest_window else None,
+                digest_window=digest_window
+            )
             
             alert.notification_sent = True
             self.logger.info(f"Email notification queued for alert: {alert.alert_id}")
@@ -488,28 +489,19 @@ class GrowthNotificationSystem:
         
         return context_html
     
-    async def process_email_queue(self):
-        """Process email notification queue"""
-        while True:
-            try:
-                email_item = await self.email_queue.get()
-                await self._send_email(email_item['msg'], email_item['recipients'])
-                self.email_queue.task_done()
-            except Exception as e:
-                self.logger.error(f"Error processing email queue: {str(e)}")
-                await asyncio.sleep(5)
-    
-    async def _send_email(self, msg: MIMEMultipart, recipients: List[str]):
-        """Send email via SMTP"""
-        try:
-            with smtplib.SMTP(self.email_config['smtp_server'], self.email_config['smtp_port']) as server:
-                server.starttls()
-                server.login(self.email_config['email_user'], self.email_config['email_password'])
-                server.send_message(msg, to_addrs=recipients)
-            
-            self.logger.info(f"Email sent successfully to {', '.join(recipients)}")
-        except Exception as e:
-            self.logger.error(f"Failed to send email: {str(e)}")
+    @property
+    def mailer(self) -> OutboundMailer:
+        """Spooling email sender (logs instead of sending without EMAIL_PASSWORD)"""
+        if self._mailer is None:
+            if self.email_config['email_password']:
+                transport = SMTPTransport(self.email_config['smtp_server'], self.email_config['smtp_port'],
+                                          username=self.email_config['email_user'],
+                                          password=self.email_config['email_password'])
+            else:
+                transport = LogTransport()
+            self._mailer = OutboundMailer(transport, default_spool_path("growth_email"),
+                                          self.email_config['from_email'])
+        return self._mailer
     
     async def monitor_performance_and_alert(self):
         """Monitor system performance and generate alerts"""
@@ -576,8 +568,8 @@ class GrowthNotificationSystem:
         """Start all notification services"""
         self.logger.info("Starting growth notification services")
         
-        # Start email queue processor
-        asyncio.create_task(self.process_email_queue())
+        # Start email delivery (also sends anything spooled before a restart)
+        self.mailer.start()
         
         # Start performance monitoring
         asyncio.create_task(self.monitor_performance_and_alert())
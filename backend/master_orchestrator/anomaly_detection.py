@@ -0,0 +1,384 @@
+"""
+Anomaly Detection - Batch anomaly detection for the monitoring dashboard
+
+Every metric owns a row in a set of numpy arrays. Recording a sample
+updates that row in O(1): the ring of recent values, running sums, the
+extremes and largest jump since the last evaluation, and whatever state
+each detector keeps. Evaluation runs periodically and scores every metric
+that received samples as one array operation per detector.
+
+Detectors are pluggable: subclass ``Detector`` and pass instances to
+``AnomalyDetectionEngine``. Bundled detectors:
+
+- ``ZScoreDetector``: distance from the rolling mean, and jumps between
+  consecutive samples, in rolling standard deviations.
+- ``EwmaDetector``: distance from an exponentially weighted mean.
+- ``SeasonalDetector``: distance from the mean of the same time slot
+  (hour of day by default).
+
+Repeated anomalies for the same metric and detector are reported once per
+``cooldown_seconds``.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class Anomaly:
+    """A metric whose latest samples a detector scored as anomalous"""
+    metric_id: str
+    detector: str
+    value: float
+    expected: float
+    score: float                         # >= 1.0 is anomalous
+    timestamp: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "metric_id": self.metric_id,
+            "detector": self.detector,
+            "value": self.value,
+            "expected": self.expected,
+            "score": self.score,
+            "timestamp": self.timestamp
+        }
+
+def _grow(array: np.ndarray, capacity: int, fill: float = 0.0) -> np.ndarray:
+    grown = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+class RollingStats:
+    """The last ``window`` samples of every metric, with running sums for mean and variance.
+
+    Sums are kept relative to each metric's first value so the variance
+    does not lose precision on large values, and are recomputed from the
+    ring every ``resync_every`` evaluations to shed accumulated rounding.
+    """
+
+    def __init__(self, window: int = 20, capacity: int = 256):
+        self.window = window
+        self.capacity = 0
+        self.values = np.zeros((0, window))
+        self.position = np.zeros(0, dtype=np.int64)
+        self.count = np.zeros(0, dtype=np.int64)
+        self.shift = np.zeros(0)
+        self.sum = np.zeros(0)
+        self.sum_squares = np.zeros(0)
+        self.last = np.zeros(0)
+        self.previous = np.zeros(0)
+        self.timestamp = np.zeros(0)
+        # Since the last evaluation
+        self.high = np.zeros(0)
+        self.low = np.zeros(0)
+        self.jump = np.zeros(0)
+        self.dirty = np.zeros(0, dtype=bool)
+        self.resize(capacity)
+
+    def resize(self, capacity: int):
+        for name in ("values", "position", "count", "shift", "sum", "sum_squares", "last",
+                     "previous", "timestamp", "high", "low", "jump", "dirty"):
+            setattr(self, name, _grow(getattr(self, name), capacity))
+        self.capacity = capacity
+
+    def update(self, row: int, value: float, timestamp: float):
+        n = self.count[row]
+        if n == 0:
+            self.shift[row] = value
+        x = value - self.shift[row]
+        position = self.position[row]
+        if n == self.window:
+            old = self.values[row, position] - self.shift[row]
+            self.sum[row] += x - old
+            self.sum_squares[row] += x * x - old * old
+        else:
+            self.count[row] = n + 1
+            self.sum[row] += x
+            self.sum_squares[row] += x * x
+        self.values[row, position] = value
+        self.position[row] = (position + 1) % self.window
+
+        if n:
+            last = self.last[row]
+            self.previous[row] = last
+            jump = abs(value - last)
+        else:
+            jump = 0.0
+        self.last[row] = value
+        self.timestamp[row] = timestamp
+
+        if self.dirty[row]:
+            if value > self.high[row]:
+                self.high[row] = value
+            if value < self.low[row]:
+                self.low[row] = value
+            if jump > self.jump[row]:
+                self.jump[row] = jump
+        else:
+            self.high[row] = value
+            self.low[row] = value
+            self.jump[row] = jump
+            self.dirty[row] = True
+
+    def mean_std(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Rolling mean and sample standard deviation of ``rows``"""
+        n = np.maximum(self.count[rows], 1)
+        mean = self.sum[rows] / n
+        variance = np.maximum(self.sum_squares[rows] / n - mean * mean, 0.0) * n / np.maximum(n - 1, 1)
+        return self.shift[rows] + mean, np.sqrt(variance)
+
+    def resync(self, rows: np.ndarray):
+        """Recompute running sums of full rows from the ring"""
+        full = rows[self.count[rows] == self.window]
+        centered = self.values[full] - self.shift[full, None]
+        self.sum[full] = centered.sum(axis=1)
+        self.sum_squares[full] = (centered * centered).sum(axis=1)
+
+@dataclass
+class Batch:
+    """Everything detectors see for the metrics being evaluated"""
+    rows: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    jump: np.ndarray
+    timestamp: np.ndarray
+    count: np.ndarray
+    mean: np.ndarray
+    std: np.ndarray
+
+def _deviation_score(batch: Batch, center: np.ndarray, scale: np.ndarray, threshold: float) -> np.ndarray:
+    """Largest distance of the batch's extremes from ``center`` in units of ``threshold * scale``.
+
+    A zero scale makes any deviation infinitely anomalous, as the previous
+    per-sample check did.
+    """
+    deviation = np.maximum(np.abs(batch.high - center), np.abs(batch.low - center))
+    limit = threshold * scale
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = np.where(limit > 0, deviation / limit, np.where(deviation > 0, np.inf, 0.0))
+    return score
+
+class Detector:
+    """Base class: per-sample state updates and a vectorized score per metric"""
+
+    name = "detector"
+
+    def resize(self, capacity: int):
+        """Grow per-metric state to ``capacity`` rows"""
+
+    def update(self, row: int, value: float, timestamp: float):
+        """Fold one sample into the detector's state"""
+
+    def score(self, batch: Batch) -> Tuple[np.ndarray, np.ndarray]:
+        """(score, expected value) per batch row; a score >= 1.0 is anomalous"""
+        raise NotImplementedError
+
+class ZScoreDetector(Detector):
+    """Rolling mean/stddev check plus a jump check between consecutive samples"""
+
+    name = "zscore"
+
+    def __init__(self, threshold: float = 3.0, jump_threshold: float = 5.0, min_samples: int = 20):
+        self.threshold = threshold
+        self.jump_threshold = jump_threshold
+        self.min_samples = min_samples
+
+    def score(self, batch: Batch) -> Tuple[np.ndarray, np.ndarray]:
+        score = _deviation_score(batch, batch.mean, batch.std, self.threshold)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            jump_limit = self.jump_threshold * batch.std
+            jump_score = np.where(jump_limit > 0, batch.jump / jump_limit, 0.0)
+        score = np.maximum(score, jump_score)
+        return np.where(batch.count >= self.min_samples, score, 0.0), batch.mean
+
+class EwmaDetector(Detector):
+    """Distance from an exponentially weighted mean, in weighted standard deviations"""
+
+    name = "ewma"
+
+    def __init__(self, alpha: float = 0.1, threshold: float = 4.0, min_samples: int = 20):
+        self.alpha = alpha
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.mean = np.zeros(0)
+        self.variance = np.zeros(0)
+        self.count = np.zeros(0, dtype=np.int64)
+
+    def resize(self, capacity: int):
+        self.mean = _grow(self.mean, capacity)
+        self.variance = _grow(self.variance, capacity)
+        self.count = _grow(self.count, capacity)
+
+    def update(self, row: int, value: float, timestamp: float):
+        if self.count[row] == 0:
+            self.mean[row] = value
+        else:
+            diff = value - self.mean[row]
+            increment = self.alpha * diff
+            self.mean[row] += increment
+            self.variance[row] = (1 - self.alpha) * (self.variance[row] + diff * increment)
+        self.count[row] += 1
+
+    def score(self, batch: Batch) -> Tuple[np.ndarray, np.ndarray]:
+        rows = batch.rows
+        mean = self.mean[rows]
+        score = _deviation_score(batch, mean, np.sqrt(self.variance[rows]), self.threshold)
+        return np.where(self.count[rows] >= self.min_samples, score, 0.0), mean
+
+class SeasonalDetector(Detector):
+    """Distance from the mean of the same slot in previous periods (hour of day by default)"""
+
+    name = "seasonal"
+
+    def __init__(self, period: float = 86400, slots: int = 24, threshold: float = 3.0, min_samples: int = 10):
+        self.period = period
+        self.slots = slots
+        self.slot_width = period / slots
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.count = np.zeros((0, slots), dtype=np.int64)
+        self.mean = np.zeros((0, slots))
+        self.m2 = np.zeros((0, slots))
+
+    def resize(self, capacity: int):
+        self.count = _grow(self.count, capacity)
+        self.mean = _grow(self.mean, capacity)
+        self.m2 = _grow(self.m2, capacity)
+
+    def update(self, row: int, value: float, timestamp: float):
+        slot = int(timestamp % self.period // self.slot_width)
+        n = self.count[row, slot] + 1
+        delta = value - self.mean[row, slot]
+        self.mean[row, slot] += delta / n
+        self.m2[row, slot] += delta * (value - self.mean[row, slot])
+        self.count[row, slot] = n
+
+    def score(self, batch: Batch) -> Tuple[np.ndarray, np.ndarray]:
+        rows = batch.rows
+        slots = (batch.timestamp % self.period // self.slot_width).astype(np.int64)
+        count = self.count[rows, slots]
+        mean = self.mean[rows, slots]
+        std = np.sqrt(self.m2[rows, slots] / np.maximum(count - 1, 1))
+        score = _deviation_score(batch, mean, std, self.threshold)
+        return np.where(count >= self.min_samples, score, 0.0), mean
+
+class AnomalyDetectionEngine:
+    """Per-metric rolling state, batch evaluation and alert deduplication"""
+
+    def __init__(self,
+                 detectors: Optional[Sequence[Detector]] = None,
+                 window: int = 20,
+                 cooldown_seconds: float = 300,
+                 resync_every: int = 100,
+                 capacity: int = 256):
+        self.detectors: List[Detector] = list(detectors) if detectors is not None else [ZScoreDetector()]
+        self.cooldown_seconds = cooldown_seconds
+        self.resync_every = resync_every
+
+        self.stats = RollingStats(window, capacity)
+        for detector in self.detectors:
+            detector.resize(capacity)
+        self.rows: Dict[str, int] = {}
+        self.metric_ids: List[str] = []
+
+        self._last_reported: Dict[Tuple[str, str], float] = {}
+        self.evaluations = 0
+        self.detected = 0
+        self.suppressed = 0
+        self.last_evaluation_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self.metric_ids)
+
+    def _row(self, metric_id: str) -> int:
+        row = self.rows.get(metric_id)
+        if row is None:
+            row = len(self.metric_ids)
+            if row >= self.stats.capacity:
+                capacity = self.stats.capacity * 2
+                self.stats.resize(capacity)
+                for detector in self.detectors:
+                    detector.resize(capacity)
+            self.rows[metric_id] = row
+            self.metric_ids.append(metric_id)
+        return row
+
+    def observe(self, metric_id: str, value: float, timestamp: Optional[float] = None):
+        """Record a sample; O(1) per detector"""
+
+        timestamp = timestamp if timestamp is not None else time.time()
+        row = self._row(metric_id)
+        self.stats.update(row, value, timestamp)
+        for detector in self.detectors:
+            detector.update(row, value, timestamp)
+
+    def evaluate(self, now: Optional[float] = None) -> List[Anomaly]:
+        """Score every metric with new samples; returns anomalies not reported within the cooldown"""
+
+        started = time.perf_counter()
+        now = now if now is not None else time.time()
+        stats = self.stats
+        count = len(self.metric_ids)
+        rows = np.flatnonzero(stats.dirty[:count])
+        if not len(rows):
+            return []
+
+        self.evaluations += 1
+        if self.evaluations % self.resync_every == 0:
+            stats.resync(np.arange(count))
+
+        mean, std = stats.mean_std(rows)
+        batch = Batch(rows=rows, high=stats.high[rows], low=stats.low[rows], jump=stats.jump[rows],
+                      timestamp=stats.timestamp[rows], count=stats.count[rows], mean=mean, std=std)
+        stats.dirty[rows] = False
+
+        best = np.zeros(len(rows))
+        best_detector = np.full(len(rows), -1)
+        expected = np.array(mean)
+        for i, detector in enumerate(self.detectors):
+            try:
+                score, detector_expected = detector.score(batch)
+            except Exception as e:
+                logger.error(f"Anomaly detector {detector.name} failed: {e}")
+                continue
+            better = score > best
+            best = np.where(better, score, best)
+            best_detector = np.where(better, i, best_detector)
+            expected = np.where(better, detector_expected, expected)
+
+        anomalies = []
+        for j in np.flatnonzero(best >= 1.0):
+            metric_id = self.metric_ids[rows[j]]
+            detector = self.detectors[best_detector[j]].name
+            key = (metric_id, detector)
+            last = self._last_reported.get(key)
+            if last is not None and now - last < self.cooldown_seconds:
+                self.suppressed += 1
+                continue
+            self._last_reported[key] = now
+
+            # Report the extreme that is further from what was expected
+            high, low = batch.high[j], batch.low[j]
+            value = high if abs(high - expected[j]) >= abs(low - expected[j]) else low
+            anomalies.append(Anomaly(metric_id=metric_id, detector=detector, value=float(value),
+                                     expected=float(expected[j]), score=float(best[j]), timestamp=now))
+
+        self.detected += len(anomalies)
+        self.last_evaluation_seconds = time.perf_counter() - started
+        return anomalies
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "metrics": len(self.metric_ids),
+            "detectors": [detector.name for detector in self.detectors],
+            "evaluations": self.evaluations,
+            "detected": self.detected,
+            "suppressed": self.suppressed,
+            "last_evaluation_ms": self.last_evaluation_seconds * 1000
+        }
@@ -11,11 +11,14 @@ import uuid
 import json
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Set, Callable
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from enum import Enum
 from collections import defaultdict, deque
 import hashlib
 
+from .delivery_engine import DeliveryEngine
+from .message_scheduler import ExpiryIndex, MessageScheduler
+
 logger = logging.getLogger(__name__)
 
 class MessageType(Enum):
@@ -82,9 +85,8 @@ class CommunicationProtocol:
         
         # Message routing
         self.message_queue: Dict[str, deque] = defaultdict(lambda: deque(maxlen=1000))
-        self.priority_queue: Dict[MessagePriority, deque] = {
-            priority: deque() for priority in MessagePriority
-        }
+        self.offline_queue: Dict[str, deque] = defaultdict(lambda: deque(maxlen=1000))  # held until heartbeat
+        self.scheduler = MessageScheduler(self._route_message)  # dispatches by priority, then expiry
         
         # Channels
         self.channels: Dict[str, CommunicationChannel] = {}
@@ -92,6 +94,7 @@ class CommunicationProtocol:
         
         # Message tracking
         self.pending_messages: Dict[str, AgentMessage] = {}
+        self.expiry_index = ExpiryIndex()  # pending message expiries
         self.message_history: deque = deque(maxlen=10000)
         self.response_callbacks: Dict[str, Callable] = {}
         
@@ -110,6 +113,14 @@ class CommunicationProtocol:
         self.heartbeat_interval_seconds = 30
         self.channel_cleanup_interval = 3600
         
+        # Handlers run on per-agent mailbox consumers, never on the sender
+        self.delivery = DeliveryEngine(
+            handler_for=self.event_handlers.get,
+            max_attempts=self.max_retry_attempts,
+            base_backoff=1.0,
+            max_backoff=30.0
+        )
+        
         # Metrics
         self.communication_metrics = {
             "total_messages_sent": 0,
@@ -196,23 +207,18 @@ class CommunicationProtocol:
         if not message.expiry:
             message.expiry = datetime.utcnow() + timedelta(seconds=self.message_timeout_seconds)
         
-        # Add to appropriate queue
-        if message.message_type == MessageType.BROADCAST:
-            await self._handle_broadcast(message)
-        elif message.recipient_id:
-            await self._route_direct_message(message)
-        elif message.recipient_department:
-            await self._route_department_message(message)
-        else:
+        if (message.message_type != MessageType.BROADCAST and not message.recipient_id
+                and not message.recipient_department):
             logger.error(f"Cannot route message {message.message_id}: no recipient specified")
             return False
         
         # Track message
         self.pending_messages[message.message_id] = message
+        self.expiry_index.add(message.message_id, message.expiry)
         self.message_history.append(message)
         
-        # Add to priority queue
-        self.priority_queue[message.priority].append(message.message_id)
+        # Queue for dispatch by priority
+        self.scheduler.submit(message)
         
         # Update metrics
         self.communication_metrics["total_messages_sent"] += 1
@@ -221,7 +227,17 @@ class CommunicationProtocol:
         
         return True
 
-    async def _route_direct_message(self, message: AgentMessage) -> None:
+    def _route_message(self, message: AgentMessage) -> None:
+        """Route a message taken off the scheduler"""
+        
+        if message.message_type == MessageType.BROADCAST:
+            self._handle_broadcast(message)
+        elif message.recipient_id:
+            self._route_direct_message(message)
+        else:
+            self._route_department_message(message)
+
+    def _route_direct_message(self, message: AgentMessage) -> None:
         """Route a direct message to specific agent"""
         
         if message.recipient_id not in self.registered_agents:
@@ -232,13 +248,13 @@ class CommunicationProtocol:
         if self.agent_status.get(message.recipient_id) != "online":
             logger.warning(f"Recipient {message.recipient_id} is offline")
             # Queue for later delivery
-            self.message_queue[message.recipient_id].append(message)
+            self.offline_queue[message.recipient_id].append(message)
             return
         
         # Deliver message
-        await self._deliver_message(message.recipient_id, message)
+        self._deliver_message(message.recipient_id, message)
 
-    async def _route_department_message(self, message: AgentMessage) -> None:
+    def _route_department_message(self, message: AgentMessage) -> None:
         """Route message to all agents in a department"""
         
         dept_channel_id = f"channel_{message.recipient_department}"
@@ -250,11 +266,12 @@ class CommunicationProtocol:
         channel = self.channels[dept_channel_id]
         
         # Deliver to all participants in department
-        for agent_id in channel.participants:
-            if agent_id != message.sender_id:  # Don't send to self
-                await self._deliver_message(agent_id, message)
+        self._deliver_to(
+            [agent_id for agent_id in channel.participants if agent_id != message.sender_id],  # Don't send to self
+            message
+        )
 
-    async def _handle_broadcast(self, message: AgentMessage) -> None:
+    def _handle_broadcast(self, message: AgentMessage) -> None:
         """Handle broadcast messages"""
         
         # Determine broadcast scope
@@ -264,48 +281,31 @@ class CommunicationProtocol:
             channel_id = "channel_cross_department"
         
         if channel_id in self.channels:
-            channel = self.channels[channel_id]
-            
             # Broadcast to all online agents
-            for agent_id in self.registered_agents:
-                if agent_id != message.sender_id and self.agent_status.get(agent_id) == "online":
-                    await self._deliver_message(agent_id, message)
+            self._deliver_to(
+                [agent_id for agent_id in self.registered_agents
+                 if agent_id != message.sender_id and self.agent_status.get(agent_id) == "online"],
+                message
+            )
         
         self.communication_metrics["total_broadcasts"] += 1
 
-    async def _deliver_message(self, recipient_id: str, message: AgentMessage) -> bool:
-        """Deliver message to recipient"""
+    def _deliver_message(self, recipient_id: str, message: AgentMessage) -> bool:
+        """Queue message in the recipient's mailbox; its handler runs on the mailbox consumer"""
+        
+        self.message_queue[recipient_id].append(message)
+        message.delivered = True
+        
+        return self.delivery.enqueue(recipient_id, message)
+
+    def _deliver_to(self, recipient_ids: List[str], message: AgentMessage) -> int:
+        """Queue message for several recipients without waiting for any handler"""
         
-        try:
-            # Add to recipient's queue
+        for recipient_id in recipient_ids:
             self.message_queue[recipient_id].append(message)
-            
-            # Mark as delivered
-            message.delivered = True
-            message.delivery_attempts += 1
-            
-            # Trigger handler if exists
-            if recipient_id in self.event_handlers:
-                handler = self.event_handlers[recipient_id]
-                await handler(message)
-            
-            # Update metrics
-            self.communication_metrics["total_messages_delivered"] += 1
-            
-            logger.debug(f"Message {message.message_id} delivered to {recipient_id}")
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to deliver message {message.message_id}: {e}")
-            
-            # Retry if attempts remaining
-            if message.delivery_attempts < self.max_retry_attempts:
-                await asyncio.sleep(1)  # Brief delay before retry
-                return await self._deliver_message(recipient_id, message)
-            else:
-                self.communication_metrics["failed_deliveries"] += 1
-                return False
+        message.delivered = True
+        
+        return self.delivery.broadcast(recipient_ids, message)
 
     async def send_response(self, original_message: AgentMessage, response_content: Dict[str, Any]) -> bool:
         """Send a response to a message"""
@@ -355,10 +355,9 @@ class CommunicationProtocol:
             metadata={"event_type": event_type}
         )
         
-        # Send to all subscribers
+        # Send to all subscribers; each gets its own copy since handlers run later
         for subscriber_id in self.event_subscribers[event_type]:
-            event_message.recipient_id = subscriber_id
-            await self.send_message(event_message)
+            await self.send_message(replace(event_message, recipient_id=subscriber_id))
         
         logger.info(f"Event {event_type} broadcast to {len(self.event_subscribers[event_type])} subscribers")
 
@@ -406,12 +405,13 @@ class CommunicationProtocol:
         self.last_heartbeat[agent_id] = datetime.utcnow()
         self.agent_status[agent_id] = "online"
         
-        # Process any queued messages
-        if agent_id in self.message_queue:
-            while self.message_queue[agent_id]:
-                message = self.message_queue[agent_id].popleft()
-                if message.expiry and message.expiry > datetime.utcnow():
-                    await self._deliver_message(agent_id, message)
+        # Deliver messages held while the agent was offline
+        if agent_id in self.offline_queue:
+            held = self.offline_queue.pop(agent_id)
+            current_time = datetime.utcnow()
+            for message in held:
+                if not message.expiry or message.expiry > current_time:
+                    self._deliver_message(agent_id, message)
 
     async def check_agent_health(self) -> Dict[str, Any]:
         """Check health status of all agents"""
@@ -455,8 +455,7 @@ class CommunicationProtocol:
         success_count = 0
         for agent_id in agent_ids:
             if agent_id in self.registered_agents:
-                sync_message.recipient_id = agent_id
-                if await self.send_message(sync_message):
+                if await self.send_message(replace(sync_message, recipient_id=agent_id)):
                     success_count += 1
         
         logger.info(f"Synchronized {success_count}/{len(agent_ids)} agents")
@@ -469,7 +468,11 @@ class CommunicationProtocol:
         if agent_id not in self.message_queue:
             return []
         
-        messages = list(self.message_queue[agent_id])[-limit:]
+        current_time = datetime.utcnow()
+        messages = [
+            msg for msg in list(self.message_queue[agent_id])[-limit:]
+            if not msg.expiry or msg.expiry >= current_time
+        ]
         
         return [
             {
@@ -498,36 +501,40 @@ class CommunicationProtocol:
                 "unresponsive": len([a for a in self.agent_status.values() if a == "unresponsive"])
             },
             "event_subscriptions": {event: len(subs) for event, subs in self.event_subscribers.items()},
-            "metrics": self.communication_metrics
+            "metrics": self._sync_delivery_metrics(),
+            "scheduler": self.scheduler.get_stats(),
+            "delivery": self.delivery.get_stats()
         }
 
+    def _sync_delivery_metrics(self) -> Dict[str, Any]:
+        self.communication_metrics["total_messages_delivered"] = self.delivery.delivered
+        self.communication_metrics["failed_deliveries"] = self.delivery.dead_lettered
+        self.communication_metrics["average_delivery_time"] = (
+            self.delivery.total_delivery_seconds / self.delivery.delivered if self.delivery.delivered else 0.0
+        )
+        return self.communication_metrics
+
+    def get_dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Deliveries that failed every attempt or found a full mailbox, newest first"""
+        return self.delivery.get_dead_letters(limit)
+
     async def cleanup_expired_messages(self) -> int:
         """Clean up expired messages"""
         
         current_time = datetime.utcnow()
         expired_count = 0
         
-        # Clean up pending messages
-        expired_ids = [
-            msg_id for msg_id, msg in self.pending_messages.items()
-            if msg.expiry and msg.expiry < current_time
-        ]
-        
-        for msg_id in expired_ids:
+        # Only the expired entries of the expiry index are visited; per-agent
+        # queues are bounded and skip expired messages when read
+        for msg_id in self.expiry_index.pop_expired(current_time):
+            message = self.pending_messages.get(msg_id)
+            if message is None or (message.expiry and message.expiry > current_time):
+                continue  # already gone, or re-sent under the same id with a later expiry
             del self.pending_messages[msg_id]
             expired_count += 1
         
-        # Clean up from queues
-        for agent_id in list(self.message_queue.keys()):
-            cleaned_queue = deque([
-                msg for msg in self.message_queue[agent_id]
-                if not msg.expiry or msg.expiry >= current_time
-            ])
-            
-            expired_count += len(self.message_queue[agent_id]) - len(cleaned_queue)
-            self.message_queue[agent_id] = cleaned_queue
-        
-        logger.info(f"Cleaned up {expired_count} expired messages")
+        if expired_count:
+            logger.info(f"Cleaned up {expired_count} expired messages")
         
         return expired_count
 
@@ -542,31 +549,11 @@ class CommunicationProtocol:
                 # Clean up expired messages
                 await self.cleanup_expired_messages()
                 
-                # Process priority queue
-                await self._process_priority_queue()
-                
                 await asyncio.sleep(30)  # Run every 30 seconds
                 
             except Exception as e:
                 logger.error(f"Error in maintenance loop: {e}")
                 await asyncio.sleep(60)
 
-    async def _process_priority_queue(self) -> None:
-        """Process messages by priority"""
-        
-        # Process from highest to lowest priority
-        for priority in reversed(list(MessagePriority)):
-            queue = self.priority_queue[priority]
-            
-            while queue:
-                message_id = queue.popleft()
-                
-                if message_id in self.pending_messages:
-                    message = self.pending_messages[message_id]
-                    
-                    # Re-attempt delivery if not delivered
-                    if not message.delivered and message.recipient_id:
-                        await self._deliver_message(message.recipient_id, message)
-
 # Global communication protocol instance
 communication_protocol = CommunicationProtocol()
\ No newline at end of file
@@ -0,0 +1,297 @@
+"""
+Delivery Engine - Per-recipient mailboxes for inter-agent messages
+
+Each recipient has a mailbox drained by its own consumer task, so a slow or
+failing handler only holds up messages to that recipient. Mailboxes are
+priority queues: a message with a higher ``priority`` is handled before
+lower-priority messages already waiting for the same recipient, and
+messages of equal priority keep their order. Enqueueing never awaits a
+handler: a broadcast is one non-blocking put per recipient.
+
+A failed handler call is retried after an exponential backoff that is
+kept on a hashed timer wheel; one driver task advances the wheel while
+anything is scheduled. A delivery that fails ``max_attempts`` times, or
+that finds its mailbox full, goes to a bounded dead-letter queue.
+"""
+
+import asyncio
+import itertools
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Any], Awaitable[Any]]
+
+class TimerWheel:
+    """Hashed timer wheel with ``slots`` slots of ``tick`` seconds.
+
+    Scheduling and cancelling are O(1); a timer fires on the tick at or
+    after its delay, to within one tick.
+    """
+
+    def __init__(self, tick: float = 0.05, slots: int = 512):
+        self.tick = tick
+        self._slots: List[List[list]] = [[] for _ in range(slots)]
+        self._cursor = 0
+        self._pending = 0
+        self._last_tick = 0.0
+        self._driver: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return self._pending
+
+    def schedule(self, delay: float, callback: Callable[..., Any], *args: Any) -> list:
+        """Call ``callback(*args)`` after ``delay`` seconds; returns a handle for ``cancel``"""
+
+        ticks = max(1, math.ceil(delay / self.tick))
+        size = len(self._slots)
+        entry = [(ticks - 1) // size, callback, args]
+        self._slots[(self._cursor + ticks) % size].append(entry)
+        self._pending += 1
+
+        if self._driver is None or self._driver.done():
+            self._last_tick = asyncio.get_running_loop().time()
+            self._driver = asyncio.create_task(self._run())
+        return entry
+
+    def cancel(self, handle: list):
+        if handle[1] is not None:
+            handle[1] = None
+            self._pending -= 1
+
+    def _advance(self):
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        slot = self._slots[self._cursor]
+        if not slot:
+            return
+        due = []
+        waiting = []
+        for entry in slot:
+            if entry[1] is None:
+                continue
+            if entry[0] == 0:
+                due.append(entry)
+            else:
+                entry[0] -= 1
+                waiting.append(entry)
+        self._slots[self._cursor] = waiting
+        for entry in due:
+            callback, args = entry[1], entry[2]
+            entry[1] = None
+            self._pending -= 1
+            try:
+                callback(*args)
+            except Exception as e:
+                logger.error(f"Timer callback failed: {e}")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            await asyncio.sleep(self.tick)
+            ticks = int((loop.time() - self._last_tick) / self.tick)
+            self._last_tick += ticks * self.tick
+            for _ in range(ticks):
+                self._advance()
+
+    def close(self):
+        if self._driver is not None:
+            self._driver.cancel()
+            self._driver = None
+        self._slots = [[] for _ in self._slots]
+        self._pending = 0
+
+class Delivery:
+    """One message on its way to one recipient"""
+
+    __slots__ = ("recipient_id", "message", "priority", "attempts", "enqueued_at")
+
+    def __init__(self, recipient_id: str, message: Any):
+        self.recipient_id = recipient_id
+        self.message = message
+        priority = getattr(message, "priority", 0)
+        self.priority = getattr(priority, "value", priority)
+        self.attempts = 0
+        self.enqueued_at = time.perf_counter()
+
+@dataclass
+class DeadLetter:
+    """A delivery that was given up on"""
+    recipient_id: str
+    message: Any
+    attempts: int
+    reason: str
+    failed_at: float                   # epoch seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "recipient_id": self.recipient_id,
+            "message_id": getattr(self.message, "message_id", None),
+            "subject": getattr(self.message, "subject", None),
+            "attempts": self.attempts,
+            "reason": self.reason,
+            "failed_at": self.failed_at
+        }
+
+class DeliveryEngine:
+    """Mailboxes, consumer tasks, retry timers and dead letters for message delivery.
+
+    - ``handler_for(recipient_id)`` is looked up for every attempt and may
+      return None, in which case the delivery succeeds without a call.
+    - Mailboxes hold up to ``mailbox_size`` deliveries and are created on
+      first use, so enqueueing must happen on the running loop. They are
+      ordered by ``message.priority`` (highest first), then arrival.
+    - Retry ``n`` waits ``min(max_backoff, base_backoff * 2 ** (n - 1))``
+      seconds, then rejoins the recipient's mailbox behind the waiting
+      deliveries of the same priority.
+    - With ``handler_timeout`` set, a handler call that takes longer counts
+      as a failed attempt. It is off by default because the timeout costs
+      about as much as a trivial handler call.
+    """
+
+    def __init__(self,
+                 handler_for: Callable[[str], Optional[Handler]],
+                 max_attempts: int = 3,
+                 base_backoff: float = 1.0,
+                 max_backoff: float = 30.0,
+                 mailbox_size: int = 1000,
+                 handler_timeout: Optional[float] = None,
+                 dead_letter_capacity: int = 1000,
+                 timer_tick: float = 0.05):
+        self.handler_for = handler_for
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.mailbox_size = mailbox_size
+        self.handler_timeout = handler_timeout
+
+        self.timers = TimerWheel(tick=timer_tick)
+        self.dead_letters: deque = deque(maxlen=dead_letter_capacity)
+        self._mailboxes: Dict[str, asyncio.PriorityQueue] = {}
+        self._consumers: Dict[str, asyncio.Task] = {}
+        self._sequence = itertools.count()
+
+        # Statistics
+        self.enqueued = 0
+        self.delivered = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self.total_delivery_seconds = 0.0
+
+    def _mailbox(self, recipient_id: str) -> asyncio.PriorityQueue:
+        mailbox = self._mailboxes.get(recipient_id)
+        if mailbox is None:
+            mailbox = self._mailboxes[recipient_id] = asyncio.PriorityQueue(self.mailbox_size)
+            self._consumers[recipient_id] = asyncio.create_task(self._consume(recipient_id, mailbox))
+        return mailbox
+
+    def enqueue(self, recipient_id: str, message: Any) -> bool:
+        """Queue ``message`` for ``recipient_id``; False if it went to the dead-letter queue"""
+        return self._put(Delivery(recipient_id, message))
+
+    def broadcast(self, recipient_ids: Iterable[str], message: Any) -> int:
+        """Queue ``message`` for every recipient; returns how many were queued"""
+        return sum(self._put(Delivery(recipient_id, message)) for recipient_id in recipient_ids)
+
+    def _put(self, delivery: Delivery) -> bool:
+        if not self._put_in_mailbox(delivery):
+            return False
+        self.enqueued += 1
+        return True
+
+    def _put_in_mailbox(self, delivery: Delivery) -> bool:
+        try:
+            self._mailbox(delivery.recipient_id).put_nowait((-delivery.priority, next(self._sequence), delivery))
+        except asyncio.QueueFull:
+            self._dead_letter(delivery, "mailbox full")
+            return False
+        return True
+
+    async def _consume(self, recipient_id: str, mailbox: asyncio.PriorityQueue):
+        while True:
+            _, _, delivery = await mailbox.get()
+            try:
+                await self._attempt(delivery)
+            except Exception as e:
+                # _attempt handles handler errors; this guards the consumer itself
+                logger.error(f"Mailbox consumer for {recipient_id} failed: {e}")
+
+    async def _attempt(self, delivery: Delivery):
+        delivery.attempts += 1
+        message = delivery.message
+        if hasattr(message, "delivery_attempts"):
+            message.delivery_attempts += 1
+
+        handler = self.handler_for(delivery.recipient_id)
+        try:
+            if handler is not None:
+                if self.handler_timeout is None:
+                    await handler(message)
+                else:
+                    async with asyncio.timeout(self.handler_timeout):
+                        await handler(message)
+        except Exception as e:
+            reason = "handler timed out" if isinstance(e, TimeoutError) else str(e)
+            logger.error(f"Failed to deliver message {getattr(message, 'message_id', '?')} "
+                         f"to {delivery.recipient_id} (attempt {delivery.attempts}): {reason}")
+            if delivery.attempts < self.max_attempts:
+                self.retried += 1
+                self.timers.schedule(self.backoff(delivery.attempts), self._retry, delivery)
+            else:
+                self._dead_letter(delivery, reason)
+            return
+
+        self.delivered += 1
+        self.total_delivery_seconds += time.perf_counter() - delivery.enqueued_at
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait after failed attempt number ``attempt``"""
+        return min(self.max_backoff, self.base_backoff * 2 ** (attempt - 1))
+
+    def _retry(self, delivery: Delivery):
+        self._put_in_mailbox(delivery)
+
+    def _dead_letter(self, delivery: Delivery, reason: str):
+        self.dead_lettered += 1
+        self.dead_letters.append(DeadLetter(
+            recipient_id=delivery.recipient_id,
+            message=delivery.message,
+            attempts=delivery.attempts,
+            reason=reason,
+            failed_at=time.time()
+        ))
+
+    def backlog(self, recipient_id: str) -> int:
+        """Deliveries waiting in a recipient's mailbox"""
+        mailbox = self._mailboxes.get(recipient_id)
+        return mailbox.qsize() if mailbox is not None else 0
+
+    def get_dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent dead letters, newest first"""
+        return [self.dead_letters[-i].to_dict() for i in range(1, min(limit, len(self.dead_letters)) + 1)]
+
+    async def close(self):
+        """Stop consumers and drop pending retries"""
+        self.timers.close()
+        consumers = list(self._consumers.values())
+        for consumer in consumers:
+            consumer.cancel()
+        await asyncio.gather(*consumers, return_exceptions=True)
+        self._consumers.clear()
+        self._mailboxes.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "mailboxes": len(self._mailboxes),
+            "queued": sum(mailbox.qsize() for mailbox in self._mailboxes.values()),
+            "enqueued": self.enqueued,
+            "delivered": self.delivered,
+            "retried": self.retried,
+            "retries_scheduled": len(self.timers),
+            "dead_lettered": self.dead_lettered,
+            "average_delivery_seconds": self.total_delivery_seconds / self.delivered if self.delivered else 0.0
+        }
@@ -0,0 +1,176 @@
+"""
+Execution Engine - Runs cross-department tasks on the orchestrator's event loop
+
+Every execution mode runs its department work as an asyncio task group on
+the running loop; nothing is handed to threads or nested event loops.
+Concurrency is bounded by semaphores: one for all department work and one
+per department. EMERGENCY work skips both and holds back the start of
+other work until it finishes.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DepartmentRunner = Callable[[Any, Dict[str, Any], str], Awaitable[Dict[str, Any]]]
+
+class ExecutionEngine:
+    """Runs the department work of a CrossDepartmentTask in the requested mode.
+
+    - SEQUENTIAL: one department after another, stopping at the first failure.
+    - PARALLEL / CONCURRENT: all departments at once in a task group. A
+      failing department is recorded and does not cancel the others.
+    - DISTRIBUTED: like CONCURRENT, but the least-loaded departments are
+      started first and their load is passed along with the work.
+    - EMERGENCY: all departments at once, bypassing the concurrency limits.
+      While any emergency work runs, other department work waits before
+      starting; work that is already running is left to finish.
+    """
+
+    def __init__(self,
+                 run_department: DepartmentRunner,
+                 max_concurrent: int = 200,
+                 department_limits: Optional[Dict[Hashable, int]] = None,
+                 department_load: Optional[Callable[[Hashable], float]] = None):
+        self.run_department = run_department
+        self.max_concurrent = max_concurrent
+        self.department_load = department_load or (lambda department: 0.0)
+
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._department_slots: Dict[Hashable, asyncio.Semaphore] = {
+            department: asyncio.Semaphore(limit)
+            for department, limit in (department_limits or {}).items()
+        }
+
+        # Cleared while emergency work runs so new regular work waits
+        self._no_emergency = asyncio.Event()
+        self._no_emergency.set()
+        self._emergencies = 0
+
+        # Statistics
+        self.running = 0
+        self.mode_stats: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {"tasks": 0, "department_runs": 0, "failures": 0, "total_seconds": 0.0}
+        )
+
+    async def execute(self, task: Any, mode: Any) -> Dict[Any, Any]:
+        """Run ``task``'s department work in ``mode`` and return results per department"""
+
+        started = time.perf_counter()
+        mode_name = getattr(mode, "value", str(mode))
+
+        if mode_name == "sequential":
+            results = await self._run_sequential(task)
+        elif mode_name == "emergency":
+            results = await self._run_emergency(task)
+        else:
+            departments = list(task.required_departments)
+            if mode_name == "distributed":
+                departments.sort(key=self.department_load)
+            results = await self._run_group(task, departments, mode_name)
+
+        stats = self.mode_stats[mode_name]
+        stats["tasks"] += 1
+        stats["department_runs"] += len(results)
+        stats["failures"] += sum(1 for result in results.values() if "error" in result)
+        stats["total_seconds"] += time.perf_counter() - started
+        return results
+
+    async def _run_sequential(self, task: Any) -> Dict[Any, Any]:
+        results = {}
+        total = len(task.required_departments)
+        for i, department in enumerate(task.required_departments):
+            result = await self._run_one(task, department, task.department_tasks.get(department, {}))
+            results[department] = result
+            if "error" in result:
+                break  # Stop on first failure in sequential mode
+            task.progress_percentage = ((i + 1) / total) * 100
+        return results
+
+    async def _run_group(self, task: Any, departments: List[Hashable], mode_name: str) -> Dict[Any, Any]:
+        results: Dict[Any, Any] = {}
+        async with asyncio.TaskGroup() as group:
+            for department in departments:
+                work = task.department_tasks.get(department, {})
+                if mode_name == "distributed":
+                    work["execution_priority"] = "distributed"
+                    work["load_factor"] = self.department_load(department)
+                group.create_task(self._run_into(results, task, department, work))
+        return {department: results[department] for department in departments}
+
+    async def _run_emergency(self, task: Any) -> Dict[Any, Any]:
+        logger.warning(f"EMERGENCY EXECUTION: {task.name}")
+
+        self._emergencies += 1
+        self._no_emergency.clear()
+        try:
+            results: Dict[Any, Any] = {}
+            async with asyncio.TaskGroup() as group:
+                for department in task.required_departments:
+                    work = task.department_tasks.get(department, {})
+                    work["priority"] = "EMERGENCY"
+                    work["bypass_queue"] = True
+                    group.create_task(self._run_into(results, task, department, work, limited=False))
+            return {department: results[department] for department in task.required_departments}
+        finally:
+            self._emergencies -= 1
+            if not self._emergencies:
+                self._no_emergency.set()
+
+    async def _run_into(self, results: Dict[Any, Any], task: Any, department: Hashable,
+                        work: Dict[str, Any], limited: bool = True):
+        results[department] = await self._run_one(task, department, work, limited)
+        done = sum(1 for result in results.values() if "error" not in result)
+        task.progress_percentage = (done / len(task.required_departments)) * 100
+
+    async def _run_one(self, task: Any, department: Hashable, work: Dict[str, Any],
+                       limited: bool = True) -> Dict[str, Any]:
+        """Run one department's work, recording a failure instead of raising it"""
+
+        try:
+            if not limited:
+                result = await self._call(task, department, work)
+            else:
+                await self._no_emergency.wait()
+                department_slots = self._department_slots.get(department)
+                async with self._slots:
+                    if department_slots is None:
+                        result = await self._call(task, department, work)
+                    else:
+                        async with department_slots:
+                            result = await self._call(task, department, work)
+        except Exception as e:
+            name = getattr(department, "value", department)
+            logger.error(f"Department {name} task failed: {e}")
+            task.errors.append(f"{name}: {str(e)}")
+            return {"error": str(e)}
+
+        task.department_results[department] = result
+        return result
+
+    async def _call(self, task: Any, department: Hashable, work: Dict[str, Any]) -> Dict[str, Any]:
+        self.running += 1
+        try:
+            return await self.run_department(department, work, task.id)
+        finally:
+            self.running -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Running work and per-mode dispatch statistics"""
+
+        return {
+            "running": self.running,
+            "max_concurrent": self.max_concurrent,
+            "emergency_active": self._emergencies > 0,
+            "modes": {
+                mode: {
+                    **stats,
+                    "average_seconds": stats["total_seconds"] / stats["tasks"] if stats["tasks"] else 0.0
+                }
+                for mode, stats in self.mode_stats.items()
+            }
+        }
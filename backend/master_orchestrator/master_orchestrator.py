@@ -10,14 +10,20 @@ import asyncio
 import logging
 import uuid
 import json
+import math
+import os
+import time
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from collections import defaultdict, deque
-import concurrent.futures
 from threading import Lock
 
+from .execution_engine import ExecutionEngine
+from .task_history import TaskHistory
+from .task_scheduler import DeadlineTaskScheduler, AdmissionError
+
 logger = logging.getLogger(__name__)
 
 class DepartmentType(Enum):
@@ -43,6 +49,24 @@ class SystemPriority(Enum):
     MEDIUM = "medium"          # Optimization
     LOW = "low"                # Nice-to-have
 
+# Dispatch order of the task scheduler, most important first
+PRIORITY_RANK = {
+    SystemPriority.CRITICAL: 0,
+    SystemPriority.URGENT: 1,
+    SystemPriority.HIGH: 2,
+    SystemPriority.MEDIUM: 3,
+    SystemPriority.LOW: 4
+}
+
+# Emergency tasks rank ahead of every priority level and skip the concurrency limits
+EMERGENCY_RANK = -1
+
+# Simulated load a running department task puts on its department
+DEPARTMENT_TASK_LOAD = 10.0
+
+# Departments stop accepting tasks at this utilization (see DepartmentStatus.is_available)
+DEPARTMENT_AVAILABILITY_THRESHOLD = 90.0
+
 @dataclass
 class DepartmentStatus:
     """Department operational status"""
@@ -69,7 +93,7 @@ class DepartmentStatus:
     @property
     def is_available(self) -> bool:
         """Check if department can accept new tasks"""
-        return self.status == "operational" and self.utilization_percentage < 90
+        return self.status == "operational" and self.utilization_percentage < DEPARTMENT_AVAILABILITY_THRESHOLD
 
 @dataclass
 class CrossDepartmentTask:
@@ -87,11 +111,12 @@ class CrossDepartmentTask:
     # Execution settings
     execution_mode: ExecutionMode = ExecutionMode.CONCURRENT
     timeout_minutes: int = 60
+    deadline: Optional[datetime] = None  # latest start; defaults to submission + timeout_minutes
     retry_on_failure: bool = True
     max_retries: int = 3
     
     # Tracking
-    status: str = "pending"  # pending, running, completed, failed
+    status: str = "pending"  # pending, queued, running, completed, failed
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     progress_percentage: float = 0.0
@@ -157,10 +182,11 @@ class MasterOrchestrator:
         self.department_interfaces: Dict[DepartmentType, Any] = {}
         
         # Task management
-        self.global_task_queue: deque = deque()
         self.active_tasks: Dict[str, CrossDepartmentTask] = {}
-        self.completed_tasks: List[CrossDepartmentTask] = []
-        self.task_execution_pool = concurrent.futures.ThreadPoolExecutor(max_workers=10)
+        self.task_history = TaskHistory(
+            capacity=1000,
+            spill_path=os.getenv("ORCHESTRATOR_TASK_HISTORY_DB")  # sqlite file for older records
+        )
         
         # System KPIs
         self.system_kpis: Dict[str, SystemKPI] = {}
@@ -168,7 +194,7 @@ class MasterOrchestrator:
         
         # Optimization cycles
         self.active_optimization_cycles: Dict[str, SystemOptimizationCycle] = {}
-        self.optimization_history: List[SystemOptimizationCycle] = []
+        self.optimization_history: deque = deque(maxlen=100)
         
         # Inter-department communication
         self.message_bus: Dict[str, deque] = defaultdict(lambda: deque(maxlen=100))
@@ -176,9 +202,11 @@ class MasterOrchestrator:
         
         # System configuration
         self.max_concurrent_tasks = 50
+        self.max_concurrent_department_tasks = 200
         self.department_sync_interval = 30  # seconds
         self.kpi_enforcement_interval = 300  # 5 minutes
         self.optimization_interval = 3600  # 1 hour
+        self.max_queued_tasks = 10000
         
         # Performance targets
         self.global_performance_targets = {
@@ -212,6 +240,26 @@ class MasterOrchestrator:
         # Initialize system KPIs
         self._initialize_system_kpis()
         
+        # Task scheduler and execution engine: a department takes as many
+        # tasks as keep it available
+        department_limits = {
+            dept_type: self._department_concurrency_limit(dept)
+            for dept_type, dept in self.departments.items()
+        }
+        self.scheduler = DeadlineTaskScheduler(
+            executor=self.execute_cross_department_task,
+            max_concurrent=self.max_concurrent_tasks,
+            department_limits=department_limits,
+            max_queue_size=self.max_queued_tasks,
+            on_expired=self._on_task_expired
+        )
+        self.execution_engine = ExecutionEngine(
+            run_department=self._execute_department_task,
+            max_concurrent=self.max_concurrent_department_tasks,
+            department_limits=department_limits,
+            department_load=lambda dept_type: self.departments[dept_type].current_load
+        )
+        
         logger.info(f"Master Orchestrator initialized for {self.system_name}")
 
     def _initialize_departments(self):
@@ -276,6 +324,43 @@ class MasterOrchestrator:
                 department=dept
             )
 
+    def _department_concurrency_limit(self, dept: DepartmentStatus) -> int:
+        """Department tasks that can run before the department reports itself unavailable"""
+        
+        free_load = dept.capacity * DEPARTMENT_AVAILABILITY_THRESHOLD / 100
+        return max(1, math.ceil(free_load / DEPARTMENT_TASK_LOAD))
+
+    def submit_task(self, task: CrossDepartmentTask) -> bool:
+        """Queue a task for scheduled execution; returns False if it is not admitted"""
+        
+        now = datetime.utcnow()
+        deadline = task.deadline or now + timedelta(minutes=task.timeout_minutes)
+        emergency = task.execution_mode == ExecutionMode.EMERGENCY
+        
+        try:
+            self.scheduler.submit(
+                task,
+                priority=EMERGENCY_RANK if emergency else PRIORITY_RANK[task.priority],
+                deadline=time.monotonic() + (deadline - now).total_seconds(),
+                departments=task.required_departments,
+                bypass_limits=emergency
+            )
+        except AdmissionError as e:
+            logger.warning(f"Task {task.name} ({task.id}) not admitted: {e}")
+            return False
+        
+        task.status = "queued"
+        return True
+
+    def _on_task_expired(self, task: CrossDepartmentTask):
+        """Record a task whose deadline passed while it was queued"""
+        
+        task.status = "failed"
+        task.completed_at = datetime.utcnow()
+        task.errors.append("Deadline passed before the task could start")
+        self.system_metrics["failed_tasks"] += 1
+        self._record_finished(task)
+
     async def execute_cross_department_task(self, task: CrossDepartmentTask) -> Dict[str, Any]:
         """Execute a task across multiple departments"""
         
@@ -296,16 +381,7 @@ class MasterOrchestrator:
                     raise ValueError(f"Department {dept_type.value} is not available (status: {dept_status.status})")
             
             # Execute based on mode
-            if task.execution_mode == ExecutionMode.SEQUENTIAL:
-                result = await self._execute_sequential(task)
-            elif task.execution_mode == ExecutionMode.PARALLEL:
-                result = await self._execute_parallel(task)
-            elif task.execution_mode == ExecutionMode.CONCURRENT:
-                result = await self._execute_concurrent(task)
-            elif task.execution_mode == ExecutionMode.DISTRIBUTED:
-                result = await self._execute_distributed(task)
-            else:  # EMERGENCY
-                result = await self._execute_emergency(task)
+            await self.execution_engine.execute(task, task.execution_mode)
             
             # Complete task
             task.status = "completed"
@@ -325,8 +401,8 @@ class MasterOrchestrator:
             self.system_metrics["total_tasks_executed"] += 1
             self.system_metrics["successful_tasks"] += 1
             
-            # Move to completed
-            self.completed_tasks.append(task)
+            # Move to history
+            self._record_finished(task)
             del self.active_tasks[task.id]
             
             logger.info(f"Cross-department task completed: {task.name} in {execution_time:.1f}s")
@@ -356,10 +432,13 @@ class MasterOrchestrator:
                 logger.info(f"Retrying task {task.name} (attempt {len(task.errors)}/{task.max_retries})")
                 task.status = "pending"
                 task.completed_at = None
-                self.global_task_queue.append(task)
                 del self.active_tasks[task.id]
+                if not self.submit_task(task):
+                    task.status = "failed"
+                    task.completed_at = datetime.utcnow()
+                    self._record_finished(task)
             else:
-                self.completed_tasks.append(task)
+                self._record_finished(task)
                 del self.active_tasks[task.id]
             
             return {
@@ -370,154 +449,11 @@ class MasterOrchestrator:
                 "errors": task.errors
             }
 
-    async def _execute_concurrent(self, task: CrossDepartmentTask) -> Dict[str, Any]:
-        """Execute task concurrently across departments"""
-        
-        # Create department tasks
-        department_futures = []
-        
-        for dept_type in task.required_departments:
-            dept_task = task.department_tasks.get(dept_type, {})
-            future = asyncio.create_task(
-                self._execute_department_task(dept_type, dept_task, task.id)
-            )
-            department_futures.append((dept_type, future))
-        
-        # Wait for all departments to complete
-        results = {}
-        for dept_type, future in department_futures:
-            try:
-                dept_result = await future
-                results[dept_type] = dept_result
-                task.department_results[dept_type] = dept_result
-                
-                # Update progress
-                completed_count = len(task.department_results)
-                total_count = len(task.required_departments)
-                task.progress_percentage = (completed_count / total_count) * 100
-                
-            except Exception as e:
-                logger.error(f"Department {dept_type.value} task failed: {e}")
-                results[dept_type] = {"error": str(e)}
-                task.errors.append(f"{dept_type.value}: {str(e)}")
+    def _record_finished(self, task: CrossDepartmentTask):
+        """Add a finished task to the history and refresh the metrics derived from it"""
         
-        return results
-
-    async def _execute_parallel(self, task: CrossDepartmentTask) -> Dict[str, Any]:
-        """Execute task in parallel with maximum concurrency"""
-        
-        # Similar to concurrent but with thread pool execution
-        loop = asyncio.get_event_loop()
-        futures = []
-        
-        for dept_type in task.required_departments:
-            dept_task = task.department_tasks.get(dept_type, {})
-            future = loop.run_in_executor(
-                self.task_execution_pool,
-                asyncio.run,
-                self._execute_department_task(dept_type, dept_task, task.id)
-            )
-            futures.append((dept_type, future))
-        
-        results = {}
-        for dept_type, future in futures:
-            try:
-                dept_result = await future
-                results[dept_type] = dept_result
-                task.department_results[dept_type] = dept_result
-            except Exception as e:
-                results[dept_type] = {"error": str(e)}
-                task.errors.append(f"{dept_type.value}: {str(e)}")
-        
-        return results
-
-    async def _execute_sequential(self, task: CrossDepartmentTask) -> Dict[str, Any]:
-        """Execute task sequentially across departments"""
-        
-        results = {}
-        
-        for i, dept_type in enumerate(task.required_departments):
-            dept_task = task.department_tasks.get(dept_type, {})
-            
-            try:
-                dept_result = await self._execute_department_task(dept_type, dept_task, task.id)
-                results[dept_type] = dept_result
-                task.department_results[dept_type] = dept_result
-                
-                # Update progress
-                task.progress_percentage = ((i + 1) / len(task.required_departments)) * 100
-                
-            except Exception as e:
-                logger.error(f"Department {dept_type.value} task failed: {e}")
-                results[dept_type] = {"error": str(e)}
-                task.errors.append(f"{dept_type.value}: {str(e)}")
-                break  # Stop on first failure in sequential mode
-        
-        return results
-
-    async def _execute_distributed(self, task: CrossDepartmentTask) -> Dict[str, Any]:
-        """Execute task in distributed mode with load balancing"""
-        
-        # Distribute work based on department load
-        sorted_departments = sorted(
-            task.required_departments,
-            key=lambda d: self.departments[d].current_load
-        )
-        
-        results = {}
-        futures = []
-        
-        for dept_type in sorted_departments:
-            dept_task = task.department_tasks.get(dept_type, {})
-            
-            # Add load balancing metadata
-            dept_task["execution_priority"] = "distributed"
-            dept_task["load_factor"] = self.departments[dept_type].current_load
-            
-            future = asyncio.create_task(
-                self._execute_department_task(dept_type, dept_task, task.id)
-            )
-            futures.append((dept_type, future))
-            
-            # Stagger execution slightly to prevent resource contention
-            await asyncio.sleep(0.1)
-        
-        # Gather results
-        for dept_type, future in futures:
-            try:
-                dept_result = await future
-                results[dept_type] = dept_result
-                task.department_results[dept_type] = dept_result
-            except Exception as e:
-                results[dept_type] = {"error": str(e)}
-                task.errors.append(f"{dept_type.value}: {str(e)}")
-        
-        return results
-
-    async def _execute_emergency(self, task: CrossDepartmentTask) -> Dict[str, Any]:
-        """Execute task in emergency mode - all departments immediately"""
-        
-        # Override all priorities and execute immediately
-        logger.warning(f"EMERGENCY EXECUTION: {task.name}")
-        
-        emergency_futures = []
-        
-        for dept_type in task.required_departments:
-            dept_task = task.department_tasks.get(dept_type, {})
-            dept_task["priority"] = "EMERGENCY"
-            dept_task["bypass_queue"] = True
-            
-            future = asyncio.create_task(
-                self._execute_department_task(dept_type, dept_task, task.id)
-            )
-            emergency_futures.append((dept_type, future))
-        
-        # Don't wait for completion in emergency mode
-        results = {}
-        for dept_type, _ in emergency_futures:
-            results[dept_type] = {"status": "emergency_dispatched"}
-        
-        return results
+        self.task_history.record(task)
+        self.system_metrics["average_task_time"] = self.task_history.overall.average_seconds
 
     async def _execute_department_task(self, department: DepartmentType, 
                                       task_data: Dict[str, Any], parent_task_id: str) -> Dict[str, Any]:
@@ -525,7 +461,7 @@ class MasterOrchestrator:
         
         # Update department status
         dept_status = self.departments[department]
-        dept_status.current_load += 10.0  # Simulated load increase
+        dept_status.current_load += DEPARTMENT_TASK_LOAD  # Simulated load increase
         dept_status.tasks_in_queue += 1
         
         try:
@@ -562,7 +498,7 @@ class MasterOrchestrator:
             
             # Update department metrics
             dept_status.tasks_completed_today += 1
-            dept_status.current_load = max(0, dept_status.current_load - 10.0)
+            dept_status.current_load = max(0, dept_status.current_load - DEPARTMENT_TASK_LOAD)
             dept_status.tasks_in_queue = max(0, dept_status.tasks_in_queue - 1)
             
             # Send completion event
@@ -575,7 +511,7 @@ class MasterOrchestrator:
             return result
             
         except Exception as e:
-            dept_status.current_load = max(0, dept_status.current_load - 10.0)
+            dept_status.current_load = max(0, dept_status.current_load - DEPARTMENT_TASK_LOAD)
             dept_status.tasks_in_queue = max(0, dept_status.tasks_in_queue - 1)
             raise e
 
@@ -833,9 +769,9 @@ class MasterOrchestrator:
                 for dept_type, dept in self.departments.items()
             },
             "tasks": {
-                "queued": len(self.global_task_queue),
+                "queued": len(self.scheduler),
                 "active": len(self.active_tasks),
-                "completed": len(self.completed_tasks),
+                "completed": self.task_history.overall.count,
                 "success_rate": (self.system_metrics["successful_tasks"] / 
                                 max(1, self.system_metrics["total_tasks_executed"])) * 100
             },
@@ -848,6 +784,9 @@ class MasterOrchestrator:
                 }
                 for kpi_name, kpi in self.system_kpis.items()
             },
+            "history": self.task_history.summary(),
+            "scheduler": self.scheduler.get_stats(),
+            "execution": self.execution_engine.get_stats(),
             "optimization": {
                 "active_cycles": len(self.active_optimization_cycles),
                 "total_optimizations": self.system_metrics["total_optimizations"],
@@ -872,16 +811,20 @@ class MasterOrchestrator:
             return_exceptions=True
         )
 
+    async def shutdown(self):
+        """Stop dispatching, let running tasks finish and persist the task history"""
+        
+        await self.scheduler.stop()
+        await self.task_history.aclose()
+        logger.info("Master Orchestrator stopped")
+
     async def _task_processing_loop(self):
-        """Process global task queue"""
+        """Dispatch queued tasks as soon as capacity allows"""
         
         while True:
             try:
-                if self.global_task_queue and len(self.active_tasks) < self.max_concurrent_tasks:
-                    task = self.global_task_queue.popleft()
-                    asyncio.create_task(self.execute_cross_department_task(task))
-                
-                await asyncio.sleep(1)
+                await self.scheduler.run()
+                return
                 
             except Exception as e:
                 logger.error(f"Error in task processing loop: {e}")
@@ -0,0 +1,140 @@
+"""
+Message Scheduler - Priority dispatch and expiry tracking for inter-agent messages
+
+Sent messages wait in one heap ordered by priority, then deadline (expiry),
+then arrival. A dispatcher task drains it in batches as soon as anything
+is queued, yielding to the event loop between batches, so an urgent
+message waits for at most one batch instead of a maintenance tick.
+
+Expiry times are kept in a separate min-heap, so finding expired messages
+costs O(expired log n) and nothing is rescanned or rebuilt.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+def _epoch(value: Optional[datetime]) -> float:
+    """Epoch seconds of a naive UTC datetime, or infinity for None"""
+    if value is None:
+        return float("inf")
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+class ExpiryIndex:
+    """Min-heap of (expires_at, sequence, key)"""
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def add(self, key: Hashable, expires_at: Optional[datetime]):
+        if expires_at is not None:
+            heapq.heappush(self._heap, (_epoch(expires_at), next(self._sequence), key))
+
+    def pop_expired(self, now: Optional[datetime] = None) -> List[Hashable]:
+        """Keys whose expiry is at or before ``now`` (naive UTC, default: now), oldest first"""
+        now = _epoch(now) if now is not None else time.time()
+        heap = self._heap
+        expired = []
+        while heap and heap[0][0] <= now:
+            expired.append(heapq.heappop(heap)[2])
+        return expired
+
+class MessageScheduler:
+    """Priority/deadline heap with a continuously running dispatcher.
+
+    - Ordering: highest ``message.priority`` first, then earliest
+      ``message.expiry``, then arrival.
+    - ``dispatch(message)`` is called for each message in order, at most
+      ``batch_size`` per turn of the event loop. A message whose expiry has
+      passed by then is dropped and counted instead.
+    - The dispatcher task is started by ``submit`` and exits when the heap
+      is empty, so ``submit`` must be called on the running loop.
+    """
+
+    def __init__(self, dispatch: Callable[[Any], Any], batch_size: int = 256):
+        self.dispatch = dispatch
+        self.batch_size = batch_size
+
+        self._heap: List[Tuple[int, float, int, float, Any]] = []
+        self._sequence = itertools.count()
+        self._runner: Optional[asyncio.Task] = None
+
+        # Statistics
+        self.stats = {
+            "submitted": 0,
+            "dispatched": 0,
+            "failed": 0,
+            "expired": 0
+        }
+        self.queue_delays: deque = deque(maxlen=1000)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def submit(self, message: Any):
+        """Queue ``message`` for dispatch"""
+
+        priority = getattr(message.priority, "value", message.priority)
+        heapq.heappush(self._heap, (-priority, _epoch(message.expiry), next(self._sequence),
+                                    time.monotonic(), message))
+        self.stats["submitted"] += 1
+
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self.run())
+
+    async def run(self):
+        """Dispatch until the heap is empty"""
+
+        while self._heap:
+            self._dispatch_batch()
+            await asyncio.sleep(0)
+
+    def _dispatch_batch(self):
+        heap = self._heap
+        now = time.time()
+        for _ in range(min(self.batch_size, len(heap))):
+            _, deadline, _, enqueued_at, message = heapq.heappop(heap)
+            if deadline <= now:
+                self.stats["expired"] += 1
+                continue
+            self.queue_delays.append(time.monotonic() - enqueued_at)
+            try:
+                self.dispatch(message)
+                self.stats["dispatched"] += 1
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.error(f"Failed to dispatch message {getattr(message, 'message_id', '?')}: {e}")
+
+    async def stop(self):
+        """Stop dispatching; queued messages stay queued"""
+        if self._runner is not None:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+            self._runner = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        delays = sorted(self.queue_delays)
+
+        def pct(p: float) -> float:
+            return delays[min(len(delays) - 1, int(len(delays) * p))] if delays else 0.0
+
+        return {
+            **self.stats,
+            "queued": len(self._heap),
+            "queue_delay_p50": pct(0.50),
+            "queue_delay_p95": pct(0.95),
+            "queue_delay_max": delays[-1] if delays else 0.0
+        }
@@ -0,0 +1,316 @@
+"""
+Metric Aggregation - Streaming multi-window aggregates for the monitoring dashboard
+
+Samples are added to a one-second bucket per metric. When that bucket
+closes it is merged into each window's current bucket, and each window
+keeps its last ``buckets_per_window`` closed buckets as a ring. Running
+totals over the ring are updated as buckets enter and leave it:
+
+- count, mean and variance with Welford/Chan updates,
+- min and max with monotonic deques of bucket extremes,
+- quantiles with a log-bucketed sketch (relative error ``relative_accuracy``).
+
+Ingest is O(1) per sample; a window read combines the ring totals with the
+open buckets, so a window covers its length plus at most one bucket width.
+"""
+
+import math
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+class Bucket:
+    """Count, mean, M2, extremes and sketch counts of the samples in one time slot"""
+
+    __slots__ = ("index", "count", "mean", "m2", "min", "max", "sketch")
+
+    def __init__(self, index: int):
+        self.index = index
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch: Dict[float, int] = {}
+
+    def merge(self, other: "Bucket"):
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        if other.min < self.min:
+            self.min = other.min
+        if other.max > self.max:
+            self.max = other.max
+        sketch = self.sketch
+        for key, n in other.sketch.items():
+            sketch[key] = sketch.get(key, 0) + n
+
+class QuantileSketch:
+    """Maps values to log-spaced representatives so counts per representative answer quantiles.
+
+    Any value is represented within ``relative_accuracy`` of itself, and the
+    number of distinct representatives grows with the log of the value
+    range, not with the number of samples.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-9):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(gamma)
+        self._midpoint = 2 / (1 + gamma)
+        self._gamma = gamma
+
+    def key(self, value: float) -> float:
+        magnitude = abs(value)
+        if magnitude < self.min_value:
+            return 0.0
+        representative = self._gamma ** math.ceil(math.log(magnitude) / self._log_gamma) * self._midpoint
+        return representative if value > 0 else -representative
+
+    @staticmethod
+    def quantiles(counts: Dict[float, int], total: int, qs: Iterable[float]) -> List[float]:
+        """Values at each quantile in ``qs`` (ascending) from representative counts"""
+        results = []
+        targets = [q * (total - 1) for q in qs]
+        if not targets:
+            return results
+        seen = 0
+        pending = iter(targets)
+        target = next(pending)
+        for key in sorted(counts):
+            seen += counts[key]
+            while seen > target:
+                results.append(key)
+                target = next(pending, None)
+                if target is None:
+                    return results
+        last = max(counts) if counts else 0.0
+        return results + [last] * (len(targets) - len(results))
+
+class WindowAggregate:
+    """One window of one metric: a ring of closed buckets and their running totals"""
+
+    __slots__ = ("ratio", "size", "ring", "open", "count", "mean", "m2", "mins", "maxes", "sketch")
+
+    def __init__(self, bucket_width: int, size: int):
+        self.ratio = bucket_width          # seconds, i.e. one-second buckets, per bucket
+        self.size = size
+        self.ring: deque = deque()
+        self.open: Optional[Bucket] = None
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.mins: deque = deque()         # (index, min), values increasing
+        self.maxes: deque = deque()        # (index, max), values decreasing
+        self.sketch: Dict[float, int] = {}
+
+    def add_base(self, base: Bucket):
+        """Merge a closed one-second bucket"""
+        index = base.index // self.ratio
+        if self.open is None or index > self.open.index:
+            if self.open is not None:
+                self._close(self.open)
+            self.open = Bucket(index)
+        self.open.merge(base)
+        self.expire(index)
+
+    def _close(self, bucket: Bucket):
+        self.ring.append(bucket)
+        self._accumulate(bucket)
+
+        mins = self.mins
+        while mins and mins[-1][1] >= bucket.min:
+            mins.pop()
+        mins.append((bucket.index, bucket.min))
+        maxes = self.maxes
+        while maxes and maxes[-1][1] <= bucket.max:
+            maxes.pop()
+        maxes.append((bucket.index, bucket.max))
+
+    def _accumulate(self, bucket: Bucket):
+        count = self.count + bucket.count
+        delta = bucket.mean - self.mean
+        self.mean += delta * bucket.count / count
+        self.m2 += bucket.m2 + delta * delta * self.count * bucket.count / count
+        self.count = count
+        sketch = self.sketch
+        for key, n in bucket.sketch.items():
+            sketch[key] = sketch.get(key, 0) + n
+
+    def expire(self, current_index: int):
+        """Drop closed buckets that have left the window ending at ``current_index``"""
+        oldest = current_index - self.size
+        ring = self.ring
+        while ring and ring[0].index <= oldest:
+            self._remove(ring.popleft())
+        while self.mins and self.mins[0][0] <= oldest:
+            self.mins.popleft()
+        while self.maxes and self.maxes[0][0] <= oldest:
+            self.maxes.popleft()
+        if self.open is not None and self.open.index <= oldest:
+            self.open = None
+
+    def _remove(self, bucket: Bucket):
+        remaining = self.count - bucket.count
+        if remaining <= 0 or not self.ring:
+            # Start exact again rather than carry rounding error
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            self.sketch = {}
+            for other in self.ring:
+                self._accumulate(other)
+            return
+        mean = (self.count * self.mean - bucket.count * bucket.mean) / remaining
+        delta = bucket.mean - mean
+        self.m2 = max(0.0, self.m2 - bucket.m2 - delta * delta * remaining * bucket.count / self.count)
+        self.mean = mean
+        self.count = remaining
+        sketch = self.sketch
+        for key, n in bucket.sketch.items():
+            left = sketch[key] - n
+            if left:
+                sketch[key] = left
+            else:
+                del sketch[key]
+
+    def combined(self, base: Optional[Bucket]) -> Bucket:
+        """Closed ring plus the open window bucket plus the still-open base bucket"""
+        total = Bucket(-1)
+        total.count, total.mean, total.m2 = self.count, self.mean, self.m2
+        if self.mins:
+            total.min = self.mins[0][1]
+            total.max = self.maxes[0][1]
+        total.sketch = dict(self.sketch)
+        if self.open is not None:
+            total.merge(self.open)
+        if base is not None:
+            total.merge(base)
+        return total
+
+class MetricAggregates:
+    """All windows of one metric plus its open one-second bucket"""
+
+    __slots__ = ("base", "windows")
+
+    def __init__(self, windows: Dict[int, WindowAggregate]):
+        self.base: Optional[Bucket] = None
+        self.windows = windows
+
+    def advance(self, index: int):
+        """Close the one-second bucket if ``index`` is past it"""
+        base = self.base
+        if base is not None and index > base.index:
+            for window in self.windows.values():
+                window.add_base(base)
+            self.base = None
+        for window in self.windows.values():
+            window.expire(index // window.ratio)
+
+class StreamingAggregator:
+    """Per-metric min/max/avg/median/stddev/percentiles over several windows.
+
+    ``add`` costs the same however many samples a window holds; ``get``
+    costs O(distinct sketch representatives) for the quantiles.
+    """
+
+    def __init__(self,
+                 windows: Iterable[int] = (60, 300, 900, 3600, 86400),
+                 buckets_per_window: int = 60,
+                 relative_accuracy: float = 0.01):
+        self.windows = sorted(windows)
+        self.buckets_per_window = buckets_per_window
+        self.sketch = QuantileSketch(relative_accuracy)
+        self._metrics: Dict[str, MetricAggregates] = {}
+
+    def __contains__(self, metric_id: str) -> bool:
+        return metric_id in self._metrics
+
+    def __len__(self) -> int:
+        return len(self._metrics)
+
+    def _new_metric(self) -> MetricAggregates:
+        return MetricAggregates({
+            window: WindowAggregate(max(1, window // self.buckets_per_window), self.buckets_per_window)
+            for window in self.windows
+        })
+
+    def add(self, metric_id: str, value: float, timestamp: Optional[float] = None):
+        """Add a sample; ``timestamp`` is epoch seconds (default: now)"""
+
+        index = int(timestamp if timestamp is not None else time.time())
+        metric = self._metrics.get(metric_id)
+        if metric is None:
+            metric = self._metrics[metric_id] = self._new_metric()
+
+        base = metric.base
+        if base is None or index > base.index:
+            if base is not None:
+                metric.advance(index)
+            base = metric.base = Bucket(index)
+        # A late sample lands in the open bucket rather than reopening a closed one
+
+        count = base.count + 1
+        delta = value - base.mean
+        base.mean += delta / count
+        base.m2 += delta * (value - base.mean)
+        base.count = count
+        if value < base.min:
+            base.min = value
+        if value > base.max:
+            base.max = value
+        key = self.sketch.key(value)
+        sketch = base.sketch
+        sketch[key] = sketch.get(key, 0) + 1
+
+    def get(self, metric_id: str, window: int, now: Optional[float] = None,
+            percentiles: Iterable[float] = (0.95, 0.99)) -> Optional[Dict[str, float]]:
+        """Aggregates of ``metric_id`` over ``window`` seconds, or None without samples"""
+
+        metric = self._metrics.get(metric_id)
+        if metric is None or window not in metric.windows:
+            return None
+        metric.advance(int(now if now is not None else time.time()))
+
+        total = metric.windows[window].combined(metric.base)
+        if not total.count:
+            return None
+
+        percentiles = list(percentiles)
+        quantiles = QuantileSketch.quantiles(total.sketch, total.count, [0.5] + percentiles)
+        # Sketch representatives can sit just outside the observed range
+        quantiles = [min(total.max, max(total.min, value)) for value in quantiles]
+
+        result = {
+            "min": total.min,
+            "max": total.max,
+            "avg": total.mean,
+            "median": quantiles[0],
+            "stddev": math.sqrt(total.m2 / (total.count - 1)) if total.count > 1 else 0,
+            "count": total.count
+        }
+        for q, value in zip(percentiles, quantiles[1:]):
+            result[f"p{q * 100:g}"] = value
+        return result
+
+    def snapshot(self, metric_id: str, now: Optional[float] = None) -> Dict[int, Dict[str, float]]:
+        """Aggregates for every window that has samples"""
+
+        now = now if now is not None else time.time()
+        results = {}
+        for window in self.windows:
+            aggregate = self.get(metric_id, window, now)
+            if aggregate is not None:
+                results[window] = aggregate
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "metrics": len(self._metrics),
+            "windows": self.windows,
+            "buckets_per_window": self.buckets_per_window,
+            "relative_accuracy": self.sketch.relative_accuracy
+        }
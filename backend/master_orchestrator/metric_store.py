@@ -0,0 +1,462 @@
+"""
+Metric Store - Local time-series storage for monitoring metrics
+
+Samples are kept at three resolutions in one sqlite file:
+
+- raw: columnar segments, one row per metric holding up to
+  ``segment_size`` packed timestamps and values,
+- 1m and 1h rollups: count, sum, min and max per metric and bucket,
+  maintained as samples arrive rather than recomputed from raw data.
+
+Each resolution has its own retention; an in-memory store (``:memory:``)
+defaults to hours rather than days, since it cannot outlive the process.
+Range queries read the finest
+resolution that is still retained for the requested start and return at
+most ``max_points`` points, merging neighbouring points into equal time
+buckets when there are more, so a 30-day query reads hourly rows and
+never touches raw segments. Samples not yet written are answered from
+memory.
+
+Segment, rollup and retention writes are queued to a background writer
+thread, so appending never waits on sqlite. ``close`` writes everything
+still held in memory, including the open buckets.
+"""
+
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from array import array
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ROLLUPS = (60, 3600)
+RESOLUTION_NAMES = {"raw": 0, "1m": 60, "1h": 3600}
+DEFAULT_RETENTION = {"raw": 2 * 86400, "1m": 7 * 86400, "1h": 365 * 86400}
+MEMORY_RETENTION = {"raw": 3600, "1m": 6 * 3600, "1h": 86400}
+
+_STOP = ("stop",)
+
+class MetricStore:
+    """Append-only raw segments plus incrementally maintained rollups with retention.
+
+    - ``append`` is O(1): it buffers the sample and folds it into the open
+      1m and 1h buckets. A metric's buffer is queued as one segment when
+      it reaches ``segment_size`` samples, when it is ``max_buffer_seconds``
+      old and holds at least ``min_segment_size`` samples, or when it is
+      ``max_buffer_age`` old, so slow metrics are not written one or two
+      samples per row.
+    - Retention (seconds per resolution) is queued at most every
+      ``retention_interval`` seconds while appending.
+    - Queued writes stay visible to queries until the writer has applied
+      them; the connection and that data are guarded by one lock.
+    """
+
+    def __init__(self,
+                 path: str = ":memory:",
+                 segment_size: int = 256,
+                 max_buffer_seconds: float = 60,
+                 min_segment_size: int = 32,
+                 max_buffer_age: float = 3600,
+                 retention: Optional[Dict[str, float]] = None,
+                 retention_interval: float = 600,
+                 raw_query_span: float = 6 * 3600):
+        self.path = path
+        self.segment_size = segment_size
+        self.max_buffer_seconds = max_buffer_seconds
+        self.min_segment_size = min_segment_size
+        self.max_buffer_age = max_buffer_age
+        self.retention = dict(MEMORY_RETENTION if path == ":memory:" else DEFAULT_RETENTION)
+        self.retention.update(retention or {})
+        self.retention_interval = retention_interval
+        self.raw_query_span = raw_query_span
+
+        self._ids: Dict[str, int] = {}
+        self._buffers: Dict[str, Tuple[array, array]] = {}
+        self._buffer_started: Dict[str, float] = {}
+        # metric -> resolution -> [bucket, count, sum, min, max]
+        self._open: Dict[str, Dict[int, List[float]]] = defaultdict(dict)
+        self._pending_rollups: Dict[int, List[Tuple]] = {resolution: [] for resolution in ROLLUPS}
+        self._last_maintenance = time.monotonic()
+        self._last_retention = 0.0
+
+        # Queued for the writer thread but not yet written
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._unwritten_segments: Dict[str, List[Tuple[array, array]]] = defaultdict(list)
+        self._unwritten_rollups: Dict[int, List[List[Tuple]]] = {resolution: [] for resolution in ROLLUPS}
+
+        self.stats = {"appended": 0, "segments_written": 0, "rollups_written": 0, "retention_runs": 0}
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS metrics (
+                id INTEGER PRIMARY KEY,
+                name TEXT UNIQUE NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS raw_segments (
+                metric INTEGER NOT NULL,
+                start REAL NOT NULL,
+                end REAL NOT NULL,
+                count INTEGER NOT NULL,
+                timestamps BLOB NOT NULL,
+                samples BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_raw_segments_metric_end ON raw_segments (metric, end);
+        """ + "".join(f"""
+            CREATE TABLE IF NOT EXISTS rollup_{resolution} (
+                metric INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                sum REAL NOT NULL,
+                min REAL NOT NULL,
+                max REAL NOT NULL,
+                PRIMARY KEY (metric, bucket)
+            ) WITHOUT ROWID;
+        """ for resolution in ROLLUPS))
+        for metric_id, name in self._db.execute("SELECT id, name FROM metrics"):
+            self._ids[name] = metric_id
+        self._next_id = max(self._ids.values(), default=0) + 1
+
+        self._writer = threading.Thread(target=self._run, name="metric-store", daemon=True)
+        self._writer.start()
+
+    def __contains__(self, metric_id: str) -> bool:
+        return metric_id in self._ids or metric_id in self._buffers
+
+    def _metric(self, name: str) -> int:
+        metric = self._ids.get(name)
+        if metric is None:
+            # Ids are assigned here; the writer inserts the row before any data using it
+            metric = self._ids[name] = self._next_id
+            self._next_id += 1
+            self._queue.put(("metric", metric, name))
+        return metric
+
+    def append(self, metric_id: str, value: float, timestamp: Optional[float] = None):
+        """Record a sample (``timestamp`` in epoch seconds, default now)"""
+
+        timestamp = timestamp if timestamp is not None else time.time()
+        buffer = self._buffers.get(metric_id)
+        if buffer is None:
+            self._metric(metric_id)
+            buffer = self._buffers[metric_id] = (array("d"), array("d"))
+            self._buffer_started[metric_id] = time.monotonic()
+        buffer[0].append(timestamp)
+        buffer[1].append(value)
+
+        open_buckets = self._open[metric_id]
+        for resolution in ROLLUPS:
+            bucket = int(timestamp // resolution) * resolution
+            current = open_buckets.get(resolution)
+            if current is None or bucket > current[0]:
+                if current is not None:
+                    self._pending_rollups[resolution].append((self._ids[metric_id], *current))
+                open_buckets[resolution] = [bucket, 1, value, value, value]
+            elif bucket == current[0]:
+                current[1] += 1
+                current[2] += value
+                if value < current[3]:
+                    current[3] = value
+                if value > current[4]:
+                    current[4] = value
+            else:
+                # Late sample for a closed bucket: merged on write
+                self._pending_rollups[resolution].append((self._ids[metric_id], bucket, 1, value, value, value))
+
+        self.stats["appended"] += 1
+        if len(buffer[0]) >= self.segment_size:
+            self._queue_segment(metric_id)
+        if time.monotonic() - self._last_maintenance >= 5:
+            self._queue_writes(only_aged=True)
+
+    def _queue_segment(self, metric_id: str):
+        segment = self._buffers.pop(metric_id)
+        self._buffer_started.pop(metric_id, None)
+        if not segment[0]:
+            return
+        with self._lock:
+            self._unwritten_segments[metric_id].append(segment)
+        self._queue.put(("segment", metric_id, segment))
+
+    def _queue_writes(self, only_aged: bool = False):
+        """Queue buffered segments (all, or only those due by age) and closed rollups"""
+
+        now = time.monotonic()
+        self._last_maintenance = now
+        for metric_id, buffer in list(self._buffers.items()):
+            age = now - self._buffer_started[metric_id]
+            if (not only_aged or age >= self.max_buffer_age
+                    or (age >= self.max_buffer_seconds and len(buffer[0]) >= self.min_segment_size)):
+                self._queue_segment(metric_id)
+        for resolution, pending in self._pending_rollups.items():
+            if pending:
+                self._pending_rollups[resolution] = []
+                with self._lock:
+                    self._unwritten_rollups[resolution].append(pending)
+                self._queue.put(("rollups", resolution, pending))
+        if now - self._last_retention >= self.retention_interval:
+            self._last_retention = now
+            self._queue.put(("retention",))
+
+    def flush(self):
+        """Write every buffered segment and closed rollup, blocking until they are written"""
+        self._queue_writes()
+        self._queue.join()
+
+    def close(self):
+        """Write everything held in memory, including the open buckets, and stop the writer"""
+        if not self._writer.is_alive():
+            return
+        # Open buckets are partial; they are merged with later samples on restart
+        for metric_id, open_buckets in self._open.items():
+            for resolution, current in open_buckets.items():
+                self._pending_rollups[resolution].append((self._ids[metric_id], *current))
+        self._open.clear()
+        self._queue_writes()
+        self._queue.put(_STOP)
+        self._writer.join()
+        self._db.close()
+
+    # Writer thread
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                with self._lock:
+                    self._apply([op for op in batch if op is not _STOP])
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if _STOP in batch:
+                break
+
+    def _apply(self, batch: List[tuple]):
+        """Write a batch of queued operations in one transaction (called with the lock held)"""
+        try:
+            with self._db:
+                for op in batch:
+                    kind = op[0]
+                    if kind == "metric":
+                        self._db.execute("INSERT OR IGNORE INTO metrics (id, name) VALUES (?, ?)", op[1:])
+                    elif kind == "segment":
+                        metric_id, (timestamps, values) = op[1], op[2]
+                        self._db.execute(
+                            "INSERT INTO raw_segments VALUES (?, ?, ?, ?, ?, ?)",
+                            (self._ids[metric_id], min(timestamps), max(timestamps), len(timestamps),
+                             timestamps.tobytes(), values.tobytes())
+                        )
+                        self.stats["segments_written"] += 1
+                    elif kind == "rollups":
+                        self._db.executemany(f"""
+                            INSERT INTO rollup_{op[1]} VALUES (?, ?, ?, ?, ?, ?)
+                            ON CONFLICT (metric, bucket) DO UPDATE SET
+                                count = count + excluded.count,
+                                sum = sum + excluded.sum,
+                                min = MIN(min, excluded.min),
+                                max = MAX(max, excluded.max)
+                        """, op[2])
+                        self.stats["rollups_written"] += len(op[2])
+                    elif kind == "retention":
+                        self._delete_expired(time.time())
+        except sqlite3.Error as e:
+            logger.error(f"Error writing metrics: {e}")
+        finally:
+            # Written (or lost to the error above): no longer answered from memory
+            for op in batch:
+                if op[0] == "segment":
+                    segments = self._unwritten_segments[op[1]]
+                    segments.remove(op[2])
+                    if not segments:
+                        del self._unwritten_segments[op[1]]
+                elif op[0] == "rollups":
+                    self._unwritten_rollups[op[1]].remove(op[2])
+
+    def _delete_expired(self, now: float) -> Dict[str, int]:
+        deleted = {"raw": 0, "1m": 0, "1h": 0}
+        # Per metric, so each delete is a range scan of the (metric, ...) index
+        for metric in list(self._ids.values()):
+            deleted["raw"] += self._db.execute(
+                "DELETE FROM raw_segments WHERE metric = ? AND end < ?",
+                (metric, now - self.retention["raw"])
+            ).rowcount
+            for name, resolution in (("1m", 60), ("1h", 3600)):
+                deleted[name] += self._db.execute(
+                    f"DELETE FROM rollup_{resolution} WHERE metric = ? AND bucket < ?",
+                    (metric, now - self.retention[name])
+                ).rowcount
+        self.stats["retention_runs"] += 1
+        return deleted
+
+    def apply_retention(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Delete data older than each resolution's retention now; returns rows deleted"""
+
+        self.flush()
+        try:
+            with self._lock, self._db:
+                return self._delete_expired(now if now is not None else time.time())
+        except sqlite3.Error as e:
+            logger.error(f"Error applying metric retention: {e}")
+            return {"raw": 0, "1m": 0, "1h": 0}
+
+    def choose_resolution(self, start: float, end: float, max_points: int = 1000) -> str:
+        """Finest retained resolution for the range that stays near ``max_points``"""
+
+        now = time.time()
+        span = end - start
+        if start >= now - self.retention["raw"] and span <= self.raw_query_span:
+            return "raw"
+        if start >= now - self.retention["1m"] and span / 60 <= max_points:
+            return "1m"
+        return "1h"
+
+    def query(self, metric_id: str, start: float, end: float,
+              resolution: Optional[str] = None, max_points: int = 1000) -> Dict[str, Any]:
+        """At most ``max_points`` points of ``metric_id`` in [start, end) at the given or chosen resolution"""
+
+        resolution = resolution or self.choose_resolution(start, end, max_points)
+        if resolution not in RESOLUTION_NAMES:
+            raise ValueError(f"Unknown resolution {resolution}")
+
+        metric = self._ids.get(metric_id)
+        if resolution == "raw":
+            points = self._query_raw(metric_id, metric, start, end)
+        else:
+            points = self._query_rollup(metric_id, metric, RESOLUTION_NAMES[resolution], start, end)
+
+        bucket_seconds = None
+        if len(points) > max_points:
+            bucket_seconds = (end - start) / max_points
+            points = self._downsample(points, start, bucket_seconds)
+
+        count = sum(point["count"] for point in points)
+        total = sum(point["value"] * point["count"] for point in points)
+        return {
+            "metric_id": metric_id,
+            "resolution": resolution,
+            "bucket_seconds": bucket_seconds,  # set when points were merged to fit max_points
+            "points": points,
+            "summary": {
+                "count": count,
+                "min": min((point["min"] for point in points), default=0),
+                "max": max((point["max"] for point in points), default=0),
+                "avg": total / count if count else 0
+            }
+        }
+
+    def _query_raw(self, metric_id: str, metric: Optional[int], start: float, end: float) -> List[Dict[str, Any]]:
+        samples: List[Tuple[float, float]] = []
+        if metric is not None:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT timestamps, samples FROM raw_segments WHERE metric = ? AND end >= ? AND start < ?",
+                    (metric, start, end)
+                ).fetchall()
+                unwritten = list(self._unwritten_segments.get(metric_id, ()))
+            for timestamp_blob, value_blob in rows:
+                timestamps, values = array("d"), array("d")
+                timestamps.frombytes(timestamp_blob)
+                values.frombytes(value_blob)
+                samples.extend(pair for pair in zip(timestamps, values) if start <= pair[0] < end)
+            for timestamps, values in unwritten:
+                samples.extend(pair for pair in zip(timestamps, values) if start <= pair[0] < end)
+        buffer = self._buffers.get(metric_id)
+        if buffer is not None:
+            samples.extend(pair for pair in zip(*buffer) if start <= pair[0] < end)
+        samples.sort()
+        return [{"timestamp": t, "value": v, "min": v, "max": v, "count": 1} for t, v in samples]
+
+    def _query_rollup(self, metric_id: str, metric: Optional[int], resolution: int,
+                      start: float, end: float) -> List[Dict[str, Any]]:
+        first = int(start // resolution) * resolution
+        buckets: Dict[int, List[float]] = {}
+
+        def merge(bucket, count, total, low, high):
+            current = buckets.get(bucket)
+            if current is None:
+                buckets[bucket] = [count, total, low, high]
+            else:
+                current[0] += count
+                current[1] += total
+                current[2] = min(current[2], low)
+                current[3] = max(current[3], high)
+
+        if metric is not None:
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT bucket, count, sum, min, max FROM rollup_{resolution} "
+                    f"WHERE metric = ? AND bucket >= ? AND bucket < ? ORDER BY bucket",
+                    (metric, first, end)
+                ).fetchall()
+                unwritten = [row for pending in self._unwritten_rollups[resolution] for row in pending
+                             if row[0] == metric and first <= row[1] < end]
+            for row in rows:
+                merge(*row)
+            for row in unwritten:
+                merge(*row[1:])
+            for row in self._pending_rollups[resolution]:
+                if row[0] == metric and first <= row[1] < end:
+                    merge(*row[1:])
+        current = self._open.get(metric_id, {}).get(resolution)
+        if current is not None and first <= current[0] < end:
+            merge(*current)
+
+        return [
+            {"timestamp": bucket, "value": total / count, "min": low, "max": high, "count": count}
+            for bucket, (count, total, low, high) in sorted(buckets.items())
+        ]
+
+    @staticmethod
+    def _downsample(points: List[Dict[str, Any]], start: float, bucket_seconds: float) -> List[Dict[str, Any]]:
+        """Merge sorted points into buckets of ``bucket_seconds`` from ``start``, count-weighted"""
+        buckets: List[List[float]] = []  # [bucket, count, sum, min, max]
+        for point in points:
+            bucket = int((point["timestamp"] - start) // bucket_seconds)
+            if not buckets or buckets[-1][0] != bucket:
+                buckets.append([bucket, 0, 0.0, point["min"], point["max"]])
+            current = buckets[-1]
+            current[1] += point["count"]
+            current[2] += point["value"] * point["count"]
+            if point["min"] < current[3]:
+                current[3] = point["min"]
+            if point["max"] > current[4]:
+                current[4] = point["max"]
+        return [
+            {"timestamp": start + bucket * bucket_seconds, "value": total / count, "min": low, "max": high, "count": count}
+            for bucket, count, total, low, high in buckets
+        ]
+
+    def disk_usage(self) -> Dict[str, int]:
+        """Bytes used by the database file, and how many of them are free pages"""
+
+        with self._lock:
+            page_size = self._db.execute("PRAGMA page_size").fetchone()[0]
+            page_count = self._db.execute("PRAGMA page_count").fetchone()[0]
+            free_pages = self._db.execute("PRAGMA freelist_count").fetchone()[0]
+        return {"file_bytes": page_size * page_count, "free_bytes": page_size * free_pages}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "path": self.path,
+            "metrics": len(self._ids),
+            "buffered_samples": sum(len(buffer[0]) for buffer in self._buffers.values()),
+            "queued_writes": self._queue.qsize(),
+            "retention_seconds": self.retention
+        }
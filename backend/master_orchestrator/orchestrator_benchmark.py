@@ -0,0 +1,873 @@
+"""
+Master Orchestrator Benchmarks
+
+Run from the backend directory:
+
+    python -m master_orchestrator.orchestrator_benchmark scheduler --tasks 20000 --rate 5000
+    python -m master_orchestrator.orchestrator_benchmark modes [--baseline-ref <git ref>]
+    python -m master_orchestrator.orchestrator_benchmark history --hours 24 --rate 5 --spill
+    python -m master_orchestrator.orchestrator_benchmark aggregation --metrics 500 --rate 100000
+    python -m master_orchestrator.orchestrator_benchmark anomaly --metrics 1000 5000 20000
+    python -m master_orchestrator.orchestrator_benchmark metric-store --metrics 200 --days 30
+    python -m master_orchestrator.orchestrator_benchmark broadcast --agents 1000 [--baseline-ref <git ref>]
+    python -m master_orchestrator.orchestrator_benchmark messages --queued 100000 [--baseline-ref <git ref>]
+
+``scheduler`` offers tasks at a fixed rate to the deadline scheduler and to
+the previous one-task-per-second polling loop, and reports sustained
+dispatch rate and queueing delay for both.
+
+``modes`` measures the dispatch overhead of each execution mode with
+department work that does nothing but yield, and the wall time of a burst
+of PARALLEL tasks, for the current MasterOrchestrator and for
+master_orchestrator.py as it was at a git ref (default: where the branch
+forked from main, or HEAD~1 on main).
+
+``history`` feeds a simulated day of finished tasks into TaskHistory and
+reports traced memory and the cost of a KPI read every simulated hour,
+next to the unbounded list of tasks it replaced.
+
+``aggregation`` streams samples for many metrics into the dashboard's
+multi-window aggregator at a simulated sample rate and reports ingest
+rate and read cost, next to the per-sample rescan it replaced.
+
+``anomaly`` times one batch evaluation cycle of the anomaly detection
+engine for several metric counts, next to the per-sample check it
+replaced.
+
+``metric-store`` writes a simulated month of samples into the metric
+store and reports ingest rate, disk footprint after retention and range
+query latency at the resolution each range is read from.
+
+``broadcast`` sends broadcasts to many registered agents through the
+CommunicationProtocol and reports how long the sender is held and how long
+until every handler has run, then repeats one broadcast with failing
+handlers; for the current protocol and for communication_protocol.py at a
+git ref (default: as for ``modes``).
+
+``messages`` queues many normal-priority messages at once, sends one
+CRITICAL message to a recipient whose handler is still working through its
+share of them and reports how long until the CRITICAL message is handled,
+then the CPU time of a maintenance cycle once some of the queued messages
+have expired; for the current and the baseline protocol as above.
+
+Results are printed as JSON.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import statistics
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from . import communication_protocol
+from . import master_orchestrator as current
+from .master_orchestrator import DepartmentType, PRIORITY_RANK, SystemPriority
+from .anomaly_detection import AnomalyDetectionEngine, EwmaDetector, SeasonalDetector, ZScoreDetector
+from .metric_aggregation import StreamingAggregator
+from .metric_store import MetricStore
+from .task_history import TaskHistory
+from .task_scheduler import DeadlineTaskScheduler, AdmissionError
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile (0 for no samples)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))]
+
+def delay_summary(delays: List[float]) -> Dict[str, float]:
+    return {
+        "queue_delay_p50_ms": percentile(delays, 50) * 1000,
+        "queue_delay_p95_ms": percentile(delays, 95) * 1000,
+        "queue_delay_p99_ms": percentile(delays, 99) * 1000,
+        "queue_delay_max_ms": max(delays) * 1000 if delays else 0.0
+    }
+
+def synthetic_tasks(count: int, seed: int) -> List[Dict[str, Any]]:
+    """Tasks with a realistic priority mix touching one or two departments"""
+    rng = random.Random(seed)
+    priorities = [SystemPriority.CRITICAL, SystemPriority.URGENT, SystemPriority.HIGH,
+                  SystemPriority.MEDIUM, SystemPriority.LOW]
+    departments = list(DepartmentType)
+    return [
+        {
+            "id": i,
+            "priority": rng.choices(priorities, weights=[1, 4, 15, 60, 20])[0],
+            "departments": rng.sample(departments, rng.choice([1, 1, 2]))
+        }
+        for i in range(count)
+    ]
+
+async def offer(tasks: List[Dict[str, Any]], rate: float, submit) -> float:
+    """Call ``submit`` for each task at ``rate`` tasks/s; returns the offer duration"""
+    start = time.perf_counter()
+    for i, task in enumerate(tasks):
+        delay = start + i / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task["offered_at"] = time.perf_counter()
+        submit(task)
+    return time.perf_counter() - start
+
+async def bench_deadline_scheduler(tasks: List[Dict[str, Any]], rate: float, service_time: float,
+                                   max_concurrent: int, department_limit: int) -> Dict[str, Any]:
+    done = asyncio.Event()
+    delays: List[float] = []
+    finished = 0
+
+    async def executor(task):
+        nonlocal finished
+        delays.append(time.perf_counter() - task["offered_at"])
+        await asyncio.sleep(service_time)
+        finished += 1
+        if finished == len(tasks):
+            done.set()
+
+    scheduler = DeadlineTaskScheduler(
+        executor,
+        max_concurrent=max_concurrent,
+        department_limits={dept: department_limit for dept in DepartmentType},
+        max_queue_size=len(tasks)
+    )
+    runner = asyncio.create_task(scheduler.run())
+
+    def submit(task):
+        try:
+            scheduler.submit(task, priority=PRIORITY_RANK[task["priority"]], departments=task["departments"])
+        except AdmissionError:
+            pass
+
+    start = time.perf_counter()
+    offered_for = await offer(tasks, rate, submit)
+    await asyncio.wait_for(done.wait(), timeout=600)
+    elapsed = time.perf_counter() - start
+
+    await scheduler.stop()
+    await runner
+    return {
+        "dispatched": len(delays),
+        "offer_seconds": offered_for,
+        "dispatch_per_second": len(delays) / elapsed,
+        **delay_summary(delays)
+    }
+
+async def bench_polling_loop(tasks: List[Dict[str, Any]], rate: float, service_time: float,
+                             max_concurrent: int, duration: float) -> Dict[str, Any]:
+    """The previous loop: pop one task per second from a deque"""
+    queue: deque = deque()
+    delays: List[float] = []
+    active = 0
+
+    async def execute(task):
+        nonlocal active
+        active += 1
+        try:
+            await asyncio.sleep(service_time)
+        finally:
+            active -= 1
+
+    async def loop():
+        while True:
+            if queue and active < max_concurrent:
+                task = queue.popleft()
+                delays.append(time.perf_counter() - task["offered_at"])
+                asyncio.create_task(execute(task))
+            await asyncio.sleep(1)
+
+    poller = asyncio.create_task(loop())
+    offered = tasks[:max(1, int(rate * duration))]
+    producer = asyncio.create_task(offer(offered, rate, queue.append))
+    await asyncio.sleep(duration)
+    poller.cancel()
+    producer.cancel()
+    return {
+        "offered": len(offered),
+        "dispatched": len(delays),
+        "dispatch_per_second": len(delays) / duration,
+        "still_queued": len(queue),
+        **delay_summary(delays)
+    }
+
+async def run_scheduler_benchmark(args) -> Dict[str, Any]:
+    tasks = synthetic_tasks(args.tasks, args.seed)
+    return {
+        "tasks": args.tasks,
+        "offered_rate": args.rate,
+        "service_time_s": args.service_time,
+        "max_concurrent": args.max_concurrent,
+        "department_limit": args.department_limit,
+        "deadline_scheduler": await bench_deadline_scheduler(
+            tasks, args.rate, args.service_time, args.max_concurrent, args.department_limit
+        ),
+        "polling_loop": await bench_polling_loop(
+            synthetic_tasks(args.tasks, args.seed), args.rate, args.service_time,
+            args.max_concurrent, args.polling_duration
+        )
+    }
+
+def load_baseline(ref: str, filename: str = "master_orchestrator.py"):
+    """Import ``filename`` from this package as it was at git ``ref``, or None if git can't provide it"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        top = subprocess.run(["git", "rev-parse", "--show-toplevel"], cwd=here,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        path = os.path.relpath(os.path.join(here, filename), top)
+        source = subprocess.run(["git", "show", f"{ref}:{path}"], cwd=here,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    name = "master_orchestrator._baseline"
+    if filename != "master_orchestrator.py":
+        name += "_" + os.path.splitext(filename)[0]
+    spec = importlib.util.spec_from_loader(name, loader=None)
+    module = importlib.util.module_from_spec(spec)
+    module.__package__ = "master_orchestrator"
+    sys.modules[spec.name] = module
+    exec(compile(source, f"{ref}:{path}", "exec"), module.__dict__)
+    return module
+
+BASELINE_REF_HELP = ("git ref of the baseline (default: the merge-base with origin/main or main "
+                     "when HEAD is on another branch, otherwise HEAD~1)")
+
+def default_baseline_ref() -> str:
+    """The commit this branch forked from, or the previous commit when HEAD is already on main"""
+    def git(*command):
+        return subprocess.run(["git", *command], capture_output=True, text=True, check=True).stdout.strip()
+
+    try:
+        head = git("rev-parse", "HEAD")
+    except (OSError, subprocess.CalledProcessError):
+        return "HEAD~1"
+    for main in ("origin/main", "main"):
+        try:
+            fork_point = git("merge-base", "HEAD", main)
+        except subprocess.CalledProcessError:
+            continue
+        if fork_point != head:
+            return fork_point
+        break
+    return "HEAD~1"
+
+def make_orchestrator(module, work_seconds: float):
+    """A MasterOrchestrator from ``module`` whose department work only sleeps ``work_seconds``"""
+
+    async def department_work(self, department, task_data, parent_task_id):
+        await asyncio.sleep(work_seconds)
+        return {"status": "completed"}
+
+    class BenchOrchestrator(module.MasterOrchestrator):
+        _execute_department_task = department_work
+
+    return BenchOrchestrator()
+
+async def time_mode(module, mode_name: str, repeat: int, max_seconds: float) -> Dict[str, Any]:
+    """Mean time to run one four-department task in a mode, tasks run one after another"""
+    orchestrator = make_orchestrator(module, 0)
+    mode = module.ExecutionMode(mode_name)
+    departments = list(module.DepartmentType)
+
+    def make_task():
+        return module.CrossDepartmentTask(name="bench", required_departments=departments,
+                                          execution_mode=mode, retry_on_failure=False)
+
+    await orchestrator.execute_cross_department_task(make_task())  # warm up
+
+    runs = 0
+    start = time.perf_counter()
+    while runs < repeat and time.perf_counter() - start < max_seconds:
+        result = await orchestrator.execute_cross_department_task(make_task())
+        if not result["success"]:
+            raise RuntimeError(f"{mode_name} task failed: {result.get('error')}")
+        runs += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "tasks": runs,
+        "per_task_us": elapsed / runs * 1e6,
+        "per_department_us": elapsed / runs / len(departments) * 1e6
+    }
+
+async def time_burst(module, tasks: int, work_seconds: float) -> Dict[str, Any]:
+    """Wall time for ``tasks`` concurrent PARALLEL tasks over all departments"""
+    orchestrator = make_orchestrator(module, work_seconds)
+    departments = list(module.DepartmentType)
+    batch = [
+        module.CrossDepartmentTask(name=f"burst-{i}", required_departments=departments,
+                                   execution_mode=module.ExecutionMode.PARALLEL, retry_on_failure=False)
+        for i in range(tasks)
+    ]
+    start = time.perf_counter()
+    results = await asyncio.gather(*(orchestrator.execute_cross_department_task(task) for task in batch))
+    elapsed = time.perf_counter() - start
+    return {
+        "tasks": tasks,
+        "department_work_s": work_seconds,
+        "succeeded": sum(1 for result in results if result["success"]),
+        "wall_seconds": elapsed,
+        "department_runs_per_second": tasks * len(departments) / elapsed
+    }
+
+async def run_modes_benchmark(args) -> Dict[str, Any]:
+    ref = args.baseline_ref or default_baseline_ref()
+    implementations = {"current": current}
+    baseline = load_baseline(ref)
+    if baseline is not None:
+        implementations["baseline"] = baseline
+
+    results: Dict[str, Any] = {"baseline_ref": ref if baseline is not None else None}
+    for name, module in implementations.items():
+        results[name] = {
+            "modes": {
+                mode.value: await time_mode(module, mode.value, args.repeat, args.max_seconds)
+                for mode in current.ExecutionMode
+            },
+            "parallel_burst": await time_burst(module, args.burst_tasks, args.burst_work)
+        }
+    if baseline is not None:
+        # EMERGENCY used to return before the department work ran, so its time is not comparable
+        results["note"] = "baseline EMERGENCY returns without waiting for department work"
+    return results
+
+def finished_task(rng: random.Random, completed_at: datetime) -> "current.CrossDepartmentTask":
+    departments = list(DepartmentType)
+    duration = rng.expovariate(1 / 2.0)
+    failed = rng.random() < 0.05
+    return current.CrossDepartmentTask(
+        name="soak",
+        required_departments=rng.sample(departments, rng.choice([1, 1, 2, 4])),
+        execution_mode=rng.choice(list(current.ExecutionMode)),
+        status="failed" if failed else "completed",
+        started_at=completed_at - timedelta(seconds=duration),
+        completed_at=completed_at,
+        errors=["department error"] if failed else []
+    )
+
+def time_read(read, reads: int = 200) -> float:
+    """Mean microseconds per call of ``read``"""
+    start = time.perf_counter()
+    for _ in range(reads):
+        read()
+    return (time.perf_counter() - start) / reads * 1e6
+
+def list_kpis(tasks: List[Any]) -> Dict[str, float]:
+    """What a KPI read over the old completed_tasks list costs"""
+    succeeded = sum(1 for task in tasks if task.status == "completed")
+    durations = [(task.completed_at - task.started_at).total_seconds() for task in tasks]
+    return {
+        "success_rate": succeeded / len(tasks) * 100 if tasks else 0.0,
+        "average_seconds": sum(durations) / len(durations) if durations else 0.0
+    }
+
+async def run_history_benchmark(args) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    per_hour = int(args.rate * 3600)
+    spill_dir = tempfile.TemporaryDirectory() if args.spill else None
+    history = TaskHistory(
+        capacity=args.capacity,
+        spill_path=os.path.join(spill_dir.name, "history.db") if spill_dir else None,
+        retention_seconds=None
+    )
+    clock = datetime.utcnow() - timedelta(hours=args.hours)
+
+    # The old unbounded list, for the first simulated hour only
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tasks = []
+    for i in range(per_hour):
+        tasks.append(finished_task(rng, clock + timedelta(seconds=i / args.rate)))
+    list_bytes = tracemalloc.get_traced_memory()[0] - before
+    list_read_us = time_read(lambda: list_kpis(tasks), reads=5)
+    del tasks
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    baseline_memory = tracemalloc.get_traced_memory()[0]
+    hourly = []
+    started = time.perf_counter()
+    for hour in range(args.hours):
+        for i in range(per_hour):
+            history.record(finished_task(rng, clock + timedelta(hours=hour, seconds=i / args.rate)))
+        hourly.append({
+            "hour": hour + 1,
+            "tasks": history.overall.count,
+            "retained": len(history),
+            "traced_mb": (tracemalloc.get_traced_memory()[0] - baseline_memory) / 1e6,
+            "kpi_read_us": time_read(history.summary)
+        })
+    elapsed = time.perf_counter() - started
+    tracemalloc.stop()
+
+    query_us = time_read(lambda: history.query(department="growth", status="failed", limit=50), reads=20)
+    history.close()
+    if spill_dir:
+        spill_dir.cleanup()
+
+    return {
+        "hours": args.hours,
+        "tasks_per_second": args.rate,
+        "capacity": args.capacity,
+        "spill": args.spill,
+        "record_us": elapsed / max(1, history.overall.count) * 1e6,
+        "query_us": query_us,
+        "hourly": hourly,
+        "unbounded_list": {
+            "mb_per_hour": list_bytes / 1e6,
+            "projected_mb": list_bytes * args.hours / 1e6,
+            "kpi_read_us_after_1h": list_read_us,
+            "projected_kpi_read_us": list_read_us * args.hours
+        }
+    }
+
+def rescan_aggregates(history: deque, windows: List[int], now: float) -> Dict[int, Dict[str, float]]:
+    """The previous per-sample update: rescan the retained history for every window"""
+    aggregates = {}
+    for window in windows:
+        cutoff = now - window
+        values = [value for timestamp, value in history if timestamp >= cutoff]
+        if values:
+            aggregates[window] = {
+                "min": min(values),
+                "max": max(values),
+                "avg": statistics.mean(values),
+                "median": statistics.median(values),
+                "stddev": statistics.stdev(values) if len(values) > 1 else 0,
+                "count": len(values)
+            }
+    return aggregates
+
+async def run_aggregation_benchmark(args) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    metric_ids = [f"metric_{i}" for i in range(args.metrics)]
+    levels = [rng.uniform(1, 1000) for _ in metric_ids]
+    start_time = time.time() - args.samples / args.rate
+
+    samples = []
+    for i in range(args.samples):
+        m = rng.randrange(args.metrics)
+        samples.append((metric_ids[m], rng.gauss(levels[m], levels[m] * 0.1), start_time + i / args.rate))
+
+    aggregator = StreamingAggregator()
+    started = time.perf_counter()
+    for metric_id, value, timestamp in samples:
+        aggregator.add(metric_id, value, timestamp)
+    ingest_seconds = time.perf_counter() - started
+
+    now = samples[-1][2]
+    reads = min(args.metrics, 200)
+    started = time.perf_counter()
+    for metric_id in metric_ids[:reads]:
+        aggregator.snapshot(metric_id, now)
+    snapshot_us = (time.perf_counter() - started) / reads * 1e6
+
+    # The old path with each metric's 1000-sample history already full
+    windows = aggregator.windows
+    history = deque(((now - (1000 - i) * 0.1, rng.gauss(100, 10)) for i in range(1000)), maxlen=1000)
+    rescans = 200
+    started = time.perf_counter()
+    for i in range(rescans):
+        history.append((now + i * 0.1, rng.gauss(100, 10)))
+        rescan_aggregates(history, windows, now + i * 0.1)
+    rescan_us = (time.perf_counter() - started) / rescans * 1e6
+
+    return {
+        "metrics": args.metrics,
+        "samples": args.samples,
+        "simulated_rate": args.rate,
+        "streaming": {
+            "ingest_per_second": args.samples / ingest_seconds,
+            "ingest_us": ingest_seconds / args.samples * 1e6,
+            "snapshot_us": snapshot_us
+        },
+        "rescan": {
+            "ingest_per_second": 1e6 / rescan_us,
+            "ingest_us": rescan_us
+        }
+    }
+
+def per_sample_anomaly_check(history: deque, value: float) -> bool:
+    """The previous check, run for every recorded sample"""
+    recent_values = list(history)[-20:]
+    mean = statistics.mean(recent_values)
+    stddev = statistics.stdev(recent_values)
+    if abs(value - mean) > 3 * stddev:
+        return True
+    return abs(value - recent_values[-2]) > 5 * stddev
+
+async def run_anomaly_benchmark(args) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    results = []
+    for metrics in args.metrics:
+        engine = AnomalyDetectionEngine(detectors=[ZScoreDetector(), EwmaDetector(), SeasonalDetector()])
+        metric_ids = [f"metric_{i}" for i in range(metrics)]
+        clock = time.time() - 3600
+
+        # Warm every metric up past the detectors' minimum sample counts
+        for step in range(30):
+            for metric_id in metric_ids:
+                engine.observe(metric_id, rng.gauss(100, 10), clock + step)
+        engine.evaluate(clock + 30)
+
+        observe_seconds = 0.0
+        cycle_seconds = []
+        for cycle in range(args.cycles):
+            now = clock + 30 + (cycle + 1) * 10
+            samples = [(metric_id, rng.gauss(100, 10) if rng.random() > 0.001 else 1000.0)
+                       for metric_id in metric_ids for _ in range(args.samples_per_cycle)]
+            started = time.perf_counter()
+            for metric_id, value in samples:
+                engine.observe(metric_id, value, now)
+            observe_seconds += time.perf_counter() - started
+
+            started = time.perf_counter()
+            engine.evaluate(now)
+            cycle_seconds.append(time.perf_counter() - started)
+
+        observed = metrics * args.samples_per_cycle * args.cycles
+        results.append({
+            "metrics": metrics,
+            "evaluation_ms_p50": percentile(cycle_seconds, 50) * 1000,
+            "evaluation_ms_max": max(cycle_seconds) * 1000,
+            "observe_us": observe_seconds / observed * 1e6,
+            "anomalies": engine.detected,
+            "suppressed": engine.suppressed
+        })
+
+    history = deque((rng.gauss(100, 10) for _ in range(1000)), maxlen=1000)
+    checks = 2000
+    started = time.perf_counter()
+    for _ in range(checks):
+        value = rng.gauss(100, 10)
+        history.append(value)
+        per_sample_anomaly_check(history, value)
+    per_sample_us = (time.perf_counter() - started) / checks * 1e6
+
+    return {
+        "samples_per_metric_per_cycle": args.samples_per_cycle,
+        "batch": results,
+        "per_sample_check_us": per_sample_us,
+        "per_sample_cycle_ms": {
+            metrics: per_sample_us * metrics * args.samples_per_cycle / 1000 for metrics in args.metrics
+        }
+    }
+
+async def run_metric_store_benchmark(args) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    metric_ids = [f"metric_{i}" for i in range(args.metrics)]
+    end = time.time()
+    start = end - args.days * 86400
+    steps = int(args.days * 86400 / args.interval)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "metrics.db")
+        store = MetricStore(path, retention_interval=float("inf"))
+
+        started = time.perf_counter()
+        for step in range(steps):
+            timestamp = start + step * args.interval
+            for metric_id in metric_ids:
+                store.append(metric_id, rng.gauss(100, 10), timestamp)
+        store.flush()
+        ingest_seconds = time.perf_counter() - started
+
+        before = os.path.getsize(path)
+        deleted = store.apply_retention(end)
+        store._db.execute("VACUUM")
+        store._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        after = os.path.getsize(path)
+
+        queries = {}
+        for label, hours in (("1h", 1), ("6h", 6), ("1d", 24), ("7d", 168), ("30d", 720)):
+            latencies = []
+            for metric_id in rng.sample(metric_ids, min(20, len(metric_ids))):
+                query_started = time.perf_counter()
+                result = store.query(metric_id, end - hours * 3600, end)
+                latencies.append(time.perf_counter() - query_started)
+            queries[label] = {
+                "resolution": result["resolution"],
+                "points": len(result["points"]),
+                "latency_ms_p50": percentile(latencies, 50) * 1000,
+                "latency_ms_max": max(latencies) * 1000
+            }
+        store.close()
+
+    samples = steps * args.metrics
+    return {
+        "metrics": args.metrics,
+        "days": args.days,
+        "interval_s": args.interval,
+        "samples": samples,
+        "ingest_per_second": samples / ingest_seconds,
+        "retention_deleted": deleted,
+        "disk_mb_before_retention": before / 1e6,
+        "disk_mb": after / 1e6,
+        "disk_bytes_per_metric_day": after / args.metrics / args.days,
+        "queries": queries
+    }
+
+async def time_broadcast(module, agents: int, rounds: int, failing: int, work_seconds: float) -> Dict[str, Any]:
+    """Sender-side and until-last-handler latency of broadcasts to ``agents`` agents"""
+    protocol = module.CommunicationProtocol()
+    agent_ids = [f"agent_{i}" for i in range(agents)]
+    for i, agent_id in enumerate(agent_ids):
+        await protocol.register_agent(agent_id, ["frontend", "backend", "rnd", "growth"][i % 4], [])
+
+    latencies: List[float] = []
+    remaining = 0
+    all_handled = asyncio.Event()
+    sent_at = 0.0
+
+    async def handler(message):
+        nonlocal remaining
+        latencies.append(time.perf_counter() - sent_at)
+        await asyncio.sleep(work_seconds)
+        remaining -= 1
+        if remaining == 0:
+            all_handled.set()
+
+    async def failing_handler(message):
+        raise RuntimeError("handler failure")
+
+    def broadcast():
+        return module.AgentMessage(sender_id="bench", sender_department="system",
+                                   message_type=module.MessageType.BROADCAST, subject="bench")
+
+    for agent_id in agent_ids:
+        protocol.event_handlers[agent_id] = handler
+
+    async def run_round(healthy: int) -> Dict[str, float]:
+        nonlocal remaining, sent_at
+        remaining = healthy
+        all_handled.clear()
+        sent_at = time.perf_counter()
+        await protocol.send_message(broadcast())
+        returned = time.perf_counter() - sent_at
+        await asyncio.wait_for(all_handled.wait(), timeout=600)
+        return {"send_returned": returned, "all_handled": time.perf_counter() - sent_at}
+
+    await run_round(agents)  # warm up
+    rounds_timed = []
+    for _ in range(rounds):
+        latencies.clear()
+        rounds_timed.append(await run_round(agents))
+    last_round = list(latencies)
+
+    for agent_id in agent_ids[:failing]:
+        protocol.event_handlers[agent_id] = failing_handler
+    with_failures = await run_round(agents - failing)
+
+    if hasattr(protocol, "delivery"):
+        await protocol.delivery.close()
+
+    sends = [r["send_returned"] for r in rounds_timed]
+    handled = [r["all_handled"] for r in rounds_timed]
+    return {
+        "send_returned_ms_p50": percentile(sends, 50) * 1000,
+        "send_returned_ms_max": max(sends) * 1000,
+        "all_handled_ms_p50": percentile(handled, 50) * 1000,
+        "all_handled_ms_max": max(handled) * 1000,
+        "handler_latency_ms_p50": percentile(last_round, 50) * 1000,
+        "handler_latency_ms_p99": percentile(last_round, 99) * 1000,
+        f"with_{failing}_failing_handlers": {
+            "send_returned_ms": with_failures["send_returned"] * 1000,
+            "all_healthy_handled_ms": with_failures["all_handled"] * 1000
+        }
+    }
+
+async def run_broadcast_benchmark(args) -> Dict[str, Any]:
+    ref = args.baseline_ref or default_baseline_ref()
+    implementations = {"current": communication_protocol}
+    baseline = load_baseline(ref, "communication_protocol.py")
+    if baseline is not None:
+        implementations["baseline"] = baseline
+
+    logging.getLogger(communication_protocol.__name__).setLevel(logging.CRITICAL)
+    logging.getLogger(f"{communication_protocol.__package__}.delivery_engine").setLevel(logging.CRITICAL)
+    results: Dict[str, Any] = {"agents": args.agents, "rounds": args.rounds, "handler_work_s": args.handler_work,
+                               "baseline_ref": ref if baseline is not None else None}
+    for name, module in implementations.items():
+        if module is baseline:
+            logging.getLogger(module.__name__).setLevel(logging.CRITICAL)
+        results[name] = await time_broadcast(module, args.agents, args.rounds, args.failing, args.handler_work)
+    return results
+
+async def time_queued_messages(module, agents: int, queued: int, expiring: float,
+                               seed: int, busy_handler_work: float = 0.001) -> Dict[str, Any]:
+    """Latency of a CRITICAL message to a recipient with a backlog, and maintenance cost with ``queued`` messages outstanding"""
+    rng = random.Random(seed)
+    protocol = module.CommunicationProtocol()
+    agent_ids = [f"agent_{i}" for i in range(agents)]
+    for i, agent_id in enumerate(agent_ids):
+        await protocol.register_agent(agent_id, ["frontend", "backend", "rnd", "growth"][i % 4], [])
+
+    # One recipient works through its messages slowly, so they pile up in front of it
+    busy = agent_ids[0]
+    handled = asyncio.Event()
+    handled_at = 0.0
+
+    async def busy_handler(message):
+        nonlocal handled_at
+        if message.subject == "urgent":
+            handled_at = time.perf_counter()
+            handled.set()
+        else:
+            await asyncio.sleep(busy_handler_work)
+
+    protocol.event_handlers[busy] = busy_handler
+
+    soon = datetime.utcnow() + timedelta(seconds=1)
+    started = time.perf_counter()
+    for i in range(queued):
+        await protocol.send_message(module.AgentMessage(
+            sender_id="bench", subject=f"bulk-{i}", recipient_id=agent_ids[i % agents],
+            priority=module.MessagePriority.NORMAL,
+            expiry=soon if rng.random() < expiring else None
+        ))
+    queue_seconds = time.perf_counter() - started
+
+    # Let the scheduler hand the bulk to the mailboxes before the urgent message is sent
+    drain_started = time.perf_counter()
+    scheduler = getattr(protocol, "scheduler", None)
+    while scheduler is not None and len(scheduler):
+        await asyncio.sleep(0.001)
+    drain_seconds = time.perf_counter() - drain_started
+    delivery = getattr(protocol, "delivery", None)
+    backlog = delivery.backlog(busy) if delivery is not None else None
+
+    sent_at = time.perf_counter()
+    await protocol.send_message(module.AgentMessage(
+        sender_id="bench", subject="urgent", recipient_id=busy, priority=module.MessagePriority.CRITICAL
+    ))
+    send_returned = time.perf_counter() - sent_at
+    await asyncio.wait_for(handled.wait(), timeout=600)
+    urgent_latency = handled_at - sent_at
+    await asyncio.sleep(max(0.0, (soon - datetime.utcnow()).total_seconds()) + 0.05)
+
+    async def maintenance() -> float:
+        cycle_started = time.process_time()
+        await protocol.check_agent_health()
+        await protocol.cleanup_expired_messages()
+        if hasattr(protocol, "_process_priority_queue"):
+            await protocol._process_priority_queue()
+        return time.process_time() - cycle_started
+
+    first_cycle = await maintenance()
+    steady = [await maintenance() for _ in range(5)]
+
+    if hasattr(protocol, "delivery"):
+        await protocol.delivery.close()
+
+    return {
+        "queue_seconds": queue_seconds,
+        "busy_recipient_backlog": backlog,
+        "urgent_send_returned_ms": send_returned * 1000,
+        "urgent_handled_ms": urgent_latency * 1000,
+        "backlog_drain_estimate_ms": backlog * busy_handler_work * 1000 if backlog is not None else None,
+        "bulk_drain_seconds": drain_seconds,
+        "maintenance_cpu_ms_with_expiries": first_cycle * 1000,
+        "maintenance_cpu_ms_steady": percentile(steady, 50) * 1000,
+        "pending_after_cleanup": len(protocol.pending_messages)
+    }
+
+async def run_messages_benchmark(args) -> Dict[str, Any]:
+    ref = args.baseline_ref or default_baseline_ref()
+    implementations = {"current": communication_protocol}
+    baseline = load_baseline(ref, "communication_protocol.py")
+    if baseline is not None:
+        implementations["baseline"] = baseline
+
+    logging.getLogger(communication_protocol.__name__).setLevel(logging.CRITICAL)
+    results: Dict[str, Any] = {"agents": args.agents, "queued": args.queued, "expiring": args.expiring,
+                               "baseline_ref": ref if baseline is not None else None}
+    for name, module in implementations.items():
+        if module is baseline:
+            logging.getLogger(module.__name__).setLevel(logging.CRITICAL)
+        results[name] = await time_queued_messages(module, args.agents, args.queued, args.expiring, args.seed)
+    if baseline is not None:
+        results["note"] = "baseline routes on the sender's call; its priority queues are only drained by maintenance"
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Master Orchestrator benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scheduler = commands.add_parser("scheduler", help="task dispatch rate and queueing delay")
+    scheduler.add_argument("--tasks", type=int, default=20000)
+    scheduler.add_argument("--rate", type=float, default=5000.0, help="offered tasks per second")
+    scheduler.add_argument("--service-time", type=float, default=0.005, help="seconds each task runs")
+    scheduler.add_argument("--max-concurrent", type=int, default=50)
+    scheduler.add_argument("--department-limit", type=int, default=20)
+    scheduler.add_argument("--polling-duration", type=float, default=5.0, help="seconds to run the old loop")
+    scheduler.add_argument("--seed", type=int, default=7)
+    scheduler.set_defaults(run=run_scheduler_benchmark)
+
+    modes = commands.add_parser("modes", help="dispatch overhead per execution mode")
+    modes.add_argument("--repeat", type=int, default=2000, help="tasks per mode")
+    modes.add_argument("--max-seconds", type=float, default=5.0, help="time limit per mode")
+    modes.add_argument("--burst-tasks", type=int, default=200)
+    modes.add_argument("--burst-work", type=float, default=0.01, help="seconds of department work in the burst")
+    modes.add_argument("--baseline-ref", default=None, help=BASELINE_REF_HELP)
+    modes.set_defaults(run=run_modes_benchmark)
+
+    history = commands.add_parser("history", help="task history memory and KPI read cost over a simulated day")
+    history.add_argument("--hours", type=int, default=24)
+    history.add_argument("--rate", type=float, default=5.0, help="finished tasks per simulated second")
+    history.add_argument("--capacity", type=int, default=1000)
+    history.add_argument("--spill", action="store_true", help="spill older records to a temporary sqlite file")
+    history.add_argument("--seed", type=int, default=7)
+    history.set_defaults(run=run_history_benchmark)
+
+    aggregation = commands.add_parser("aggregation", help="monitoring aggregate ingest rate and read cost")
+    aggregation.add_argument("--metrics", type=int, default=500)
+    aggregation.add_argument("--samples", type=int, default=1_000_000)
+    aggregation.add_argument("--rate", type=float, default=100_000.0, help="simulated samples per second")
+    aggregation.add_argument("--seed", type=int, default=7)
+    aggregation.set_defaults(run=run_aggregation_benchmark)
+
+    anomaly = commands.add_parser("anomaly", help="anomaly detection cost per evaluation cycle")
+    anomaly.add_argument("--metrics", type=int, nargs="+", default=[1000, 5000, 20000])
+    anomaly.add_argument("--samples-per-cycle", type=int, default=1, help="samples per metric between evaluations")
+    anomaly.add_argument("--cycles", type=int, default=20)
+    anomaly.add_argument("--seed", type=int, default=7)
+    anomaly.set_defaults(run=run_anomaly_benchmark)
+
+    store = commands.add_parser("metric-store", help="metric store ingest, disk footprint and query latency")
+    store.add_argument("--metrics", type=int, default=200)
+    store.add_argument("--days", type=float, default=30)
+    store.add_argument("--interval", type=float, default=60.0, help="seconds between samples of a metric")
+    store.add_argument("--seed", type=int, default=7)
+    store.set_defaults(run=run_metric_store_benchmark)
+
+    broadcast = commands.add_parser("broadcast", help="broadcast latency through the communication protocol")
+    broadcast.add_argument("--agents", type=int, default=1000)
+    broadcast.add_argument("--rounds", type=int, default=20)
+    broadcast.add_argument("--handler-work", type=float, default=0.0, help="seconds each handler awaits")
+    broadcast.add_argument("--failing", type=int, default=1, help="agents whose handler raises in the last round")
+    broadcast.add_argument("--baseline-ref", default=None, help=BASELINE_REF_HELP)
+    broadcast.set_defaults(run=run_broadcast_benchmark)
+
+    messages = commands.add_parser("messages", help="urgent-message latency and maintenance cost with many queued")
+    messages.add_argument("--agents", type=int, default=1000)
+    messages.add_argument("--queued", type=int, default=100_000)
+    messages.add_argument("--expiring", type=float, default=0.01, help="share of messages that expire after 1s")
+    messages.add_argument("--seed", type=int, default=7)
+    messages.add_argument("--baseline-ref", default=None, help=BASELINE_REF_HELP)
+    messages.set_defaults(run=run_messages_benchmark)
+
+    args = parser.parse_args()
+    results = asyncio.run(args.run(args))
+    print(json.dumps({"benchmark": args.command, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
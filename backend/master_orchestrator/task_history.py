@@ -0,0 +1,384 @@
+"""
+Task History - Bounded record of finished cross-department tasks
+
+The most recent tasks are kept in a fixed-size ring buffer of compact
+records. Counts, durations and success rates per department and per
+execution mode are updated as each task is recorded, so reading them does
+not depend on how many tasks have run. Records pushed out of the ring can
+optionally be spilled to a local sqlite file and queried from there; when
+an event loop is running, full batches are written in a worker thread.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class TaskRecord:
+    """What is kept of a finished task"""
+    task_id: str
+    name: str
+    status: str                        # completed or failed
+    priority: str
+    execution_mode: str
+    departments: Tuple[str, ...]
+    started_at: Optional[float]        # epoch seconds
+    completed_at: float                # epoch seconds
+    duration_seconds: float
+    error_count: int = 0
+    last_error: Optional[str] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.status == "completed"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "task_id": self.task_id,
+            "name": self.name,
+            "status": self.status,
+            "priority": self.priority,
+            "execution_mode": self.execution_mode,
+            "departments": list(self.departments),
+            "started_at": self.started_at,
+            "completed_at": self.completed_at,
+            "duration_seconds": self.duration_seconds,
+            "error_count": self.error_count,
+            "last_error": self.last_error
+        }
+
+class TaskStats:
+    """Running totals for a group of tasks"""
+
+    __slots__ = ("count", "succeeded", "failed", "total_seconds", "max_seconds", "last_completed_at")
+
+    def __init__(self):
+        self.count = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_completed_at: Optional[float] = None
+
+    def add(self, record: TaskRecord):
+        self.count += 1
+        if record.succeeded:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        self.total_seconds += record.duration_seconds
+        self.max_seconds = max(self.max_seconds, record.duration_seconds)
+        self.last_completed_at = record.completed_at
+
+    @property
+    def success_rate(self) -> float:
+        """Percentage of tasks that completed"""
+        return self.succeeded / self.count * 100 if self.count else 0.0
+
+    @property
+    def average_seconds(self) -> float:
+        return self.total_seconds / self.count if self.count else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "success_rate": self.success_rate,
+            "average_seconds": self.average_seconds,
+            "max_seconds": self.max_seconds,
+            "last_completed_at": self.last_completed_at
+        }
+
+def _epoch(value: Optional[datetime]) -> Optional[float]:
+    """Epoch seconds of a naive UTC datetime (the orchestrator uses utcnow)"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def _value(item: Any) -> str:
+    return str(getattr(item, "value", item))
+
+class TaskHistory:
+    """Ring buffer of recent TaskRecords plus incremental aggregates.
+
+    - ``capacity`` records are kept in memory; older ones are dropped, or
+      written to ``spill_path`` (sqlite) in batches of ``spill_batch_size``,
+      off the event loop when one is running.
+    - ``close`` / ``aclose`` write the last, partial batch; call one of them
+      on shutdown or those records are lost.
+    - Spilled records older than ``retention_seconds`` are deleted when a
+      batch is written (None keeps them all).
+    - ``summary`` reads the aggregates only; ``query`` searches the ring
+      and, when spilling, the sqlite file through its indexes.
+    """
+
+    def __init__(self,
+                 capacity: int = 1000,
+                 spill_path: Optional[str] = None,
+                 spill_batch_size: int = 256,
+                 retention_seconds: Optional[float] = 7 * 24 * 3600):
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self.spill_batch_size = spill_batch_size
+        self.retention_seconds = retention_seconds
+
+        self._recent: deque = deque(maxlen=capacity)
+        self._pending_spill: List[TaskRecord] = []
+        self._unwritten: List[List[TaskRecord]] = []    # batches handed to a writer thread
+        self._writes: set = set()                        # their asyncio tasks
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()  # batches are written off the event loop, queries run on it
+
+        # Aggregates since start
+        self.overall = TaskStats()
+        self.by_department: Dict[str, TaskStats] = defaultdict(TaskStats)
+        self.by_mode: Dict[str, TaskStats] = defaultdict(TaskStats)
+        self.spilled = 0
+
+        if spill_path:
+            self._open_spill(spill_path)
+
+    def __len__(self) -> int:
+        return len(self._recent)
+
+    def _open_spill(self, path: str):
+        try:
+            db = sqlite3.connect(path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS task_history (
+                    task_id TEXT NOT NULL,
+                    name TEXT,
+                    status TEXT NOT NULL,
+                    priority TEXT,
+                    execution_mode TEXT,
+                    started_at REAL,
+                    completed_at REAL NOT NULL,
+                    duration_seconds REAL,
+                    error_count INTEGER,
+                    last_error TEXT
+                );
+                CREATE TABLE IF NOT EXISTS task_history_departments (
+                    task_id TEXT NOT NULL,
+                    department TEXT NOT NULL,
+                    completed_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_task_history_completed ON task_history (completed_at);
+                CREATE INDEX IF NOT EXISTS idx_task_history_departments_task
+                    ON task_history_departments (task_id, completed_at);
+                CREATE INDEX IF NOT EXISTS idx_task_history_status ON task_history (status, completed_at);
+                CREATE INDEX IF NOT EXISTS idx_task_history_department
+                    ON task_history_departments (department, completed_at);
+            """)
+            self._db = db
+        except sqlite3.Error as e:
+            logger.error(f"Task history spill disabled, cannot open {path}: {e}")
+            self._db = None
+
+    def record(self, task: Any) -> TaskRecord:
+        """Record a finished CrossDepartmentTask"""
+
+        completed_at = _epoch(task.completed_at) or time.time()
+        started_at = _epoch(task.started_at)
+        record = TaskRecord(
+            task_id=task.id,
+            name=task.name,
+            status=task.status,
+            priority=_value(task.priority),
+            execution_mode=_value(task.execution_mode),
+            departments=tuple(_value(dept) for dept in task.required_departments),
+            started_at=started_at,
+            completed_at=completed_at,
+            duration_seconds=max(0.0, completed_at - started_at) if started_at is not None else 0.0,
+            error_count=len(task.errors),
+            last_error=task.errors[-1] if task.errors else None
+        )
+        self.add(record)
+        return record
+
+    def add(self, record: TaskRecord):
+        """Add a record, updating aggregates and spilling the oldest if full"""
+
+        if len(self._recent) == self.capacity and self._db is not None:
+            self._pending_spill.append(self._recent[0])
+            if len(self._pending_spill) >= self.spill_batch_size:
+                self._spill_in_background()
+        self._recent.append(record)
+
+        self.overall.add(record)
+        self.by_mode[record.execution_mode].add(record)
+        for department in record.departments:
+            self.by_department[department].add(record)
+
+    def _spill_in_background(self):
+        """Hand the pending batch to a worker thread, or write it now without a running loop"""
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        batch = self._hand_off()[-1]
+        task = loop.create_task(asyncio.to_thread(self._write, batch))
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    def _hand_off(self) -> List[List[TaskRecord]]:
+        """Move pending records into a batch to write; returns every unwritten batch"""
+        with self._lock:
+            if self._pending_spill:
+                self._unwritten.append(self._pending_spill)
+                self._pending_spill = []
+            return list(self._unwritten)
+
+    def flush(self):
+        """Write pending spilled records, and batches not yet written by a worker thread, to sqlite"""
+
+        if self._db is None:
+            return
+        for batch in self._hand_off():
+            self._write(batch)
+
+    async def flush_async(self):
+        """``flush`` without blocking the event loop"""
+        if self._db is None:
+            return
+        batches = self._hand_off()
+        await asyncio.to_thread(lambda: [self._write(batch) for batch in batches])
+
+    def _write(self, batch: List[TaskRecord]):
+        with self._lock:
+            # flush() may have written the batch already
+            if self._db is None or not any(pending is batch for pending in self._unwritten):
+                return
+            self._unwritten = [pending for pending in self._unwritten if pending is not batch]
+            self._insert(batch)
+
+    def _insert(self, batch: List[TaskRecord]):
+        try:
+            with self._db:
+                self._db.executemany(
+                    "INSERT INTO task_history VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(r.task_id, r.name, r.status, r.priority, r.execution_mode, r.started_at,
+                      r.completed_at, r.duration_seconds, r.error_count, r.last_error) for r in batch]
+                )
+                self._db.executemany(
+                    "INSERT INTO task_history_departments VALUES (?, ?, ?)",
+                    [(r.task_id, department, r.completed_at) for r in batch for department in r.departments]
+                )
+                if self.retention_seconds is not None:
+                    cutoff = time.time() - self.retention_seconds
+                    self._db.execute("DELETE FROM task_history WHERE completed_at < ?", (cutoff,))
+                    self._db.execute("DELETE FROM task_history_departments WHERE completed_at < ?", (cutoff,))
+            self.spilled += len(batch)
+        except sqlite3.Error as e:
+            logger.error(f"Error spilling task history: {e}")
+
+    def close(self):
+        """Write every remaining record and close the sqlite file"""
+        self.flush()
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    async def aclose(self):
+        """``close`` without blocking the event loop"""
+        await self.flush_async()
+        await asyncio.to_thread(self.close)
+
+    def recent(self, limit: int = 100) -> List[TaskRecord]:
+        """Most recent records, newest first"""
+        return [self._recent[-i] for i in range(1, min(limit, len(self._recent)) + 1)]
+
+    def query(self,
+              department: Optional[str] = None,
+              execution_mode: Optional[str] = None,
+              status: Optional[str] = None,
+              since: Optional[float] = None,
+              until: Optional[float] = None,
+              limit: int = 100) -> List[TaskRecord]:
+        """Records matching every given filter, newest first (times are epoch seconds)"""
+
+        def matches(record: TaskRecord) -> bool:
+            return ((department is None or department in record.departments) and
+                    (execution_mode is None or record.execution_mode == execution_mode) and
+                    (status is None or record.status == status) and
+                    (since is None or record.completed_at >= since) and
+                    (until is None or record.completed_at < until))
+
+        results = [record for record in reversed(self._recent) if matches(record)][:limit]
+        if len(results) < limit and self._db is not None:
+            self.flush()
+            results.extend(self._query_spilled(department, execution_mode, status, since, until,
+                                               limit - len(results)))
+        return results
+
+    def _query_spilled(self, department, execution_mode, status, since, until, limit) -> List[TaskRecord]:
+        sql = "SELECT h.* FROM task_history h"
+        conditions, params = [], []
+        if department is not None:
+            sql += " JOIN task_history_departments d ON d.task_id = h.task_id AND d.completed_at = h.completed_at"
+            conditions.append("d.department = ?")
+            params.append(department)
+        for column, op, value in (("execution_mode", "=", execution_mode), ("status", "=", status),
+                                  ("completed_at", ">=", since), ("completed_at", "<", until)):
+            if value is not None:
+                conditions.append(f"h.{column} {op} ?")
+                params.append(value)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY h.completed_at DESC LIMIT ?"
+        params.append(limit)
+
+        try:
+            with self._lock:
+                rows = self._db.execute(sql, params).fetchall()
+                departments = self._departments_for([(row[0], row[6]) for row in rows])
+        except sqlite3.Error as e:
+            logger.error(f"Error querying task history: {e}")
+            return []
+
+        return [
+            TaskRecord(task_id=row[0], name=row[1], status=row[2], priority=row[3], execution_mode=row[4],
+                       departments=departments.get((row[0], row[6]), ()), started_at=row[5],
+                       completed_at=row[6], duration_seconds=row[7], error_count=row[8], last_error=row[9])
+            for row in rows
+        ]
+
+    def _departments_for(self, keys: List[Tuple[str, float]]) -> Dict[Tuple[str, float], Tuple[str, ...]]:
+        found: Dict[Tuple[str, float], List[str]] = defaultdict(list)
+        for task_id, completed_at in keys:
+            if (task_id, completed_at) in found:
+                continue
+            for (department,) in self._db.execute(
+                "SELECT department FROM task_history_departments WHERE task_id = ? AND completed_at = ?",
+                (task_id, completed_at)
+            ):
+                found[(task_id, completed_at)].append(department)
+        return {key: tuple(value) for key, value in found.items()}
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregates since start; cost does not grow with the number of tasks"""
+
+        return {
+            "overall": self.overall.to_dict(),
+            "by_department": {name: stats.to_dict() for name, stats in self.by_department.items()},
+            "by_mode": {name: stats.to_dict() for name, stats in self.by_mode.items()},
+            "retained": len(self._recent),
+            "capacity": self.capacity,
+            "spilled": self.spilled,
+            "spill_path": self.spill_path if self._db is not None else None
+        }
@@ -0,0 +1,268 @@
+"""
+Task Scheduler - Deadline-driven dispatch for the Master Orchestrator
+
+Queued tasks are kept in a heap ordered by priority, then deadline, then
+arrival. The dispatcher sleeps on an event that is set whenever a task is
+submitted or a running task frees its slots, so a task starts as soon as
+the global and per-department concurrency limits allow instead of on the
+next polling tick. Tasks submitted with ``bypass_limits`` start at once,
+ahead of everything queued and regardless of those limits.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ScheduledEntry:
+    """A queued task with its scheduling attributes"""
+    task: Any
+    priority: int                      # lower runs first
+    deadline: float                    # time.monotonic() by which the task should have started
+    departments: Tuple[Hashable, ...] = ()
+    enqueued_at: float = field(default_factory=time.monotonic)
+    bypass_limits: bool = False        # starts without waiting for concurrency limits
+
+class AdmissionError(Exception):
+    """Raised by ``DeadlineTaskScheduler.submit`` when a task is refused"""
+
+class DeadlineTaskScheduler:
+    """Priority/deadline heap with event-driven dispatch and admission control.
+
+    - Ordering: ``(priority, deadline, arrival)``; earliest deadline first
+      within a priority level.
+    - Concurrency: at most ``max_concurrent`` tasks run at once, and at most
+      ``department_limits[d]`` of them may use department ``d``. When the
+      head of the queue is waiting for a busy department, up to
+      ``lookahead`` entries behind it are considered so one saturated
+      department does not stall the others.
+    - Preemption: a task submitted with ``bypass_limits`` is launched as
+      soon as it is submitted (or, before ``run``, ahead of the queue),
+      even when ``max_concurrent`` or its departments' limits are reached.
+      It still counts towards them, so other work waits for it.
+    - Admission: a task is refused when its deadline has passed, when the
+      estimated queueing delay already overshoots its deadline, or when the
+      queue holds ``max_queue_size`` tasks (priority 0 or lower, and tasks
+      that bypass the limits, are always admitted).
+    - Expiry: a task still queued after its deadline is dropped and handed
+      to ``on_expired`` instead of being run late.
+    """
+
+    def __init__(self,
+                 executor: Callable[[Any], Awaitable[Any]],
+                 max_concurrent: int = 50,
+                 department_limits: Optional[Dict[Hashable, int]] = None,
+                 max_queue_size: int = 10000,
+                 lookahead: int = 64,
+                 on_expired: Optional[Callable[[Any], None]] = None):
+        self.executor = executor
+        self.max_concurrent = max_concurrent
+        self.department_limits: Dict[Hashable, int] = dict(department_limits or {})
+        self.max_queue_size = max_queue_size
+        self.lookahead = lookahead
+        self.on_expired = on_expired
+
+        # Queue state
+        self._heap: List[Tuple[int, float, int, ScheduledEntry]] = []
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._running_tasks: Set[asyncio.Task] = set()
+        self._in_flight = 0
+        self._department_in_flight: Dict[Hashable, int] = defaultdict(int)
+        self.is_running = False
+
+        # Statistics
+        self.stats = {
+            "submitted": 0,
+            "rejected": 0,
+            "dispatched": 0,
+            "completed": 0,
+            "failed": 0,
+            "expired": 0
+        }
+        self.queue_delays: deque = deque(maxlen=1000)
+        self.service_time: Optional[float] = None  # EWMA seconds per task
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def submit(self,
+               task: Any,
+               priority: int = 0,
+               deadline: Optional[float] = None,
+               departments: Iterable[Hashable] = (),
+               bypass_limits: bool = False) -> ScheduledEntry:
+        """Queue ``task``, or start it now with ``bypass_limits``; raises AdmissionError if it is refused"""
+
+        now = time.monotonic()
+        deadline = deadline if deadline is not None else float("inf")
+        self.stats["submitted"] += 1
+
+        reason = self._admission_check(priority, deadline, now, bypass_limits)
+        if reason:
+            self.stats["rejected"] += 1
+            raise AdmissionError(reason)
+
+        entry = ScheduledEntry(
+            task=task,
+            priority=priority,
+            deadline=deadline,
+            departments=tuple(departments),
+            enqueued_at=now,
+            bypass_limits=bypass_limits
+        )
+        if bypass_limits and self.is_running:
+            self._launch(entry, now)
+            return entry
+        heapq.heappush(self._heap, (priority, deadline, next(self._sequence), entry))
+        self._wakeup.set()
+        return entry
+
+    def _admission_check(self, priority: int, deadline: float, now: float,
+                         bypass_limits: bool = False) -> Optional[str]:
+        """Reason to refuse a task, or None to admit it"""
+
+        if deadline <= now:
+            return "deadline already passed"
+        if bypass_limits:
+            return None
+        if priority > 0 and len(self._heap) >= self.max_queue_size:
+            return f"queue full ({self.max_queue_size} tasks)"
+        if self.service_time is not None and deadline != float("inf"):
+            # Rough wait: everything queued drains at max_concurrent tasks per service time
+            estimated_wait = len(self._heap) * self.service_time / max(1, self.max_concurrent)
+            if now + estimated_wait > deadline:
+                return f"estimated queueing delay {estimated_wait:.1f}s exceeds deadline"
+        return None
+
+    async def run(self):
+        """Dispatch queued tasks until ``stop`` is called"""
+
+        self.is_running = True
+        logger.info("Task scheduler started")
+
+        while self.is_running:
+            self._wakeup.clear()
+            self._dispatch_ready()
+            await self._wakeup.wait()
+
+        logger.info("Task scheduler stopped")
+
+    async def stop(self, wait: bool = True):
+        """Stop dispatching; optionally wait for running tasks to finish"""
+
+        self.is_running = False
+        self._wakeup.set()
+        if wait and self._running_tasks:
+            await asyncio.gather(*self._running_tasks, return_exceptions=True)
+
+    def _departments_free(self, entry: ScheduledEntry) -> bool:
+        if entry.bypass_limits:
+            return True
+        for department in entry.departments:
+            limit = self.department_limits.get(department)
+            if limit is not None and self._department_in_flight[department] >= limit:
+                return False
+        return True
+
+    def _dispatch_ready(self):
+        """Start queued tasks while there is capacity for them"""
+
+        heap = self._heap
+        # Bypassing entries queued before ``run`` started are launched regardless of capacity
+        while heap and heap[0][3].bypass_limits:
+            entry = heapq.heappop(heap)[3]
+            now = time.monotonic()
+            if entry.deadline <= now:
+                self._expire(entry)
+            else:
+                self._launch(entry, now)
+
+        while heap and self._in_flight < self.max_concurrent:
+            now = time.monotonic()
+            selected = None
+            skipped = []
+            while heap and len(skipped) < self.lookahead:
+                item = heapq.heappop(heap)
+                entry = item[3]
+                if entry.deadline <= now:
+                    self._expire(entry)
+                elif self._departments_free(entry):
+                    selected = entry
+                    break
+                else:
+                    skipped.append(item)
+
+            for item in skipped:
+                heapq.heappush(heap, item)
+
+            if selected is None:
+                return
+            self._launch(selected, now)
+
+    def _launch(self, entry: ScheduledEntry, now: float):
+        self._in_flight += 1
+        for department in entry.departments:
+            self._department_in_flight[department] += 1
+
+        self.stats["dispatched"] += 1
+        self.queue_delays.append(now - entry.enqueued_at)
+
+        running = asyncio.create_task(self._run_entry(entry, now))
+        self._running_tasks.add(running)
+        running.add_done_callback(self._running_tasks.discard)
+
+    async def _run_entry(self, entry: ScheduledEntry, started: float):
+        try:
+            await self.executor(entry.task)
+            self.stats["completed"] += 1
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.error(f"Scheduled task failed: {e}")
+        finally:
+            elapsed = time.monotonic() - started
+            self.service_time = elapsed if self.service_time is None else self.service_time + 0.1 * (elapsed - self.service_time)
+
+            self._in_flight -= 1
+            for department in entry.departments:
+                self._department_in_flight[department] -= 1
+            self._wakeup.set()
+
+    def _expire(self, entry: ScheduledEntry):
+        self.stats["expired"] += 1
+        logger.warning(f"Task expired in queue after {time.monotonic() - entry.enqueued_at:.1f}s")
+        if self.on_expired:
+            try:
+                self.on_expired(entry.task)
+            except Exception as e:
+                logger.error(f"Error handling expired task: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue, concurrency and delay statistics"""
+
+        delays = sorted(self.queue_delays)
+
+        def pct(p: float) -> float:
+            return delays[min(len(delays) - 1, int(len(delays) * p))] if delays else 0.0
+
+        return {
+            **self.stats,
+            "queued": len(self._heap),
+            "in_flight": self._in_flight,
+            "max_concurrent": self.max_concurrent,
+            "department_in_flight": {
+                getattr(department, "value", department): count
+                for department, count in self._department_in_flight.items()
+            },
+            "queue_delay_p50": pct(0.50),
+            "queue_delay_p95": pct(0.95),
+            "queue_delay_max": delays[-1] if delays else 0.0,
+            "service_time": self.service_time
+        }
@@ -7,17 +7,25 @@ intelligent alerting and predictive analytics.
 """
 
 import asyncio
+import atexit
 import logging
 import json
-from datetime import datetime, timedelta
+import os
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from collections import defaultdict, deque
 import statistics
 
+from .anomaly_detection import AnomalyDetectionEngine, Anomaly, ZScoreDetector, EwmaDetector, SeasonalDetector
+from .metric_aggregation import StreamingAggregator
+from .metric_store import MetricStore
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_METRICS_DB_PATH = os.getenv("MONITORING_METRICS_DB", "/tmp/coinlink_monitoring/metrics.db")
+
 class MetricType(Enum):
     """Types of metrics to monitor"""
     PERFORMANCE = "performance"
@@ -76,6 +84,12 @@ class DashboardPanel:
     position: Dict[str, int] = field(default_factory=dict)  # x, y, width, height
     configuration: Dict[str, Any] = field(default_factory=dict)
 
+def _epoch_seconds(timestamp: datetime) -> float:
+    """Epoch seconds of a metric timestamp (naive timestamps are utcnow)"""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
 class UnifiedMonitoringDashboard:
     """Comprehensive system monitoring dashboard"""
     
@@ -85,7 +99,8 @@ class UnifiedMonitoringDashboard:
         # Metrics storage
         self.current_metrics: Dict[str, MonitoringMetric] = {}
         self.metrics_history: Dict[str, deque] = defaultdict(lambda: deque(maxlen=1000))
-        self.metrics_aggregates: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self.metric_store = MetricStore(DEFAULT_METRICS_DB_PATH)  # raw, 1m, 1h
+        atexit.register(self.close)  # entry points that exit without calling close()
         
         # Alerts
         self.active_alerts: Dict[str, SystemAlert] = {}
@@ -113,6 +128,12 @@ class UnifiedMonitoringDashboard:
         # Configuration
         self.alert_thresholds = self._initialize_alert_thresholds()
         self.aggregation_windows = [60, 300, 900, 3600, 86400]  # 1m, 5m, 15m, 1h, 1d
+        self.aggregator = StreamingAggregator(self.aggregation_windows)
+        self.anomaly_engine = AnomalyDetectionEngine(
+            detectors=[ZScoreDetector(), EwmaDetector(), SeasonalDetector()],
+            cooldown_seconds=300
+        )
+        self.anomaly_detection_interval = 10  # seconds
         
         # Initialize dashboard panels
         self._initialize_dashboard_panels()
@@ -227,10 +248,12 @@ class UnifiedMonitoringDashboard:
         self.current_metrics[metric.metric_id] = metric
         
         # Add to history
+        timestamp = _epoch_seconds(metric.timestamp)
         self.metrics_history[metric.metric_id].append({
             "timestamp": metric.timestamp,
             "value": metric.value
         })
+        self.metric_store.append(metric.metric_id, metric.value, timestamp)
         
         # Check for alerts
         await self._check_metric_alerts(metric)
@@ -241,9 +264,8 @@ class UnifiedMonitoringDashboard:
         # Stream to real-time subscribers
         await self._stream_metric(metric)
         
-        # Detect anomalies
-        if await self._detect_anomaly(metric):
-            await self._create_anomaly_alert(metric)
+        # Feed anomaly detection; detect_anomalies evaluates in batches
+        self.anomaly_engine.observe(metric.metric_id, metric.value, timestamp)
 
     async def _check_metric_alerts(self, metric: MonitoringMetric) -> None:
         """Check if metric triggers any alerts"""
@@ -347,25 +369,23 @@ class UnifiedMonitoringDashboard:
     async def _update_aggregates(self, metric: MonitoringMetric) -> None:
         """Update metric aggregates for different time windows"""
         
-        for window in self.aggregation_windows:
-            window_key = f"{metric.metric_id}_{window}"
-            
-            # Get recent values within window
-            cutoff = datetime.utcnow() - timedelta(seconds=window)
-            recent_values = [
-                entry["value"] for entry in self.metrics_history[metric.metric_id]
-                if entry["timestamp"] >= cutoff
-            ]
-            
-            if recent_values:
-                self.metrics_aggregates[window_key] = {
-                    "min": min(recent_values),
-                    "max": max(recent_values),
-                    "avg": statistics.mean(recent_values),
-                    "median": statistics.median(recent_values),
-                    "stddev": statistics.stdev(recent_values) if len(recent_values) > 1 else 0,
-                    "count": len(recent_values)
-                }
+        self.aggregator.add(metric.metric_id, metric.value, _epoch_seconds(metric.timestamp))
+
+    def get_metric_aggregates(self, metric_id: str, window: Optional[int] = None) -> Dict[int, Dict[str, float]]:
+        """min/max/avg/median/stddev/count/p95/p99 per aggregation window (seconds)"""
+        
+        if window is not None:
+            aggregate = self.aggregator.get(metric_id, window)
+            return {window: aggregate} if aggregate else {}
+        return self.aggregator.snapshot(metric_id)
+
+    def get_metric_history(self, metric_id: str, start: datetime, end: Optional[datetime] = None,
+                           resolution: Optional[str] = None, max_points: int = 1000) -> Dict[str, Any]:
+        """Stored points for a time range, read at the finest retained resolution that fits max_points"""
+        
+        end = end or datetime.utcnow()
+        return self.metric_store.query(metric_id, _epoch_seconds(start), _epoch_seconds(end),
+                                       resolution=resolution, max_points=max_points)
 
     async def _stream_metric(self, metric: MonitoringMetric) -> None:
         """Stream metric to real-time subscribers"""
@@ -388,41 +408,38 @@ class UnifiedMonitoringDashboard:
         
         self.real_time_streams[stream_key].append(stream_data)
 
-    async def _detect_anomaly(self, metric: MonitoringMetric) -> bool:
-        """Detect anomalies in metric values"""
+    async def detect_anomalies(self) -> List[SystemAlert]:
+        """Evaluate all metrics recorded since the last run and alert on anomalies"""
         
-        history = self.metrics_history.get(metric.metric_id, [])
-        
-        if len(history) < 20:
-            return False  # Not enough data for anomaly detection
-        
-        recent_values = [entry["value"] for entry in list(history)[-20:]]
-        
-        # Simple statistical anomaly detection
-        mean = statistics.mean(recent_values)
-        stddev = statistics.stdev(recent_values)
-        
-        # Check if current value is outside 3 standard deviations
-        if abs(metric.value - mean) > 3 * stddev:
-            return True
-        
-        # Check for sudden changes
-        if len(recent_values) >= 2:
-            recent_change = abs(metric.value - recent_values[-2])
-            typical_change = stddev
-            
-            if recent_change > 5 * typical_change:
-                return True
-        
-        return False
+        alerts = []
+        for anomaly in self.anomaly_engine.evaluate():
+            metric = self.current_metrics.get(anomaly.metric_id)
+            if metric is None:
+                continue
+            self.anomaly_detection[anomaly.metric_id] = anomaly.to_dict()
+            alerts.append(await self._create_anomaly_alert(metric, anomaly))
+        return alerts
+
+    async def start_anomaly_detection_loop(self):
+        """Run anomaly detection every anomaly_detection_interval seconds"""
+        
+        while True:
+            try:
+                await self.detect_anomalies()
+                await asyncio.sleep(self.anomaly_detection_interval)
+                
+            except Exception as e:
+                logger.error(f"Error in anomaly detection loop: {e}")
+                await asyncio.sleep(self.anomaly_detection_interval)
 
-    async def _create_anomaly_alert(self, metric: MonitoringMetric) -> None:
+    async def _create_anomaly_alert(self, metric: MonitoringMetric, anomaly: Anomaly) -> SystemAlert:
         """Create alert for detected anomaly"""
         
-        await self._create_alert(
+        return await self._create_alert(
             severity=AlertSeverity.WARNING,
             title=f"Anomaly Detected: {metric.name}",
-            message=f"Unusual value detected for {metric.name}: {metric.value} {metric.unit}",
+            message=(f"Unusual value detected for {metric.name}: {anomaly.value} {metric.unit} "
+                     f"(expected ~{anomaly.expected:.2f}, {anomaly.detector})"),
             metric_id=metric.metric_id,
             department=metric.department
         )
@@ -594,15 +611,26 @@ class UnifiedMonitoringDashboard:
         
         # Analyze metrics
         for metric_id, history in self.metrics_history.items():
-            recent_data = [entry for entry in history if entry["timestamp"] >= cutoff]
+            if period == "daily":
+                # The 1d window covers the whole day, not just the retained history
+                aggregate = self.aggregator.get(metric_id, 86400)
+                if aggregate:
+                    report["metrics"][metric_id] = {
+                        "min": aggregate["min"],
+                        "max": aggregate["max"],
+                        "avg": aggregate["avg"],
+                        "current": history[-1]["value"] if history else 0
+                    }
+                continue
             
-            if recent_data:
-                values = [entry["value"] for entry in recent_data]
+            # Hourly rollups from the metric store cover the whole period
+            summary = self.get_metric_history(metric_id, cutoff, resolution="1h")["summary"]
+            if summary["count"]:
                 report["metrics"][metric_id] = {
-                    "min": min(values),
-                    "max": max(values),
-                    "avg": statistics.mean(values),
-                    "current": values[-1] if values else 0
+                    "min": summary["min"],
+                    "max": summary["max"],
+                    "avg": summary["avg"],
+                    "current": history[-1]["value"] if history else 0
                 }
         
         # Analyze alerts
@@ -656,6 +684,10 @@ class UnifiedMonitoringDashboard:
         
         return recommendations[:5]  # Return top 5 recommendations
 
+    def close(self) -> None:
+        """Write the metric history still held in memory; blocks until it is on disk"""
+        self.metric_store.close()
+
     def get_dashboard_status(self) -> Dict[str, Any]:
         """Get dashboard status"""
         
@@ -667,6 +699,9 @@ class UnifiedMonitoringDashboard:
             "alert_rules": len(self.alert_rules),
             "dashboard_panels": len(self.dashboard_panels),
             "real_time_streams": len(self.real_time_streams),
+            "aggregation": self.aggregator.get_stats(),
+            "anomaly_detection": self.anomaly_engine.get_stats(),
+            "metric_store": self.metric_store.get_stats(),
             "available_layouts": list(self.dashboard_layouts.keys())
         }
 
@@ -7,6 +7,7 @@ department status, agent activity, KPI progress, and alert management.
 
 import asyncio
 import logging
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 from fastapi import FastAPI, HTTPException, BackgroundTasks
@@ -42,7 +43,7 @@ class MonitoringAPI:
     """Comprehensive monitoring API system"""
     
     def __init__(self):
-        self.app = FastAPI(title="CoinLink Monitoring API", version="2.0.0")
+        self.app = FastAPI(title="CoinLink Monitoring API", version="2.0.0", lifespan=self._lifespan)
         self.api_metrics = {
             "requests_total": 0,
             "requests_per_minute": 0,
@@ -54,6 +55,12 @@ class MonitoringAPI:
         
         logger.info("Monitoring API initialized")
     
+    @asynccontextmanager
+    async def _lifespan(self, app: FastAPI):
+        yield
+        # Shutdown: write buffered metric history before the process exits
+        await asyncio.to_thread(unified_monitoring.close)
+    
     def _setup_routes(self):
         """Setup API routes"""
         
@@ -396,29 +403,32 @@ class MonitoringAPI:
             }
         
         @self.app.get("/api/v1/metrics/{metric_id}/history")
-        async def get_metric_history(metric_id: str, hours: Optional[int] = 24):
-            """Get metric history"""
-            if metric_id not in unified_monitoring.metrics_history:
+        async def get_metric_history(metric_id: str, hours: Optional[int] = 24,
+                                     resolution: Optional[str] = None, max_points: int = 1000):
+            """Get metric history (resolution: raw, 1m or 1h; chosen from the range if omitted)"""
+            if metric_id not in unified_monitoring.metric_store:
                 raise HTTPException(status_code=404, detail="Metric not found")
             
             cutoff = datetime.utcnow() - timedelta(hours=hours)
-            history = [
-                entry for entry in unified_monitoring.metrics_history[metric_id]
-                if entry["timestamp"] >= cutoff
-            ]
+            try:
+                result = unified_monitoring.get_metric_history(metric_id, cutoff, resolution=resolution,
+                                                               max_points=max_points)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
             
             return {
                 "metric_id": metric_id,
+                "resolution": result["resolution"],
                 "history": [
-                    {"timestamp": entry["timestamp"].isoformat(), "value": entry["value"]}
-                    for entry in history
+                    {
+                        "timestamp": datetime.utcfromtimestamp(point["timestamp"]).isoformat(),
+                        "value": point["value"],
+                        **({} if result["resolution"] == "raw" else
+                           {"min": point["min"], "max": point["max"], "count": point["count"]})
+                    }
+                    for point in result["points"]
                 ],
-                "summary": {
-                    "count": len(history),
-                    "min": min(entry["value"] for entry in history) if history else 0,
-                    "max": max(entry["value"] for entry in history) if history else 0,
-                    "avg": sum(entry["value"] for entry in history) / len(history) if history else 0
-                }
+                "summary": result["summary"]
             }
         
         # Reporting Endpoints
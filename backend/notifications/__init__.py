@@ -0,0 +1,19 @@
+"""
+Outbound notification delivery for CoinLink
+Durable, batched email delivery shared by the R&D and growth departments
+"""
+
+from .spool import NotificationSpool, SpooledMessage
+from .mailer import OutboundMailer, SMTPTransport, LogTransport, DeliveryError, default_spool_path
+from .smtp_sink import SMTPSink
+
+__all__ = [
+    'NotificationSpool',
+    'SpooledMessage',
+    'OutboundMailer',
+    'SMTPTransport',
+    'LogTransport',
+    'DeliveryError',
+    'default_spool_path',
+    'SMTPSink'
+]
@@ -0,0 +1,398 @@
+"""
+Outbound Mailer - non-blocking, batched email delivery
+
+``OutboundMailer.send`` writes the message to a durable spool and returns;
+a dispatcher task delivers due messages in batches over persistent SMTP
+connections, spreading each batch across them. Each SMTP connection and
+the sqlite spool run on their own worker thread, so a burst of
+notifications never blocks the event loop.
+
+Notifications sent with a ``digest_key`` are held for a digest window and
+every notification with the same key and recipient is delivered as one
+email. Failed deliveries are retried with exponential backoff; permanent
+failures and messages out of attempts are kept in the spool as dead
+letters.
+"""
+
+import asyncio
+import logging
+import os
+import smtplib
+import ssl
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from .spool import NotificationSpool, SpooledMessage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPOOL_DIR = os.getenv("NOTIFICATION_SPOOL_DIR", "/tmp/coinlink_notifications")
+
+def default_spool_path(name: str) -> str:
+    """Spool database of one sender, in NOTIFICATION_SPOOL_DIR"""
+    return os.path.join(DEFAULT_SPOOL_DIR, f"{name}.db")
+
+class DeliveryError(Exception):
+    """A message could not be delivered; ``permanent`` failures are not retried"""
+
+    def __init__(self, message: str, permanent: bool = False):
+        super().__init__(message)
+        self.permanent = permanent
+
+class SMTPTransport:
+    """Blocking SMTP client that keeps its connection open between messages"""
+
+    def __init__(self,
+                 host: str,
+                 port: int = 587,
+                 username: str = "",
+                 password: str = "",
+                 starttls: bool = True,
+                 use_ssl: bool = False,
+                 timeout: float = 30.0,
+                 idle_timeout: float = 60.0,
+                 max_messages_per_connection: int = 500):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout  # reconnect rather than reuse a connection idle this long
+        self.max_messages_per_connection = max_messages_per_connection
+
+        self._server: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self._sent_on_connection = 0
+
+        # Statistics
+        self.connections = 0
+        self.messages_sent = 0
+
+    def _connection(self) -> Tuple[smtplib.SMTP, bool]:
+        """Open connection and whether it was reused"""
+
+        if self._server is not None and (
+            time.monotonic() - self._last_used > self.idle_timeout
+            or self._sent_on_connection >= self.max_messages_per_connection
+        ):
+            self.close()
+        if self._server is not None:
+            return self._server, True
+
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout,
+                                      context=ssl.create_default_context())
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            server.ehlo()
+            if self.starttls and not self.use_ssl:
+                server.starttls(context=ssl.create_default_context())
+                server.ehlo()
+            if self.username and self.password:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        self._server = server
+        self._sent_on_connection = 0
+        self.connections += 1
+        return server, False
+
+    def send(self, sender: str, recipients: List[str], message: str):
+        """Deliver one message; raises DeliveryError"""
+
+        while True:
+            reused = False
+            try:
+                server, reused = self._connection()
+                refused = server.sendmail(sender, recipients, message)
+            except smtplib.SMTPRecipientsRefused as e:
+                permanent = all(code >= 500 for code, _ in e.recipients.values())
+                raise DeliveryError(f"All recipients refused: {e.recipients}", permanent=permanent)
+            except smtplib.SMTPServerDisconnected as e:
+                self._drop()
+                if reused:
+                    continue  # the server closed an idle connection; retry once on a fresh one
+                raise DeliveryError(f"Server disconnected: {e}")
+            except smtplib.SMTPResponseException as e:
+                if e.smtp_code == 421:
+                    self._drop()  # server is closing the connection
+                raise DeliveryError(f"{e.smtp_code} {e.smtp_error!r}", permanent=e.smtp_code >= 500)
+            except OSError as e:
+                self._drop()
+                raise DeliveryError(f"Connection failed: {e}")
+
+            if refused:
+                logger.warning(f"Recipients refused: {', '.join(refused)}")
+            self._last_used = time.monotonic()
+            self._sent_on_connection += 1
+            self.messages_sent += 1
+            return
+
+    def _drop(self):
+        if self._server is not None:
+            try:
+                self._server.close()
+            except Exception:
+                pass
+            self._server = None
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._drop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "host": self.host,
+            "port": self.port,
+            "connected": self._server is not None,
+            "connections": self.connections,
+            "messages_sent": self.messages_sent
+        }
+
+class LogTransport:
+    """Logs messages instead of sending them (development/demo mode)"""
+
+    def __init__(self):
+        self.messages_sent = 0
+
+    def send(self, sender: str, recipients: List[str], message: str):
+        logger.info(f"EMAIL NOTIFICATION (Demo Mode): to {', '.join(recipients)}, {len(message)} bytes")
+        self.messages_sent += 1
+
+    def close(self):
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"demo_mode": True, "messages_sent": self.messages_sent}
+
+class OutboundMailer:
+    """Spools notifications and delivers them in the background"""
+
+    def __init__(self,
+                 transport: Union[SMTPTransport, LogTransport, Sequence[SMTPTransport]],
+                 spool_path: str,
+                 sender: str,
+                 batch_size: int = 50,
+                 poll_interval: float = 5.0,
+                 max_attempts: int = 6,
+                 base_backoff: float = 30.0,
+                 max_backoff: float = 3600.0,
+                 digest_window: float = 300.0):
+        # Several transports deliver in parallel, one connection each
+        self.transports = list(transport) if isinstance(transport, (list, tuple)) else [transport]
+        self.sender = sender
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval  # longest sleep between spool checks
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.digest_window = digest_window
+
+        os.makedirs(os.path.dirname(os.path.abspath(spool_path)), exist_ok=True)
+        self.spool = NotificationSpool(spool_path)
+        # One thread each, so the spool connection and an SMTP connection are never shared
+        self._spool_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="notification-spool")
+        self._transport_threads = [ThreadPoolExecutor(max_workers=1, thread_name_prefix="notification-smtp")
+                                   for _ in self.transports]
+
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+
+        # Statistics
+        self.accepted = 0
+        self.emails_sent = 0
+        self.notifications_sent = 0
+        self.coalesced = 0
+        self.retries_scheduled = 0
+        self.dead_lettered = 0
+        self.batches = 0
+        self.delivery_latencies: deque = deque(maxlen=1000)  # seconds from send() to delivery
+
+    async def _on_spool(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._spool_thread, function, *args)
+
+    async def send(self,
+                   recipients: Union[str, Sequence[str]],
+                   subject: str,
+                   html: str,
+                   digest_key: Optional[str] = None,
+                   digest_window: Optional[float] = None) -> List[int]:
+        """Spool a notification and return its spool ids.
+
+        With a ``digest_key`` each recipient gets one email per digest
+        window containing every notification sent under that key.
+        """
+
+        recipients = [recipients] if isinstance(recipients, str) else list(recipients)
+        now = time.time()
+        if digest_key is None:
+            rows = [(self.sender, recipients, subject, html, None, now, now)]
+        else:
+            due = now + (self.digest_window if digest_window is None else digest_window)
+            rows = [(self.sender, [recipient], subject, html, digest_key, now, due) for recipient in recipients]
+
+        ids = await self._on_spool(self.spool.add, rows)
+        self.accepted += len(ids)
+        self.start()
+        if digest_key is None:
+            self._wake.set()
+        return ids
+
+    def start(self):
+        """Start the dispatcher (also delivers anything left in the spool by a previous run)"""
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._idle = asyncio.Event()
+            self._task = asyncio.create_task(self._dispatch())
+
+    async def stop(self):
+        """Stop the dispatcher and close the SMTP connection; spooled messages are kept"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(thread, transport.close)
+                               for thread, transport in zip(self._transport_threads, self.transports)))
+
+    async def drain(self, timeout: Optional[float] = None):
+        """Wait until no spooled message is due"""
+
+        async def drained():
+            while True:
+                self._idle.clear()
+                self._wake.set()
+                await self._idle.wait()
+                next_due = await self._on_spool(self.spool.next_due)
+                if next_due is None or next_due > time.time():
+                    return
+
+        self.start()
+        await asyncio.wait_for(drained(), timeout)
+
+    async def _dispatch(self):
+        while True:
+            try:
+                batch = await self._on_spool(self.spool.claim_due, time.time(), self.batch_size)
+                if not batch:
+                    self._idle.set()
+                    next_due = await self._on_spool(self.spool.next_due)
+                    sleep = self.poll_interval if next_due is None else min(max(next_due - time.time(), 0.0),
+                                                                            self.poll_interval)
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), sleep)
+                    except asyncio.TimeoutError:
+                        pass
+                    self._wake.clear()
+                    continue
+
+                # One email per digest group, dealt out across the transports
+                groups: Dict[Any, List[SpooledMessage]] = {}
+                for message in batch:
+                    key = message.id if message.digest_key is None else (message.digest_key, tuple(message.recipients))
+                    groups.setdefault(key, []).append(message)
+                shares = [list(groups.values())[i::len(self.transports)] for i in range(len(self.transports))]
+                loop = asyncio.get_running_loop()
+                delivered = await asyncio.gather(*(
+                    loop.run_in_executor(thread, self._deliver, transport, share)
+                    for thread, transport, share in zip(self._transport_threads, self.transports, shares) if share
+                ))
+                await self._on_spool(self._record, [outcome for outcomes in delivered for outcome in outcomes])
+                self.batches += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error dispatching notifications: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    def _deliver(self, transport, groups: List[List[SpooledMessage]]) -> List[Tuple[List[SpooledMessage], Optional[DeliveryError]]]:
+        """Send one email per group over ``transport`` (on its thread)"""
+
+        outcomes = []
+        for messages in groups:
+            first = messages[0]
+            try:
+                transport.send(first.sender, first.recipients, self._compose(messages))
+                outcomes.append((messages, None))
+            except DeliveryError as e:
+                outcomes.append((messages, e))
+            except Exception as e:
+                outcomes.append((messages, DeliveryError(str(e))))
+        return outcomes
+
+    @staticmethod
+    def _compose(messages: List[SpooledMessage]) -> str:
+        first = messages[0]
+        message = MIMEMultipart("alternative")
+        if len(messages) == 1:
+            message["Subject"] = first.subject
+            html = first.html
+        else:
+            message["Subject"] = f"{messages[-1].subject} (+{len(messages) - 1} more)"
+            html = "\n<hr>\n".join(f"<h2>{m.subject}</h2>\n{m.html}" for m in reversed(messages))
+        message["From"] = first.sender
+        message["To"] = ", ".join(first.recipients)
+        # utf-8 is sent base64-encoded, which keeps lines short even for large digests
+        message.attach(MIMEText(html, "html", "utf-8"))
+        return message.as_string()
+
+    def _record(self, outcomes: List[Tuple[List[SpooledMessage], Optional[DeliveryError]]]):
+        """Remove delivered messages from the spool, reschedule or dead-letter the rest (spool thread)"""
+
+        now = time.time()
+        delivered = []
+        for messages, error in outcomes:
+            if error is None:
+                delivered.extend(m.id for m in messages)
+                self.emails_sent += 1
+                self.notifications_sent += len(messages)
+                self.coalesced += len(messages) - 1
+                self.delivery_latencies.extend(now - m.created for m in messages)
+                continue
+
+            attempts = max(m.attempts for m in messages) + 1
+            ids = [m.id for m in messages]
+            if error.permanent or attempts >= self.max_attempts:
+                logger.error(f"Giving up on notification '{messages[0].subject}' after {attempts} attempts: {error}")
+                self.spool.kill(ids, str(error))
+                self.dead_lettered += len(ids)
+            else:
+                backoff = min(self.base_backoff * 2 ** (attempts - 1), self.max_backoff)
+                logger.warning(f"Notification '{messages[0].subject}' failed ({error}); retrying in {backoff:.0f}s")
+                self.spool.reschedule(ids, now + backoff, str(error))
+                self.retries_scheduled += len(ids)
+        if delivered:
+            self.spool.delete(delivered)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        latencies = sorted(self.delivery_latencies)
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "accepted": self.accepted,
+            "emails_sent": self.emails_sent,
+            "notifications_sent": self.notifications_sent,
+            "coalesced": self.coalesced,
+            "retries_scheduled": self.retries_scheduled,
+            "dead_lettered": self.dead_lettered,
+            "batches": self.batches,
+            "spool": await self._on_spool(self.spool.counts),
+            "average_delivery_latency": sum(latencies) / len(latencies) if latencies else 0.0,
+            "p95_delivery_latency": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0,
+            "transports": [transport.get_stats() for transport in self.transports]
+        }
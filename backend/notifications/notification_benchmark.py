@@ -0,0 +1,165 @@
+"""
+Notification Delivery Benchmarks
+
+Run from the backend directory:
+
+    python -m notifications.notification_benchmark burst --messages 500 --reply-delay 0.002
+
+``burst`` sends ``--messages`` notifications as fast as a caller can issue
+them to an in-process SMTP sink that waits ``--reply-delay`` seconds
+before every reply. It reports messages delivered per second, how long
+callers waited, and event-loop lag measured by a 1 ms timer probe, for
+the OutboundMailer with each of ``--connections`` SMTP connections and
+for the pattern the R&D and growth notifiers used before it: one
+blocking smtplib session (connect, login, send, quit) per message, run
+on the event loop. STARTTLS is skipped in both because the sink has no
+TLS. It also reports how many emails the same burst becomes when sent
+on a digest channel.
+
+Results are printed as JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import smtplib
+import tempfile
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Any, Dict, List
+
+from .mailer import OutboundMailer, SMTPTransport
+from .smtp_sink import SMTPSink
+
+SENDER = "noreply@coinlink.app"
+RECIPIENT = "team@coinlink.app"
+HTML = "<html><body><h1>Growth Performance Update</h1>" + "<p>metric row</p>" * 50 + "</body></html>"
+
+class LagProbe:
+    """Measures how late a 1 ms timer fires while the event loop is busy"""
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.lags: List[float] = []
+        self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(time.perf_counter() - started - self.interval)
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self._run())
+        await asyncio.sleep(self.interval)  # let the probe start its first timer
+        return self
+
+    async def __aexit__(self, *exc):
+        await asyncio.sleep(self.interval)  # let the probe record a timer delayed by the run
+        self._task.cancel()
+
+    def summary(self) -> Dict[str, float]:
+        lags = sorted(self.lags) or [0.0]
+        return {
+            "max_ms": lags[-1] * 1000,
+            "p99_ms": lags[min(len(lags) - 1, int(len(lags) * 0.99))] * 1000,
+            "mean_ms": sum(lags) / len(lags) * 1000
+        }
+
+async def blocking_send(port: int, subject: str):
+    """One message the way the notifiers used to send it"""
+    message = MIMEMultipart("alternative")
+    message["Subject"] = subject
+    message["From"] = SENDER
+    message["To"] = RECIPIENT
+    message.attach(MIMEText(HTML, "html"))
+    with smtplib.SMTP("127.0.0.1", port) as server:
+        server.login(SENDER, "password")
+        server.sendmail(SENDER, RECIPIENT, message.as_string())
+
+async def run_blocking(sink: SMTPSink, messages: int) -> Dict[str, Any]:
+    async with LagProbe() as probe:
+        started = time.perf_counter()
+        for i in range(messages):
+            await blocking_send(sink.port, f"Alert {i}")
+        issued = time.perf_counter() - started
+    return {
+        "delivered": len(sink.messages),
+        "wall_seconds": issued,
+        "messages_per_second": messages / issued,
+        "caller_wait_ms_per_message": issued / messages * 1000,
+        "connections": sink.connections,
+        "event_loop_lag": probe.summary()
+    }
+
+async def run_mailer(sink: SMTPSink, messages: int, directory: str, connections: int,
+                     digest: bool = False) -> Dict[str, Any]:
+    transports = [SMTPTransport("127.0.0.1", sink.port, username=SENDER, password="password", starttls=False)
+                  for _ in range(connections)]
+    spool = os.path.join(directory, f"outbox_{connections}_{'digest' if digest else 'burst'}.db")
+    mailer = OutboundMailer(transports, spool, SENDER, batch_size=100)
+    await asyncio.sleep(0.01)
+
+    async with LagProbe() as probe:
+        started = time.perf_counter()
+        for i in range(messages):
+            if digest:
+                await mailer.send(RECIPIENT, f"Alert {i}", HTML, digest_key="performance", digest_window=0.0)
+            else:
+                await mailer.send(RECIPIENT, f"Alert {i}", HTML)
+        issued = time.perf_counter() - started
+        await mailer.drain()
+        wall = time.perf_counter() - started
+    stats = await mailer.get_stats()
+    await mailer.stop()
+
+    return {
+        "delivered": stats["notifications_sent"],
+        "emails": len(sink.messages),
+        "wall_seconds": wall,
+        "messages_per_second": messages / wall,
+        "caller_wait_ms_per_message": issued / messages * 1000,
+        "connections": sink.connections,
+        "batches": stats["batches"],
+        "p95_delivery_latency_ms": stats["p95_delivery_latency"] * 1000,
+        "event_loop_lag": probe.summary()
+    }
+
+async def run_burst_benchmark(args) -> Dict[str, Any]:
+    logging.getLogger("notifications").setLevel(logging.ERROR)
+    results: Dict[str, Any] = {"messages": args.messages, "reply_delay_s": args.reply_delay}
+
+    with tempfile.TemporaryDirectory() as directory:
+        runs = [("baseline_blocking_per_message", lambda sink: run_blocking(sink, args.messages))]
+        for connections in args.connections:
+            runs.append((f"mailer_{connections}_connections",
+                         lambda sink, c=connections: run_mailer(sink, args.messages, directory, c)))
+        runs.append(("mailer_digest", lambda sink: run_mailer(sink, args.messages, directory, 1, digest=True)))
+        for name, run in runs:
+            sink = SMTPSink(reply_delay=args.reply_delay)
+            sink.start()
+            try:
+                results[name] = await run(sink)
+            finally:
+                sink.stop()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Notification delivery benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    burst = commands.add_parser("burst", help="throughput and event-loop lag during a notification burst")
+    burst.add_argument("--messages", type=int, default=500, help="notifications in the burst")
+    burst.add_argument("--reply-delay", type=float, default=0.002, help="seconds the SMTP sink waits before each reply")
+    burst.add_argument("--connections", type=int, nargs="+", default=[1, 4], help="SMTP connection counts of the mailer")
+    burst.set_defaults(run=run_burst_benchmark)
+
+    args = parser.parse_args()
+    results = asyncio.run(args.run(args))
+    print(json.dumps({"benchmark": args.command, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+SMTP Sink - in-process SMTP server that keeps what it receives
+
+For tests and benchmarks. The server runs its own event loop on a
+background thread, so blocking SMTP clients can talk to it from the
+thread that owns the caller's loop.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+class SMTPSink:
+    """Accepts SMTP sessions on 127.0.0.1 and records (sender, recipients, data) of each message"""
+
+    def __init__(self, reply_delay: float = 0.0, refuse: Optional[Set[str]] = None):
+        self.reply_delay = reply_delay        # seconds before every reply, to simulate network round trips
+        self.refuse = set(refuse or ())       # recipients answered with 550
+        self.messages: List[Tuple[str, List[str], bytes]] = []
+        self.connections = 0
+        self.port: Optional[int] = None
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+
+    def start(self) -> int:
+        """Start serving; returns the port"""
+
+        started = threading.Event()
+
+        def serve():
+            self._loop = asyncio.new_event_loop()
+            self._server = self._loop.run_until_complete(asyncio.start_server(self._session, "127.0.0.1", 0, limit=2 ** 20))
+            self.port = self._server.sockets[0].getsockname()[1]
+            started.set()
+            self._loop.run_forever()
+            self._loop.close()
+
+        self._thread = threading.Thread(target=serve, name="smtp-sink", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self.port
+
+    def stop(self):
+        if self._loop is None:
+            return
+
+        async def shutdown():
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop = None
+
+    def disconnect_all(self):
+        """Drop every open session, as a server closing idle connections would"""
+        for writer in list(self._writers):
+            self._loop.call_soon_threadsafe(writer.close)
+
+    async def _session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        self._writers.add(writer)
+
+        async def reply(line: str):
+            if self.reply_delay:
+                await asyncio.sleep(self.reply_delay)
+            writer.write(line.encode() + b"\r\n")
+            await writer.drain()
+
+        sender, recipients = None, []
+        try:
+            await reply("220 sink ESMTP")
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode("utf-8", "replace").strip()
+                verb = command[:4].upper()
+
+                if verb == "EHLO":
+                    await reply("250-sink\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME")
+                elif verb == "HELO":
+                    await reply("250 sink")
+                elif verb == "AUTH":
+                    await reply("235 Authentication successful")
+                elif verb == "MAIL":
+                    sender, recipients = command.split(":", 1)[1].strip().strip("<>"), []
+                    await reply("250 OK")
+                elif verb == "RCPT":
+                    recipient = command.split(":", 1)[1].strip().strip("<>")
+                    if recipient in self.refuse:
+                        await reply("550 No such user")
+                    else:
+                        recipients.append(recipient)
+                        await reply("250 OK")
+                elif verb == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    data = []
+                    while True:
+                        chunk = await reader.readline()
+                        if not chunk or chunk == b".\r\n":
+                            break
+                        data.append(chunk[1:] if chunk.startswith(b"..") else chunk)
+                    self.messages.append((sender, recipients, b"".join(data)))
+                    sender, recipients = None, []
+                    await reply("250 OK queued")
+                elif verb == "RSET":
+                    sender, recipients = None, []
+                    await reply("250 OK")
+                elif verb == "NOOP":
+                    await reply("250 OK")
+                elif verb == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:
+                    await reply("502 Command not implemented")
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
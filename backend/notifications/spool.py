@@ -0,0 +1,136 @@
+"""
+Notification Spool - durable sqlite outbox for outbound messages
+
+A message is written to the spool before it is acknowledged, and removed
+only once the transport has accepted it, so delivery is at-least-once
+across restarts. Failed messages are rescheduled with a later due time;
+messages that fail permanently or too often are kept as dead letters.
+"""
+
+import json
+import logging
+import sqlite3
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class SpooledMessage:
+    """One spooled notification"""
+    id: int
+    sender: str
+    recipients: List[str]
+    subject: str
+    html: str
+    digest_key: Optional[str]
+    created: float          # epoch seconds
+    attempts: int
+
+class NotificationSpool:
+    """sqlite outbox; the connection may be used from one thread at a time"""
+
+    _COLUMNS = "id, sender, recipients, subject, html, digest_key, created, attempts"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY,
+                sender TEXT NOT NULL,
+                recipients TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                html TEXT NOT NULL,
+                digest_key TEXT,
+                created REAL NOT NULL,
+                due REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                dead INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (dead, due);
+            CREATE INDEX IF NOT EXISTS idx_outbox_digest ON outbox (digest_key, recipients) WHERE digest_key IS NOT NULL;
+        """)
+
+    def add(self, rows: Sequence[Tuple[str, List[str], str, str, Optional[str], float, float]]) -> List[int]:
+        """Insert (sender, recipients, subject, html, digest_key, created, due) rows; returns their ids"""
+        ids = []
+        with self.db:
+            for sender, recipients, subject, html, digest_key, created, due in rows:
+                cursor = self.db.execute(
+                    "INSERT INTO outbox (sender, recipients, subject, html, digest_key, created, due) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (sender, json.dumps(recipients), subject, html, digest_key, created, due)
+                )
+                ids.append(cursor.lastrowid)
+        return ids
+
+    def _messages(self, rows: Iterable[tuple]) -> List[SpooledMessage]:
+        return [SpooledMessage(row[0], row[1], json.loads(row[2]), row[3], row[4], row[5], row[6], row[7])
+                for row in rows]
+
+    def claim_due(self, now: float, limit: int) -> List[SpooledMessage]:
+        """Up to ``limit`` messages due by ``now``, plus every pending message of the digests among them"""
+
+        due = self._messages(self.db.execute(
+            f"SELECT {self._COLUMNS} FROM outbox WHERE dead = 0 AND due <= ? ORDER BY due, id LIMIT ?",
+            (now, limit)
+        ))
+        seen = {message.id for message in due}
+        digests = {(message.digest_key, json.dumps(message.recipients))
+                   for message in due if message.digest_key is not None}
+        for digest_key, recipients in digests:
+            for message in self._messages(self.db.execute(
+                f"SELECT {self._COLUMNS} FROM outbox WHERE digest_key = ? AND recipients = ? AND dead = 0 ORDER BY id",
+                (digest_key, recipients)
+            )):
+                if message.id not in seen:
+                    seen.add(message.id)
+                    due.append(message)
+        return due
+
+    def next_due(self) -> Optional[float]:
+        row = self.db.execute("SELECT MIN(due) FROM outbox WHERE dead = 0").fetchone()
+        return row[0]
+
+    def delete(self, ids: Iterable[int]):
+        with self.db:
+            self.db.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in ids])
+
+    def reschedule(self, ids: Iterable[int], due: float, error: str):
+        with self.db:
+            self.db.executemany(
+                "UPDATE outbox SET attempts = attempts + 1, due = ?, last_error = ? WHERE id = ?",
+                [(due, error, i) for i in ids]
+            )
+
+    def kill(self, ids: Iterable[int], error: str):
+        """Keep messages as dead letters"""
+        with self.db:
+            self.db.executemany(
+                "UPDATE outbox SET attempts = attempts + 1, dead = 1, last_error = ? WHERE id = ?",
+                [(error, i) for i in ids]
+            )
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        rows = self.db.execute(
+            "SELECT id, recipients, subject, attempts, last_error, created FROM outbox "
+            "WHERE dead = 1 ORDER BY id DESC LIMIT ?", (limit,)
+        )
+        return [
+            {"id": row[0], "recipients": json.loads(row[1]), "subject": row[2],
+             "attempts": row[3], "error": row[4], "created": row[5]}
+            for row in rows
+        ]
+
+    def counts(self) -> Dict[str, int]:
+        pending, dead = self.db.execute(
+            "SELECT COALESCE(SUM(dead = 0), 0), COALESCE(SUM(dead = 1), 0) FROM outbox"
+        ).fetchone()
+        return {"pending": pending, "dead": dead}
+
+    def close(self):
+        self.db.close()
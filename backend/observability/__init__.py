@@ -10,17 +10,26 @@ from typing import Optional
 from .log_config import configure_logging, set_trace_id, get_trace_id, app_logger
 from .sentry import configure_sentry, capture_exception, capture_message
 from .metrics import coinlink_metrics, create_instrumentator, start_system_metrics_collection, get_metrics_response
+from .loop_monitor import LoopMonitor
+from ..config.settings import settings
 
 logger = logging.getLogger(__name__)
 
 # Global metrics collection task
 _metrics_task: Optional[asyncio.Task] = None
 
+# Event loop lag / slow callback monitor
+_loop_monitor: Optional[LoopMonitor] = None
+
+def get_loop_monitor() -> Optional[LoopMonitor]:
+    """Return the running event loop monitor, if enabled"""
+    return _loop_monitor
+
 async def initialize_observability():
     """
     Initialize all observability components
     """
-    global _metrics_task
+    global _metrics_task, _loop_monitor
     
     try:
         # Configure structured logging
@@ -35,6 +44,16 @@ async def initialize_observability():
         _metrics_task = asyncio.create_task(start_system_metrics_collection())
         app_logger.info("System metrics collection started")
         
+        # Start event loop monitoring
+        if settings.LOOP_MONITOR_ENABLED:
+            _loop_monitor = LoopMonitor(
+                slow_threshold=settings.LOOP_SLOW_CALLBACK_THRESHOLD,
+                attribution_sample_rate=settings.LOOP_ATTRIBUTION_RATE,
+                metric_prefix="coinlink"
+            )
+            await _loop_monitor.start()
+            app_logger.info("Event loop monitoring started")
+        
         app_logger.info("Observability stack fully initialized")
         
     except Exception as e:
@@ -45,9 +64,14 @@ async def shutdown_observability():
     """
     Shutdown observability components
     """
-    global _metrics_task
+    global _metrics_task, _loop_monitor
     
     try:
+        # Stop event loop monitoring
+        if _loop_monitor:
+            _loop_monitor.stop()
+            _loop_monitor = None
+        
         # Stop metrics collection
         if _metrics_task and not _metrics_task.done():
             _metrics_task.cancel()
@@ -78,6 +102,10 @@ __all__ = [
     'create_instrumentator',
     'get_metrics_response',
     
+    # Event loop
+    'LoopMonitor',
+    'get_loop_monitor',
+    
     # Initialization
     'initialize_observability',
     'shutdown_observability'
@@ -0,0 +1,423 @@
+"""
+Event loop instrumentation: scheduling lag, slow callbacks and per-coroutine time
+
+Kept byte-identical in backend/observability/loop_monitor.py and
+parallel-processing-framework/core/loop_monitor.py; CI fails when they
+differ, so edit both. Callers pass their own metric_prefix.
+
+The two copies exist because neither package can import from the other:
+the backend image (Dockerfile, backend/Dockerfile.production) copies only
+backend/ and is started as ``backend.api.main_production``, while the
+framework is run from its own directory with top-level imports
+(``from core...``) and is not installed as a distribution the backend
+could depend on. There is no third package both of them install, so the
+module is vendored rather than shared; it imports nothing outside the
+standard library and the optional prometheus_client for that reason.
+"""
+import asyncio
+import collections.abc
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+try:
+    from prometheus_client import Histogram, REGISTRY
+    from prometheus_client.core import CounterMetricFamily
+except ImportError:  # metrics export is optional
+    Histogram = None
+    REGISTRY = None
+    CounterMetricFamily = None
+
+logger = logging.getLogger(__name__)
+
+
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+@dataclass
+class SlowCallback:
+    """One stretch during which the loop was blocked longer than the threshold"""
+    detected_at: datetime
+    duration: float
+    coroutine: Optional[str]
+    stack: Optional[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'detected_at': self.detected_at.isoformat(),
+            'duration': self.duration,
+            'coroutine': self.coroutine,
+            'stack': self.stack
+        }
+
+
+def coroutine_name(coro: Any) -> str:
+    """Qualified name used to attribute a coroutine's time"""
+    code = getattr(coro, 'cr_code', None) or getattr(coro, 'gi_code', None)
+    module = code.co_filename.rsplit('/', 1)[-1][:-3] if code else ''
+    name = getattr(coro, '__qualname__', None) or type(coro).__name__
+    return f"{module}.{name}" if module else name
+
+
+_ASYNCIO_DIR = asyncio.__file__.rsplit('/', 1)[0]
+_perf_counter = time.perf_counter
+
+
+def _format_blocking_stack(frame) -> str:
+    """Stack of the blocked loop thread without asyncio's and this module's own frames"""
+    frames = [
+        entry for entry in traceback.extract_stack(frame)
+        if not entry.filename.startswith(_ASYNCIO_DIR) and entry.filename != __file__
+    ]
+    return ''.join(traceback.format_list(frames))
+
+
+class _TimedCoroutine(collections.abc.Coroutine):
+    """Wraps a task's coroutine and adds the duration of every step to ``totals[name]``"""
+
+    __slots__ = ('_coro', '_totals')
+
+    def __init__(self, coro, totals: List[float]):
+        self._coro = coro
+        self._totals = totals  # [seconds, steps], shared by every coroutine with this name
+
+    def send(self, value):
+        start = _perf_counter()
+        try:
+            return self._coro.send(value)
+        finally:
+            totals = self._totals
+            totals[0] += _perf_counter() - start
+            totals[1] += 1
+
+    def throw(self, *args):
+        start = _perf_counter()
+        try:
+            return self._coro.throw(*args)
+        finally:
+            totals = self._totals
+            totals[0] += _perf_counter() - start
+            totals[1] += 1
+
+    def close(self):
+        return self._coro.close()
+
+    def __await__(self):
+        return self
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.send(None)
+
+    def __getattr__(self, name):
+        # cr_frame, cr_code, __qualname__ ... for task reprs and debuggers
+        return getattr(self._coro, name)
+
+
+class LoopMonitor:
+    """Measures how responsive an event loop is.
+
+    - A sampler task sleeps ``sample_interval`` and records how late it woke
+      up: the loop's scheduling lag.
+    - A watchdog thread notices when the sampler is overdue by more than
+      ``slow_threshold`` and captures the loop thread's stack and running
+      task while the loop is still blocked, so the offending call (bcrypt,
+      smtplib, a sync pickle write...) shows up in the report.
+    - Tasks created through ``attach``'s task factory (or ``wrap_coroutine``)
+      have every step timed and summed per coroutine name. Only every
+      ``1 / attribution_sample_rate``-th task is wrapped.
+
+    Lag and slow-callback durations are exported as Prometheus histograms
+    and coroutine time as counters when prometheus_client is installed.
+    """
+
+    def __init__(self,
+                 sample_interval: float = 0.1,
+                 slow_threshold: float = 0.1,
+                 attribution_sample_rate: float = 0.1,
+                 max_slow_callbacks: int = 100,
+                 metric_prefix: str = "asyncio",
+                 registry: Any = None):
+        self.sample_interval = sample_interval
+        self.slow_threshold = slow_threshold
+        self.attribution_every = max(1, round(1 / attribution_sample_rate)) if attribution_sample_rate > 0 else 0
+        self.metric_prefix = metric_prefix
+        self.registry = registry if registry is not None else REGISTRY
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.is_running = False
+        self._sampler_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._previous_factory: Optional[Callable] = None
+
+        # Lag samples and slow callbacks
+        self.lag_samples: Deque[float] = deque(maxlen=1000)
+        self.max_lag = 0.0
+        self.total_samples = 0
+        self.slow_callbacks: Deque[SlowCallback] = deque(maxlen=max_slow_callbacks)
+        self.total_slow_callbacks = 0
+
+        # State shared with the watchdog thread
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = time.monotonic()
+        self._captured_beat: Optional[float] = None
+        self._captured: Optional[SlowCallback] = None
+
+        # Per-coroutine [seconds, steps]
+        self.coroutine_times: Dict[str, List[float]] = {}
+        self._tasks_seen = 0
+
+        self._lag_histogram = None
+        self._slow_histogram = None
+        self._collector = None
+
+    # Lifecycle
+
+    def attach(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Install a task factory on ``loop`` that wraps new tasks for time attribution"""
+        self.loop = loop
+        if not self.attribution_every:
+            return
+        self._previous_factory = loop.get_task_factory()
+        loop.set_task_factory(self._task_factory)
+
+    def detach(self) -> None:
+        """Restore the task factory replaced by ``attach``"""
+        if self.loop is not None and self.loop.get_task_factory() == self._task_factory:
+            self.loop.set_task_factory(self._previous_factory)
+        self._previous_factory = None
+
+    def start_soon(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start monitoring ``loop``; the sampler begins once the loop runs"""
+        if self.is_running:
+            return
+        self.loop = loop
+        self.is_running = True
+        self._stop_event.clear()
+        self._register_metrics()
+
+        self._sampler_task = loop.create_task(self._sample_loop())
+        self._watchdog = threading.Thread(target=self._watch, name="LoopMonitor-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def start(self, attach: bool = True) -> None:
+        """Start monitoring the running loop (e.g. from a FastAPI lifespan)"""
+        loop = asyncio.get_running_loop()
+        if attach:
+            self.attach(loop)
+        self.start_soon(loop)
+
+    def stop(self) -> None:
+        """Stop sampling and the watchdog; keeps collected statistics"""
+        if not self.is_running:
+            return
+        self.is_running = False
+        self._stop_event.set()
+        if self._sampler_task is not None and not self._sampler_task.done():
+            self._sampler_task.cancel()
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+        self.detach()
+        self._unregister_metrics()
+
+    # Time attribution
+
+    def _task_factory(self, loop: asyncio.AbstractEventLoop, coro, **kwargs) -> asyncio.Future:
+        coro = self.wrap_coroutine(coro)
+        if self._previous_factory is not None:
+            return self._previous_factory(loop, coro, **kwargs)
+        return asyncio.Task(coro, loop=loop, **kwargs)
+
+    def wrap_coroutine(self, coro):
+        """Return ``coro`` wrapped for per-step timing if it is picked by the sampling rate"""
+        if not self.attribution_every or not asyncio.iscoroutine(coro) or isinstance(coro, _TimedCoroutine):
+            return coro
+        self._tasks_seen += 1
+        if (self._tasks_seen - 1) % self.attribution_every:
+            return coro
+
+        name = coroutine_name(coro)
+        totals = self.coroutine_times.get(name)
+        if totals is None:
+            totals = self.coroutine_times[name] = [0.0, 0]
+        return _TimedCoroutine(coro, totals)
+
+    # Lag sampling and slow-callback detection
+
+    async def _sample_loop(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        interval = self.sample_interval
+        while self.is_running:
+            try:
+                expected = time.monotonic() + interval
+                self._heartbeat = expected
+                await asyncio.sleep(interval)
+                lag = max(0.0, time.monotonic() - expected)
+                self._record_lag(lag, expected)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Loop monitor sampling error: {e}")
+
+    def _record_lag(self, lag: float, beat: float) -> None:
+        self.lag_samples.append(lag)
+        self.total_samples += 1
+        if lag > self.max_lag:
+            self.max_lag = lag
+        if self._lag_histogram is not None:
+            self._lag_histogram.observe(lag)
+
+        if lag < self.slow_threshold:
+            return
+
+        captured = self._captured if self._captured_beat == beat else None
+        event = SlowCallback(
+            detected_at=captured.detected_at if captured else datetime.utcnow(),
+            duration=lag,
+            coroutine=captured.coroutine if captured else None,
+            stack=captured.stack if captured else None
+        )
+        self._captured = None
+        self.slow_callbacks.append(event)
+        self.total_slow_callbacks += 1
+        if self._slow_histogram is not None:
+            self._slow_histogram.labels(coroutine=event.coroutine or 'unknown').observe(lag)
+
+        where = f" in {event.coroutine}" if event.coroutine else ""
+        logger.warning(f"Event loop blocked for {lag * 1000:.1f}ms{where}"
+                       + (f"\n{event.stack}" if event.stack else ""))
+
+    def _watch(self) -> None:
+        """Watchdog thread: snapshot the loop thread while it is blocked"""
+        check_every = max(0.005, self.slow_threshold / 2)
+        while not self._stop_event.wait(check_every):
+            beat = self._heartbeat
+            if self._loop_thread_id is None or beat == self._captured_beat:
+                continue
+            if time.monotonic() - beat < self.slow_threshold:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            task = None
+            try:
+                task = asyncio.current_task(self.loop)
+            except Exception:
+                pass
+            self._captured = SlowCallback(
+                detected_at=datetime.utcnow(),
+                duration=0.0,
+                coroutine=coroutine_name(task.get_coro()) if task is not None else None,
+                stack=_format_blocking_stack(frame) if frame is not None else None
+            )
+            self._captured_beat = beat
+
+    # Metrics
+
+    def _register_metrics(self) -> None:
+        if Histogram is None or self.registry is None or self._lag_histogram is not None:
+            return
+        try:
+            self._lag_histogram = Histogram(
+                f'{self.metric_prefix}_event_loop_lag_seconds',
+                'Event loop scheduling lag',
+                buckets=LAG_BUCKETS,
+                registry=self.registry
+            )
+            self._slow_histogram = Histogram(
+                f'{self.metric_prefix}_event_loop_slow_callback_seconds',
+                'Duration of loop stalls over the slow-callback threshold',
+                ['coroutine'],
+                buckets=LAG_BUCKETS,
+                registry=self.registry
+            )
+            self._collector = _CoroutineTimeCollector(self)
+            self.registry.register(self._collector)
+        except ValueError as e:
+            # Another monitor already exports under this prefix
+            logger.warning(f"Loop monitor metrics not registered: {e}")
+            self._unregister_metrics()
+
+    def _unregister_metrics(self) -> None:
+        for collector in (self._lag_histogram, self._slow_histogram, self._collector):
+            if collector is not None:
+                try:
+                    self.registry.unregister(collector)
+                except KeyError:
+                    pass
+        self._lag_histogram = None
+        self._slow_histogram = None
+        self._collector = None
+
+    # Reporting
+
+    def top_coroutines(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Coroutines that held the loop longest (sampled time scaled to all tasks)"""
+        scale = self.attribution_every or 1
+        ranked = sorted(self.coroutine_times.items(), key=lambda item: item[1][0], reverse=True)
+        return [
+            {
+                'coroutine': name,
+                'seconds': seconds * scale,
+                'steps': int(steps * scale),
+                'mean_step_ms': seconds / steps * 1000 if steps else 0.0
+            }
+            for name, (seconds, steps) in ranked[:limit]
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        samples = sorted(self.lag_samples)
+
+        def pct(p: float) -> float:
+            return samples[min(len(samples) - 1, int(len(samples) * p))] if samples else 0.0
+
+        return {
+            'is_running': self.is_running,
+            'sample_interval': self.sample_interval,
+            'slow_threshold': self.slow_threshold,
+            'samples': self.total_samples,
+            'lag_p50': pct(0.50),
+            'lag_p95': pct(0.95),
+            'lag_p99': pct(0.99),
+            'lag_max': self.max_lag,
+            'slow_callbacks': self.total_slow_callbacks,
+            'recent_slow_callbacks': [event.to_dict() for event in list(self.slow_callbacks)[-5:]],
+            'top_coroutines': self.top_coroutines()
+        }
+
+
+class _CoroutineTimeCollector:
+    """Exports per-coroutine loop time at scrape time instead of on every step"""
+
+    def __init__(self, monitor: LoopMonitor):
+        self.monitor = monitor
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        prefix = self.monitor.metric_prefix
+        scale = self.monitor.attribution_every or 1
+        seconds = CounterMetricFamily(
+            f'{prefix}_coroutine_loop_seconds',
+            'Time coroutines spent running on the event loop',
+            labels=['coroutine']
+        )
+        steps = CounterMetricFamily(
+            f'{prefix}_coroutine_steps',
+            'Coroutine steps run on the event loop',
+            labels=['coroutine']
+        )
+        for name, (total, count) in list(self.monitor.coroutine_times.items()):
+            seconds.add_metric([name], total * scale)
+            steps.add_metric([name], count * scale)
+        yield seconds
+        yield steps
@@ -0,0 +1,173 @@
+"""
+R&D Agent Coordinator
+Concurrent fan-out of R&D agent calls under a single deadline
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class AgentCall:
+    """One agent invocation in a coordination round"""
+    agent_name: str
+    task_type: str
+    description: str
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    inputs: Optional[Hashable] = None  # fingerprint of the data the agent works on; None = always invoke
+
+    def cache_key(self) -> Optional[tuple]:
+        if self.inputs is None:
+            return None
+        return (self.task_type, self.description, json.dumps(self.parameters, sort_keys=True, default=str), self.inputs)
+
+@dataclass
+class AgentCoordinationMetrics:
+    """Latency and outcome counters for one agent"""
+    invocations: int = 0
+    completed: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    cache_hits: int = 0
+    last_latency: float = 0.0
+    latencies: deque = field(default_factory=lambda: deque(maxlen=100))
+
+    def to_dict(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        return {
+            "invocations": self.invocations,
+            "completed": self.completed,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "last_latency": self.last_latency,
+            "average_latency": sum(latencies) / len(latencies) if latencies else 0.0,
+            "p95_latency": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0
+        }
+
+class AgentCoordinator:
+    """Runs agent calls concurrently and returns whatever finished by the deadline"""
+
+    def __init__(self, deadline: float = 60.0, cache_ttl: float = 3600.0):
+        self.deadline = deadline
+        self.cache_ttl = cache_ttl  # cached results older than this are refreshed even if inputs are unchanged
+
+        self.metrics: Dict[str, AgentCoordinationMetrics] = {}
+        self._cache: Dict[str, tuple] = {}  # agent_name -> (cache key, result, stored at)
+        self.last_round: Dict[str, Any] = {}
+
+    async def coordinate(self,
+                         calls: List[AgentCall],
+                         invoke: Callable[..., Awaitable[Dict[str, Any]]],
+                         deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Invoke every call concurrently and return {agent_name: result} in call order.
+
+        ``invoke(agent_name, task_type, description, parameters)`` performs
+        one call. Calls still running at the deadline are cancelled and get
+        a ``{"status": "timeout"}`` result; calls whose inputs are unchanged
+        since their last completed result reuse it.
+        """
+
+        deadline = self.deadline if deadline is None else deadline
+        started = time.perf_counter()
+        results: Dict[str, Any] = {}
+        running: Dict[asyncio.Task, AgentCall] = {}
+
+        for call in calls:
+            cached = self._cached_result(call)
+            if cached is not None:
+                self._metrics(call.agent_name).cache_hits += 1
+                results[call.agent_name] = cached
+            else:
+                task = asyncio.create_task(self._timed(invoke, call))
+                running[task] = call
+
+        if running:
+            done, pending = await asyncio.wait(running, timeout=deadline)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+            for task, call in running.items():
+                metrics = self._metrics(call.agent_name)
+                metrics.invocations += 1
+                if task in done:
+                    status, result, latency = task.result()
+                    if status == "completed":
+                        metrics.completed += 1
+                        self._store(call, result)
+                    else:
+                        metrics.errors += 1
+                else:
+                    latency = deadline
+                    metrics.timeouts += 1
+                    logger.warning(f"Agent {call.agent_name} timed out after {deadline:.0f}s")
+                    result = {"status": "timeout", "error": "Agent response timeout"}
+                metrics.last_latency = latency
+                metrics.latencies.append(latency)
+                results[call.agent_name] = result
+
+        ordered = {call.agent_name: results[call.agent_name] for call in calls}
+        self.last_round = {
+            "wall_time": time.perf_counter() - started,
+            "deadline": deadline,
+            "agents": len(calls),
+            "completed": sum(1 for r in ordered.values() if r.get("status") == "completed"),
+            "timed_out": [name for name, r in ordered.items() if r.get("status") == "timeout"],
+            "failed": [name for name, r in ordered.items() if r.get("status") == "error"],
+            "cached": [name for name, r in ordered.items() if r.get("cached")]
+        }
+        self.last_round["partial"] = bool(self.last_round["timed_out"] or self.last_round["failed"])
+        return ordered
+
+    async def _timed(self, invoke: Callable[..., Awaitable[Dict[str, Any]]], call: AgentCall) -> tuple:
+        """(status, result, latency) of one call; errors become results"""
+        started = time.perf_counter()
+        try:
+            result = await invoke(call.agent_name, call.task_type, call.description, call.parameters)
+            status = result.get("status", "completed") if isinstance(result, dict) else "completed"
+        except Exception as e:
+            logger.error(f"Error invoking agent {call.agent_name}: {e}")
+            result, status = {"status": "error", "error": str(e)}, "error"
+        return status, result, time.perf_counter() - started
+
+    def _cached_result(self, call: AgentCall) -> Optional[Dict[str, Any]]:
+        key = call.cache_key()
+        entry = self._cache.get(call.agent_name)
+        if key is None or entry is None or entry[0] != key or time.time() - entry[2] > self.cache_ttl:
+            return None
+        return {**entry[1], "cached": True}
+
+    def _store(self, call: AgentCall, result: Dict[str, Any]):
+        key = call.cache_key()
+        if key is None:
+            self._cache.pop(call.agent_name, None)
+        else:
+            self._cache[call.agent_name] = (key, result, time.time())
+
+    def _metrics(self, agent_name: str) -> AgentCoordinationMetrics:
+        metrics = self.metrics.get(agent_name)
+        if metrics is None:
+            metrics = self.metrics[agent_name] = AgentCoordinationMetrics()
+        return metrics
+
+    def invalidate(self, agent_name: Optional[str] = None):
+        """Drop cached results (of one agent, or all)"""
+        if agent_name is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(agent_name, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "deadline": self.deadline,
+            "last_round": self.last_round,
+            "agents": {name: metrics.to_dict() for name, metrics in self.metrics.items()}
+        }
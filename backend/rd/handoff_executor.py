@@ -0,0 +1,341 @@
+"""
+R&D Handoff Executor
+Concurrent delivery of production handoffs, grouped by destination department
+
+Each department drains its handoffs with its own concurrency limit, so a
+slow department only delays its own handoffs. Failed or timed-out
+deliveries go to a local sqlite retry queue and are retried with
+exponential backoff; handoffs that keep failing are kept as dead letters.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETRY_QUEUE_PATH = os.getenv("RD_HANDOFF_RETRY_PATH", "/tmp/coinlink_rd/handoff_retries.db")
+
+@dataclass
+class PendingHandoff:
+    """One handoff awaiting delivery to a department"""
+    department: str
+    package: Dict[str, Any]
+    attempts: int = 0               # failed deliveries so far
+    retry_id: Optional[int] = None  # row in the retry queue, for retried handoffs
+
+class HandoffRetryQueue:
+    """sqlite store of failed handoffs; the database is opened on first use"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or DEFAULT_RETRY_QUEUE_PATH
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()  # writes run off the event loop
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS retries (
+                    id INTEGER PRIMARY KEY,
+                    innovation_id TEXT,
+                    department TEXT NOT NULL,
+                    package TEXT NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    due REAL NOT NULL,
+                    last_error TEXT,
+                    dead INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS idx_retries_due ON retries (dead, due);
+            """)
+            self._db = db
+        return self._db
+
+    def record(self, failures: List[Tuple[PendingHandoff, float, str]], dead: List[Tuple[PendingHandoff, str]]):
+        """Schedule (handoff, due, error) retries and keep dead letters, in one transaction"""
+        with self._lock:
+            db = self._connection()
+            with db:
+                for handoff, due, error in failures:
+                    self._upsert(db, handoff, due, error, 0)
+                for handoff, error in dead:
+                    self._upsert(db, handoff, 0.0, error, 1)
+
+    @staticmethod
+    def _upsert(db: sqlite3.Connection, handoff: PendingHandoff, due: float, error: str, dead: int):
+        if handoff.retry_id is None:
+            db.execute(
+                "INSERT INTO retries (innovation_id, department, package, attempts, due, last_error, dead) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (handoff.package.get("innovation_id"), handoff.department, json.dumps(handoff.package, default=str),
+                 handoff.attempts, due, error, dead)
+            )
+        else:
+            db.execute("UPDATE retries SET attempts = ?, due = ?, last_error = ?, dead = ? WHERE id = ?",
+                       (handoff.attempts, due, error, dead, handoff.retry_id))
+
+    def claim_due(self, now: float, limit: int, lease: float,
+                  per_department: Optional[Callable[[str], int]] = None) -> List[PendingHandoff]:
+        """Up to ``limit`` retries due by ``now``, leased for ``lease`` seconds.
+
+        With ``per_department``, at most ``per_department(department)`` of
+        each department's oldest due retries are claimed. A claimed retry is
+        not handed out again until the lease runs out, so a retry whose
+        outcome was never recorded (a crash mid-delivery) is picked up again
+        later.
+        """
+        with self._lock:
+            db = self._connection()
+            with db:
+                candidates = db.execute(
+                    "SELECT id, department, ROW_NUMBER() OVER (PARTITION BY department ORDER BY due, id) "
+                    "FROM retries WHERE dead = 0 AND due <= ? ORDER BY due, id", (now,)
+                ).fetchall()
+                ids = [retry_id for retry_id, department, position in candidates
+                       if per_department is None or position <= per_department(department)][:limit]
+                rows = db.execute(
+                    f"SELECT id, department, package, attempts FROM retries WHERE id IN ({', '.join('?' * len(ids))}) "
+                    "ORDER BY due, id", ids
+                ).fetchall() if ids else []
+                db.executemany("UPDATE retries SET due = ? WHERE id = ?", [(now + lease, row[0]) for row in rows])
+        return [PendingHandoff(row[1], json.loads(row[2]), row[3], row[0]) for row in rows]
+
+    def delete(self, retry_ids: List[int]):
+        with self._lock:
+            db = self._connection()
+            with db:
+                db.executemany("DELETE FROM retries WHERE id = ?", [(retry_id,) for retry_id in retry_ids])
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT id, innovation_id, department, attempts, last_error FROM retries WHERE dead = 1 "
+                "ORDER BY id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [{"retry_id": row[0], "innovation_id": row[1], "department": row[2],
+                 "attempts": row[3], "last_error": row[4]} for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            pending, dead = self._connection().execute(
+                "SELECT COALESCE(SUM(dead = 0), 0), COALESCE(SUM(dead = 1), 0) FROM retries"
+            ).fetchone()
+        return {"pending": pending, "dead": dead}
+
+@dataclass
+class DepartmentHandoffMetrics:
+    """Delivery counters and latencies for one department"""
+    dispatched: int = 0
+    delivered: int = 0
+    failed: int = 0
+    timeouts: int = 0
+    in_flight: int = 0
+    delivery_latencies: deque = field(default_factory=lambda: deque(maxlen=1000))  # department call
+    handoff_latencies: deque = field(default_factory=lambda: deque(maxlen=1000))   # prepared -> delivered
+
+    @staticmethod
+    def _summary(samples: deque) -> Dict[str, float]:
+        ordered = sorted(samples)
+        return {
+            "average": sum(ordered) / len(ordered) if ordered else 0.0,
+            "p50": ordered[len(ordered) // 2] if ordered else 0.0,
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else 0.0
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "dispatched": self.dispatched,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "in_flight": self.in_flight,
+            "delivery_latency": self._summary(self.delivery_latencies),
+            "handoff_latency": self._summary(self.handoff_latencies)
+        }
+
+class HandoffExecutor:
+    """Delivers handoffs concurrently across departments, with a concurrency limit per department"""
+
+    def __init__(self,
+                 deliver: Callable[[str, Dict[str, Any]], Awaitable[Any]],
+                 concurrency: Optional[Dict[str, int]] = None,
+                 default_concurrency: int = 4,
+                 delivery_timeout: float = 30.0,
+                 retry_queue: Optional[HandoffRetryQueue] = None,
+                 max_attempts: int = 5,
+                 base_backoff: float = 60.0,
+                 max_backoff: float = 3600.0):
+        self.deliver = deliver  # deliver(department, package); raises or returns False on failure
+        self.concurrency = dict(concurrency or {})
+        self.default_concurrency = default_concurrency
+        self.delivery_timeout = delivery_timeout
+        self.retry_queue = retry_queue or HandoffRetryQueue()
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self.metrics: Dict[str, DepartmentHandoffMetrics] = {}
+        self.totals = {"dispatches": 0, "handoffs": 0, "delivered": 0, "retries_scheduled": 0,
+                       "dead_lettered": 0, "busy_time": 0.0}
+        self.last_dispatch: Dict[str, Any] = {}
+
+    async def dispatch(self, handoffs: List[PendingHandoff], include_due_retries: bool = True) -> List[Dict[str, Any]]:
+        """Deliver ``handoffs`` (plus retries now due) and return one outcome per handoff, in order.
+
+        Departments run concurrently; within a department at most its
+        concurrency limit of deliveries are in flight. Each dispatch claims
+        at most one concurrency limit of due retries per department, after
+        that department's new handoffs, and leases them for as many delivery
+        timeouts as the department can take to get through its share, plus
+        one; an overlapping dispatch cannot claim them again meanwhile.
+        Returns once every delivery has succeeded, failed or timed out.
+        """
+        started = time.perf_counter()
+        handoffs = list(handoffs)
+        if include_due_retries:
+            new_per_department = Counter(handoff.department for handoff in handoffs)
+            rounds = max((math.ceil(count / self._limit(department)) for department, count in new_per_department.items()),
+                         default=0) + 1  # the claimed retries take at most one more round
+            handoffs += await asyncio.to_thread(self.retry_queue.claim_due, time.time(), 1000,
+                                                (rounds + 1) * self.delivery_timeout, self._limit)
+
+        by_department: Dict[str, List[int]] = {}
+        for index, handoff in enumerate(handoffs):
+            by_department.setdefault(handoff.department, []).append(index)
+
+        outcomes: List[Optional[Dict[str, Any]]] = [None] * len(handoffs)
+        await asyncio.gather(*(self._drain_department(department, indexes, handoffs, outcomes)
+                               for department, indexes in by_department.items()))
+        await self._record(handoffs, outcomes)
+
+        wall_time = time.perf_counter() - started
+        delivered = sum(1 for outcome in outcomes if outcome["status"] == "delivered")
+        self.totals["dispatches"] += 1
+        self.totals["handoffs"] += len(handoffs)
+        self.totals["delivered"] += delivered
+        self.totals["busy_time"] += wall_time
+        self.last_dispatch = {
+            "handoffs": len(handoffs),
+            "delivered": delivered,
+            "departments": {department: len(indexes) for department, indexes in by_department.items()},
+            "wall_time": wall_time,
+            "throughput": delivered / wall_time if wall_time > 0 else 0.0,
+            "timestamp": datetime.now().isoformat()
+        }
+        return outcomes
+
+    async def _drain_department(self, department: str, indexes: List[int],
+                                handoffs: List[PendingHandoff], outcomes: List[Optional[Dict[str, Any]]]):
+        queue = iter(indexes)  # workers share one iterator; each takes the next handoff when free
+
+        async def worker():
+            for index in queue:
+                outcomes[index] = await self._deliver_one(handoffs[index])
+
+        await asyncio.gather(*(worker() for _ in range(min(self._limit(department), len(indexes)))))
+
+    def _limit(self, department: str) -> int:
+        """Deliveries to ``department`` in flight at once"""
+        return max(1, self.concurrency.get(department, self.default_concurrency))
+
+    async def _deliver_one(self, handoff: PendingHandoff) -> Dict[str, Any]:
+        metrics = self._metrics(handoff.department)
+        metrics.dispatched += 1
+        metrics.in_flight += 1
+        started = time.perf_counter()
+        error = None
+        try:
+            result = await asyncio.wait_for(self.deliver(handoff.department, handoff.package), self.delivery_timeout)
+            if result is False:
+                error = "Department rejected the handoff"
+        except asyncio.TimeoutError:
+            metrics.timeouts += 1
+            error = f"Delivery timed out after {self.delivery_timeout:g}s"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        finally:
+            metrics.in_flight -= 1
+        latency = time.perf_counter() - started
+        metrics.delivery_latencies.append(latency)
+
+        outcome = {
+            "innovation_id": handoff.package.get("innovation_id"),
+            "feature_name": handoff.package.get("feature_name"),
+            "department": handoff.department,
+            "attempts": handoff.attempts + 1,
+            "delivery_latency": latency
+        }
+        if error is None:
+            metrics.delivered += 1
+            handoff_latency = self._handoff_latency(handoff.package)
+            if handoff_latency is not None:
+                metrics.handoff_latencies.append(handoff_latency)
+            outcome.update(status="delivered", handoff_latency=handoff_latency)
+        else:
+            metrics.failed += 1
+            logger.warning(f"Handoff of {handoff.package.get('feature_name')} to {handoff.department} failed: {error}")
+            outcome.update(status="failed", error=error)
+        return outcome
+
+    @staticmethod
+    def _handoff_latency(package: Dict[str, Any]) -> Optional[float]:
+        """Seconds from handoff preparation to delivery"""
+        try:
+            return max(0.0, time.time() - datetime.fromisoformat(package["handoff_timestamp"]).timestamp())
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    async def _record(self, handoffs: List[PendingHandoff], outcomes: List[Dict[str, Any]]):
+        """Persist the retry queue changes of one dispatch"""
+        now = time.time()
+        delivered, failures, dead = [], [], []
+        for handoff, outcome in zip(handoffs, outcomes):
+            if outcome["status"] == "delivered":
+                if handoff.retry_id is not None:
+                    delivered.append(handoff.retry_id)
+                continue
+            handoff.attempts += 1
+            if handoff.attempts >= self.max_attempts:
+                dead.append((handoff, outcome["error"]))
+                outcome["status"] = "dead_lettered"
+            else:
+                backoff = min(self.base_backoff * 2 ** (handoff.attempts - 1), self.max_backoff)
+                failures.append((handoff, now + backoff, outcome["error"]))
+                outcome.update(status="retry_scheduled", retry_at=datetime.fromtimestamp(now + backoff).isoformat())
+
+        if delivered:
+            await asyncio.to_thread(self.retry_queue.delete, delivered)
+        if failures or dead:
+            await asyncio.to_thread(self.retry_queue.record, failures, dead)
+            self.totals["retries_scheduled"] += len(failures)
+            self.totals["dead_lettered"] += len(dead)
+
+    def _metrics(self, department: str) -> DepartmentHandoffMetrics:
+        metrics = self.metrics.get(department)
+        if metrics is None:
+            metrics = self.metrics[department] = DepartmentHandoffMetrics()
+        return metrics
+
+    def get_stats(self) -> Dict[str, Any]:
+        busy_time = self.totals["busy_time"]
+        return {
+            **self.totals,
+            "throughput": self.totals["delivered"] / busy_time if busy_time > 0 else 0.0,
+            "last_dispatch": self.last_dispatch,
+            "retry_queue": self.retry_queue.counts(),
+            "concurrency": {department: self.concurrency.get(department, self.default_concurrency)
+                            for department in sorted(set(self.concurrency) | set(self.metrics))},
+            "departments": {department: metrics.to_dict() for department, metrics in self.metrics.items()}
+        }
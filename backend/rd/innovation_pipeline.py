@@ -6,11 +6,16 @@ Bridge between R&D innovations and production system integration
 import asyncio
 import logging
 import json
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Awaitable, Callable, List, Optional
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from enum import Enum
 import uuid
+from bisect import bisect_right
+from collections import deque
+from itertools import islice
+
+from .handoff_executor import HandoffExecutor, PendingHandoff
 
 logger = logging.getLogger(__name__)
 
@@ -86,13 +91,66 @@ class InnovationPipeline:
             "auto_approval_threshold": 85,  # Score above which features auto-advance
             "critical_review_threshold": 95,  # Score requiring executive review
             "pipeline_timeout_days": 30,  # Max days in pipeline before review
-            "batch_handoff_size": 5  # Number of features to handoff at once
+            "batch_handoff_size": 5,  # Number of features to handoff at once
+            "handoff_departments": {  # Destination department per feature category
+                "chat_interface": "frontend",
+                "prompt_feed": "frontend",
+                "ai_reports": "backend",
+                "infrastructure": "infrastructure"
+            },
+            "default_handoff_department": "backend",
+            "handoff_concurrency": {"frontend": 4, "backend": 4, "infrastructure": 2}  # Deliveries in flight per department
         }
         
         # Integration with production system
         self.production_integration_queue = []
         self.helios_coordination_active = False
         
+        # Handoff delivery: per-department handlers (Helios coordination by default), run concurrently
+        self.department_handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]] = {}
+        self.handoff_executor = HandoffExecutor(self._deliver_handoff,
+                                                concurrency=self.pipeline_config["handoff_concurrency"])
+        
+        # Incremented on every change to the pipeline, so consumers can tell whether it changed
+        self.version = 0
+        
+        # Running aggregates, updated by every change so status and reports never scan all innovations
+        self.stage_counts: Dict[str, int] = {}
+        self.approval_counts: Dict[str, int] = {}
+        self._created_times: List[float] = []  # creation timestamps, in insertion (= time) order
+        
+        # Change log for incremental reports; event "seq" is the version the change produced
+        self.events: deque = deque(maxlen=10000)
+        
+    def _record_event(self, event_type: str, innovation: FeatureInnovation, **details):
+        """Bump the version and log one change"""
+        self.version += 1
+        self.events.append({
+            "seq": self.version,
+            "type": event_type,
+            "innovation_id": innovation.id,
+            "name": innovation.name,
+            "timestamp": datetime.now().isoformat(),
+            **details
+        })
+    
+    @staticmethod
+    def _shift_count(counts: Dict[str, int], old: Optional[str], new: str):
+        if old is not None:
+            counts[old] -= 1
+            if not counts[old]:
+                del counts[old]
+        counts[new] = counts.get(new, 0) + 1
+    
+    def events_since(self, version: int) -> tuple:
+        """(events after ``version``, whether the log still holds all of them); costs O(new events)"""
+        missing = self.version - version
+        if missing <= 0:
+            return [], True
+        events = list(islice(reversed(self.events), missing))
+        events.reverse()
+        return events, len(events) == missing
+        
     def add_innovation(self, innovation_data: Dict[str, Any]) -> str:
         """Add new innovation to pipeline"""
         innovation_id = str(uuid.uuid4())
@@ -122,6 +180,10 @@ class InnovationPipeline:
         })
         
         self.innovations[innovation_id] = innovation
+        self._shift_count(self.stage_counts, None, innovation.current_stage.value)
+        self._shift_count(self.approval_counts, None, innovation.approval_status.value)
+        self._created_times.append(innovation.created_at.timestamp())
+        self._record_event("added", innovation, stage=innovation.current_stage.value)
         logger.info(f"Added innovation {innovation.name} to pipeline with ID {innovation_id}")
         
         return innovation_id
@@ -151,6 +213,8 @@ class InnovationPipeline:
             if current_index < len(stage_flow) - 1:
                 next_stage = stage_flow[current_index + 1]
                 innovation.current_stage = next_stage
+                self._shift_count(self.stage_counts, current_stage.value, next_stage.value)
+                self._record_event("advanced", innovation, from_stage=current_stage.value, stage=next_stage.value)
                 
                 # Record stage transition
                 innovation.stage_history.append({
@@ -221,8 +285,10 @@ class InnovationPipeline:
             return False
         
         innovation = self.innovations[innovation_id]
+        self._shift_count(self.approval_counts, innovation.approval_status.value, status.value)
         innovation.approval_status = status
         innovation.approval_notes = notes
+        self._record_event("approval", innovation, status=status.value)
         
         # Record approval decision
         innovation.stakeholder_feedback.append({
@@ -274,6 +340,7 @@ class InnovationPipeline:
         
         # Add to production integration queue
         self.production_integration_queue.append(handoff_package)
+        self._record_event("handoff_prepared", innovation, priority=handoff_package["priority"])
         
         # Advance innovation stage
         self.advance_innovation_stage(innovation_id, "Prepared for production handoff")
@@ -353,24 +420,14 @@ class InnovationPipeline:
     
     def get_pipeline_status(self) -> Dict[str, Any]:
         """Get comprehensive pipeline status"""
-        stage_counts = {}
-        approval_counts = {}
-        
-        for innovation in self.innovations.values():
-            stage = innovation.current_stage.value
-            approval = innovation.approval_status.value
-            
-            stage_counts[stage] = stage_counts.get(stage, 0) + 1
-            approval_counts[approval] = approval_counts.get(approval, 0) + 1
-        
         # Calculate metrics
         total_innovations = len(self.innovations)
-        approved_count = approval_counts.get("approved", 0)
+        approved_count = self.approval_counts.get("approved", 0)
         
         return {
             "total_innovations": total_innovations,
-            "stage_distribution": stage_counts,
-            "approval_distribution": approval_counts,
+            "stage_distribution": dict(self.stage_counts),
+            "approval_distribution": dict(self.approval_counts),
             "approval_rate": approved_count / total_innovations if total_innovations > 0 else 0,
             "production_queue_size": len(self.production_integration_queue),
             "helios_coordination_active": self.helios_coordination_active,
@@ -383,12 +440,9 @@ class InnovationPipeline:
         if not self.innovations:
             return "empty"
         
-        # Check for stalled innovations
-        stalled_count = 0
-        for innovation in self.innovations.values():
-            days_in_current_stage = (datetime.now() - innovation.created_at).days
-            if days_in_current_stage > self.pipeline_config["pipeline_timeout_days"]:
-                stalled_count += 1
+        # Stalled innovations: more than pipeline_timeout_days whole days old
+        cutoff = datetime.now() - timedelta(days=self.pipeline_config["pipeline_timeout_days"] + 1)
+        stalled_count = bisect_right(self._created_times, cutoff.timestamp())
         
         stall_rate = stalled_count / len(self.innovations)
         
@@ -433,10 +487,30 @@ class InnovationPipeline:
         
         return ready_innovations
     
-    def process_batch_handoffs(self) -> List[Dict[str, Any]]:
-        """Process batch of innovations ready for production handoff"""
-        handoff_results = []
+    def register_department_handler(self, department: str, handler: Callable[[Dict[str, Any]], Awaitable[Any]],
+                                    concurrency: Optional[int] = None):
+        """Deliver handoffs for ``department`` with ``handler(package)``; it raises or returns False on failure"""
+        self.department_handlers[department] = handler
+        if concurrency is not None:
+            self.handoff_executor.concurrency[department] = concurrency
+    
+    def _handoff_department(self, handoff_package: Dict[str, Any]) -> str:
+        """Destination department of a handoff package"""
+        return self.pipeline_config["handoff_departments"].get(
+            handoff_package.get("category"), self.pipeline_config["default_handoff_department"]
+        )
+    
+    async def _deliver_handoff(self, department: str, handoff_package: Dict[str, Any]) -> Any:
+        handler = self.department_handlers.get(department, self.coordinate_with_helios)
+        return await handler(handoff_package)
+    
+    async def process_batch_handoffs(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Prepare a batch of approved innovations for handoff and deliver them to their departments.
         
+        Departments are served concurrently, each within its own concurrency
+        limit; handoffs whose delivery fails are retried on later batches.
+        Each returned package carries its delivery outcome under "delivery".
+        """
         # Get approved innovations ready for handoff
         ready_for_handoff = [
             innovation for innovation in self.innovations.values()
@@ -445,14 +519,24 @@ class InnovationPipeline:
         ]
         
         # Process up to batch size
-        batch_size = min(len(ready_for_handoff), self.pipeline_config["batch_handoff_size"])
-        
-        for i in range(batch_size):
-            innovation = ready_for_handoff[i]
+        batch_size = min(len(ready_for_handoff), limit or self.pipeline_config["batch_handoff_size"])
+        handoffs = []
+        for innovation in ready_for_handoff[:batch_size]:
             handoff_package = self.prepare_production_handoff(innovation.id)
-            handoff_results.append(handoff_package)
+            handoffs.append(PendingHandoff(self._handoff_department(handoff_package), handoff_package))
+        
+        # Deliver, together with earlier failed handoffs now due for retry
+        outcomes = await self.handoff_executor.dispatch(handoffs)
+        handoff_results = [{**handoff.package, "delivery": outcome} for handoff, outcome in zip(handoffs, outcomes)]
+        
+        # Outcomes of retried handoffs from earlier batches follow the new ones
+        handoff_results.extend({"retried": True, "delivery": outcome} for outcome in outcomes[len(handoffs):])
         
         return handoff_results
+    
+    def get_handoff_metrics(self) -> Dict[str, Any]:
+        """Handoff throughput, latency and retry queue statistics"""
+        return self.handoff_executor.get_stats()
 
 # Global innovation pipeline instance
 innovation_pipeline = InnovationPipeline()
\ No newline at end of file
@@ -3,17 +3,18 @@ R&D Email Notification System
 Automated email reporting for innovation insights and strategic recommendations
 """
 
-import smtplib
-import ssl
 import os
 import logging
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 import json
 
+try:
+    from ..notifications import OutboundMailer, SMTPTransport, default_spool_path
+except ImportError:  # rd imported as a top-level package
+    from notifications import OutboundMailer, SMTPTransport, default_spool_path
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -39,6 +40,7 @@ class RDEmailNotifier:
         self.sender_email = os.getenv("SENDER_EMAIL", "noreply@coinlink.app")
         self.sender_password = os.getenv("SENDER_PASSWORD", "")
         self.default_recipient = "shayan.bozorgmanesh@gmail.com"
+        self._mailer: Optional[OutboundMailer] = None
         
         # Email templates and styling
         self.email_templates = {
@@ -575,19 +577,18 @@ class RDEmailNotifier:
             logger.error(f"Error sending feature approval request: {e}")
             return False
     
+    @property
+    def mailer(self) -> OutboundMailer:
+        """Spooling SMTP mailer, created on first production send"""
+        if self._mailer is None:
+            transport = SMTPTransport(self.smtp_server, self.smtp_port,
+                                      username=self.sender_email, password=self.sender_password)
+            self._mailer = OutboundMailer(transport, default_spool_path("rd_email"), self.sender_email)
+        return self._mailer
+
     async def _send_email(self, recipient: str, subject: str, html_content: str) -> bool:
-        """Send email using SMTP"""
+        """Queue an email for delivery; True once it is durably spooled"""
         try:
-            # Create message
-            message = MIMEMultipart("alternative")
-            message["Subject"] = subject
-            message["From"] = self.sender_email
-            message["To"] = recipient
-            
-            # Add HTML content
-            html_part = MIMEText(html_content, "html")
-            message.attach(html_part)
-            
             # For development/demo purposes, log the email instead of sending
             if not self.sender_password or self.sender_password == "":
                 logger.info(f"EMAIL NOTIFICATION (Demo Mode):")
@@ -596,14 +597,9 @@ class RDEmailNotifier:
                 logger.info(f"Content Length: {len(html_content)} characters")
                 return True
             
-            # Send email (production mode)
-            context = ssl.create_default_context()
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls(context=context)
-                server.login(self.sender_email, self.sender_password)
-                server.sendmail(self.sender_email, recipient, message.as_string())
-            
-            logger.info(f"Email sent successfully to {recipient}")
+            # Production mode: delivered in the background over a reused SMTP connection
+            await self.mailer.send(recipient, subject, html_content)
+            logger.info(f"Email queued for {recipient}")
             return True
             
         except Exception as e:
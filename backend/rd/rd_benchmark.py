@@ -0,0 +1,353 @@
+"""
+R&D Department Benchmarks
+
+Run from the backend directory:
+
+    python -m rd.rd_benchmark coordination --latencies 0.1 0.2 0.3 0.4 0.5 0.6 --hung 3
+    python -m rd.rd_benchmark report --innovations 1000 10000 100000 --events 20
+    python -m rd.rd_benchmark handoff --handoffs 2000 --latencies 0.02 0.01 0.1
+
+``coordination`` generates thirty-minute reports with the six R&D agents
+replaced by stand-ins that answer after ``--latencies`` seconds. It
+reports report wall time with all agents answering, with one agent hung
+for ``--hung`` seconds past a ``--deadline``, and for a second report
+while the innovation pipeline is unchanged; for the current
+RDOrchestrator and for rd_orchestrator.py at a git ref (default: the
+first commit), which awaited the agents one after another.
+
+``report`` times thirty-minute report generation (agents answer at once)
+with ``--innovations`` innovations in the pipeline and ``--events``
+pipeline changes between consecutive reports, each report computing its
+delta against the previous one. The current RDOrchestrator, reading
+running aggregates and the pipeline change log and archiving every
+report, is compared with rd_orchestrator.py and innovation_pipeline.py
+at the baseline ref, which rescanned the whole pipeline per report.
+
+``handoff`` approves ``--handoffs`` innovations spread evenly over the
+chat_interface, prompt_feed, ai_reports and infrastructure categories and
+processes them as one handoff batch, with each destination department
+(frontend, backend, infrastructure) replaced by a stand-in answering
+after its ``--latencies`` seconds (infrastructure is the slow one) and
+failing ``--failure-rate`` of deliveries. It reports throughput and, per
+department, latency from handoff preparation to delivery, plus the retry
+queue afterwards. The baseline is innovation_pipeline.py at the baseline
+ref, whose batch was followed by awaiting the department calls one at a
+time; being sequential it is run on at most ``--baseline-handoffs``
+handoffs.
+
+Results are printed as JSON.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+from . import rd_orchestrator as current
+from .rd_interface import rd_agents
+from .handoff_executor import HandoffExecutor, HandoffRetryQueue
+from .report_archive import ReportArchive
+
+# the package re-exports the pipeline instance under the module's name
+pipeline_module = sys.modules[current.__package__ + ".innovation_pipeline"]
+
+def load_baseline(ref: str, filename: str):
+    """Import ``filename`` from this package as it was at git ``ref``, or None if git can't provide it"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        top = subprocess.run(["git", "rev-parse", "--show-toplevel"], cwd=here,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        path = os.path.relpath(os.path.join(here, filename), top)
+        source = subprocess.run(["git", "show", f"{ref}:{path}"], cwd=here,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    spec = importlib.util.spec_from_loader(f"rd._baseline_{os.path.splitext(filename)[0]}", loader=None)
+    module = importlib.util.module_from_spec(spec)
+    module.__package__ = "rd"
+    sys.modules[spec.name] = module
+    exec(compile(source, f"{ref}:{path}", "exec"), module.__dict__)
+    return module
+
+def root_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-list", "--max-parents=0", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.split()[0]
+    except (OSError, subprocess.CalledProcessError, IndexError):
+        return "HEAD"
+
+AGENTS = ["argus-competitor", "minerva-research", "echo-feedback",
+          "vulcan-strategy", "mercury-integration", "daedalus-prototype"]
+
+class StandInAgents:
+    """Replaces rd_agents.invoke_rd_agent with agents that answer after a fixed latency"""
+
+    def __init__(self, latencies: Dict[str, float]):
+        self.latencies = latencies
+        self.calls = 0
+        self.original = rd_agents.invoke_rd_agent
+
+    async def invoke(self, agent_name: str, task_type: str, description: str, parameters: Dict[str, Any] = None):
+        self.calls += 1
+        await asyncio.sleep(self.latencies[agent_name])
+        return {"agent_name": agent_name, "status": "completed", "result": {"new_features_detected": 1}}
+
+    def __enter__(self):
+        rd_agents.invoke_rd_agent = self.invoke
+        return self
+
+    def __exit__(self, *exc):
+        rd_agents.invoke_rd_agent = self.original
+
+async def time_report(orchestrator, latencies: Dict[str, float]) -> Dict[str, Any]:
+    with StandInAgents(latencies) as agents:
+        started = time.perf_counter()
+        report = await orchestrator.generate_thirty_minute_report(include_delta=False)
+        wall = time.perf_counter() - started
+    coordination = report.get("orchestration_metadata", {}).get("agent_coordination", {})
+    return {
+        "wall_seconds": wall,
+        "agent_calls": agents.calls,
+        "timed_out": coordination.get("timed_out"),
+        "cached": coordination.get("cached")
+    }
+
+async def run_coordination_benchmark(args) -> Dict[str, Any]:
+    ref = args.baseline_ref or root_commit()
+    logging.getLogger("rd").setLevel(logging.ERROR)
+    latencies = dict(zip(AGENTS, args.latencies))
+    hung = {**latencies, AGENTS[0]: args.hung}
+
+    results: Dict[str, Any] = {
+        "agent_latencies": latencies,
+        "slowest_agent_s": max(latencies.values()),
+        "sum_of_latencies_s": sum(latencies.values()),
+        "hung_agent_s": args.hung,
+        "deadline_s": args.deadline
+    }
+
+    orchestrator = current.RDOrchestrator(agent_deadline=args.deadline, archive=None)
+    results["current"] = {
+        "all_answer": await time_report(orchestrator, latencies),
+        "repeat_unchanged_pipeline": await time_report(orchestrator, latencies),
+        "one_hung": await time_report(current.RDOrchestrator(agent_deadline=args.deadline, archive=None), hung)
+    }
+
+    baseline = load_baseline(ref, "rd_orchestrator.py")
+    results["baseline_ref"] = ref if baseline is not None else None
+    if baseline is not None:
+        results["baseline"] = {
+            "all_answer": await time_report(baseline.RDOrchestrator(), latencies),
+            "one_hung": await time_report(baseline.RDOrchestrator(), hung)
+        }
+    return results
+
+@contextmanager
+def installed_pipeline(pipeline):
+    """Make ``pipeline`` the global innovation pipeline the orchestrators read"""
+    original = pipeline_module.innovation_pipeline
+    pipeline_module.innovation_pipeline = pipeline
+    try:
+        yield pipeline
+    finally:
+        pipeline_module.innovation_pipeline = original
+
+def add_innovations(pipeline, count: int, prefix: str):
+    for i in range(count):
+        pipeline.add_innovation({"name": f"{prefix}-{i}", "description": "Benchmark innovation",
+                                 "source_agent": "vulcan-strategy"})
+
+async def time_incremental_reports(orchestrator, pipeline, reports: int, events: int) -> Dict[str, Any]:
+    with installed_pipeline(pipeline), StandInAgents(dict.fromkeys(AGENTS, 0.0)):
+        last = await orchestrator.generate_thirty_minute_report(include_delta=False)
+        timings = []
+        for report in range(reports):
+            add_innovations(pipeline, events, f"report-{report}")
+            started = time.perf_counter()
+            last = await orchestrator.generate_thirty_minute_report(include_delta=True, last_report_data=last)
+            timings.append(time.perf_counter() - started)
+    return {
+        "median_ms": statistics.median(timings) * 1000,
+        "max_ms": max(timings) * 1000,
+        "changes_summary": last.get("delta_summary", {}).get("changes_summary")
+    }
+
+async def run_report_benchmark(args) -> Dict[str, Any]:
+    ref = args.baseline_ref or root_commit()
+    logging.getLogger("rd").setLevel(logging.ERROR)
+    baseline_pipeline = load_baseline(ref, "innovation_pipeline.py")
+    baseline_orchestrator = load_baseline(ref, "rd_orchestrator.py")
+
+    results: Dict[str, Any] = {
+        "events_between_reports": args.events,
+        "reports": args.reports,
+        "baseline_ref": ref if baseline_pipeline and baseline_orchestrator else None,
+        "by_pipeline_size": {}
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.innovations:
+            pipeline = pipeline_module.InnovationPipeline()
+            add_innovations(pipeline, size, "existing")
+            orchestrator = current.RDOrchestrator(archive=ReportArchive(os.path.join(directory, f"reports_{size}.db")))
+            entry = {"current": await time_incremental_reports(orchestrator, pipeline, args.reports, args.events)}
+            del pipeline
+
+            if results["baseline_ref"]:
+                pipeline = baseline_pipeline.InnovationPipeline()
+                add_innovations(pipeline, size, "existing")
+                entry["baseline"] = await time_incremental_reports(baseline_orchestrator.RDOrchestrator(), pipeline,
+                                                                   args.reports, args.events)
+                del pipeline
+            results["by_pipeline_size"][size] = entry
+    return results
+
+HANDOFF_CATEGORIES = ["chat_interface", "prompt_feed", "ai_reports", "infrastructure"]
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+def add_approved_handoffs(module, pipeline, count: int):
+    """``count`` approved innovations at the handoff stage, categories in rotation"""
+    for i in range(count):
+        innovation_id = pipeline.add_innovation({
+            "name": f"handoff-{i}", "description": "Benchmark handoff", "source_agent": "vulcan-strategy",
+            "category": HANDOFF_CATEGORIES[i % len(HANDOFF_CATEGORIES)]
+        })
+        for _ in range(3):  # ideation -> approval; approving advances it to handoff
+            pipeline.advance_innovation_stage(innovation_id)
+        pipeline.set_approval_status(innovation_id, module.ApprovalStatus.APPROVED)
+
+def stand_in_department(latency: float, failure_rate: float, seed: int):
+    """Department call taking ``latency`` seconds and failing about ``failure_rate`` of the time"""
+    rng = random.Random(seed)
+
+    async def deliver(handoff_package: Dict[str, Any]) -> bool:
+        await asyncio.sleep(latency)
+        if rng.random() < failure_rate:
+            raise ConnectionError("department unavailable")
+        return True
+    return deliver
+
+def department_latencies(latencies: Dict[str, List[float]]) -> Dict[str, Any]:
+    return {department: {"handoffs": len(samples), "p50": percentile(samples, 0.5), "p95": percentile(samples, 0.95),
+                         "max": max(samples)}
+            for department, samples in sorted(latencies.items())}
+
+async def run_handoff_benchmark(args) -> Dict[str, Any]:
+    ref = args.baseline_ref or root_commit()
+    logging.getLogger("rd").setLevel(logging.ERROR)
+    departments = dict(zip(["frontend", "backend", "infrastructure"], args.latencies))
+
+    results: Dict[str, Any] = {
+        "handoffs": args.handoffs,
+        "department_latencies": departments,
+        "failure_rate": args.failure_rate
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        pipeline = pipeline_module.InnovationPipeline()
+        pipeline.handoff_executor = HandoffExecutor(
+            pipeline._deliver_handoff, concurrency=pipeline.pipeline_config["handoff_concurrency"],
+            retry_queue=HandoffRetryQueue(os.path.join(directory, "retries.db"))
+        )
+        for seed, (department, latency) in enumerate(departments.items()):
+            pipeline.register_department_handler(department, stand_in_department(latency, args.failure_rate, seed))
+        add_approved_handoffs(pipeline_module, pipeline, args.handoffs)
+
+        started = time.perf_counter()
+        handoff_results = await pipeline.process_batch_handoffs(limit=args.handoffs)
+        wall_time = time.perf_counter() - started
+        latencies: Dict[str, List[float]] = {}
+        for result in handoff_results:
+            if result["delivery"]["status"] == "delivered":
+                latencies.setdefault(result["delivery"]["department"], []).append(result["delivery"]["handoff_latency"])
+        stats = pipeline.get_handoff_metrics()
+        results["current"] = {
+            "concurrency": stats["concurrency"],
+            "wall_time": wall_time,
+            "delivered": stats["delivered"],
+            "throughput": stats["delivered"] / wall_time,
+            "handoff_latency": department_latencies(latencies),
+            "retries_scheduled": stats["retries_scheduled"],
+            "retry_queue": stats["retry_queue"]
+        }
+
+    baseline = load_baseline(ref, "innovation_pipeline.py")
+    if baseline:
+        count = min(args.handoffs, args.baseline_handoffs)
+        pipeline = baseline.InnovationPipeline()
+        add_approved_handoffs(baseline, pipeline, count)
+        pipeline.pipeline_config["batch_handoff_size"] = count
+        handlers = {department: stand_in_department(latency, args.failure_rate, seed)
+                    for seed, (department, latency) in enumerate(departments.items())}
+        routing = pipeline_module.InnovationPipeline().pipeline_config["handoff_departments"]
+
+        started = time.perf_counter()
+        latencies = {}
+        delivered = 0
+        for handoff_package in pipeline.process_batch_handoffs():
+            department = routing.get(handoff_package["category"], "backend")
+            try:
+                await handlers[department](handoff_package)
+            except ConnectionError:
+                continue
+            delivered += 1
+            latencies.setdefault(department, []).append(time.perf_counter() - started)
+        wall_time = time.perf_counter() - started
+        results["baseline"] = {
+            "ref": ref,
+            "handoffs": count,
+            "wall_time": wall_time,
+            "delivered": delivered,
+            "throughput": delivered / wall_time,
+            "handoff_latency": department_latencies(latencies)
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="R&D department benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    coordination = commands.add_parser("coordination", help="report wall time with concurrent agent coordination")
+    coordination.add_argument("--latencies", type=float, nargs=6, default=[0.1, 0.2, 0.3, 0.4, 0.5, 0.6],
+                              help="seconds each of the six agents takes to answer")
+    coordination.add_argument("--hung", type=float, default=3.0, help="seconds the hung agent takes")
+    coordination.add_argument("--deadline", type=float, default=1.0, help="coordination deadline of the current orchestrator")
+    coordination.add_argument("--baseline-ref", default=None, help="git ref of the baseline (default: first commit)")
+    coordination.set_defaults(run=run_coordination_benchmark)
+
+    report = commands.add_parser("report", help="thirty-minute report generation cost against pipeline size")
+    report.add_argument("--innovations", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="innovations in the pipeline")
+    report.add_argument("--events", type=int, default=20, help="innovations added between reports")
+    report.add_argument("--reports", type=int, default=10, help="reports timed per pipeline size")
+    report.add_argument("--baseline-ref", default=None, help="git ref of the baseline (default: first commit)")
+    report.set_defaults(run=run_report_benchmark)
+
+    handoff = commands.add_parser("handoff", help="handoff batch throughput and latency with slow departments")
+    handoff.add_argument("--handoffs", type=int, default=2000, help="approved innovations in the batch")
+    handoff.add_argument("--latencies", type=float, nargs=3, default=[0.02, 0.01, 0.1],
+                         help="seconds per delivery for the frontend, backend and infrastructure departments")
+    handoff.add_argument("--failure-rate", type=float, default=0.02, help="fraction of deliveries that fail")
+    handoff.add_argument("--baseline-handoffs", type=int, default=500, help="cap on the sequential baseline's batch")
+    handoff.add_argument("--baseline-ref", default=None, help="git ref of the baseline (default: first commit)")
+    handoff.set_defaults(run=run_handoff_benchmark)
+
+    args = parser.parse_args()
+    results = asyncio.run(args.run(args))
+    print(json.dumps({"benchmark": args.command, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
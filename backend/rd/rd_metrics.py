@@ -94,6 +94,14 @@ class RDMetricsTracker:
             "stakeholder_satisfaction": 0.85
         }
         
+        # Running team totals, updated per recorded task for periodic reports
+        self.team_totals = {
+            "total_tasks": 0,
+            "completed_tasks": 0,
+            "innovation_contributions": 0
+        }
+        self.active_agents: set = set()  # agents that have recorded a task
+        
         # Real-time metrics
         self.real_time_metrics = {
             "active_tasks": 0,
@@ -120,9 +128,12 @@ class RDMetricsTracker:
         metrics = self.agent_metrics[agent_name]
         metrics.total_tasks += 1
         metrics.last_active = datetime.now()
+        self.team_totals["total_tasks"] += 1
+        self.active_agents.add(agent_name)
         
         if success:
             metrics.completed_tasks += 1
+            self.team_totals["completed_tasks"] += 1
         
         # Update success rate
         metrics.success_rate = metrics.completed_tasks / metrics.total_tasks
@@ -150,6 +161,7 @@ class RDMetricsTracker:
         # Track innovation contributions
         if task_type in ["feature_ideation", "prototype_creation", "strategic_analysis"]:
             metrics.innovation_contributions += 1
+            self.team_totals["innovation_contributions"] += 1
         
         logger.debug(f"Recorded task for {agent_name}: success={success}, time={response_time}")
     
@@ -360,6 +372,20 @@ class RDMetricsTracker:
         
         return recommendations
     
+    def get_report_metrics(self) -> Dict[str, Any]:
+        """Team metrics for periodic reports from the running totals"""
+        total_tasks = self.team_totals["total_tasks"]
+        recent_cycles = list(self.metrics_history)[-4:]  # Last 4 weeks
+        
+        return {
+            **self.team_totals,
+            "team_success_rate": self.team_totals["completed_tasks"] / total_tasks if total_tasks > 0 else 0,
+            "active_agents": len(self.active_agents),
+            "avg_features_per_week": statistics.mean([
+                cycle["metrics"]["features_ideated"] for cycle in recent_cycles
+            ]) if recent_cycles else 0
+        }
+    
     def get_innovation_pipeline_metrics(self) -> Dict[str, Any]:
         """Get metrics specific to innovation pipeline performance"""
         current_cycle = self.cycle_metrics.get(self.current_cycle_id) if self.current_cycle_id else None
@@ -9,14 +9,31 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 import json
 
+from .agent_coordinator import AgentCall, AgentCoordinator
+from .report_archive import ReportArchive, report_archive
+
 logger = logging.getLogger(__name__)
 
+# Agents whose work depends only on the innovation pipeline; their results
+# are reused while the pipeline is unchanged. The others scan external sources.
+PIPELINE_AGENTS = {"vulcan-strategy", "mercury-integration", "daedalus-prototype"}
+
+# Report sections compared item by item between snapshots -> delta counter
+DELTA_SECTIONS = {
+    "competitive_updates": "new_competitive_updates",
+    "research_highlights": "new_research_highlights",
+    "feature_recommendations": "new_feature_recommendations",
+    "pipeline_changes": "new_pipeline_changes"
+}
+
 class RDOrchestrator:
     """R&D Orchestrator for coordinating agent activities and report generation"""
     
-    def __init__(self):
+    def __init__(self, agent_deadline: float = 60.0, archive: Optional[ReportArchive] = report_archive):
         self.last_activities = {}
         self.delta_cache = {}
+        self.coordinator = AgentCoordinator(deadline=agent_deadline)
+        self.archive = archive  # None disables archiving
         self.orchestration_stats = {
             "reports_generated": 0,
             "total_orchestrations": 0,
@@ -25,8 +42,13 @@ class RDOrchestrator:
         }
     
     async def generate_thirty_minute_report(self, include_delta: bool = True, 
-                                          last_report_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Generate comprehensive 30-minute R&D report"""
+                                          last_report_data: Optional[Dict[str, Any]] = None,
+                                          archive: bool = True) -> Dict[str, Any]:
+        """Generate comprehensive 30-minute R&D report
+        
+        With ``archive=False`` the report is not stored; callers that only
+        preview it, or that archive it once it has been sent, pass False.
+        """
         try:
             logger.info("Starting 30-minute R&D report orchestration")
             start_time = datetime.now()
@@ -35,7 +57,12 @@ class RDOrchestrator:
             agent_results = await self._coordinate_all_agents("thirty_minute_report")
             
             # Aggregate intelligence from all sources
-            report_data = await self._aggregate_intelligence(agent_results, last_report_data, include_delta)
+            report_data = await self._aggregate_intelligence(agent_results)
+            
+            # Changes since the previous report's snapshot
+            snapshot = self._take_snapshot(report_data)
+            if include_delta and last_report_data:
+                report_data["delta_summary"] = self._calculate_delta_changes(report_data, last_report_data, snapshot)
             
             # Generate executive summary
             report_data["executive_summary"] = self._generate_executive_summary(report_data)
@@ -45,14 +72,19 @@ class RDOrchestrator:
                 "report_type": "thirty_minute_interval",
                 "generation_time": (datetime.now() - start_time).total_seconds(),
                 "agents_coordinated": len(agent_results),
+                "agent_coordination": self.coordinator.last_round,
                 "timestamp": datetime.now().isoformat(),
-                "report_number": self.orchestration_stats["reports_generated"] + 1
+                "report_number": self.orchestration_stats["reports_generated"] + 1,
+                "snapshot": snapshot
             }
             
             # Update stats
             self.orchestration_stats["reports_generated"] += 1
             self.orchestration_stats["last_orchestration"] = datetime.now()
             
+            if archive:
+                await self.archive_report(report_data)
+            
             logger.info(f"30-minute report generated successfully in {report_data['orchestration_metadata']['generation_time']:.2f}s")
             return report_data
             
@@ -76,47 +108,48 @@ class RDOrchestrator:
             ("daedalus-prototype", "prototype_status", "30-minute prototype development status")
         ]
         
-        # Execute agent tasks concurrently
-        agent_results = {}
-        tasks = []
-        
-        for agent_name, task_subtype, description in agent_tasks:
-            task = self._invoke_agent_with_timeout(
-                rd_agents, agent_name, task_subtype, description
-            )
-            tasks.append((agent_name, task))
-        
-        # Collect results with timeout handling
-        for agent_name, task in tasks:
-            try:
-                result = await asyncio.wait_for(task, timeout=60.0)  # 1 minute timeout per agent
-                agent_results[agent_name] = result
-            except asyncio.TimeoutError:
-                logger.warning(f"Agent {agent_name} timed out during 30-minute report")
-                agent_results[agent_name] = {"status": "timeout", "error": "Agent response timeout"}
-            except Exception as e:
-                logger.error(f"Error invoking agent {agent_name}: {e}")
-                agent_results[agent_name] = {"status": "error", "error": str(e)}
+        parameters = {
+            "priority": "high",
+            "timeout": 45,
+            "report_interval": "thirty_minutes",
+            "include_delta": True
+        }
+        pipeline_version = self._pipeline_version()
+        calls = [
+            AgentCall(agent_name, task_subtype, description, parameters,
+                      inputs=(task_type, pipeline_version) if agent_name in PIPELINE_AGENTS and pipeline_version is not None else None)
+            for agent_name, task_subtype, description in agent_tasks
+        ]
+        
+        # Fan out to all agents at once; whatever has not answered by the deadline is reported as a timeout
+        agent_results = await self.coordinator.coordinate(calls, rd_agents.invoke_rd_agent)
+        
+        for agent_name, result in agent_results.items():
+            self.last_activities[agent_name] = {"timestamp": datetime.now().isoformat(), "status": result.get("status")}
+        
+        completed = sum(1 for result in agent_results.values() if result.get("status") == "completed")
+        self.orchestration_stats["agent_coordination_success_rate"] = completed / len(agent_results) if agent_results else 0.0
         
         return agent_results
     
-    async def _invoke_agent_with_timeout(self, rd_agents, agent_name: str, task_type: str, description: str):
-        """Invoke agent with timeout protection"""
-        return await rd_agents.invoke_rd_agent(
-            agent_name,
-            task_type,
-            description,
-            {
-                "priority": "high",
-                "timeout": 45,
-                "report_interval": "thirty_minutes",
-                "include_delta": True
-            }
-        )
+    def _pipeline_version(self) -> Optional[int]:
+        """Change counter of the innovation pipeline, or None if it is unavailable"""
+        try:
+            from .innovation_pipeline import innovation_pipeline
+            return innovation_pipeline.version
+        except Exception:
+            return None
+    
+    async def archive_report(self, report_data: Dict[str, Any]):
+        """Store a finished report off the event loop"""
+        if self.archive is None:
+            return
+        try:
+            report_data["orchestration_metadata"]["archive_id"] = await asyncio.to_thread(self.archive.store, report_data)
+        except Exception as e:
+            logger.error(f"Error archiving 30-minute report: {e}")
     
-    async def _aggregate_intelligence(self, agent_results: Dict[str, Any], 
-                                    last_report_data: Optional[Dict[str, Any]] = None,
-                                    include_delta: bool = True) -> Dict[str, Any]:
+    async def _aggregate_intelligence(self, agent_results: Dict[str, Any]) -> Dict[str, Any]:
         """Aggregate intelligence from all agent results"""
         
         # Initialize report structure
@@ -229,36 +262,28 @@ class RDOrchestrator:
         # Generate metrics dashboard
         report_data["metrics_dashboard"] = await self._generate_metrics_dashboard()
         
-        # Calculate delta if previous report data available
-        if include_delta and last_report_data:
-            report_data["delta_summary"] = self._calculate_delta_changes(report_data, last_report_data)
-        
         return report_data
     
     async def _generate_metrics_dashboard(self) -> Dict[str, Any]:
-        """Generate real-time metrics dashboard"""
+        """Generate real-time metrics dashboard from running aggregates"""
         try:
             from .rd_metrics import rd_metrics_tracker
             from .innovation_pipeline import innovation_pipeline
             
             # Get current metrics
-            innovation_metrics = rd_metrics_tracker.get_innovation_pipeline_metrics()
             pipeline_status = innovation_pipeline.get_pipeline_status()
-            agent_performance = rd_metrics_tracker.get_agent_performance_report()
+            team_metrics = rd_metrics_tracker.get_report_metrics()
             
-            # Calculate key metrics for 30-minute interval
             current_time = datetime.now()
-            thirty_minutes_ago = current_time - timedelta(minutes=30)
             
             return {
                 "timestamp": current_time.isoformat(),
                 "interval": "30_minutes",
                 "pipeline_health": pipeline_status.get("pipeline_health", "unknown"),
                 "total_innovations": pipeline_status.get("total_innovations", 0),
-                "active_agents": len([a for a in agent_performance.get("individual_agents", {}).values() 
-                                    if a.get("last_active")]),
-                "team_success_rate": agent_performance.get("team_averages", {}).get("team_success_rate", 0),
-                "innovation_velocity": innovation_metrics.get("pipeline_velocity", {}).get("avg_features_per_week", 0),
+                "active_agents": team_metrics["active_agents"],
+                "team_success_rate": team_metrics["team_success_rate"],
+                "innovation_velocity": team_metrics["avg_features_per_week"],
                 "significant_changes": self._detect_significant_metric_changes()
             }
             
@@ -276,8 +301,25 @@ class RDOrchestrator:
         # In production, this would compare against historical baselines
         return True
     
+    def _take_snapshot(self, report_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Compact state the next report's delta is computed against"""
+        snapshot = {
+            "pipeline_version": self._pipeline_version(),
+            "sections": {
+                section: [json.dumps(item, sort_keys=True, default=str) for item in report_data.get(section, [])]
+                for section in DELTA_SECTIONS
+            }
+        }
+        try:
+            from .rd_metrics import rd_metrics_tracker
+            snapshot["team_totals"] = dict(rd_metrics_tracker.team_totals)
+        except Exception:
+            snapshot["team_totals"] = None
+        return snapshot
+    
     def _calculate_delta_changes(self, current_data: Dict[str, Any], 
-                               last_data: Dict[str, Any]) -> Dict[str, Any]:
+                               last_data: Dict[str, Any],
+                               snapshot: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Calculate changes since last report"""
         delta = {
             "new_competitive_updates": 0,
@@ -287,7 +329,12 @@ class RDOrchestrator:
             "changes_summary": []
         }
         
-        # Calculate new items by comparing lengths
+        previous = last_data.get("orchestration_metadata", {}).get("snapshot")
+        if snapshot is not None and previous is not None:
+            self._calculate_snapshot_delta(delta, snapshot, previous)
+            return delta
+        
+        # Without snapshots, calculate new items by comparing lengths
         current_competitive = len(current_data.get("competitive_updates", []))
         last_competitive = len(last_data.get("competitive_updates", []))
         delta["new_competitive_updates"] = max(0, current_competitive - last_competitive)
@@ -316,6 +363,52 @@ class RDOrchestrator:
         
         return delta
     
+    def _calculate_snapshot_delta(self, delta: Dict[str, Any], snapshot: Dict[str, Any], previous: Dict[str, Any]):
+        """Fill ``delta`` from two snapshots and the events recorded between them"""
+        
+        # Items not present in the previous report
+        for section, key in DELTA_SECTIONS.items():
+            seen = set(previous["sections"].get(section, []))
+            delta[key] = sum(1 for item in snapshot["sections"][section] if item not in seen)
+        
+        # Innovation pipeline events since the previous report; reads only the new events
+        if snapshot["pipeline_version"] is not None and previous.get("pipeline_version") is not None:
+            from .innovation_pipeline import innovation_pipeline
+            events, complete = innovation_pipeline.events_since(previous["pipeline_version"])
+            counts: Dict[str, int] = {}
+            for event in events:
+                counts[event["type"]] = counts.get(event["type"], 0) + 1
+            delta["pipeline_events"] = {
+                "total": snapshot["pipeline_version"] - previous["pipeline_version"],
+                "by_type": counts,
+                "innovations_added": [event["name"] for event in events if event["type"] == "added"][:10],
+                "complete": complete
+            }
+        
+        # Agent tasks since the previous report
+        if snapshot.get("team_totals") and previous.get("team_totals"):
+            delta["agent_tasks"] = {
+                key: snapshot["team_totals"][key] - previous["team_totals"].get(key, 0)
+                for key in snapshot["team_totals"]
+            }
+        
+        # Generate summary
+        if delta["new_competitive_updates"] > 0:
+            delta["changes_summary"].append(f"{delta['new_competitive_updates']} new competitive updates")
+        if delta["new_research_highlights"] > 0:
+            delta["changes_summary"].append(f"{delta['new_research_highlights']} new research highlights")
+        if delta["new_feature_recommendations"] > 0:
+            delta["changes_summary"].append(f"{delta['new_feature_recommendations']} new feature recommendations")
+        if delta["new_pipeline_changes"] > 0:
+            delta["changes_summary"].append(f"{delta['new_pipeline_changes']} pipeline changes")
+        pipeline_counts = delta.get("pipeline_events", {}).get("by_type", {})
+        if pipeline_counts.get("added"):
+            delta["changes_summary"].append(f"{pipeline_counts['added']} innovations added")
+        if pipeline_counts.get("advanced"):
+            delta["changes_summary"].append(f"{pipeline_counts['advanced']} stage advances")
+        if delta.get("agent_tasks", {}).get("completed_tasks"):
+            delta["changes_summary"].append(f"{delta['agent_tasks']['completed_tasks']} agent tasks completed")
+    
     def _generate_executive_summary(self, report_data: Dict[str, Any]) -> str:
         """Generate executive summary for 30-minute report"""
         summary_parts = []
@@ -421,7 +514,7 @@ class RDOrchestrator:
         """Aggregate intelligence for daily review"""
         # Similar to 30-minute aggregation but with daily focus
         # This would include more comprehensive analysis and longer-term trends
-        return await self._aggregate_intelligence(agent_results, None, False)
+        return await self._aggregate_intelligence(agent_results)
     
     def _calculate_daily_velocity(self) -> Dict[str, Any]:
         """Calculate daily innovation velocity metrics"""
@@ -461,6 +554,8 @@ class RDOrchestrator:
                 agent: activity["timestamp"] if isinstance(activity, dict) and "timestamp" in activity else str(activity)
                 for agent, activity in list(self.last_activities.items())[-5:]  # Last 5 activities
             },
+            "agent_coordination": self.coordinator.get_stats(),
+            "archive_path": self.archive.path if self.archive is not None else None,
             "system_status": "operational"
         }
 
@@ -0,0 +1,105 @@
+"""
+R&D Report Archive
+sqlite store of finished 30-minute reports for the R&D API
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_PATH = os.getenv("RD_REPORT_ARCHIVE_PATH", "/tmp/coinlink_rd/reports.db")
+
+class ReportArchive:
+    """Finished reports, newest first; the database is opened on first use"""
+
+    def __init__(self, path: Optional[str] = None, max_reports: int = 5000):
+        self.path = path or DEFAULT_ARCHIVE_PATH
+        self.max_reports = max_reports  # about 100 days of 30-minute reports
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()  # stores run off the event loop, reads on it
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS reports (
+                    id INTEGER PRIMARY KEY,
+                    report_number INTEGER,
+                    report_type TEXT NOT NULL,
+                    generated_at TEXT NOT NULL,
+                    executive_summary TEXT,
+                    urgent_alerts INTEGER NOT NULL DEFAULT 0,
+                    changes_summary TEXT,
+                    report TEXT NOT NULL
+                );
+            """)
+            self._db = db
+        return self._db
+
+    def store(self, report: Dict[str, Any]) -> int:
+        """Archive a report; returns its archive id"""
+        metadata = report.get("orchestration_metadata", {})
+        with self._lock:
+            db = self._connection()
+            with db:
+                cursor = db.execute(
+                    "INSERT INTO reports (report_number, report_type, generated_at, executive_summary, "
+                    "urgent_alerts, changes_summary, report) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        metadata.get("report_number"),
+                        metadata.get("report_type", "unknown"),
+                        metadata.get("timestamp", ""),
+                        report.get("executive_summary"),
+                        len(report.get("urgent_alerts", [])),
+                        json.dumps(report.get("delta_summary", {}).get("changes_summary", [])),
+                        json.dumps(report, default=str)
+                    )
+                )
+                report_id = cursor.lastrowid
+                db.execute("DELETE FROM reports WHERE id <= ?", (report_id - self.max_reports,))
+        return report_id
+
+    def get(self, report_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connection().execute("SELECT id, report FROM reports WHERE id = ?", (report_id,)).fetchone()
+        return {"archive_id": row[0], **json.loads(row[1])} if row else None
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connection().execute("SELECT id, report FROM reports ORDER BY id DESC LIMIT 1").fetchone()
+        return {"archive_id": row[0], **json.loads(row[1])} if row else None
+
+    def history(self, limit: int = 20, before_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Report summaries, newest first, optionally older than archive id ``before_id``"""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT id, report_number, report_type, generated_at, executive_summary, urgent_alerts, changes_summary "
+                "FROM reports WHERE id < ? ORDER BY id DESC LIMIT ?",
+                (before_id if before_id is not None else 2 ** 63 - 1, limit)
+            ).fetchall()
+        return [
+            {
+                "archive_id": row[0],
+                "report_number": row[1],
+                "report_type": row[2],
+                "generated_at": row[3],
+                "executive_summary": row[4],
+                "urgent_alerts": row[5],
+                "changes_summary": json.loads(row[6]) if row[6] else []
+            }
+            for row in rows
+        ]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+# Global report archive instance
+report_archive = ReportArchive()
@@ -178,7 +178,8 @@ class RDScheduler:
             # Generate comprehensive 30-minute report
             report_data = await rd_orchestrator.generate_thirty_minute_report(
                 include_delta=True,
-                last_report_data=self.last_report_data
+                last_report_data=self.last_report_data,
+                archive=False
             )
             
             # Send email report if there's meaningful content
@@ -187,6 +188,7 @@ class RDScheduler:
                 
                 if success:
                     logger.info(f"30-minute report #{self.report_count} sent successfully")
+                    await rd_orchestrator.archive_report(report_data)
                     self.last_report_data = report_data.copy()
                 else:
                     logger.error("Failed to send 30-minute report")
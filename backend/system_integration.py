@@ -297,8 +297,8 @@ class SystemIntegration:
     async def _initialize_monitoring_systems(self):
         """Initialize all monitoring systems"""
         
-        # Initialize unified monitoring (no start_maintenance_loop method)
-        # unified_monitoring is already initialized
+        # unified_monitoring is already initialized; start its anomaly detection
+        asyncio.create_task(unified_monitoring.start_anomaly_detection_loop())
         
         # Start department-specific monitoring
         asyncio.create_task(frontend_metrics_tracker.start_monitoring_loop())
@@ -315,6 +315,12 @@ class SystemIntegration:
         
         logger.info("All monitoring systems initialized")
 
+    async def shutdown(self) -> None:
+        """Persist orchestrator and monitoring state before the process exits"""
+        await master_orchestrator.shutdown()
+        await asyncio.to_thread(unified_monitoring.close)
+        logger.info("Orchestrator and monitoring state persisted")
+
     async def _initialize_infrastructure(self):
         """Initialize infrastructure systems"""
         
@@ -598,6 +604,7 @@ async def main():
             await asyncio.Event().wait()
         except KeyboardInterrupt:
             print("\n⏹️ Shutting down system...")
+            await system_integration.shutdown()
     
     else:
         print(f"\n❌ System initialization failed. Status: {system_integration.system_status}")
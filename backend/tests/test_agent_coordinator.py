@@ -0,0 +1,186 @@
+"""
+Unit tests for the R&D agent coordinator
+Tests the shared deadline, cancellation of late calls, error results and the result cache
+"""
+
+import asyncio
+import time
+import pytest
+
+from ..rd.agent_coordinator import AgentCall, AgentCoordinator
+from ..rd.innovation_pipeline import innovation_pipeline
+from ..rd.rd_interface import rd_agents
+from ..rd.rd_orchestrator import PIPELINE_AGENTS, RDOrchestrator
+
+
+class FakeAgents:
+    """Answers after a per-agent delay and records every call and cancellation"""
+
+    def __init__(self, delays=None, failures=()):
+        self.delays = delays or {}
+        self.failures = set(failures)
+        self.calls = []
+        self.cancelled = []
+
+    async def invoke(self, agent_name, task_type, description, parameters):
+        self.calls.append(agent_name)
+        try:
+            await asyncio.sleep(self.delays.get(agent_name, 0.0))
+        except asyncio.CancelledError:
+            self.cancelled.append(agent_name)
+            raise
+        if agent_name in self.failures:
+            raise RuntimeError(f"{agent_name} is down")
+        return {"status": "completed", "agent": agent_name, "call": len(self.calls)}
+
+
+def call(agent_name, inputs=None):
+    return AgentCall(agent_name, "scan", f"{agent_name} scan", {"priority": "high"}, inputs=inputs)
+
+
+@pytest.mark.unit
+class TestDeadline:
+    """Test that one deadline bounds the whole round"""
+
+    @pytest.mark.asyncio
+    async def test_slow_agents_time_out_and_are_cancelled(self):
+        agents = FakeAgents(delays={"fast": 0.01, "medium": 0.03, "hung": 5.0, "stuck": 5.0})
+        coordinator = AgentCoordinator(deadline=0.1)
+
+        started = time.perf_counter()
+        results = await coordinator.coordinate([call(name) for name in ("hung", "fast", "stuck", "medium")],
+                                               agents.invoke)
+
+        assert time.perf_counter() - started < 1.0
+        assert list(results) == ["hung", "fast", "stuck", "medium"]
+        assert results["fast"]["status"] == results["medium"]["status"] == "completed"
+        assert results["hung"] == {"status": "timeout", "error": "Agent response timeout"}
+        assert sorted(agents.cancelled) == ["hung", "stuck"]
+
+        round_summary = coordinator.last_round
+        assert round_summary["timed_out"] == ["hung", "stuck"]
+        assert (round_summary["completed"], round_summary["partial"]) == (2, True)
+        stats = coordinator.get_stats()["agents"]
+        assert stats["hung"]["timeouts"] == 1 and stats["hung"]["last_latency"] == 0.1
+        assert stats["fast"]["completed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_calls_run_concurrently(self):
+        agents = FakeAgents(delays={f"agent-{i}": 0.05 for i in range(6)})
+        coordinator = AgentCoordinator(deadline=1.0)
+
+        await coordinator.coordinate([call(f"agent-{i}") for i in range(6)], agents.invoke)
+
+        assert coordinator.last_round["wall_time"] < 0.2  # not the 0.3s a sequential round takes
+        assert coordinator.last_round["partial"] is False
+
+    @pytest.mark.asyncio
+    async def test_per_round_deadline_overrides_default(self):
+        agents = FakeAgents(delays={"slow": 0.05})
+        coordinator = AgentCoordinator(deadline=0.01)
+
+        results = await coordinator.coordinate([call("slow")], agents.invoke, deadline=1.0)
+        assert results["slow"]["status"] == "completed"
+        assert coordinator.last_round["deadline"] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_errors_become_results(self):
+        agents = FakeAgents(failures={"broken"})
+
+        async def invoke(agent_name, *args):
+            if agent_name == "refusing":
+                return {"status": "error", "error": "no capacity"}
+            return await agents.invoke(agent_name, *args)
+
+        coordinator = AgentCoordinator(deadline=1.0)
+        results = await coordinator.coordinate([call("broken", "v1"), call("refusing", "v1"), call("ok")], invoke)
+
+        assert results["broken"] == {"status": "error", "error": "broken is down"}
+        assert results["refusing"]["error"] == "no capacity"
+        assert coordinator.last_round["failed"] == ["broken", "refusing"]
+        assert coordinator.get_stats()["agents"]["broken"]["errors"] == 1
+
+        # Failed results are not cached
+        await coordinator.coordinate([call("broken", "v1"), call("refusing", "v1")], invoke)
+        assert coordinator.last_round["cached"] == []
+
+
+@pytest.mark.unit
+class TestResultCache:
+    """Test reuse of results while an agent's inputs are unchanged"""
+
+    @pytest.mark.asyncio
+    async def test_unchanged_inputs_reuse_the_last_result(self):
+        agents = FakeAgents()
+        coordinator = AgentCoordinator(deadline=1.0)
+        first = await coordinator.coordinate([call("vulcan", "v1"), call("argus")], agents.invoke)
+        second = await coordinator.coordinate([call("vulcan", "v1"), call("argus")], agents.invoke)
+
+        assert agents.calls == ["vulcan", "argus", "argus"]
+        assert second["vulcan"] == {**first["vulcan"], "cached": True}
+        assert coordinator.last_round["cached"] == ["vulcan"]
+        assert coordinator.get_stats()["agents"]["vulcan"]["cache_hits"] == 1
+
+        await coordinator.coordinate([call("vulcan", "v2")], agents.invoke)
+        assert agents.calls[-1] == "vulcan"
+
+    @pytest.mark.asyncio
+    async def test_changed_parameters_miss_the_cache(self):
+        agents = FakeAgents()
+        coordinator = AgentCoordinator(deadline=1.0)
+        await coordinator.coordinate([call("vulcan", "v1")], agents.invoke)
+
+        changed = call("vulcan", "v1")
+        changed.parameters = {"priority": "low"}
+        await coordinator.coordinate([changed], agents.invoke)
+        assert agents.calls == ["vulcan", "vulcan"]
+
+    @pytest.mark.asyncio
+    async def test_invalidate_and_ttl_force_a_new_call(self):
+        agents = FakeAgents()
+        coordinator = AgentCoordinator(deadline=1.0, cache_ttl=60.0)
+        calls = [call("vulcan", "v1"), call("mercury", "v1")]
+        await coordinator.coordinate(calls, agents.invoke)
+
+        coordinator.invalidate("vulcan")
+        await coordinator.coordinate(calls, agents.invoke)
+        assert agents.calls == ["vulcan", "mercury", "vulcan"]
+
+        coordinator.invalidate()
+        await coordinator.coordinate(calls, agents.invoke)
+        assert agents.calls[3:] == ["vulcan", "mercury"]
+
+        key, result, _ = coordinator._cache["mercury"]
+        coordinator._cache["mercury"] = (key, result, time.time() - 61.0)
+        await coordinator.coordinate(calls, agents.invoke)
+        assert agents.calls[5:] == ["mercury"]
+
+    @pytest.mark.asyncio
+    async def test_timed_out_call_keeps_no_stale_result(self):
+        agents = FakeAgents()
+        coordinator = AgentCoordinator(deadline=0.05)
+        await coordinator.coordinate([call("vulcan", "v1")], agents.invoke)
+
+        # Inputs changed and the new call times out: the old result must not be served for the new inputs
+        agents.delays["vulcan"] = 5.0
+        results = await coordinator.coordinate([call("vulcan", "v2")], agents.invoke)
+        assert results["vulcan"]["status"] == "timeout"
+        results = await coordinator.coordinate([call("vulcan", "v2")], agents.invoke)
+        assert results["vulcan"]["status"] == "timeout"
+        assert agents.calls == ["vulcan", "vulcan", "vulcan"]
+
+    @pytest.mark.asyncio
+    async def test_pipeline_change_invalidates_pipeline_agents(self, monkeypatch):
+        agents = FakeAgents()
+        monkeypatch.setattr(rd_agents, "invoke_rd_agent", agents.invoke)
+        orchestrator = RDOrchestrator(agent_deadline=1.0, archive=None)
+
+        await orchestrator._coordinate_all_agents("report")
+        await orchestrator._coordinate_all_agents("report")
+        assert set(orchestrator.coordinator.last_round["cached"]) == PIPELINE_AGENTS
+        assert len(agents.calls) == 9
+
+        innovation_pipeline.add_innovation({"name": "Coordinator test", "description": "", "source_agent": "test"})
+        await orchestrator._coordinate_all_agents("report")
+        assert orchestrator.coordinator.last_round["cached"] == []
+        assert len(agents.calls) == 15
@@ -0,0 +1,68 @@
+"""
+Unit tests for the agent registry
+Tests index swaps on refresh and the location of the parse cache
+"""
+
+import os
+import stat
+import pytest
+
+from ..agents.agent_registry import AgentRegistry, default_cache_path
+
+
+def write_agent(directory, name, tools, department="backend"):
+    (directory / f"{name}.md").write_text(
+        f"---\nname: {name}\ntools: {tools}\ndepartment: {department}\n---\nBody\n"
+    )
+
+
+@pytest.fixture
+def agents_dir(tmp_path):
+    directory = tmp_path / "agents"
+    directory.mkdir()
+    write_agent(directory, "atlas", "Read, Bash")
+    write_agent(directory, "iris", "Read", department="frontend")
+    return directory
+
+
+@pytest.mark.unit
+class TestAgentRegistry:
+    """Test lookups across refreshes"""
+
+    def test_refresh_swaps_indexes_instead_of_mutating_them(self, agents_dir, tmp_path):
+        registry = AgentRegistry(str(agents_dir), cache_path=str(tmp_path / "cache" / "agents.json"))
+        registry.refresh()
+        published = registry._indexes
+        assert registry.find("read") == ["atlas", "iris"]
+
+        write_agent(agents_dir, "atlas", "Bash")
+        (agents_dir / "iris.md").unlink()
+        changes = registry.refresh()
+
+        assert (changes.changed, changes.removed) == (["atlas"], ["iris"])
+        # A lookup still holding the previous indexes sees them unchanged
+        assert list(published[0]["read"]) == ["atlas", "iris"]
+        assert list(published[1]) == ["backend", "frontend"]
+        assert registry.find("read") == []
+        assert registry.find("bash", department="backend") == ["atlas"]
+        assert registry.get_stats()["departments"] == ["backend"]
+
+    def test_unchanged_refresh_keeps_indexes(self, agents_dir, tmp_path):
+        registry = AgentRegistry(str(agents_dir), cache_path=str(tmp_path / "agents.json"))
+        registry.refresh()
+        published = registry._indexes
+        assert not registry.refresh()
+        assert registry._indexes is published
+
+    def test_default_cache_is_private_to_the_user(self, agents_dir, tmp_path, monkeypatch):
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+        path = default_cache_path(str(agents_dir))
+        assert path.startswith(str(tmp_path / "xdg"))
+
+        registry = AgentRegistry(str(agents_dir))
+        registry.refresh()
+
+        assert os.path.exists(path)
+        assert stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode) == 0o700
+        assert stat.S_IMODE(os.stat(path).st_mode) & 0o077 == 0
+        assert AgentRegistry(str(agents_dir))._load_cache().keys() == registry._cache.keys()
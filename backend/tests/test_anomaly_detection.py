@@ -0,0 +1,138 @@
+"""
+Unit tests for batch anomaly detection
+Tests parity with the previous per-sample rules, cooldowns, growth and seasonal slots
+"""
+
+import random
+import statistics
+import numpy as np
+import pytest
+
+from ..master_orchestrator.anomaly_detection import AnomalyDetectionEngine, SeasonalDetector, ZScoreDetector
+
+
+def previous_rule(history):
+    """The per-sample check UnifiedMonitoringDashboard ran before batch detection"""
+    if len(history) < 20:
+        return False
+    recent_values = history[-20:]
+    mean = statistics.mean(recent_values)
+    stddev = statistics.stdev(recent_values)
+    if abs(history[-1] - mean) > 3 * stddev:
+        return True
+    return abs(history[-1] - recent_values[-2]) > 5 * stddev
+
+
+@pytest.mark.unit
+class TestZScoreDetector:
+    """Test the rolling z-score and jump rules"""
+
+    def test_matches_previous_rule_per_sample(self):
+        rng = random.Random(7)
+        engine = AnomalyDetectionEngine(cooldown_seconds=0)
+        history = []
+        flagged = 0
+
+        for i in range(3000):
+            value = rng.gauss(100, 5)
+            if rng.random() < 0.03:
+                value += rng.choice((-1, 1)) * rng.uniform(10, 60)
+            history.append(value)
+            engine.observe("latency", value, timestamp=float(i))
+
+            expected = previous_rule(history)
+            assert bool(engine.evaluate(now=float(i))) == expected, f"sample {i}"
+            flagged += expected
+
+        assert flagged > 10
+
+    def test_jump_rule_flags_sudden_change_within_three_sigma(self):
+        engine = AnomalyDetectionEngine(detectors=[ZScoreDetector()], cooldown_seconds=0)
+        # Alternating 0/10 has a large spread, so a step from 0 to 10 stays within 3 sigma
+        values = [0.0, 10.0] * 10 + [0.0] * 2
+        for i, value in enumerate(values):
+            engine.observe("queue_depth", value, timestamp=float(i))
+        engine.evaluate(now=0.0)
+
+        engine.observe("queue_depth", 40.0, timestamp=30.0)
+        assert previous_rule(values + [40.0])
+        assert [anomaly.metric_id for anomaly in engine.evaluate(now=30.0)] == ["queue_depth"]
+
+    def test_needs_twenty_samples(self):
+        engine = AnomalyDetectionEngine(cooldown_seconds=0)
+        for i in range(18):
+            engine.observe("cpu", 50.0, timestamp=float(i))
+        engine.observe("cpu", 500.0, timestamp=18.0)
+        assert engine.evaluate(now=18.0) == []
+
+
+@pytest.mark.unit
+class TestAnomalyDetectionEngine:
+    """Test alert deduplication and metric capacity"""
+
+    def test_cooldown_suppresses_repeats(self):
+        engine = AnomalyDetectionEngine(cooldown_seconds=300)
+        for i in range(20):
+            engine.observe("cpu", 50.0 + i % 2, timestamp=float(i))
+        engine.evaluate(now=20.0)
+
+        engine.observe("cpu", 500.0, timestamp=21.0)
+        first = engine.evaluate(now=21.0)
+        assert [(anomaly.metric_id, anomaly.value) for anomaly in first] == [("cpu", 500.0)]
+
+        engine.observe("cpu", 900.0, timestamp=100.0)
+        assert engine.evaluate(now=100.0) == []
+        assert engine.suppressed == 1
+
+        engine.observe("cpu", 5000.0, timestamp=400.0)
+        assert len(engine.evaluate(now=400.0)) == 1
+        assert engine.get_stats()["detected"] == 2
+
+    def test_grows_past_initial_capacity(self):
+        engine = AnomalyDetectionEngine(detectors=[ZScoreDetector(), SeasonalDetector()], capacity=256)
+        for i in range(20):
+            for metric in range(600):
+                engine.observe(f"m{metric}", float(metric + i % 2), timestamp=float(i))
+        engine.evaluate(now=20.0)
+
+        assert len(engine) == 600
+        assert engine.stats.capacity >= 600
+        assert engine.detectors[1].count.shape[0] == engine.stats.capacity
+
+        engine.observe("m0", 1000.0, timestamp=21.0)
+        engine.observe("m599", 1000.0, timestamp=21.0)
+        assert sorted(anomaly.metric_id for anomaly in engine.evaluate(now=21.0)) == ["m0", "m599"]
+        # Earlier rows kept their history through the resize
+        mean, _ = engine.stats.mean_std(np.array([engine.rows["m300"]]))
+        assert mean[0] == pytest.approx(300.5)
+
+
+@pytest.mark.unit
+class TestSeasonalDetector:
+    """Test hour-of-day slot selection"""
+
+    def engine(self):
+        engine = AnomalyDetectionEngine(detectors=[SeasonalDetector(min_samples=10)], cooldown_seconds=0)
+        for day in range(14):
+            start = day * 86400
+            engine.observe("traffic", 1000.0 + day % 3, timestamp=start + 3 * 3600 + 60)
+            engine.observe("traffic", 10.0 + day % 3, timestamp=start + 15 * 3600 + 60)
+        engine.evaluate(now=14 * 86400)
+        return engine
+
+    def test_compares_against_the_same_hour(self):
+        engine = self.engine()
+        # Normal for 03:00, far outside what 15:00 usually sees
+        engine.observe("traffic", 1001.0, timestamp=14 * 86400 + 3 * 3600 + 120)
+        assert engine.evaluate() == []
+
+        engine.observe("traffic", 1001.0, timestamp=14 * 86400 + 15 * 3600 + 120)
+        anomalies = engine.evaluate()
+        assert [anomaly.detector for anomaly in anomalies] == ["seasonal"]
+        # The 15:00 slot mean, which already includes this sample
+        assert anomalies[0].expected == pytest.approx((sum(10.0 + day % 3 for day in range(14)) + 1001.0) / 15)
+
+    def test_unseen_slot_is_not_scored(self):
+        engine = self.engine()
+        engine.observe("traffic", 1e6, timestamp=14 * 86400 + 9 * 3600)
+        assert engine.evaluate() == []
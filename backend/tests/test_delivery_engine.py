@@ -0,0 +1,186 @@
+"""
+Unit tests for per-recipient message delivery
+Tests priority ordering of mailboxes, timer-wheel expiry, retries and dead-lettering
+"""
+
+import asyncio
+import pytest
+
+from ..master_orchestrator.communication_protocol import AgentMessage, MessagePriority
+from ..master_orchestrator.delivery_engine import DeliveryEngine, TimerWheel
+
+
+def message(subject, priority=MessagePriority.NORMAL):
+    return AgentMessage(sender_id="test", subject=subject, recipient_id="busy", priority=priority)
+
+
+async def wait_until(condition, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "condition not reached"
+        await asyncio.sleep(0.002)
+
+
+@pytest.mark.unit
+class TestMailboxPriority:
+    """Test that urgent messages overtake a recipient's backlog"""
+
+    @pytest.mark.asyncio
+    async def test_critical_message_overtakes_backlog(self):
+        handled = []
+        release = asyncio.Event()
+
+        async def handler(msg):
+            if msg.subject == "first":
+                await release.wait()  # keep the consumer busy while the backlog builds
+            handled.append(msg.subject)
+
+        engine = DeliveryEngine(handler_for=lambda recipient_id: handler)
+        engine.enqueue("busy", message("first"))
+        await asyncio.sleep(0)
+        for i in range(50):
+            engine.enqueue("busy", message(f"bulk-{i}"))
+        engine.enqueue("busy", message("high", MessagePriority.HIGH))
+        engine.enqueue("busy", message("critical", MessagePriority.CRITICAL))
+        assert engine.backlog("busy") == 52
+
+        release.set()
+        while engine.delivered < 53:
+            await asyncio.sleep(0.001)
+
+        assert handled[:3] == ["first", "critical", "high"]
+        assert handled[3:] == [f"bulk-{i}" for i in range(50)]
+        await engine.close()
+
+
+@pytest.mark.unit
+class TestTimerWheel:
+    """Test when wheel timers fire and that cancelled ones do not"""
+
+    @pytest.mark.asyncio
+    async def test_timers_fire_in_order_within_a_tick(self):
+        loop = asyncio.get_running_loop()
+        wheel = TimerWheel(tick=0.01, slots=8)
+        fired = {}
+        start = loop.time()
+        # 0.15s is more than one turn of an 8-slot wheel
+        for delay in (0.15, 0.03, 0.001, 0.07):
+            wheel.schedule(delay, lambda d: fired.setdefault(d, loop.time() - start), delay)
+        assert len(wheel) == 4
+
+        await wait_until(lambda: len(fired) == 4)
+        assert list(fired) == [0.001, 0.03, 0.07, 0.15]
+        for delay, elapsed in fired.items():
+            assert delay - 0.005 <= elapsed <= delay + 0.01 + 0.05
+        assert len(wheel) == 0
+        await wait_until(lambda: wheel._driver.done())
+
+    @pytest.mark.asyncio
+    async def test_cancelled_timer_does_not_fire(self):
+        wheel = TimerWheel(tick=0.01, slots=4)
+        fired = []
+        kept = wheel.schedule(0.05, fired.append, "kept")
+        dropped = wheel.schedule(0.05, fired.append, "dropped")
+        wheel.cancel(dropped)
+        wheel.cancel(dropped)
+        assert len(wheel) == 1
+
+        await wait_until(lambda: fired)
+        await asyncio.sleep(0.03)
+        assert fired == ["kept"]
+        wheel.cancel(kept)  # already fired: no effect
+        assert len(wheel) == 0
+        wheel.close()
+
+
+@pytest.mark.unit
+class TestRetriesAndDeadLetters:
+    """Test backoff retries and the deliveries that are given up on"""
+
+    @pytest.mark.asyncio
+    async def test_failed_delivery_is_retried_after_backoff(self):
+        loop = asyncio.get_running_loop()
+        attempts = []
+
+        async def flaky(msg):
+            attempts.append(loop.time())
+            if len(attempts) < 3:
+                raise RuntimeError("not yet")
+
+        engine = DeliveryEngine(handler_for=lambda recipient_id: flaky, max_attempts=3,
+                                base_backoff=0.02, max_backoff=0.03, timer_tick=0.005)
+        msg = message("retry me")
+        engine.enqueue("busy", msg)
+        await wait_until(lambda: engine.delivered == 1)
+
+        gaps = [later - earlier for earlier, later in zip(attempts, attempts[1:])]
+        assert gaps[0] >= 0.02 - 0.005 and gaps[1] >= 0.03 - 0.005  # second backoff capped at max_backoff
+        assert msg.delivery_attempts == 3
+        stats = engine.get_stats()
+        assert (stats["retried"], stats["dead_lettered"], stats["retries_scheduled"]) == (2, 0, 0)
+        await engine.close()
+
+    @pytest.mark.asyncio
+    async def test_delivery_is_dead_lettered_after_max_attempts(self):
+        async def broken(msg):
+            raise RuntimeError(f"cannot handle {msg.subject}")
+
+        engine = DeliveryEngine(handler_for=lambda recipient_id: broken, max_attempts=2,
+                                base_backoff=0.01, timer_tick=0.005)
+        engine.enqueue("busy", message("one"))
+        engine.enqueue("busy", message("two"))
+        await wait_until(lambda: engine.dead_lettered == 2)
+
+        letters = engine.get_dead_letters()
+        assert [letter["subject"] for letter in letters] == ["two", "one"]
+        assert letters[0]["attempts"] == 2
+        assert letters[0]["reason"] == "cannot handle two"
+        assert engine.get_dead_letters(limit=1) == letters[:1]
+        assert (engine.delivered, engine.retried) == (0, 2)
+        await engine.close()
+
+    @pytest.mark.asyncio
+    async def test_slow_handler_times_out(self):
+        async def slow(msg):
+            await asyncio.sleep(1)
+
+        engine = DeliveryEngine(handler_for=lambda recipient_id: slow, max_attempts=1, handler_timeout=0.01)
+        engine.enqueue("busy", message("slow"))
+        await wait_until(lambda: engine.dead_lettered == 1)
+        assert engine.get_dead_letters()[0]["reason"] == "handler timed out"
+        await engine.close()
+
+    @pytest.mark.asyncio
+    async def test_full_mailbox_dead_letters_immediately(self):
+        release = asyncio.Event()
+
+        async def blocked(msg):
+            await release.wait()
+
+        engine = DeliveryEngine(handler_for=lambda recipient_id: blocked, mailbox_size=1)
+        assert engine.enqueue("busy", message("handling"))
+        await asyncio.sleep(0)
+        assert engine.enqueue("busy", message("waiting"))
+        assert not engine.enqueue("busy", message("overflow"))
+        assert engine.broadcast(["busy", "idle"], message("both")) == 1
+
+        assert [letter["subject"] for letter in engine.get_dead_letters()] == ["both", "overflow"]
+        assert engine.get_dead_letters()[0]["reason"] == "mailbox full"
+        assert engine.enqueued == 3
+        release.set()
+        await wait_until(lambda: engine.delivered == 3)
+        await engine.close()
+
+    @pytest.mark.asyncio
+    async def test_close_drops_scheduled_retries(self):
+        async def broken(msg):
+            raise RuntimeError("down")
+
+        engine = DeliveryEngine(handler_for=lambda recipient_id: broken, base_backoff=10.0)
+        engine.enqueue("busy", message("later"))
+        await wait_until(lambda: engine.get_stats()["retries_scheduled"] == 1)
+
+        await engine.close()
+        assert engine.get_stats()["retries_scheduled"] == 0
+        assert engine.dead_lettered == 0
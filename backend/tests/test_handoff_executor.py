@@ -0,0 +1,176 @@
+"""
+Unit tests for R&D production handoff delivery
+Tests per-department concurrency, isolation from slow departments and the persisted retry queue
+"""
+
+import asyncio
+import pytest
+
+from ..rd.innovation_pipeline import InnovationPipeline, ApprovalStatus
+from ..rd.handoff_executor import HandoffExecutor, HandoffRetryQueue, PendingHandoff
+
+
+@pytest.fixture
+def retry_path(tmp_path):
+    return str(tmp_path / "handoff_retries.db")
+
+
+def package(name, category="chat_interface"):
+    return {"innovation_id": name, "feature_name": name, "category": category}
+
+
+def approved_pipeline(retry_path, categories, **options):
+    pipeline = InnovationPipeline()
+    pipeline.handoff_executor = HandoffExecutor(pipeline._deliver_handoff,
+                                                concurrency=pipeline.pipeline_config["handoff_concurrency"],
+                                                retry_queue=HandoffRetryQueue(retry_path), **options)
+    for i, category in enumerate(categories):
+        innovation_id = pipeline.add_innovation({"name": f"feature-{i}", "description": "Test feature",
+                                                 "source_agent": "vulcan-strategy", "category": category})
+        for _ in range(3):
+            pipeline.advance_innovation_stage(innovation_id)
+        pipeline.set_approval_status(innovation_id, ApprovalStatus.APPROVED)
+    return pipeline
+
+
+@pytest.mark.unit
+class TestHandoffRetryQueue:
+    """Test the persisted retry queue"""
+
+    def test_claimed_retries_are_leased(self, retry_path):
+        queue = HandoffRetryQueue(retry_path)
+        queue.record([(PendingHandoff("frontend", package("a")), 0.0, "down")], [])
+
+        claimed = queue.claim_due(now=1.0, limit=10, lease=60.0)
+        assert [handoff.package["feature_name"] for handoff in claimed] == ["a"]
+        assert claimed[0].retry_id is not None
+        assert queue.claim_due(now=2.0, limit=10, lease=60.0) == []
+        assert len(queue.claim_due(now=62.0, limit=10, lease=60.0)) == 1
+
+    def test_claims_are_capped_per_department(self, retry_path):
+        queue = HandoffRetryQueue(retry_path)
+        queue.record([(PendingHandoff(department, package(f"{department}-{i}")), float(i), "down")
+                      for department in ("frontend", "backend") for i in range(5)], [])
+
+        claimed = queue.claim_due(now=10.0, limit=100, lease=60.0, per_department=lambda department: {"frontend": 2}.get(department, 0))
+        by_department = {}
+        for handoff in claimed:
+            by_department.setdefault(handoff.department, []).append(handoff.package["feature_name"])
+        assert by_department == {"frontend": ["frontend-0", "frontend-1"]}
+
+    def test_retries_survive_reopening(self, retry_path):
+        HandoffRetryQueue(retry_path).record([(PendingHandoff("backend", package("a")), 0.0, "down")],
+                                             [(PendingHandoff("backend", package("b")), "gone")])
+
+        reopened = HandoffRetryQueue(retry_path)
+        assert reopened.counts() == {"pending": 1, "dead": 1}
+        assert reopened.dead_letters()[0]["last_error"] == "gone"
+
+
+@pytest.mark.unit
+class TestHandoffExecutor:
+    """Test concurrent delivery"""
+
+    @pytest.mark.asyncio
+    async def test_respects_department_concurrency(self, retry_path):
+        in_flight = {"now": 0, "peak": 0}
+
+        async def deliver(department, handoff_package):
+            in_flight["now"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            await asyncio.sleep(0.01)
+            in_flight["now"] -= 1
+
+        executor = HandoffExecutor(deliver, concurrency={"frontend": 3}, retry_queue=HandoffRetryQueue(retry_path))
+        outcomes = await executor.dispatch([PendingHandoff("frontend", package(str(i))) for i in range(12)])
+
+        assert [outcome["status"] for outcome in outcomes] == ["delivered"] * 12
+        assert in_flight["peak"] == 3
+
+    @pytest.mark.asyncio
+    async def test_slow_department_does_not_delay_others(self, retry_path):
+        pipeline = approved_pipeline(retry_path, ["chat_interface", "ai_reports", "infrastructure"] * 4)
+
+        async def slow(handoff_package):
+            await asyncio.sleep(0.3)
+
+        async def fast(handoff_package):
+            return True
+
+        pipeline.register_department_handler("infrastructure", slow, concurrency=1)
+        pipeline.register_department_handler("frontend", fast)
+        pipeline.register_department_handler("backend", fast)
+        results = await pipeline.process_batch_handoffs(limit=12)
+
+        latency = {result["category"]: result["delivery"]["handoff_latency"] for result in results}
+        assert all(result["delivery"]["status"] == "delivered" for result in results)
+        assert latency["chat_interface"] < 0.2 and latency["ai_reports"] < 0.2
+        assert latency["infrastructure"] >= 1.0
+
+    @pytest.mark.asyncio
+    async def test_failed_handoffs_are_retried_then_dead_lettered(self, retry_path):
+        pipeline = approved_pipeline(retry_path, ["chat_interface", "ai_reports"],
+                                     base_backoff=0.0, max_attempts=2, delivery_timeout=0.05)
+
+        async def hangs(handoff_package):
+            await asyncio.sleep(1)
+
+        async def rejects(handoff_package):
+            return False
+
+        pipeline.register_department_handler("frontend", hangs)
+        pipeline.register_department_handler("backend", rejects)
+
+        first = await pipeline.process_batch_handoffs()
+        assert [result["delivery"]["status"] for result in first] == ["retry_scheduled"] * 2
+        assert pipeline.handoff_executor.retry_queue.counts() == {"pending": 2, "dead": 0}
+
+        second = await pipeline.process_batch_handoffs()
+        assert all(result["retried"] for result in second)
+        assert [result["delivery"]["status"] for result in second] == ["dead_lettered"] * 2
+
+        stats = pipeline.get_handoff_metrics()
+        assert stats["retry_queue"] == {"pending": 0, "dead": 2}
+        assert stats["departments"]["frontend"]["timeouts"] == 2
+
+    @pytest.mark.asyncio
+    async def test_retry_is_delivered_and_removed(self, retry_path):
+        pipeline = approved_pipeline(retry_path, ["chat_interface"], base_backoff=0.0)
+        attempts = []
+
+        async def flaky(handoff_package):
+            attempts.append(handoff_package["feature_name"])
+            if len(attempts) == 1:
+                raise ConnectionError("department unavailable")
+
+        pipeline.register_department_handler("frontend", flaky)
+        await pipeline.process_batch_handoffs()
+        retried = await pipeline.process_batch_handoffs()
+
+        assert retried[0]["delivery"]["status"] == "delivered"
+        assert retried[0]["delivery"]["attempts"] == 2
+        assert pipeline.handoff_executor.retry_queue.counts() == {"pending": 0, "dead": 0}
+
+    @pytest.mark.asyncio
+    async def test_overlapping_dispatches_do_not_deliver_retries_twice(self, retry_path):
+        deliveries = []
+
+        async def deliver(department, handoff_package):
+            deliveries.append(handoff_package["feature_name"])
+            await asyncio.sleep(0.15)
+
+        queue = HandoffRetryQueue(retry_path)
+        queue.record([(PendingHandoff("frontend", package(str(i))), 0.0, "down") for i in range(6)], [])
+        executor = HandoffExecutor(deliver, concurrency={"frontend": 2}, delivery_timeout=0.2, retry_queue=queue)
+
+        async def second_dispatch():
+            await asyncio.sleep(0.1)  # while the first one is still delivering
+            return await executor.dispatch([PendingHandoff("frontend", package("new"))])
+
+        first, second = await asyncio.gather(executor.dispatch([]), second_dispatch())
+
+        assert len(first) == 2
+        assert len(second) == 3
+        assert second[0]["feature_name"] == "new"
+        assert sorted(deliveries) == sorted(set(deliveries))
+        assert queue.counts() == {"pending": 2, "dead": 0}
@@ -0,0 +1,135 @@
+"""
+Unit tests for the learning journal and the self-improvement engine's use of it
+Tests replay on restart, lazy loading, compaction and recovery after a crash
+"""
+
+import asyncio
+import shutil
+import sqlite3
+import pytest
+
+from ..agents.learning_journal import LearningJournal
+from ..agents.self_improvement import SelfImprovementEngine
+
+
+def record(engine, count, agents=("apollo", "hermes")):
+    for i in range(count):
+        engine.record_learning_point(
+            agent_name=agents[i % len(agents)],
+            task_type="optimization",
+            parameters={"batch_size": 16 * (1 + i % 3)},
+            outcome="success" if i % 4 else "failure",
+            performance_delta={"latency": float(i % 10)},
+            execution_time=0.1 * (i % 5)
+        )
+
+
+def point(i):
+    return {"agent_name": f"agent-{i % 3}", "task_type": "analysis", "timestamp": f"2026-01-01T00:00:{i % 60:02d}",
+            "index": i}
+
+
+@pytest.mark.unit
+class TestJournalReplay:
+    """Test that a new engine sees what the previous one recorded"""
+
+    def test_restart_replays_points_history_and_patterns(self, tmp_path):
+        engine = SelfImprovementEngine(str(tmp_path))
+        engine.pattern_confidence_threshold = 0.0
+        record(engine, 40)
+        asyncio.run(engine.discover_patterns())
+        points = [(p.agent_name, p.parameters, p.outcome) for p in engine.learning_points]
+        history = {agent: list(entries) for agent, entries in engine.agent_performance_history.items()}
+        patterns = set(engine.optimization_patterns)
+        assert patterns
+        engine.stop()
+
+        reopened = SelfImprovementEngine(str(tmp_path))
+        # Only patterns are read up front; points and history wait for first use
+        assert set(reopened.optimization_patterns) == patterns
+        assert not reopened._window_loaded and reopened._agent_performance_history == {}
+
+        assert [(p.agent_name, p.parameters, p.outcome) for p in reopened.learning_points] == points
+        assert reopened.pattern_groups.keys() == engine.pattern_groups.keys()
+        assert reopened.agent_performance_history == history
+        reopened.journal.close()
+
+    def test_recording_loads_only_that_agents_history(self, tmp_path):
+        engine = SelfImprovementEngine(str(tmp_path))
+        record(engine, 10)
+        engine.stop()
+
+        reopened = SelfImprovementEngine(str(tmp_path))
+        record(reopened, 1, agents=("hermes",))
+        assert list(reopened._agent_performance_history) == ["hermes"]
+        assert len(reopened._agent_performance_history["hermes"]) == 6
+
+        reopened.journal.flush()
+        history = reopened.agent_performance_history
+        assert {agent: len(entries) for agent, entries in history.items()} == {"hermes": 6, "apollo": 5}
+        reopened.journal.close()
+
+
+@pytest.mark.unit
+class TestJournalCompaction:
+    """Test trimming to the in-memory limits"""
+
+    def test_compact_keeps_newest_rows(self, tmp_path):
+        path = str(tmp_path / "journal.db")
+        journal = LearningJournal(path, max_points=50, max_history_per_agent=10, compact_every=10 ** 6)
+        for i in range(120):
+            journal.append_point(point(i))
+            journal.append_history(f"agent-{i % 3}", {"index": i})
+        journal.compact()
+        journal.flush()
+
+        db = sqlite3.connect(path)
+        assert db.execute("SELECT COUNT(*) FROM learning_points").fetchone()[0] == 50
+        assert db.execute("SELECT agent_name, COUNT(*) FROM performance_history GROUP BY agent_name").fetchall() == [
+            ("agent-0", 10), ("agent-1", 10), ("agent-2", 10)
+        ]
+        db.close()
+        assert [record["index"] for record in journal.load_points()] == list(range(70, 120))
+        assert [record["index"] for record in journal.load_agent_history("agent-1")] == list(range(91, 120, 3))
+        assert journal.compactions == 1
+        journal.close()
+
+    def test_compacts_automatically_after_compact_every_points(self, tmp_path):
+        journal = LearningJournal(str(tmp_path / "journal.db"), max_points=5, compact_every=20, batch_size=10)
+        for i in range(40):
+            journal.append_point(point(i))
+        journal.flush()
+
+        assert journal.compactions >= 1
+        assert len(journal.load_points(limit=100)) <= 25
+        journal.close()
+
+
+@pytest.mark.unit
+class TestJournalCrashRecovery:
+    """Test that committed writes survive a process that never closed the journal"""
+
+    def test_unclosed_journal_is_recovered_from_the_wal(self, tmp_path):
+        source, crashed = tmp_path / "running", tmp_path / "crashed"
+        source.mkdir()
+        engine = SelfImprovementEngine(str(source))
+        record(engine, 25)
+        engine.journal.flush()
+
+        # Copy the files as a killed process would leave them: no close, no checkpoint
+        shutil.copytree(source, crashed)
+        assert (crashed / "learning_journal.db-wal").exists()
+
+        recovered = SelfImprovementEngine(str(crashed))
+        assert len(recovered.learning_points) == 25
+        assert sum(len(entries) for entries in recovered.agent_performance_history.values()) == 25
+        recovered.journal.close()
+        engine.journal.close()
+
+    def test_unreadable_journal_starts_empty(self, tmp_path):
+        (tmp_path / "learning_journal.db").write_bytes(b"not a database" * 100)
+
+        engine = SelfImprovementEngine(str(tmp_path))
+        assert len(engine.learning_points) == 0
+        assert engine.agent_performance_history == {}
+        engine.journal.close()
@@ -0,0 +1,89 @@
+"""
+Unit tests for the streaming window aggregates
+Tests windowed min/max/mean/stddev/quantiles against a brute-force scan of the same samples
+"""
+
+import random
+import statistics
+import pytest
+
+from ..master_orchestrator.metric_aggregation import StreamingAggregator
+
+WINDOWS = (60, 300, 3600)
+BUCKETS = 60
+
+
+def in_window(samples, window, now):
+    """Samples a window should cover: its closed buckets after the oldest one dropped, plus the open ones"""
+    width = max(1, window // BUCKETS)
+    oldest = int(now) // width - BUCKETS
+    return [value for timestamp, value in samples if int(timestamp) // width > oldest]
+
+
+def check(aggregator, samples, now):
+    for window in WINDOWS:
+        expected = in_window(samples, window, now)
+        aggregate = aggregator.get("latency", window, now=now, percentiles=(0.9, 0.99))
+        if not expected:
+            assert aggregate is None
+            continue
+
+        ordered = sorted(expected)
+        assert aggregate["count"] == len(expected)
+        assert aggregate["min"] == ordered[0]
+        assert aggregate["max"] == ordered[-1]
+        assert aggregate["avg"] == pytest.approx(statistics.fmean(expected), rel=1e-9)
+        if len(expected) > 1:
+            assert aggregate["stddev"] == pytest.approx(statistics.stdev(expected), rel=1e-6, abs=1e-9)
+        for name, q in (("median", 0.5), ("p90", 0.9), ("p99", 0.99)):
+            # The sketch returns the rank's value to within its relative accuracy
+            assert aggregate[name] == pytest.approx(ordered[int(q * (len(ordered) - 1))], rel=0.011)
+
+
+@pytest.mark.unit
+class TestWindowAggregatesMatchBruteForce:
+    """Test every window at many points while samples arrive and expire"""
+
+    @pytest.mark.parametrize("seed", [1, 7, 42])
+    def test_random_stream(self, seed):
+        rng = random.Random(seed)
+        aggregator = StreamingAggregator(windows=WINDOWS, buckets_per_window=BUCKETS)
+        samples = []
+        now = 1_700_000_000.0
+
+        for step in range(3000):
+            # Mostly dense arrivals, with the occasional gap longer than the short windows
+            now += rng.expovariate(1.0) if rng.random() > 0.01 else rng.uniform(60, 400)
+            value = rng.lognormvariate(3, 1)
+            aggregator.add("latency", value, timestamp=now)
+            samples.append((now, value))
+            if step % 25 == 0:
+                check(aggregator, samples, now)
+                check(aggregator, samples, now + rng.uniform(0, 90))
+                now += 90
+
+        check(aggregator, samples, now)
+
+    def test_extremes_leave_with_their_bucket(self):
+        aggregator = StreamingAggregator(windows=WINDOWS, buckets_per_window=BUCKETS)
+        samples = [(1000.0, 500.0), (1001.0, 1.0)] + [(1002.0 + i, 50.0 + i % 7) for i in range(58)]
+        for timestamp, value in samples:
+            aggregator.add("latency", value, timestamp=timestamp)
+
+        for now in (1060.0, 1061.0, 1062.0, 1121.0, 1200.0, 5000.0):
+            check(aggregator, samples, now)
+            if now == 1060.0:
+                # The max has left the minute window one second before the min
+                assert aggregator.get("latency", 60, now=now)["max"] == 56.0
+                assert aggregator.get("latency", 60, now=now)["min"] == 1.0
+                assert aggregator.get("latency", 3600, now=now)["max"] == 500.0
+
+    def test_window_empties_after_a_long_gap(self):
+        aggregator = StreamingAggregator(windows=WINDOWS, buckets_per_window=BUCKETS)
+        for i in range(100):
+            aggregator.add("latency", float(i), timestamp=1000.0 + i)
+
+        assert aggregator.get("latency", 60, now=1100.0 + 3600) is None
+        assert aggregator.snapshot("latency", now=1100.0 + 7200) == {}
+        aggregator.add("latency", 3.0, timestamp=1100.0 + 7200)
+        assert aggregator.get("latency", 3600, now=1100.0 + 7200)["count"] == 1
@@ -0,0 +1,91 @@
+"""
+Unit tests for the monitoring metric store
+Tests point limits, persistence across restarts and queued writes
+"""
+
+import pytest
+import time
+
+from ..master_orchestrator.metric_store import MetricStore
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / "metrics.db")
+
+
+def fill(store, metric_id, seconds, end):
+    for i in range(seconds):
+        store.append(metric_id, float(i % 100), end - seconds + i)
+
+
+@pytest.mark.unit
+class TestMetricStore:
+    """Test the raw + rollup metric store"""
+
+    def test_raw_query_respects_max_points(self, store_path):
+        store = MetricStore(store_path)
+        end = time.time()
+        fill(store, "cpu", 6 * 3600, end)
+
+        result = store.query("cpu", end - 6 * 3600, end, max_points=1000)
+
+        assert result["resolution"] == "raw"
+        assert len(result["points"]) <= 1000
+        assert result["bucket_seconds"] == pytest.approx(21.6)
+        assert result["summary"]["count"] == 6 * 3600
+        assert (result["summary"]["min"], result["summary"]["max"]) == (0.0, 99.0)
+        store.close()
+
+    def test_history_survives_restart(self, store_path):
+        store = MetricStore(store_path)
+        end = time.time()
+        fill(store, "cpu", 600, end)
+        store.close()  # buffered segments and open buckets are written
+
+        reopened = MetricStore(store_path)
+        assert "cpu" in reopened
+        for resolution in ("raw", "1m", "1h"):
+            summary = reopened.query("cpu", end - 3600, end + 3600, resolution=resolution)["summary"]
+            assert summary["count"] == 600
+        reopened.close()
+
+    def test_queued_writes_are_visible_to_queries(self, store_path):
+        store = MetricStore(store_path, segment_size=10)
+        end = time.time()
+        fill(store, "cpu", 100, end)  # ten segments queued to the writer
+
+        assert store.query("cpu", end - 100, end, resolution="raw")["summary"]["count"] == 100
+        store.flush()
+        assert store.get_stats()["segments_written"] == 10
+        assert store.get_stats()["queued_writes"] == 0
+        assert store.query("cpu", end - 100, end, resolution="raw")["summary"]["count"] == 100
+        store.close()
+
+    def test_slow_metrics_are_not_written_sample_by_sample(self, store_path):
+        store = MetricStore(store_path, min_segment_size=32, max_buffer_seconds=60, max_buffer_age=3600)
+        end = time.time()
+        fill(store, "slow", 5, end)
+        fill(store, "idle", 3, end)
+
+        store._buffer_started["slow"] -= 120  # a minute past max_buffer_seconds, only 5 samples
+        store._buffer_started["idle"] -= 4000  # past max_buffer_age
+        store._queue_writes(only_aged=True)
+        store._queue.join()
+        assert store.get_stats()["segments_written"] == 1
+        assert "slow" in store._buffers and "idle" not in store._buffers
+
+        fill(store, "slow", 27, end + 100)  # 32 samples now
+        store._buffer_started["slow"] -= 120
+        store._queue_writes(only_aged=True)
+        store._queue.join()
+        assert store.get_stats()["segments_written"] == 2
+        store.close()
+
+    def test_in_memory_store_keeps_short_retention(self, store_path):
+        in_memory = MetricStore(":memory:")
+        on_disk = MetricStore(store_path)
+        assert in_memory.retention["raw"] < on_disk.retention["raw"]
+        assert in_memory.retention["1h"] <= 86400
+        in_memory.close()
+        on_disk.close()
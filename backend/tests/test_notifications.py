@@ -0,0 +1,183 @@
+"""
+Unit tests for outbound notification delivery
+Tests the spool, SMTP connection reuse, digests and retries against an in-process SMTP sink
+"""
+
+import pytest
+import time
+
+from ..notifications import (
+    NotificationSpool, OutboundMailer, SMTPTransport, DeliveryError, SMTPSink
+)
+
+
+@pytest.fixture
+def sink():
+    sink = SMTPSink()
+    sink.start()
+    yield sink
+    sink.stop()
+
+
+@pytest.fixture
+def spool_path(tmp_path):
+    return str(tmp_path / "outbox.db")
+
+
+def make_mailer(sink, spool_path, **options):
+    transport = SMTPTransport("127.0.0.1", sink.port, starttls=False)
+    return OutboundMailer(transport, spool_path, "noreply@coinlink.app", **options)
+
+
+@pytest.mark.unit
+class TestNotificationSpool:
+    """Test the durable outbox"""
+
+    def test_claim_due_orders_by_due_time(self, spool_path):
+        spool = NotificationSpool(spool_path)
+        now = time.time()
+        spool.add([
+            ("a@x.com", ["b@x.com"], "later", "<p/>", None, now, now + 60),
+            ("a@x.com", ["b@x.com"], "first", "<p/>", None, now, now - 1),
+            ("a@x.com", ["b@x.com"], "second", "<p/>", None, now, now)
+        ])
+
+        claimed = spool.claim_due(now, 10)
+        assert [m.subject for m in claimed] == ["first", "second"]
+        assert claimed[0].recipients == ["b@x.com"]
+
+    def test_claim_due_pulls_whole_digest(self, spool_path):
+        spool = NotificationSpool(spool_path)
+        now = time.time()
+        spool.add([
+            ("a@x.com", ["b@x.com"], "one", "<p/>", "perf", now, now - 1),
+            ("a@x.com", ["b@x.com"], "two", "<p/>", "perf", now, now + 60),
+            ("a@x.com", ["c@x.com"], "other recipient", "<p/>", "perf", now, now + 60)
+        ])
+
+        assert [m.subject for m in spool.claim_due(now, 10)] == ["one", "two"]
+
+    def test_reschedule_and_kill(self, spool_path):
+        spool = NotificationSpool(spool_path)
+        now = time.time()
+        first, second = spool.add([
+            ("a@x.com", ["b@x.com"], "retry", "<p/>", None, now, now),
+            ("a@x.com", ["b@x.com"], "dead", "<p/>", None, now, now)
+        ])
+
+        spool.reschedule([first], now + 30, "timeout")
+        spool.kill([second], "550 No such user")
+
+        assert spool.claim_due(now, 10) == []
+        assert spool.claim_due(now + 31, 10)[0].attempts == 1
+        assert spool.counts() == {"pending": 1, "dead": 1}
+        assert spool.dead_letters()[0]["error"] == "550 No such user"
+
+    def test_messages_survive_reopen(self, spool_path):
+        now = time.time()
+        NotificationSpool(spool_path).add([("a@x.com", ["b@x.com"], "kept", "<p/>", None, now, now)])
+
+        assert NotificationSpool(spool_path).claim_due(now, 10)[0].subject == "kept"
+
+
+@pytest.mark.unit
+class TestSMTPTransport:
+    """Test the persistent SMTP connection"""
+
+    def test_reuses_connection(self, sink):
+        transport = SMTPTransport("127.0.0.1", sink.port, starttls=False)
+        for i in range(5):
+            transport.send("a@x.com", ["b@x.com"], f"Subject: {i}\r\n\r\nbody")
+        transport.close()
+
+        assert len(sink.messages) == 5
+        assert sink.connections == 1
+
+    def test_reconnects_after_server_disconnect(self, sink):
+        transport = SMTPTransport("127.0.0.1", sink.port, starttls=False)
+        transport.send("a@x.com", ["b@x.com"], "Subject: 1\r\n\r\nbody")
+        sink.disconnect_all()
+        time.sleep(0.05)
+        transport.send("a@x.com", ["b@x.com"], "Subject: 2\r\n\r\nbody")
+
+        assert len(sink.messages) == 2
+        assert transport.connections == 2
+
+    def test_refused_recipient_is_permanent(self):
+        sink = SMTPSink(refuse={"nobody@x.com"})
+        sink.start()
+        try:
+            transport = SMTPTransport("127.0.0.1", sink.port, starttls=False)
+            with pytest.raises(DeliveryError) as error:
+                transport.send("a@x.com", ["nobody@x.com"], "Subject: x\r\n\r\nbody")
+            assert error.value.permanent
+        finally:
+            sink.stop()
+
+
+@pytest.mark.unit
+class TestOutboundMailer:
+    """Test spooled, batched delivery"""
+
+    @pytest.mark.asyncio
+    async def test_delivers_burst_over_one_connection(self, sink, spool_path):
+        mailer = make_mailer(sink, spool_path)
+        for i in range(25):
+            await mailer.send(["b@x.com"], f"Alert {i}", "<p>alert</p>")
+        await mailer.drain(timeout=10)
+        stats = await mailer.get_stats()
+        await mailer.stop()
+
+        assert len(sink.messages) == 25
+        assert sink.connections == 1
+        assert stats["emails_sent"] == 25
+        assert stats["spool"] == {"pending": 0, "dead": 0}
+
+    @pytest.mark.asyncio
+    async def test_digest_coalesces_per_recipient(self, sink, spool_path):
+        mailer = make_mailer(sink, spool_path)
+        for i in range(4):
+            await mailer.send(["b@x.com", "c@x.com"], f"Update {i}", f"<p>update {i}</p>",
+                              digest_key="performance", digest_window=0.2)
+        await mailer.drain(timeout=10)
+        assert sink.messages == []
+
+        time.sleep(0.25)
+        await mailer.drain(timeout=10)
+        stats = await mailer.get_stats()
+        await mailer.stop()
+
+        assert sorted(recipients[0] for _, recipients, _ in sink.messages) == ["b@x.com", "c@x.com"]
+        assert b"Subject: Update 3 (+3 more)" in sink.messages[0][2]
+        assert stats["notifications_sent"] == 8
+        assert stats["coalesced"] == 6
+
+    @pytest.mark.asyncio
+    async def test_failed_delivery_is_retried(self, spool_path):
+        sink = SMTPSink()
+        sink.start()
+        port = sink.port
+        sink.stop()
+
+        mailer = OutboundMailer(SMTPTransport("127.0.0.1", port, starttls=False, timeout=1.0),
+                                spool_path, "noreply@coinlink.app", base_backoff=0.2)
+        await mailer.send(["b@x.com"], "Retry me", "<p/>")
+        await mailer.drain(timeout=10)
+        stats = await mailer.get_stats()
+        await mailer.stop()
+
+        assert stats["retries_scheduled"] == 1
+        assert stats["spool"] == {"pending": 1, "dead": 0}
+
+    @pytest.mark.asyncio
+    async def test_spooled_messages_are_sent_after_restart(self, sink, spool_path):
+        now = time.time()
+        NotificationSpool(spool_path).add([
+            ("noreply@coinlink.app", ["b@x.com"], "Left over", "<p/>", None, now, now)
+        ])
+
+        mailer = make_mailer(sink, spool_path)
+        await mailer.drain(timeout=10)
+        await mailer.stop()
+
+        assert len(sink.messages) == 1
@@ -16,6 +16,8 @@ from ..observability.logging import (
 )
 from ..observability.sentry import configure_sentry, capture_exception, capture_message
 from ..observability.middleware import RequestTracingMiddleware, MetricsMiddleware
+from ..observability.loop_monitor import LoopMonitor
+from prometheus_client import CollectorRegistry
 
 
 @pytest.mark.unit
@@ -426,6 +428,60 @@ class TestObservabilityMiddleware:
         assert True
 
 
+@pytest.mark.unit
+class TestLoopMonitor:
+    """Test event loop lag and slow callback monitoring"""
+    
+    @pytest.mark.asyncio
+    async def test_blocking_call_reported_as_slow_callback(self):
+        """Test that a call blocking the loop is captured with its coroutine and stack"""
+        import asyncio
+        import time
+        
+        monitor = LoopMonitor(sample_interval=0.01, slow_threshold=0.05, registry=CollectorRegistry())
+        await monitor.start()
+        
+        async def blocking_handler():
+            time.sleep(0.2)
+        
+        try:
+            await asyncio.sleep(0.05)
+            await asyncio.create_task(blocking_handler())
+            await asyncio.sleep(0.05)
+        finally:
+            monitor.stop()
+        
+        stats = monitor.get_stats()
+        assert stats['slow_callbacks'] >= 1
+        assert stats['lag_max'] >= 0.1
+        
+        event = monitor.slow_callbacks[-1]
+        assert event.coroutine.endswith('blocking_handler')
+        assert 'blocking_handler' in event.stack
+    
+    @pytest.mark.asyncio
+    async def test_coroutine_time_attribution(self):
+        """Test that sampled tasks have their loop time attributed by name"""
+        import asyncio
+        
+        monitor = LoopMonitor(attribution_sample_rate=1.0, registry=CollectorRegistry())
+        await monitor.start()
+        
+        async def busy_task():
+            sum(range(10000))
+            await asyncio.sleep(0)
+        
+        try:
+            await asyncio.gather(*(asyncio.create_task(busy_task()) for _ in range(5)))
+        finally:
+            monitor.stop()
+        
+        top = {entry['coroutine']: entry for entry in monitor.top_coroutines()}
+        name = next(n for n in top if n.endswith('busy_task'))
+        assert top[name]['steps'] == 10
+        assert top[name]['seconds'] > 0
+
+
 @pytest.mark.integration
 class TestObservabilityIntegration:
     """Integration tests for observability components"""
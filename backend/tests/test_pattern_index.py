@@ -0,0 +1,156 @@
+"""
+Unit tests for the optimization pattern index
+Tests that indexed search picks the same pattern as a linear scan, across adds, removals and confidence updates
+"""
+
+import random
+from datetime import datetime
+
+import pytest
+
+from ..agents.pattern_index import PatternIndex
+from ..agents.self_improvement import OptimizationPattern, SelfImprovementEngine
+
+TASK_TYPES = ("optimization", "analysis")
+
+
+@pytest.fixture
+def match_score(tmp_path):
+    engine = SelfImprovementEngine(str(tmp_path))
+    yield engine.calculate_match_score
+    engine.journal.close()
+
+
+def random_value(rng, key):
+    if key in ("batch_size", "workers"):
+        return rng.choice([8, 16, 24, 32, 64, 100])
+    if key == "learning_rate":
+        return rng.choice([0.001, 0.01, 0.012, 0.1, 0.5])
+    if key == "mode":
+        return rng.choice(["fast", "safe", "batch"])
+    if key == "cache":
+        return rng.choice([True, False, "redis"])
+    return rng.choice([["a", "b"], {"nested": 1}, float("nan")])  # cannot be indexed
+
+
+def random_pattern(rng, i):
+    keys = ["batch_size", "workers", "learning_rate", "mode", "cache"]
+    if rng.random() < 0.1:
+        keys.append("extra")
+    size = 0 if rng.random() < 0.02 else rng.randint(1, 3)
+    conditions = {key: random_value(rng, key) for key in rng.sample(keys, size)}
+    return OptimizationPattern(
+        pattern_id=f"pattern-{i}",
+        task_type=rng.choice(TASK_TYPES),
+        conditions=conditions,
+        actions={"index": i},
+        success_rate=0.9,
+        average_improvement=1.0,
+        usage_count=0,
+        last_used=datetime.now(),
+        confidence_score=rng.choice([0.5, 0.7, 0.8, 0.9, rng.random()])
+    )
+
+
+def random_context(rng):
+    keys = ["batch_size", "workers", "learning_rate", "mode", "cache", "extra"]
+    return {key: random_value(rng, key) for key in rng.sample(keys, rng.randint(0, 5))}
+
+
+def linear_scan(patterns, match_score, task_type, context, min_confidence, min_match):
+    """The scan the index replaced: highest confidence x match, earliest added on ties"""
+    best = None
+    for pattern in patterns:
+        if pattern.task_type != task_type or pattern.confidence_score < min_confidence:
+            continue
+        score = match_score(pattern.conditions, context)
+        if score > min_match and (best is None or pattern.confidence_score * score > best[0]):
+            best = (pattern.confidence_score * score, pattern, score)
+    return None if best is None else (best[1], best[2])
+
+
+def assert_same_choice(index, patterns, match_score, rng, queries=300):
+    for _ in range(queries):
+        task_type = rng.choice(TASK_TYPES)
+        context = random_context(rng)
+        min_confidence = rng.choice([0.0, 0.6, 0.8])
+        min_match = rng.choice([0.0, 0.5, 0.7])
+
+        expected = linear_scan(patterns, match_score, task_type, context, min_confidence, min_match)
+        found = index.best_match(task_type, context, min_confidence, min_match)
+        if expected is None:
+            assert found is None, context
+        else:
+            assert found is not None, context
+            assert found[0].pattern_id == expected[0].pattern_id, context
+            assert found[1] == pytest.approx(expected[1])
+
+
+@pytest.mark.unit
+class TestPatternIndexMatchesLinearScan:
+    """Test indexed recommendation lookups against scoring every pattern"""
+
+    @pytest.mark.parametrize("seed", [3, 11, 2026])
+    def test_random_patterns_and_contexts(self, match_score, seed):
+        rng = random.Random(seed)
+        index = PatternIndex(match_score)
+        patterns = [random_pattern(rng, i) for i in range(400)]
+        for pattern in patterns:
+            index.add(pattern)
+
+        assert len(index) == len(patterns)
+        assert_same_choice(index, patterns, match_score, rng)
+
+    def test_after_removals_replacements_and_confidence_updates(self, match_score):
+        rng = random.Random(5)
+        index = PatternIndex(match_score)
+        patterns = {}
+        for i in range(300):
+            pattern = random_pattern(rng, i)
+            patterns[pattern.pattern_id] = pattern
+            index.add(pattern)
+
+        for pattern_id in rng.sample(sorted(patterns), 100):
+            index.remove(pattern_id)
+            del patterns[pattern_id]
+        for pattern in rng.sample(list(patterns.values()), 50):
+            pattern.confidence_score = rng.random()
+            index.update_confidence(pattern)
+        for pattern_id in rng.sample(sorted(patterns), 30):
+            # Re-adding an id replaces the pattern and moves it to the back on ties
+            replacement = random_pattern(rng, 0)
+            replacement.pattern_id = pattern_id
+            del patterns[pattern_id]
+            patterns[pattern_id] = replacement
+            index.add(replacement)
+
+        assert len(index) == len(patterns) == 200
+        assert_same_choice(index, list(patterns.values()), match_score, rng)
+
+    def test_ties_go_to_the_earliest_pattern(self, match_score):
+        index = PatternIndex(match_score)
+        rng = random.Random(0)
+        patterns = []
+        for i in range(5):
+            pattern = random_pattern(rng, i)
+            pattern.task_type, pattern.conditions, pattern.confidence_score = "optimization", {"mode": "fast"}, 0.9
+            patterns.append(pattern)
+            index.add(pattern)
+
+        assert index.best_match("optimization", {"mode": "fast"}, 0.8, 0.7)[0] is patterns[0]
+        index.remove("pattern-0")
+        assert index.best_match("optimization", {"mode": "fast"}, 0.8, 0.7)[0] is patterns[1]
+        assert index.best_match("optimization", {"mode": "safe"}, 0.8, 0.7) is None
+
+    def test_clear_and_stats(self, match_score):
+        index = PatternIndex(match_score)
+        rng = random.Random(1)
+        for i in range(20):
+            index.add(random_pattern(rng, i))
+        index.best_match("optimization", {"mode": "fast"}, 0.0, 0.0)
+
+        stats = index.get_stats()
+        assert stats["patterns"] == 20 and stats["queries"] == 1
+        index.clear()
+        assert len(index) == 0
+        assert index.best_match("optimization", {"mode": "fast"}, 0.0, 0.0) is None
@@ -0,0 +1,124 @@
+"""
+Unit tests for the R&D report archive and report deltas
+Tests archiving, history paging, trimming and snapshot-based deltas
+"""
+
+import pytest
+
+from ..rd.innovation_pipeline import innovation_pipeline
+from ..rd.rd_orchestrator import RDOrchestrator
+from ..rd.report_archive import ReportArchive
+
+
+def report(number, updates=(), alerts=0):
+    return {
+        "competitive_updates": list(updates),
+        "urgent_alerts": [{"title": f"alert-{i}"} for i in range(alerts)],
+        "executive_summary": f"report {number}",
+        "delta_summary": {"changes_summary": [f"{len(updates)} new competitive updates"]},
+        "orchestration_metadata": {
+            "report_type": "thirty_minute_interval",
+            "report_number": number,
+            "timestamp": f"2026-01-01T00:{number:02d}:00"
+        }
+    }
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return ReportArchive(str(tmp_path / "reports.db"), max_reports=5)
+
+
+@pytest.mark.unit
+class TestReportArchive:
+    """Test storing and reading archived reports"""
+
+    def test_store_get_and_latest(self, archive):
+        first = archive.store(report(1, updates=["a"], alerts=2))
+        second = archive.store(report(2))
+
+        assert archive.get(first)["executive_summary"] == "report 1"
+        assert archive.get(first)["archive_id"] == first
+        assert archive.latest()["archive_id"] == second
+        assert archive.get(second + 1) is None
+
+    def test_history_pages_newest_first(self, archive):
+        ids = [archive.store(report(number)) for number in range(1, 5)]
+
+        page = archive.history(limit=2)
+        assert [entry["archive_id"] for entry in page] == ids[:1:-1]
+        assert page[0]["urgent_alerts"] == 0
+        assert page[0]["changes_summary"] == ["0 new competitive updates"]
+
+        older = archive.history(limit=2, before_id=page[-1]["archive_id"])
+        assert [entry["report_number"] for entry in older] == [2, 1]
+        assert archive.history(before_id=ids[0]) == []
+
+    def test_keeps_only_max_reports(self, archive):
+        ids = [archive.store(report(number)) for number in range(1, 9)]
+
+        assert archive.count() == 5
+        assert archive.get(ids[2]) is None
+        assert [entry["archive_id"] for entry in archive.history()] == ids[:2:-1]
+
+
+@pytest.mark.unit
+class TestThirtyMinuteReportArchiving:
+    """Test which generated reports reach the archive"""
+
+    @pytest.fixture
+    def orchestrator(self, archive):
+        orchestrator = RDOrchestrator(archive=archive)
+
+        async def no_agents(task_type):
+            return {}
+
+        orchestrator._coordinate_all_agents = no_agents
+        return orchestrator
+
+    @pytest.mark.asyncio
+    async def test_preview_is_not_archived(self, orchestrator, archive):
+        report_data = await orchestrator.generate_thirty_minute_report(archive=False)
+
+        assert "archive_id" not in report_data["orchestration_metadata"]
+        assert archive.count() == 0
+
+    @pytest.mark.asyncio
+    async def test_report_is_archived_when_asked(self, orchestrator, archive):
+        report_data = await orchestrator.generate_thirty_minute_report(archive=False)
+        await orchestrator.archive_report(report_data)
+        assert archive.latest()["archive_id"] == report_data["orchestration_metadata"]["archive_id"]
+
+        archived = await orchestrator.generate_thirty_minute_report()
+        assert archive.count() == 2
+        assert archive.latest()["archive_id"] == archived["orchestration_metadata"]["archive_id"]
+
+
+@pytest.mark.unit
+class TestSnapshotDelta:
+    """Test deltas computed between report snapshots"""
+
+    def test_counts_only_items_missing_from_previous_report(self):
+        orchestrator = RDOrchestrator(archive=None)
+        previous_data = {"competitive_updates": [{"id": 1}, {"id": 2}], "research_highlights": [{"id": 7}]}
+        previous_data["orchestration_metadata"] = {"snapshot": orchestrator._take_snapshot(previous_data)}
+
+        innovation_pipeline.add_innovation({"name": "Delta test", "description": "", "source_agent": "test"})
+        # Same number of updates as before, but one of them is new
+        current_data = {"competitive_updates": [{"id": 2}, {"id": 3}], "research_highlights": [{"id": 7}]}
+        snapshot = orchestrator._take_snapshot(current_data)
+        delta = orchestrator._calculate_delta_changes(current_data, previous_data, snapshot)
+
+        assert delta["new_competitive_updates"] == 1
+        assert delta["new_research_highlights"] == 0
+        assert delta["pipeline_events"]["total"] == 1
+        assert delta["pipeline_events"]["innovations_added"] == ["Delta test"]
+        assert delta["changes_summary"] == ["1 new competitive updates", "1 innovations added"]
+
+    def test_falls_back_to_lengths_without_snapshot(self):
+        orchestrator = RDOrchestrator(archive=None)
+        previous_data = {"competitive_updates": [{"id": 1}, {"id": 2}]}
+        current_data = {"competitive_updates": [{"id": 2}, {"id": 3}]}
+
+        delta = orchestrator._calculate_delta_changes(current_data, previous_data, orchestrator._take_snapshot(current_data))
+        assert delta["new_competitive_updates"] == 0
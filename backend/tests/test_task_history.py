@@ -0,0 +1,133 @@
+"""
+Unit tests for the bounded task history
+Tests ring eviction, spilling to sqlite, aggregates and persistence on shutdown
+"""
+
+import sqlite3
+import threading
+import pytest
+from datetime import datetime, timedelta
+
+from ..master_orchestrator.master_orchestrator import (
+    CrossDepartmentTask, DepartmentType, ExecutionMode, MasterOrchestrator
+)
+from ..master_orchestrator.task_history import TaskHistory
+
+
+def finished_task(i, departments=(DepartmentType.FRONTEND,), mode=ExecutionMode.CONCURRENT, failed=False):
+    completed_at = datetime.utcnow() - timedelta(hours=1) + timedelta(seconds=i)
+    task = CrossDepartmentTask(name=f"task-{i}", required_departments=list(departments), execution_mode=mode)
+    task.status = "failed" if failed else "completed"
+    task.started_at = completed_at - timedelta(seconds=1 + i % 3)
+    task.completed_at = completed_at
+    if failed:
+        task.errors.append("boom")
+    return task
+
+
+def spilled_rows(path):
+    db = sqlite3.connect(path)
+    try:
+        return db.execute("SELECT COUNT(*) FROM task_history").fetchone()[0]
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def spill_path(tmp_path):
+    return str(tmp_path / "history.db")
+
+
+@pytest.mark.unit
+class TestEviction:
+    """Test the in-memory ring"""
+
+    def test_keeps_newest_capacity_records(self):
+        history = TaskHistory(capacity=5)
+        for i in range(12):
+            history.record(finished_task(i))
+
+        assert len(history) == 5
+        assert [record.name for record in history.recent()] == [f"task-{i}" for i in range(11, 6, -1)]
+        assert [record.name for record in history.query(limit=100)] == [f"task-{i}" for i in range(11, 6, -1)]
+
+
+@pytest.mark.unit
+class TestSpill:
+    """Test records pushed out of the ring"""
+
+    def test_evicted_records_are_written_in_batches_and_queryable(self, spill_path):
+        history = TaskHistory(capacity=5, spill_path=spill_path, spill_batch_size=4, retention_seconds=None)
+        for i in range(15):
+            history.record(finished_task(i, failed=i % 5 == 0))
+
+        # Ten evicted: two full batches written, two records pending
+        assert history.spilled == 8
+        assert spilled_rows(spill_path) == 8
+
+        failed = history.query(status="failed")
+        assert [record.name for record in failed] == ["task-10", "task-5", "task-0"]
+        assert failed[-1].departments == ("frontend",)
+        assert history.spilled == 10
+        history.close()
+
+    def test_close_writes_the_partial_batch(self, spill_path):
+        history = TaskHistory(capacity=2, spill_path=spill_path, spill_batch_size=100, retention_seconds=None)
+        for i in range(7):
+            history.record(finished_task(i))
+        assert spilled_rows(spill_path) == 0
+
+        history.close()
+        assert spilled_rows(spill_path) == 5
+
+    @pytest.mark.asyncio
+    async def test_full_batches_are_written_off_the_event_loop(self, spill_path):
+        history = TaskHistory(capacity=2, spill_path=spill_path, spill_batch_size=3, retention_seconds=None)
+        writers = []
+        insert = history._insert
+        history._insert = lambda batch: (writers.append(threading.current_thread()), insert(batch))
+
+        for i in range(5):
+            history.record(finished_task(i))
+        assert history.spilled == 0  # queued to a worker thread, not written inline
+        await history.flush_async()
+
+        assert history.spilled == 3
+        assert writers and threading.main_thread() not in writers
+        await history.aclose()
+        assert spilled_rows(spill_path) == 3
+
+    @pytest.mark.asyncio
+    async def test_orchestrator_shutdown_persists_history(self, spill_path, monkeypatch):
+        monkeypatch.setenv("ORCHESTRATOR_TASK_HISTORY_DB", spill_path)
+        orchestrator = MasterOrchestrator()
+        capacity = orchestrator.task_history.capacity
+        for i in range(capacity + 5):
+            orchestrator._record_finished(finished_task(i))
+        assert spilled_rows(spill_path) == 0  # less than a batch evicted
+
+        await orchestrator.shutdown()
+        assert spilled_rows(spill_path) == 5
+
+
+@pytest.mark.unit
+class TestAggregates:
+    """Test the running totals"""
+
+    def test_totals_per_department_and_mode_survive_eviction(self):
+        history = TaskHistory(capacity=3)
+        for i in range(10):
+            departments = (DepartmentType.FRONTEND, DepartmentType.BACKEND) if i % 2 else (DepartmentType.GROWTH,)
+            mode = ExecutionMode.PARALLEL if i < 4 else ExecutionMode.SEQUENTIAL
+            history.record(finished_task(i, departments=departments, mode=mode, failed=i % 3 == 0))
+
+        summary = history.summary()
+        assert summary["overall"]["count"] == 10
+        assert summary["overall"]["failed"] == 4
+        assert summary["overall"]["average_seconds"] == pytest.approx(sum(1 + i % 3 for i in range(10)) / 10)
+        assert summary["overall"]["max_seconds"] == 3
+        assert summary["by_department"]["frontend"]["count"] == 5
+        assert summary["by_department"]["growth"]["succeeded"] == 3
+        assert summary["by_department"]["frontend"]["success_rate"] == pytest.approx(60.0)
+        assert {mode: stats["count"] for mode, stats in summary["by_mode"].items()} == {"parallel": 4, "sequential": 6}
+        assert summary["retained"] == 3
@@ -0,0 +1,105 @@
+"""
+Unit tests for deadline-driven task scheduling
+Tests that emergency tasks start while the queue is saturated
+"""
+
+import asyncio
+import pytest
+
+from ..master_orchestrator.master_orchestrator import (
+    CrossDepartmentTask, DepartmentType, ExecutionMode, MasterOrchestrator, SystemPriority
+)
+from ..master_orchestrator.task_scheduler import DeadlineTaskScheduler
+
+
+async def settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.unit
+class TestEmergencyDispatch:
+    """Test that tasks bypassing the limits are not held behind queued work"""
+
+    @pytest.mark.asyncio
+    async def test_bypassing_task_starts_when_limits_are_reached(self):
+        started = []
+        release = asyncio.Event()
+
+        async def executor(task):
+            started.append(task)
+            if task != "emergency":
+                await release.wait()
+
+        scheduler = DeadlineTaskScheduler(executor, max_concurrent=2, department_limits={"ops": 1})
+        runner = asyncio.create_task(scheduler.run())
+        for i in range(5):
+            scheduler.submit(f"routine-{i}", priority=0, departments=["ops"])
+        await settle()
+        assert started == ["routine-0"] and len(scheduler) == 4
+
+        scheduler.submit("emergency", priority=-1, departments=["ops"], bypass_limits=True)
+        await settle()
+        assert started == ["routine-0", "emergency"]
+        assert len(scheduler) == 4
+
+        release.set()
+        await scheduler.stop()
+        runner.cancel()
+
+    @pytest.mark.asyncio
+    async def test_bypassing_task_queued_before_run_goes_first(self):
+        started = []
+
+        async def executor(task):
+            started.append(task)
+
+        scheduler = DeadlineTaskScheduler(executor, max_concurrent=1)
+        scheduler.submit("routine", priority=0)
+        scheduler.submit("emergency", priority=-1, bypass_limits=True)
+        runner = asyncio.create_task(scheduler.run())
+        await settle()
+
+        assert started == ["emergency", "routine"]
+        await scheduler.stop()
+        runner.cancel()
+
+    @pytest.mark.asyncio
+    async def test_emergency_task_starts_while_orchestrator_queue_is_saturated(self):
+        orchestrator = MasterOrchestrator()
+        release = asyncio.Event()
+        started = []
+
+        async def run_department(department, work, task_id):
+            started.append(task_id)
+            if work.get("priority") != "EMERGENCY":
+                await release.wait()
+            return {"status": "done"}
+
+        orchestrator.execution_engine.run_department = run_department
+        runner = asyncio.create_task(orchestrator.scheduler.run())
+
+        limit = orchestrator.scheduler.department_limits[DepartmentType.FRONTEND]
+        routine = [
+            CrossDepartmentTask(name=f"routine-{i}", priority=SystemPriority.CRITICAL,
+                                required_departments=[DepartmentType.FRONTEND])
+            for i in range(limit + 20)
+        ]
+        for task in routine:
+            assert orchestrator.submit_task(task)
+        await settle()
+        assert len(orchestrator.scheduler) == 20
+
+        emergency = CrossDepartmentTask(name="outage", priority=SystemPriority.LOW,
+                                        execution_mode=ExecutionMode.EMERGENCY,
+                                        required_departments=[DepartmentType.FRONTEND])
+        assert orchestrator.submit_task(emergency)
+        await settle()
+
+        assert emergency.id in started
+        assert emergency.status == "completed"
+        assert len(orchestrator.scheduler) == 20
+
+        release.set()
+        await orchestrator.scheduler.stop()
+        runner.cancel()
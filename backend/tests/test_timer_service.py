@@ -0,0 +1,212 @@
+"""
+Unit tests for the shared timer service and the agent runtime built on it
+Tests call_every periods, cancellation and overruns, and batch draining under the concurrency limit
+"""
+
+import asyncio
+import pytest
+
+from ..agents.base import AgentDomain, AgentRole, AgentTask, BaseAgent
+from ..agents.timer_service import TimerService
+
+
+def agent_task(i):
+    return AgentTask(id=f"task-{i}", type="test", priority=1, description=f"task {i}")
+
+
+class RecordingAgent(BaseAgent):
+    """Awaits ``work`` seconds per task and records batch sizes and peak concurrency"""
+
+    def __init__(self, work=0.0, **runtime):
+        for name, value in runtime.items():
+            setattr(self, name, value)
+        super().__init__("recorder", AgentRole.BUILDER, AgentDomain.BACKEND)
+        self.work = work
+        self.batches = []
+        self.running_tasks = 0
+        self.peak = 0
+        self.background_runs = 0
+
+    async def execute_batch(self, tasks):
+        self.batches.append(len(tasks))
+        await super().execute_batch(tasks)
+
+    async def process_task(self, task):
+        self.running_tasks += 1
+        self.peak = max(self.peak, self.running_tasks)
+        try:
+            await asyncio.sleep(self.work)
+        finally:
+            self.running_tasks -= 1
+        return {"id": task.id}
+
+    async def background_work(self):
+        self.background_runs += 1
+
+
+@pytest.mark.unit
+class TestCallEvery:
+    """Test periodic runs and their cancellation"""
+
+    @pytest.mark.asyncio
+    async def test_runs_every_interval_until_cancelled(self):
+        service = TimerService()
+        runs = []
+
+        async def tick():
+            runs.append(asyncio.get_running_loop().time())
+
+        timer = service.call_every(0.02, tick, delay=0.0)
+        await asyncio.sleep(0.11)
+        service.cancel(timer)
+        count = len(runs)
+        assert 4 <= count <= 7
+        assert service.get_stats()["timers"] == 0
+
+        await asyncio.sleep(0.06)
+        assert len(runs) == count
+        # The next wake-up found only the cancelled timer and disarmed the service
+        assert service._armed is None and service._heap == []
+
+    @pytest.mark.asyncio
+    async def test_cancel_is_idempotent_and_leaves_other_timers(self):
+        service = TimerService()
+        counts = {"kept": 0, "dropped": 0}
+
+        def counter(name):
+            async def tick():
+                counts[name] += 1
+            return tick
+
+        kept = service.call_every(0.02, counter("kept"))
+        dropped = service.call_every(0.02, counter("dropped"))
+        service.cancel(dropped)
+        service.cancel(dropped)
+        assert service.active == 1
+
+        await asyncio.sleep(0.07)
+        assert counts["dropped"] == 0 and counts["kept"] >= 2
+        service.cancel(kept)
+
+    @pytest.mark.asyncio
+    async def test_cancel_lets_a_running_callback_finish(self):
+        service = TimerService()
+        started, finished = asyncio.Event(), []
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(0.03)
+            finished.append(True)
+
+        timer = service.call_every(0.01, slow, delay=0.0)
+        await started.wait()
+        service.cancel(timer)
+        await asyncio.sleep(0.05)
+        assert finished == [True]
+        assert timer.runs == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_callback_skips_runs_instead_of_overlapping(self):
+        service = TimerService()
+        active, peak = 0, 0
+
+        async def slow():
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.035)
+            active -= 1
+
+        timer = service.call_every(0.01, slow, delay=0.0)
+        await asyncio.sleep(0.12)
+        service.cancel(timer)
+
+        assert peak == 1
+        assert timer.overruns >= 3
+        assert timer.runs >= 2
+
+    @pytest.mark.asyncio
+    async def test_timers_within_slack_share_a_wakeup(self):
+        service = TimerService(slack=0.01)
+
+        async def noop():
+            pass
+
+        timers = [service.call_every(0.05, noop, delay=0.02 + i * 0.002) for i in range(5)]
+        await asyncio.sleep(0.04)
+        assert service.wakeups == 1
+        assert all(timer.runs == 1 for timer in timers)
+        for timer in timers:
+            service.cancel(timer)
+
+    @pytest.mark.asyncio
+    async def test_rejects_non_positive_interval(self):
+        async def noop():
+            pass
+
+        with pytest.raises(ValueError):
+            TimerService().call_every(0, noop)
+
+
+@pytest.mark.unit
+class TestAgentRuntime:
+    """Test batch draining, the concurrency limit and background work"""
+
+    @pytest.mark.asyncio
+    async def test_batches_never_exceed_task_batch_size(self):
+        agent = RecordingAgent(task_batch_size=4)
+        for i in range(10):
+            await agent.assign_task(agent_task(i))
+        runner = asyncio.create_task(agent.start())
+        while agent.metrics.tasks_completed < 10:
+            await asyncio.sleep(0.001)
+
+        await agent.stop()
+        await runner
+        assert agent.batches == [4, 4, 2]
+        assert agent.peak == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded_by_the_semaphore(self):
+        agent = RecordingAgent(work=0.01, task_batch_size=8, max_concurrent_tasks=3)
+        for i in range(20):
+            await agent.assign_task(agent_task(i))
+        runner = asyncio.create_task(agent.start())
+        await asyncio.sleep(0.005)
+        assert len(agent._in_flight) == 3
+
+        while agent.metrics.tasks_completed < 20:
+            await asyncio.sleep(0.002)
+        await agent.stop()
+        await runner
+        assert agent.peak == 3
+        assert agent.metrics.tasks_failed == 0
+        assert agent._task_slots._value == 3
+
+    @pytest.mark.asyncio
+    async def test_stop_waits_for_in_flight_tasks(self):
+        agent = RecordingAgent(work=0.03, max_concurrent_tasks=2)
+        await agent.assign_task(agent_task(0))
+        await agent.assign_task(agent_task(1))
+        runner = asyncio.create_task(agent.start())
+        await asyncio.sleep(0.005)
+
+        await agent.stop()
+        await runner
+        assert agent.metrics.tasks_completed == 2
+        assert not agent._in_flight
+
+    @pytest.mark.asyncio
+    async def test_background_timer_is_cancelled_on_stop(self):
+        agent = RecordingAgent(background_interval=0.01)
+        agent.timer_service = TimerService()
+        runner = asyncio.create_task(agent.start())
+        await asyncio.sleep(0.035)
+
+        await agent.stop()
+        await runner
+        runs = agent.background_runs
+        assert runs >= 2
+        assert agent.timer_service.active == 0
+        await asyncio.sleep(0.03)
+        assert agent.background_runs == runs
@@ -13,12 +13,15 @@ from orchestrator.main import (
     get_orchestrator,
     run_with_orchestrator
 )
+from orchestrator.workflow import Workflow, WorkflowResult
 
 from core.interfaces import (
     Task,
     TaskResult,
     TaskStatus,
-    TaskPriority
+    TaskPriority,
+    ExecutionMode,
+    ResultRef
 )
 
 from core.task_queue import RedisTaskQueue
@@ -27,6 +30,7 @@ from core.event_loop_manager import EventLoopManager, get_event_loop_manager
 from core.circuit_breaker import (
     AsyncCircuitBreaker,
     CircuitBreakerConfig,
+    RedisCircuitState,
     get_circuit_breaker,
     circuit_breaker
 )
@@ -43,12 +47,16 @@ __all__ = [
     # Main classes
     'ParallelProcessingOrchestrator',
     'ParallelProcessor',
+    'Workflow',
+    'WorkflowResult',
     
     # Core interfaces
     'Task',
     'TaskResult', 
     'TaskStatus',
     'TaskPriority',
+    'ExecutionMode',
+    'ResultRef',
     
     # Queue and storage
     'RedisTaskQueue',
@@ -62,6 +70,7 @@ __all__ = [
     # Circuit breaker
     'AsyncCircuitBreaker',
     'CircuitBreakerConfig',
+    'RedisCircuitState',
     'get_circuit_breaker',
     'circuit_breaker',
     
@@ -0,0 +1,292 @@
+"""
+Autoscaling simulation: replay a load trace against scaling policies and compare SLO attainment.
+
+A deterministic discrete-time model of DynamicWorkerPool: seeded Poisson
+arrivals per priority, exponential service times, strict priority dequeue,
+a startup delay for new workers and graceful drain for removed ones. Each
+policy sees the same arrivals and the same ScalingObservation signals the
+real pool builds, so runs are reproducible and directly comparable:
+
+    python -m benchmarks.autoscaling_simulation --traces steady burst diurnal
+    python -m benchmarks.autoscaling_simulation --trace-file scaling_trace.jsonl
+
+A trace file is JSON lines, either segments ``{"duration", "rate",
+"service_time", "priorities"}`` or observations recorded by a pool created
+with ``trace_path`` (arrival rate is taken from ``enqueued_total`` deltas).
+"""
+import argparse
+import heapq
+import json
+import math
+import random
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.common import emit, percentile
+from core.interfaces import TaskPriority
+from workers.autoscaling import (
+    IScalingPolicy, ScalingObservation, UtilizationThresholdPolicy, QueueLatencyScalingController
+)
+
+
+DEFAULT_PRIORITY_MIX = {'HIGH': 0.2, 'NORMAL': 0.7, 'LOW': 0.1}
+
+# Dequeue order, highest priority first
+PRIORITY_ORDER = [p.name for p in sorted(TaskPriority, key=lambda p: p.value, reverse=True)]
+
+
+@dataclass
+class TraceSegment:
+    """Constant-rate stretch of a load trace"""
+    duration: float
+    rate: float  # arrivals per second
+    service_time: float = 0.5
+    priorities: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_PRIORITY_MIX))
+
+
+def synthetic_trace(name: str) -> List[TraceSegment]:
+    """Built-in traces; rates assume 0.5s tasks, so 10/s needs about 5 busy workers"""
+    if name == "steady":
+        return [TraceSegment(600, 10.0)]
+    if name == "ramp":
+        return [TraceSegment(30, rate) for rate in range(2, 42, 2)]
+    if name == "burst":
+        return [TraceSegment(180, 4.0), TraceSegment(60, 40.0), TraceSegment(240, 4.0),
+                TraceSegment(60, 40.0), TraceSegment(180, 4.0)]
+    if name == "spiky":
+        segments = []
+        for _ in range(20):
+            segments += [TraceSegment(25, 6.0), TraceSegment(5, 60.0)]
+        return segments
+    if name == "diurnal":
+        # One compressed day: 48 half-hour periods squeezed into 30s each
+        return [TraceSegment(30, 3.0 + 27.0 * (1 - math.cos(2 * math.pi * i / 48)) / 2) for i in range(48)]
+    raise ValueError(f"Unknown trace: {name}")
+
+
+def load_trace_file(path: str) -> List[TraceSegment]:
+    """Read a trace of segments or of recorded pool observations"""
+    with open(path) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    if not rows:
+        return []
+
+    if 'enqueued_total' not in rows[0]:
+        return [TraceSegment(**row) for row in rows]
+
+    segments = []
+    for previous, row in zip(rows, rows[1:]):
+        elapsed = row['timestamp'] - previous['timestamp']
+        if elapsed <= 0:
+            continue
+        arrivals = max(0, row['enqueued_total'] - previous['enqueued_total'])
+        depths = row.get('queue_depths') or {}
+        total_depth = sum(depths.values())
+        mix = {p: d / total_depth for p, d in depths.items() if d} if total_depth else dict(DEFAULT_PRIORITY_MIX)
+        segments.append(TraceSegment(
+            duration=elapsed,
+            rate=arrivals / elapsed,
+            service_time=row.get('service_time') or 0.5,
+            priorities=mix
+        ))
+    return segments
+
+
+def generate_arrivals(trace: List[TraceSegment], seed: int) -> List[tuple]:
+    """Poisson arrivals ``(time, priority, service_time)`` for the whole trace"""
+    rng = random.Random(seed)
+    arrivals = []
+    offset = 0.0
+    for segment in trace:
+        names = list(segment.priorities)
+        weights = [segment.priorities[n] for n in names]
+        t = offset
+        if segment.rate > 0:
+            while True:
+                t += rng.expovariate(segment.rate)
+                if t >= offset + segment.duration:
+                    break
+                priority = rng.choices(names, weights)[0]
+                arrivals.append((t, priority, rng.expovariate(1.0 / segment.service_time)))
+        offset += segment.duration
+    return arrivals
+
+
+def simulate(policy: IScalingPolicy,
+             arrivals: List[tuple],
+             duration: float,
+             min_workers: int,
+             max_workers: int,
+             target_wait: float,
+             startup_delay: float = 1.0,
+             window: float = 60.0) -> Dict[str, float]:
+    """Run one policy over the arrivals and summarise queue wait and cost"""
+    queues: Dict[str, deque] = {name: deque() for name in PRIORITY_ORDER}
+    idle = min_workers
+    busy = 0
+    starting: List[float] = []      # ready times of workers still booting
+    completions: List[tuple] = []   # heap of busy workers' (finish time, service time)
+    retiring = 0                    # busy workers to drop when they finish
+
+    waits: List[float] = []
+    window_waits: Dict[int, List[float]] = {}
+    recent_waits: List[float] = []
+    service_time: Optional[float] = None
+    enqueued = 0
+    worker_seconds = 0.0
+    scaling_events = 0
+    worker_counts = []
+
+    next_arrival = 0
+    next_evaluation = policy.evaluation_interval
+    now = 0.0
+
+    def dispatch() -> None:
+        nonlocal idle, busy
+        for name in PRIORITY_ORDER:
+            queue = queues[name]
+            while queue and idle:
+                arrived_at, task_service = queue.popleft()
+                wait = now - arrived_at
+                waits.append(wait)
+                recent_waits.append(wait)
+                window_waits.setdefault(int(arrived_at // window), []).append(wait)
+                idle -= 1
+                busy += 1
+                heapq.heappush(completions, (now + task_service, task_service))
+
+    while now < duration or any(queues.values()) or completions:
+        # Advance to the next event
+        candidates = [next_evaluation]
+        if next_arrival < len(arrivals):
+            candidates.append(arrivals[next_arrival][0])
+        if completions:
+            candidates.append(completions[0][0])
+        if starting:
+            candidates.append(starting[0])
+        step_to = min(candidates)
+        worker_seconds += (idle + busy + len(starting)) * (step_to - now)
+        now = step_to
+
+        while starting and starting[0] <= now:
+            heapq.heappop(starting)
+            idle += 1
+
+        while completions and completions[0][0] <= now:
+            _, task_service = heapq.heappop(completions)
+            service_time = task_service if service_time is None else service_time + 0.1 * (task_service - service_time)
+            busy -= 1
+            if retiring:
+                retiring -= 1
+            else:
+                idle += 1
+
+        while next_arrival < len(arrivals) and arrivals[next_arrival][0] <= now:
+            arrived_at, priority, task_service = arrivals[next_arrival]
+            queues[priority].append((arrived_at, task_service))
+            enqueued += 1
+            next_arrival += 1
+
+        dispatch()
+
+        if now >= next_evaluation:
+            current = idle + busy - retiring + len(starting)
+            observation = ScalingObservation(
+                timestamp=now,
+                worker_count=current,
+                busy_workers=busy,
+                queue_depths={name: len(q) for name, q in queues.items()},
+                enqueued_total=enqueued,
+                service_time=service_time,
+                observed_p95_wait=percentile(recent_waits, 95) if recent_waits else None,
+                avg_worker_load=busy / max(1, idle + busy)
+            )
+            recent_waits = []
+            target = max(min_workers, min(max_workers, policy.desired_workers(observation)))
+            if target > current:
+                for _ in range(target - current):
+                    heapq.heappush(starting, now + startup_delay)
+                scaling_events += 1
+            elif target < current:
+                remove = current - target
+                take = min(remove, idle)
+                idle -= take
+                remove -= take
+                while remove and starting:
+                    starting.pop()
+                    remove -= 1
+                retiring += remove
+                scaling_events += 1
+            worker_counts.append(target)
+            next_evaluation = now + policy.evaluation_interval
+
+            if now >= duration and not any(queues.values()) and not completions:
+                break
+
+    windows_met = sum(1 for w in window_waits.values() if percentile(w, 95) <= target_wait)
+    return {
+        'tasks': len(waits),
+        'slo_attainment': sum(1 for w in waits if w <= target_wait) / max(1, len(waits)),
+        'p50_wait': percentile(waits, 50),
+        'p95_wait': percentile(waits, 95),
+        'p99_wait': percentile(waits, 99),
+        'max_wait': max(waits) if waits else 0.0,
+        'windows_meeting_p95_target': windows_met / max(1, len(window_waits)),
+        'mean_workers': sum(worker_counts) / len(worker_counts) if worker_counts else min_workers,
+        'peak_workers': max(worker_counts) if worker_counts else min_workers,
+        'worker_seconds': worker_seconds,
+        'scaling_events': scaling_events
+    }
+
+
+def main(traces: List[str],
+         trace_file: Optional[str],
+         min_workers: int,
+         max_workers: int,
+         target_wait: float,
+         startup_delay: float,
+         seed: int) -> dict:
+    policies: Dict[str, Callable[[], IScalingPolicy]] = {
+        'utilization': lambda: UtilizationThresholdPolicy(min_workers, max_workers),
+        'queue_latency': lambda: QueueLatencyScalingController(
+            min_workers, max_workers, target_p95_wait=target_wait
+        ),
+    }
+
+    named_traces = {name: synthetic_trace(name) for name in traces}
+    if trace_file:
+        named_traces[trace_file] = load_trace_file(trace_file)
+
+    results = {}
+    for trace_name, trace in named_traces.items():
+        arrivals = generate_arrivals(trace, seed)
+        duration = sum(segment.duration for segment in trace)
+        results[trace_name] = {
+            policy_name: simulate(make_policy(), arrivals, duration, min_workers, max_workers,
+                                  target_wait, startup_delay)
+            for policy_name, make_policy in policies.items()
+        }
+
+    return emit('autoscaling_simulation', {
+        'target_p95_wait': target_wait,
+        'min_workers': min_workers,
+        'max_workers': max_workers,
+        'startup_delay': startup_delay,
+        'seed': seed,
+        'traces': results
+    }, backend='simulated')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--traces', nargs='*', default=['steady', 'ramp', 'burst', 'spiky', 'diurnal'])
+    parser.add_argument('--trace-file', default=None, help="JSON lines trace to replay")
+    parser.add_argument('--min-workers', type=int, default=2)
+    parser.add_argument('--max-workers', type=int, default=50)
+    parser.add_argument('--target-wait', type=float, default=2.0, help="p95 queue wait target, seconds")
+    parser.add_argument('--startup-delay', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+    main(args.traces, args.trace_file, args.min_workers, args.max_workers,
+         args.target_wait, args.startup_delay, args.seed)
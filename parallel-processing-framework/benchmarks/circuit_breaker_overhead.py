@@ -0,0 +1,118 @@
+"""
+Circuit breaker overhead benchmark: nanoseconds added per guarded call.
+
+Times a no-op coroutine called directly, through the current breaker (closed,
+with and without Redis shared state) and through the breaker as it was at
+``--baseline-ref`` (loaded from git), plus the open-circuit rejection path:
+
+    python -m benchmarks.circuit_breaker_overhead --calls 200000
+"""
+import argparse
+import asyncio
+import importlib.util
+import os
+import subprocess
+import sys
+import time
+from typing import Optional
+
+from benchmarks.common import make_redis, emit
+from core.circuit_breaker import AsyncCircuitBreaker, CircuitBreakerConfig, CircuitBreakerOpenException, RedisCircuitState
+
+
+async def noop() -> int:
+    return 1
+
+
+def load_baseline(ref: str):
+    """Import core/circuit_breaker.py as it was at git ``ref``, or None if git can't provide it"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        top = subprocess.run(['git', 'rev-parse', '--show-toplevel'], cwd=root,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        path = os.path.relpath(os.path.join(root, 'core', 'circuit_breaker.py'), top)
+        source = subprocess.run(['git', 'show', f'{ref}:{path}'], cwd=root,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    
+    spec = importlib.util.spec_from_loader('core._baseline_circuit_breaker', loader=None)
+    module = importlib.util.module_from_spec(spec)
+    module.__package__ = 'core'
+    sys.modules[spec.name] = module
+    exec(compile(source, f'{ref}:{path}', 'exec'), module.__dict__)
+    return module
+
+
+async def time_calls(call, calls: int) -> float:
+    """Mean nanoseconds per ``await call()``"""
+    for _ in range(min(1000, calls)):
+        await call()
+    start = time.perf_counter_ns()
+    for _ in range(calls):
+        await call()
+    return (time.perf_counter_ns() - start) / calls
+
+
+async def time_rejections(breaker, calls: int) -> float:
+    """Mean nanoseconds per call rejected by an open circuit"""
+    start = time.perf_counter_ns()
+    for _ in range(calls):
+        try:
+            await breaker.call(noop)
+        except Exception:
+            pass
+    return (time.perf_counter_ns() - start) / calls
+
+
+async def main(calls: int, baseline_ref: str, redis_url: Optional[str]) -> dict:
+    config = CircuitBreakerConfig(recovery_timeout=3600)
+    results = {'calls': calls}
+    
+    direct = await time_calls(noop, calls)
+    results['direct_ns'] = direct
+    
+    current = AsyncCircuitBreaker('bench', config)
+    results['current_closed_ns'] = await time_calls(lambda: current.call(noop), calls)
+    
+    shared_state = RedisCircuitState()
+    shared_state.redis = make_redis(redis_url)
+    shared = AsyncCircuitBreaker('bench-shared', config, shared_state=shared_state)
+    results['current_shared_closed_ns'] = await time_calls(lambda: shared.call(noop), calls)
+    
+    await current.force_open()
+    results['current_open_reject_ns'] = await time_rejections(current, calls)
+    
+    baseline = load_baseline(baseline_ref)
+    if baseline is not None:
+        old = baseline.AsyncCircuitBreaker('bench-baseline', baseline.CircuitBreakerConfig(recovery_timeout=3600))
+        results['baseline_ref'] = baseline_ref
+        results['baseline_closed_ns'] = await time_calls(lambda: old.call(noop), calls)
+        await old.force_open()
+        results['baseline_open_reject_ns'] = await time_rejections(old, calls)
+        results['closed_overhead_reduction'] = (
+            (results['baseline_closed_ns'] - direct) / max(1.0, results['current_closed_ns'] - direct)
+        )
+    
+    for key in [k for k in results if k.endswith('_closed_ns')]:
+        results[key.replace('_closed_ns', '_overhead_ns')] = results[key] - direct
+    
+    return emit('circuit_breaker_overhead', results, backend='redis' if redis_url else 'fakeredis')
+
+
+def root_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-list', '--max-parents=0', 'HEAD'],
+                              capture_output=True, text=True, check=True).stdout.split()[0]
+    except (OSError, subprocess.CalledProcessError, IndexError):
+        return 'HEAD'
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=200_000)
+    parser.add_argument('--baseline-ref', default=None,
+                        help="git ref of the breaker to compare against (default: the repository's first commit)")
+    parser.add_argument('--redis-url', default=None, help="real Redis server (default: fakeredis)")
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.baseline_ref or root_commit(), args.redis_url))
@@ -0,0 +1,93 @@
+"""
+Shared helpers for the framework benchmarks
+"""
+import contextlib
+import json
+import math
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+# Add parent directory to path so we can import the framework modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_redis(redis_url: Optional[str] = None):
+    """Return an asyncio Redis client: a real server if ``redis_url`` is given, fakeredis otherwise"""
+    if redis_url:
+        import redis.asyncio as aioredis
+        return aioredis.from_url(redis_url, decode_responses=False)
+    
+    import fakeredis
+    return fakeredis.aioredis.FakeRedis(decode_responses=False)
+
+
+@contextlib.contextmanager
+def local_redis_server(executable: str = "redis-server") -> Iterator[str]:
+    """Run a throwaway redis-server without persistence on a free port and yield its URL"""
+    path = shutil.which(executable)
+    if path is None:
+        raise RuntimeError(f"{executable} not found on PATH")
+    
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    
+    process = subprocess.Popen(
+        [path, '--port', str(port), '--bind', '127.0.0.1', '--save', '', '--appendonly', 'no'],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                    break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"redis-server did not start on port {port}")
+                time.sleep(0.05)
+        yield f"redis://127.0.0.1:{port}/0"
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples`` (0 for an empty list)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max of latency samples in seconds"""
+    return {
+        'count': len(samples),
+        'p50': percentile(samples, 50),
+        'p95': percentile(samples, 95),
+        'p99': percentile(samples, 99),
+        'max': max(samples) if samples else 0.0
+    }
+
+
+def emit(benchmark: str, results: Dict[str, Any], backend: str) -> Dict[str, Any]:
+    """Print a benchmark report as one JSON document and return it"""
+    report = {
+        'benchmark': benchmark,
+        'backend': backend,
+        'timestamp': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'results': results
+    }
+    print(json.dumps(report, indent=2, default=str))
+    return report
@@ -0,0 +1,83 @@
+"""
+CPU-bound throughput benchmark: thread pool vs warm process pool.
+
+Runs the same batch of CPU-bound tasks through ``AsyncWorker`` with the
+``IO`` (thread pool) and ``CPU`` (process pool) execution hints, sweeping the
+process pool size up to the core count:
+
+    python -m benchmarks.cpu_backends --tasks 64 --n 60000
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+
+from benchmarks.common import emit
+from core.execution_backend import ExecutionRouter, ProcessPoolBackend
+from core.interfaces import ExecutionMode, Task, TaskStatus
+from workers.async_worker import AsyncWorker
+
+
+def count_primes(n: int) -> int:
+    """Deliberately naive prime count to keep a core busy"""
+    count = 0
+    for candidate in range(2, n):
+        for divisor in range(2, int(candidate ** 0.5) + 1):
+            if candidate % divisor == 0:
+                break
+        else:
+            count += 1
+    return count
+
+
+async def run_batch(router: ExecutionRouter, execution: ExecutionMode, tasks: int, n: int) -> dict:
+    worker = AsyncWorker(max_concurrent_tasks=tasks, execution_router=router)
+    await worker.start()
+    
+    batch = [
+        Task(id=uuid.uuid4().hex, func=count_primes, args=(n,), execution=execution)
+        for _ in range(tasks)
+    ]
+    start = time.perf_counter()
+    results = await asyncio.gather(*(worker.execute_task(task) for task in batch))
+    elapsed = time.perf_counter() - start
+    await worker.stop()
+    
+    failed = sum(1 for result in results if result.status != TaskStatus.COMPLETED)
+    return {
+        'tasks': tasks,
+        'failed': failed,
+        'elapsed_s': elapsed,
+        'tasks_per_second': tasks / elapsed
+    }
+
+
+async def main(tasks: int, n: int, max_workers: int) -> dict:
+    results = {}
+    
+    router = ExecutionRouter()
+    results['thread_pool'] = await run_batch(router, ExecutionMode.IO, tasks, n)
+    
+    pool_sizes = sorted(size for size in {1, 2, 4, 8, 16, max_workers} if size <= max_workers)
+    for size in pool_sizes:
+        router = ExecutionRouter(process_backend=ProcessPoolBackend(max_workers=size))
+        await router.start()  # warm pool, keep process start-up out of the timing
+        results[f'process_pool_{size}'] = await run_batch(router, ExecutionMode.CPU, tasks, n)
+        results[f'process_pool_{size}']['backend_stats'] = router.process_backend.get_stats()
+        router.shutdown()
+    
+    baseline = results['thread_pool']['tasks_per_second']
+    for name, result in results.items():
+        result['speedup_vs_threads'] = result['tasks_per_second'] / baseline
+    
+    return emit('cpu_backends', results, f'{os.cpu_count()} cores')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, default=64)
+    parser.add_argument('--n', type=int, default=60_000, help="prime search bound per task")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    asyncio.run(main(args.tasks, args.n, args.max_workers))
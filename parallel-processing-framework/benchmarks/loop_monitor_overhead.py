@@ -0,0 +1,91 @@
+"""
+Loop monitor overhead benchmark: throughput of a busy event loop with and without instrumentation.
+
+Runs many concurrent tasks that alternate a short burst of CPU work with a
+yield to the loop, the shape of request handlers, and compares wall time
+with no monitor, lag sampling only, and lag sampling plus per-coroutine
+attribution at a few sampling rates:
+
+    python -m benchmarks.loop_monitor_overhead --tasks 500 --steps 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Optional
+
+from benchmarks.common import emit
+from core.loop_monitor import LoopMonitor
+
+
+def burn(iterations: int) -> int:
+    total = 0
+    for i in range(iterations):
+        total += i * i
+    return total
+
+
+async def handler(steps: int, work: int) -> None:
+    for _ in range(steps):
+        burn(work)
+        await asyncio.sleep(0)
+
+
+async def run_once(tasks: int, steps: int, work: int, monitor: Optional[LoopMonitor]) -> float:
+    if monitor is not None:
+        await monitor.start(attach=monitor.attribution_every > 0)
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(asyncio.create_task(handler(steps, work)) for _ in range(tasks)))
+        return time.perf_counter() - start
+    finally:
+        if monitor is not None:
+            monitor.stop()
+
+
+async def main(tasks: int, steps: int, work: int, repeat: int) -> dict:
+    configs = {
+        'none': None,
+        'lag_only': dict(attribution_sample_rate=0),
+        'attribution_10pct': dict(attribution_sample_rate=0.1),
+        'attribution_all': dict(attribution_sample_rate=1.0),
+    }
+    
+    # Rough cost of one step, for context
+    start = time.perf_counter()
+    burn(work)
+    step_us = (time.perf_counter() - start) * 1e6
+    
+    timings = {name: [] for name in configs}
+    await run_once(tasks // 10, steps, work, None)  # warm-up
+    for _ in range(repeat):
+        # Interleave configurations so drift affects them equally
+        for name, options in configs.items():
+            monitor = LoopMonitor(registry=None, **options) if options is not None else None
+            timings[name].append(await run_once(tasks, steps, work, monitor))
+    
+    baseline = statistics.median(timings['none'])
+    results = {
+        'tasks': tasks,
+        'steps_per_task': steps,
+        'step_work_us': step_us,
+        'repeat': repeat,
+    }
+    for name, samples in timings.items():
+        median = statistics.median(samples)
+        results[name] = {
+            'median_seconds': median,
+            'steps_per_second': tasks * steps / median,
+            'overhead_pct': (median - baseline) / baseline * 100
+        }
+    return emit('loop_monitor_overhead', results, backend='asyncio')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, default=500)
+    parser.add_argument('--steps', type=int, default=20)
+    parser.add_argument('--work', type=int, default=2000, help="loop iterations of CPU work per step")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.tasks, args.steps, args.work, args.repeat))
@@ -0,0 +1,92 @@
+"""
+Map/reduce scaling benchmark: throughput, peak memory and Redis key count vs input size.
+
+Streams a generator of N items through ``map_stream`` and ``reduce_async``
+on an in-process worker pool, sampling ``DBSIZE`` and tracemalloc while it
+runs. Both peaks should stay flat as N grows:
+
+    python -m benchmarks.map_scaling --sizes 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import operator
+import time
+import tracemalloc
+
+from benchmarks.common import make_redis, emit
+from orchestrator.main import ParallelProcessingOrchestrator
+
+
+def square(x: int) -> int:
+    return x * x
+
+
+async def sample_keys(redis, peak: dict, stop: asyncio.Event) -> None:
+    """Track the largest DBSIZE seen until ``stop`` is set"""
+    while not stop.is_set():
+        peak['keys'] = max(peak['keys'], await redis.dbsize())
+        await asyncio.sleep(0.05)
+
+
+async def run_size(orchestrator: ParallelProcessingOrchestrator, redis, size: int) -> dict:
+    await redis.flushdb()
+    peak = {'keys': 0}
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_keys(redis, peak, stop))
+    
+    tracemalloc.start()
+    start = time.perf_counter()
+    completed = 0
+    async for result in orchestrator.map_stream(square, (i for i in range(size)), ordered=False):
+        completed += result.status.value == 'completed'
+    map_elapsed = time.perf_counter() - start
+    _, map_peak_bytes = tracemalloc.get_traced_memory()
+    
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    total = await orchestrator.reduce_async(operator.add, (i for i in range(size)))
+    reduce_elapsed = time.perf_counter() - start
+    _, reduce_peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    stop.set()
+    await sampler
+    
+    return {
+        'items': size,
+        'map_completed': completed,
+        'map_items_per_second': size / map_elapsed,
+        'map_peak_memory_mb': map_peak_bytes / 1024 / 1024,
+        'reduce_correct': total == sum(range(size)),
+        'reduce_items_per_second': size / reduce_elapsed,
+        'reduce_peak_memory_mb': reduce_peak_bytes / 1024 / 1024,
+        'peak_redis_keys': peak['keys']
+    }
+
+
+async def main(sizes, workers: int, redis_url: str) -> dict:
+    redis = make_redis(redis_url)
+    orchestrator = ParallelProcessingOrchestrator(min_workers=workers, max_workers=workers)
+    orchestrator.task_queue.redis = redis
+    orchestrator.result_store.redis = redis
+    
+    # Only the worker pool is needed; skip event loop manager setup
+    await orchestrator.worker_pool.start()
+    orchestrator.is_running = True
+    
+    try:
+        results = {str(size): await run_size(orchestrator, redis, size) for size in sizes}
+    finally:
+        await orchestrator.worker_pool.stop()
+        await redis.aclose()
+    
+    return emit('map_scaling', results, 'redis' if redis_url else 'fakeredis')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--redis-url', default=None, help="real Redis server (default: fakeredis)")
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.workers, args.redis_url))
@@ -0,0 +1,178 @@
+"""
+Queue benchmark: enqueue/dequeue throughput, end-to-end task latency and result retrieval.
+
+- ``enqueue_dequeue`` pushes N tasks through ``RedisTaskQueue`` from
+  ``concurrency`` producers, then drains them with the same number of
+  consumers.
+- ``end_to_end`` submits tasks at a fixed rate to a running worker pool and
+  measures submit-to-result latency as seen by a batch result stream.
+- ``result_retrieval`` stores N results and reads them back one by one and
+  with ``get_results_many``.
+
+    python -m benchmarks.queue_throughput --tasks 10000
+    python -m benchmarks.queue_throughput --redis-url redis://localhost:6379/15
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Dict
+
+from benchmarks.common import make_redis, emit, latency_summary
+from core.interfaces import Task, TaskResult, TaskStatus
+from core.result_store import RedisResultStore
+from core.task_queue import RedisTaskQueue
+from orchestrator.main import ParallelProcessingOrchestrator
+
+
+def noop(x: int) -> int:
+    return x
+
+
+def make_tasks(count: int):
+    return [Task(id=uuid.uuid4().hex, func=noop, args=(i,)) for i in range(count)]
+
+
+async def run_enqueue_dequeue(redis, tasks: int, concurrency: int) -> Dict[str, float]:
+    """Enqueue then dequeue ``tasks`` tasks with ``concurrency`` clients each way"""
+    queue = RedisTaskQueue(queue_prefix=f"bench-{uuid.uuid4().hex[:8]}")
+    queue.redis = redis
+    batch = make_tasks(tasks)
+
+    async def produce(part):
+        for task in part:
+            await queue.enqueue(task)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(produce(batch[i::concurrency]) for i in range(concurrency)))
+    enqueue_elapsed = time.perf_counter() - start
+
+    dequeued = 0
+
+    async def consume():
+        nonlocal dequeued
+        while await queue.dequeue() is not None:
+            dequeued += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(consume() for _ in range(concurrency)))
+    dequeue_elapsed = time.perf_counter() - start
+
+    await queue.clear()
+    return {
+        'tasks': tasks,
+        'dequeued': dequeued,
+        'enqueue_per_second': tasks / enqueue_elapsed,
+        'dequeue_per_second': dequeued / dequeue_elapsed
+    }
+
+
+async def run_end_to_end(orchestrator: ParallelProcessingOrchestrator, tasks: int, rate: float) -> Dict[str, float]:
+    """Submit ``tasks`` tasks at ``rate`` per second and time each one until its result streams back"""
+    batch_id = uuid.uuid4().hex
+    batch = make_tasks(tasks)
+    task_ids = [task.id for task in batch]
+    submitted_at: Dict[str, float] = {}
+    await orchestrator.result_store.register_batch(batch_id, tasks)
+
+    async def submit():
+        start = time.perf_counter()
+        for i, task in enumerate(batch):
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task.metadata['batch_id'] = batch_id
+            submitted_at[task.id] = time.perf_counter()
+            await orchestrator.submit_task(task)
+
+    producer = asyncio.create_task(submit())
+    start = time.perf_counter()
+    latencies = []
+    async for result in orchestrator.result_store.get_results_stream(task_ids, batch_id=batch_id, timeout=600):
+        latencies.append(time.perf_counter() - submitted_at[result.task_id])
+    elapsed = time.perf_counter() - start
+    await producer
+    await orchestrator.result_store.delete_batch(batch_id)
+
+    summary = latency_summary(latencies)
+    return {
+        'tasks': tasks,
+        'completed': summary['count'],
+        'offered_rate': rate,
+        'completed_per_second': summary['count'] / elapsed,
+        'latency_p50_s': summary['p50'],
+        'latency_p95_s': summary['p95'],
+        'latency_p99_s': summary['p99'],
+        'latency_max_s': summary['max']
+    }
+
+
+async def run_result_retrieval(redis, items: int) -> Dict[str, float]:
+    """Store ``items`` results, then read them back individually and in MGET batches"""
+    store = RedisResultStore(key_prefix=f"bench-{uuid.uuid4().hex[:8]}")
+    store.redis = redis
+    task_ids = [uuid.uuid4().hex for _ in range(items)]
+
+    start = time.perf_counter()
+    for task_id in task_ids:
+        await store.store_result(TaskResult(task_id=task_id, status=TaskStatus.COMPLETED, result=task_id))
+    store_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = 0
+    for task_id in task_ids:
+        single += await store.get_result(task_id) is not None
+    single_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    many = len(await store.get_results_many(task_ids))
+    many_elapsed = time.perf_counter() - start
+
+    return {
+        'items': items,
+        'retrieved_single': single,
+        'retrieved_many': many,
+        'store_per_second': items / store_elapsed,
+        'get_single_per_second': single / single_elapsed,
+        'get_many_per_second': many / many_elapsed
+    }
+
+
+async def start_orchestrator(redis, workers: int) -> ParallelProcessingOrchestrator:
+    """Orchestrator on ``redis`` with a fixed-size pool; skips event loop manager setup"""
+    orchestrator = ParallelProcessingOrchestrator(min_workers=workers, max_workers=workers)
+    orchestrator.task_queue.redis = redis
+    orchestrator.result_store.redis = redis
+    await orchestrator.worker_pool.start()
+    orchestrator.is_running = True
+    return orchestrator
+
+
+async def main(tasks: int, concurrency: int, e2e_tasks: int, rate: float, workers: int, redis_url: str) -> dict:
+    redis = make_redis(redis_url)
+    await redis.flushdb()
+    results = {
+        'enqueue_dequeue': await run_enqueue_dequeue(redis, tasks, concurrency),
+        'result_retrieval': await run_result_retrieval(redis, tasks)
+    }
+
+    orchestrator = await start_orchestrator(redis, workers)
+    try:
+        results['end_to_end'] = await run_end_to_end(orchestrator, e2e_tasks, rate)
+    finally:
+        await orchestrator.worker_pool.stop()
+        await redis.aclose()
+
+    return emit('queue_throughput', results, 'redis' if redis_url else 'fakeredis')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, default=10_000)
+    parser.add_argument('--concurrency', type=int, default=8, help="concurrent queue clients")
+    parser.add_argument('--e2e-tasks', type=int, default=2_000)
+    parser.add_argument('--rate', type=float, default=500.0, help="end-to-end submit rate, tasks/s")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--redis-url', default=None, help="real Redis server (default: fakeredis)")
+    args = parser.parse_args()
+    asyncio.run(main(args.tasks, args.concurrency, args.e2e_tasks, args.rate, args.workers, args.redis_url))
@@ -0,0 +1,94 @@
+"""
+Result streaming benchmark: first-result latency and total collection time.
+
+Results are produced concurrently with the consumer, the way workers finish
+tasks while the orchestrator is collecting, and consumed through
+``RedisResultStore.get_results_stream`` in each delivery mode:
+
+    python -m benchmarks.result_streaming --items 100000
+    python -m benchmarks.result_streaming --redis-url redis://localhost:6379/15
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from benchmarks.common import make_redis, emit
+from core.interfaces import TaskResult, TaskStatus
+from core.result_store import RedisResultStore
+
+
+MODES = {
+    'batch_stream_unordered': {'use_batch': True, 'ordered': False},
+    'batch_stream_ordered': {'use_batch': True, 'ordered': True},
+    'pubsub_notifications': {'use_batch': False, 'ordered': False},
+}
+
+
+async def produce(store: RedisResultStore, task_ids, batch_id, started: asyncio.Event) -> None:
+    """Store a result for every task id, tagging it with the batch"""
+    started.set()
+    for task_id in task_ids:
+        metadata = {'batch_id': batch_id} if batch_id else {}
+        await store.store_result(TaskResult(
+            task_id=task_id,
+            status=TaskStatus.COMPLETED,
+            result=task_id,
+            metadata=metadata
+        ))
+
+
+async def run_mode(redis, items: int, use_batch: bool, ordered: bool) -> dict:
+    """Collect ``items`` results in one delivery mode"""
+    store = RedisResultStore(key_prefix=f"bench-{uuid.uuid4().hex[:8]}")
+    store.redis = redis
+    
+    batch_id = uuid.uuid4().hex if use_batch else None
+    task_ids = [uuid.uuid4().hex for _ in range(items)]
+    if batch_id:
+        await store.register_batch(batch_id, items)
+    
+    started = asyncio.Event()
+    producer = asyncio.create_task(produce(store, task_ids, batch_id, started))
+    await started.wait()
+    start = time.perf_counter()
+    
+    first_result = None
+    received = 0
+    async for _ in store.get_results_stream(task_ids, batch_id=batch_id, ordered=ordered, timeout=600):
+        if first_result is None:
+            first_result = time.perf_counter() - start
+        received += 1
+    total = time.perf_counter() - start
+    await producer
+    
+    progress = await store.get_batch_progress(batch_id) if batch_id else None
+    if batch_id:
+        await store.delete_batch(batch_id)
+    
+    return {
+        'items': items,
+        'received': received,
+        'first_result_latency_s': first_result,
+        'total_collection_s': total,
+        'results_per_second': received / total if total else 0.0,
+        'progress': progress
+    }
+
+
+async def main(items: int, redis_url: str, modes) -> dict:
+    redis = make_redis(redis_url)
+    results = {}
+    for mode in modes:
+        results[mode] = await run_mode(redis, items, **MODES[mode])
+    await redis.aclose()
+    return emit('result_streaming', results, 'redis' if redis_url else 'fakeredis')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--items', type=int, default=100_000)
+    parser.add_argument('--redis-url', default=None, help="real Redis server (default: fakeredis)")
+    parser.add_argument('--mode', action='append', choices=sorted(MODES), help="modes to run (default: all)")
+    args = parser.parse_args()
+    asyncio.run(main(args.items, args.redis_url, args.mode or list(MODES)))
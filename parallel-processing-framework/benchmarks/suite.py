@@ -0,0 +1,284 @@
+"""
+Benchmark suite: run the hot-path scenarios and compare them with a stored baseline.
+
+Every scenario runs ``--repeat`` times on a flushed database with fixed
+sizes, and the median of each metric is reported. Metrics are checked
+against ``benchmarks/baselines/<backend>.json``. A metric regresses when
+it is worse than the baseline by more than its tolerance, and any
+regression makes the exit status non-zero:
+
+    python -m benchmarks.suite                      # fakeredis
+    python -m benchmarks.suite --redis-server       # throwaway local redis-server
+    python -m benchmarks.suite --redis-url redis://localhost:6379/15
+    python -m benchmarks.suite --save-baseline      # record the current numbers
+
+Baselines are only comparable on the machine and backend that recorded
+them; the report flags a host mismatch.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from benchmarks.common import make_redis, emit, local_redis_server
+from benchmarks import map_scaling, queue_throughput, result_streaming
+
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+HIGHER = 'higher'  # throughput: a drop is a regression
+LOWER = 'lower'    # latency, memory, keys: a rise is a regression
+
+
+@dataclass
+class Scenario:
+    """A benchmark run and the metrics it is judged on"""
+    run: Callable[..., Awaitable[Dict[str, Any]]]
+    metrics: Dict[str, str]  # metric -> HIGHER/LOWER
+    sizes: Dict[str, Dict[str, Any]]  # profile -> keyword arguments for ``run``
+    tolerance: Optional[float] = None  # overrides --tolerance
+    noise_floor: float = 0.0  # absolute changes smaller than this are never judged, e.g. a few ms of latency
+    needs_pool: bool = False  # ``run`` takes (orchestrator, redis) instead of (redis)
+
+
+async def _result_streaming(redis, items: int) -> Dict[str, Any]:
+    return await result_streaming.run_mode(redis, items, use_batch=True, ordered=False)
+
+
+async def _end_to_end(orchestrator, redis, tasks: int, rate: float) -> Dict[str, Any]:
+    return await queue_throughput.run_end_to_end(orchestrator, tasks, rate)
+
+
+async def _map_reduce(orchestrator, redis, items: int) -> Dict[str, Any]:
+    return await map_scaling.run_size(orchestrator, redis, items)
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    'enqueue_dequeue': Scenario(
+        run=queue_throughput.run_enqueue_dequeue,
+        metrics={'enqueue_per_second': HIGHER, 'dequeue_per_second': HIGHER},
+        sizes={'quick': {'tasks': 2_000, 'concurrency': 8}, 'full': {'tasks': 20_000, 'concurrency': 8}}
+    ),
+    'result_retrieval': Scenario(
+        run=queue_throughput.run_result_retrieval,
+        metrics={'store_per_second': HIGHER, 'get_single_per_second': HIGHER, 'get_many_per_second': HIGHER},
+        sizes={'quick': {'items': 5_000}, 'full': {'items': 50_000}}
+    ),
+    'result_streaming': Scenario(
+        run=_result_streaming,
+        metrics={'results_per_second': HIGHER},
+        sizes={'quick': {'items': 5_000}, 'full': {'items': 50_000}}
+    ),
+    'end_to_end': Scenario(
+        run=_end_to_end,
+        metrics={'latency_p50_s': LOWER, 'latency_p95_s': LOWER},
+        sizes={'quick': {'tasks': 500, 'rate': 200.0}, 'full': {'tasks': 5_000, 'rate': 500.0}},
+        tolerance=0.5,
+        noise_floor=0.02,
+        needs_pool=True
+    ),
+    'map_reduce': Scenario(
+        run=_map_reduce,
+        metrics={
+            'map_items_per_second': HIGHER,
+            'reduce_items_per_second': HIGHER,
+            'map_peak_memory_mb': LOWER,
+            'peak_redis_keys': LOWER
+        },
+        sizes={'quick': {'items': 50_000}, 'full': {'items': 500_000}},
+        needs_pool=True
+    ),
+}
+
+
+def host_info() -> Dict[str, Any]:
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+async def run_scenario(scenario: Scenario, redis, orchestrator, profile: str, repeat: int) -> Dict[str, float]:
+    """Median of each judged metric over ``repeat`` runs"""
+    kwargs = scenario.sizes[profile]
+    samples: Dict[str, List[float]] = {metric: [] for metric in scenario.metrics}
+
+    for _ in range(repeat):
+        await redis.flushdb()
+        if scenario.needs_pool:
+            result = await scenario.run(orchestrator, redis, **kwargs)
+        else:
+            result = await scenario.run(redis, **kwargs)
+
+        for metric in scenario.metrics:
+            samples[metric].append(float(result[metric]))
+
+    return {metric: statistics.median(values) for metric, values in samples.items()}
+
+
+def compare(results: Dict[str, Dict[str, float]],
+            baseline: Dict[str, Dict[str, float]],
+            tolerance: float) -> List[Dict[str, Any]]:
+    """Judge every metric against the baseline; ``change`` is the relative move, positive when better"""
+    rows = []
+    for name, metrics in results.items():
+        scenario = SCENARIOS[name]
+        allowed = scenario.tolerance if scenario.tolerance is not None else tolerance
+        for metric, value in metrics.items():
+            expected = baseline.get(name, {}).get(metric)
+            if expected is None:
+                rows.append({'scenario': name, 'metric': metric, 'current': value,
+                             'baseline': None, 'change': None, 'status': 'new'})
+                continue
+
+            if expected == 0:
+                # e.g. no Redis keys left behind: any move away from zero is large
+                change = 0.0 if value == 0 else (1.0 if (value > 0) == (scenario.metrics[metric] == HIGHER) else -1.0)
+            elif scenario.metrics[metric] == HIGHER:
+                change = value / expected - 1
+            else:
+                change = 1 - value / expected
+
+            status = 'ok'
+            if abs(value - expected) <= scenario.noise_floor:
+                pass
+            elif change < -allowed:
+                status = 'regressed'
+            elif change > allowed:
+                status = 'improved'
+            rows.append({'scenario': name, 'metric': metric, 'current': value,
+                         'baseline': expected, 'change': change, 'status': status})
+    return rows
+
+
+def baseline_path(backend: str) -> str:
+    return os.path.join(BASELINE_DIR, f"{backend}.json")
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+async def run_suite(scenarios: List[str], redis_url: Optional[str], workers: int, profile: str, repeat: int) -> Dict[str, Dict[str, float]]:
+    redis = make_redis(redis_url)
+    # One pool for the whole run, started when first needed: a stopped
+    # pool's cancelled blocking pops can still take another pool's tasks
+    orchestrator = None
+    results = {}
+    try:
+        for name in scenarios:
+            if SCENARIOS[name].needs_pool and orchestrator is None:
+                orchestrator = await queue_throughput.start_orchestrator(redis, workers)
+            # The scenarios' own progress output is not part of the report
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[name] = await run_scenario(SCENARIOS[name], redis, orchestrator, profile, repeat)
+            print(f"{name}: {json.dumps(results[name])}", file=sys.stderr)
+        await redis.flushdb()
+    finally:
+        if orchestrator is not None:
+            await orchestrator.worker_pool.stop()
+        await redis.aclose()
+    return results
+
+
+def main(scenarios: List[str],
+         redis_url: Optional[str],
+         backend: str,
+         workers: int,
+         profile: str,
+         repeat: int,
+         tolerance: float,
+         baseline_file: Optional[str],
+         save_baseline: bool,
+         output: Optional[str]) -> int:
+    start = time.perf_counter()
+    results = asyncio.run(run_suite(scenarios, redis_url, workers, profile, repeat))
+
+    path = baseline_file or baseline_path(backend)
+    baseline = load_baseline(path)
+    comparison = []
+    host_matches = None
+    if baseline is not None:
+        if baseline.get('profile') != profile:
+            print(f"Baseline {path} was recorded with profile {baseline.get('profile')!r}, not compared", file=sys.stderr)
+        else:
+            comparison = compare(results, baseline['results'], tolerance)
+            host_matches = baseline.get('host') == host_info()
+
+    regressions = [row for row in comparison if row['status'] == 'regressed']
+    report = emit('suite', {
+        'profile': profile,
+        'repeat': repeat,
+        'workers': workers,
+        'tolerance': tolerance,
+        'elapsed_s': time.perf_counter() - start,
+        'host': host_info(),
+        'baseline': path if baseline is not None else None,
+        'baseline_host_matches': host_matches,
+        'scenarios': results,
+        'comparison': comparison,
+        'regressions': len(regressions)
+    }, backend)
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+
+    if save_baseline:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({
+                'backend': backend,
+                'profile': profile,
+                'recorded_at': report['timestamp'],
+                'host': host_info(),
+                'results': results
+            }, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline written to {path}", file=sys.stderr)
+        return 0
+
+    for row in regressions:
+        print(f"REGRESSION {row['scenario']}.{row['metric']}: {row['current']:.6g} vs baseline "
+              f"{row['baseline']:.6g} ({row['change']:+.1%})", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS), help="scenarios to run (default: all)")
+    parser.add_argument('--profile', choices=['quick', 'full'], default='quick')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--tolerance', type=float, default=0.3, help="allowed relative slowdown before a metric regresses")
+    backend = parser.add_mutually_exclusive_group()
+    backend.add_argument('--redis-url', default=None, help="real Redis server (default: fakeredis)")
+    backend.add_argument('--redis-server', action='store_true', help="start a throwaway local redis-server")
+    parser.add_argument('--baseline', default=None, help="baseline file (default: baselines/<backend>.json)")
+    parser.add_argument('--save-baseline', action='store_true', help="write this run as the baseline")
+    parser.add_argument('--output', default=None, help="also write the report to this file")
+    args = parser.parse_args()
+
+    scenarios = args.scenario or list(SCENARIOS)
+    if args.redis_server:
+        with local_redis_server() as url:
+            status = main(scenarios, url, 'redis', args.workers, args.profile, args.repeat,
+                          args.tolerance, args.baseline, args.save_baseline, args.output)
+    else:
+        status = main(scenarios, args.redis_url, 'redis' if args.redis_url else 'fakeredis', args.workers,
+                      args.profile, args.repeat, args.tolerance, args.baseline, args.save_baseline, args.output)
+    sys.exit(status)
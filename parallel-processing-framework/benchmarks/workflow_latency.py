@@ -0,0 +1,128 @@
+"""
+Workflow latency benchmark: DAG execution vs stage-by-stage execution.
+
+Each shape is run twice on the same worker pool: as a ``Workflow`` (nodes
+released as soon as their inputs finish, intermediate values passed by
+reference) and as sequential stages whose results round-trip through the
+orchestrator, which is how ``execute_parallel_workflow`` had to be chained:
+
+    python -m benchmarks.workflow_latency --repeat 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.common import make_redis, emit
+from orchestrator.main import ParallelProcessingOrchestrator
+from orchestrator.workflow import Workflow
+
+
+async def step(delay: float, *inputs) -> float:
+    """Simulated work: sleep, then combine the inputs"""
+    await asyncio.sleep(delay)
+    return delay + sum(inputs)
+
+
+# name -> list of (node, delay, dependencies); stages follow dependency depth
+SHAPES = {
+    'diamond': [
+        ('a', 0.05, []),
+        ('b', 0.05, ['a']),
+        ('c', 0.05, ['a']),
+        ('d', 0.05, ['b', 'c']),
+    ],
+    'uneven_diamond': [
+        ('a', 0.05, []),
+        ('b1', 0.05, ['a']),
+        ('b2', 0.05, ['b1']),
+        ('b3', 0.05, ['b2']),
+        ('c1', 0.20, ['a']),
+        ('c2', 0.05, ['c1']),
+        ('d', 0.05, ['b3', 'c2']),
+    ],
+    'fan_in_32': (
+        [(f'leaf{i}', 0.01 + 0.01 * (i % 8), []) for i in range(32)]
+        + [(f'mid{i}', 0.02, [f'leaf{i}']) for i in range(32)]
+        + [('join', 0.02, [f'mid{i}' for i in range(32)])]
+    ),
+}
+
+
+def depth_stages(shape):
+    """Group nodes into stages by dependency depth"""
+    depth = {}
+    for name, _, deps in shape:
+        depth[name] = 1 + max((depth[dep] for dep in deps), default=-1)
+    stages = [[] for _ in range(max(depth.values()) + 1)]
+    for node in shape:
+        stages[depth[node[0]]].append(node)
+    return stages
+
+
+async def run_dag(orchestrator, shape) -> float:
+    workflow = Workflow()
+    nodes = {}
+    for name, delay, deps in shape:
+        nodes[name] = workflow.add(name, step, delay, *(nodes[dep].output for dep in deps))
+    start = time.perf_counter()
+    result = await orchestrator.execute_workflow(workflow, timeout=60)
+    assert result.succeeded, result.failed
+    return time.perf_counter() - start
+
+
+async def run_staged(orchestrator, shape) -> float:
+    values = {}
+    start = time.perf_counter()
+    for stage in depth_stages(shape):
+        tasks = [
+            await orchestrator.create_task(step, delay, *(values[dep] for dep in deps))
+            for _, delay, deps in stage
+        ]
+        results = await orchestrator.execute_parallel_workflow(tasks, timeout=60)
+        for (name, _, _), result in zip(stage, results):
+            values[name] = result.result
+    return time.perf_counter() - start
+
+
+async def main(repeat: int, workers: int, redis_url: str) -> dict:
+    redis = make_redis(redis_url)
+    orchestrator = ParallelProcessingOrchestrator(min_workers=workers, max_workers=workers)
+    orchestrator.task_queue.redis = redis
+    orchestrator.result_store.redis = redis
+    await orchestrator.worker_pool.start()
+    orchestrator.is_running = True
+    
+    results = {}
+    try:
+        for shape_name, shape in SHAPES.items():
+            dag = [await run_dag(orchestrator, shape) for _ in range(repeat)]
+            staged = [await run_staged(orchestrator, shape) for _ in range(repeat)]
+            results[shape_name] = {
+                'nodes': len(shape),
+                'dag_latency_s': statistics.median(dag),
+                'staged_latency_s': statistics.median(staged),
+                'speedup': statistics.median(staged) / statistics.median(dag)
+            }
+        
+        # Critical path of one uneven diamond run, for the report
+        workflow = Workflow()
+        nodes = {}
+        for name, delay, deps in SHAPES['uneven_diamond']:
+            nodes[name] = workflow.add(name, step, delay, *(nodes[dep].output for dep in deps))
+        run = await orchestrator.execute_workflow(workflow, timeout=60)
+        results['uneven_diamond']['critical_path'] = run.critical_path_report()
+    finally:
+        await orchestrator.worker_pool.stop()
+        await redis.aclose()
+    
+    return emit('workflow_latency', results, 'redis' if redis_url else 'fakeredis')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--redis-url', default=None, help="real Redis server (default: fakeredis)")
+    args = parser.parse_args()
+    asyncio.run(main(args.repeat, args.workers, args.redis_url))
@@ -33,6 +33,17 @@ class WorkerSettings(BaseSettings):
     worker_timeout: int = Field(default=300, env="WORKER_TIMEOUT")
     heartbeat_interval: int = Field(default=30, env="HEARTBEAT_INTERVAL")
     max_tasks_per_worker: int = Field(default=100, env="MAX_TASKS_PER_WORKER")
+    
+    # Autoscaling: "queue_latency" (predictive) or "utilization" (load thresholds)
+    scaling_policy: str = Field(default="queue_latency", env="SCALING_POLICY")
+    scaling_interval: float = Field(default=2.0, env="SCALING_INTERVAL")
+    target_p95_queue_wait: float = Field(default=2.0, env="TARGET_P95_QUEUE_WAIT")  # seconds
+    scale_up_cooldown: float = Field(default=2.0, env="SCALE_UP_COOLDOWN")
+    scale_down_cooldown: float = Field(default=60.0, env="SCALE_DOWN_COOLDOWN")
+    scaling_hysteresis: float = Field(default=0.2, env="SCALING_HYSTERESIS")
+    scale_down_stable_evaluations: int = Field(default=3, env="SCALE_DOWN_STABLE_EVALUATIONS")
+    max_scale_up_step: int = Field(default=8, env="MAX_SCALE_UP_STEP")
+    max_scale_down_step: int = Field(default=1, env="MAX_SCALE_DOWN_STEP")
 
 
 class ProcessingSettings(BaseSettings):
@@ -42,6 +53,19 @@ class ProcessingSettings(BaseSettings):
     retry_delay: float = Field(default=1.0, env="RETRY_DELAY")
     max_concurrent_tasks: int = Field(default=1000, env="MAX_CONCURRENT_TASKS")
     result_ttl: int = Field(default=3600, env="RESULT_TTL")  # 1 hour
+    result_batch_size: int = Field(default=500, env="RESULT_BATCH_SIZE")  # keys per MGET
+    result_stats_bucket: int = Field(default=60, env="RESULT_STATS_BUCKET")  # seconds per stats bucket
+    
+    # Process pool settings for CPU-bound tasks
+    process_pool_size: Optional[int] = Field(default=None, env="PROCESS_POOL_SIZE")  # defaults to CPU count
+    process_max_tasks_per_child: int = Field(default=1000, env="PROCESS_MAX_TASKS_PER_CHILD")
+    process_memory_limit_mb: int = Field(default=1024, env="PROCESS_MEMORY_LIMIT_MB")
+    
+    # Chunking for map/filter/reduce
+    map_initial_chunk_size: int = Field(default=16, env="MAP_INITIAL_CHUNK_SIZE")
+    map_max_chunk_size: int = Field(default=10000, env="MAP_MAX_CHUNK_SIZE")
+    map_target_chunk_seconds: float = Field(default=0.25, env="MAP_TARGET_CHUNK_SECONDS")
+    map_max_in_flight: Optional[int] = Field(default=None, env="MAP_MAX_IN_FLIGHT")  # chunks; defaults to 2x max workers
     
     # Queue settings
     priority_levels: int = Field(default=5, env="PRIORITY_LEVELS")
@@ -50,7 +74,12 @@ class ProcessingSettings(BaseSettings):
     # Circuit breaker settings
     failure_threshold: int = Field(default=5, env="FAILURE_THRESHOLD")
     recovery_timeout: int = Field(default=60, env="RECOVERY_TIMEOUT")
-    half_open_max_calls: int = Field(default=3, env="HALF_OPEN_MAX_CALLS")
+    half_open_max_calls: int = Field(default=3, env="HALF_OPEN_MAX_CALLS")  # concurrent probes
+    failure_rate_threshold: float = Field(default=0.5, env="FAILURE_RATE_THRESHOLD")
+    failure_window_seconds: float = Field(default=60.0, env="FAILURE_WINDOW_SECONDS")
+    failure_window_buckets: int = Field(default=10, env="FAILURE_WINDOW_BUCKETS")
+    failure_minimum_calls: int = Field(default=20, env="FAILURE_MINIMUM_CALLS")
+    circuit_sync_interval: float = Field(default=1.0, env="CIRCUIT_SYNC_INTERVAL")  # shared state refresh, seconds
 
 
 class MonitoringSettings(BaseSettings):
@@ -72,6 +101,12 @@ class EventLoopSettings(BaseSettings):
     max_connections: int = Field(default=1000, env="MAX_CONNECTIONS")
     connection_timeout: float = Field(default=30.0, env="CONNECTION_TIMEOUT")
     keepalive_timeout: float = Field(default=60.0, env="KEEPALIVE_TIMEOUT")
+    
+    # Loop instrumentation
+    monitor_loop: bool = Field(default=True, env="MONITOR_LOOP")
+    loop_lag_sample_interval: float = Field(default=0.1, env="LOOP_LAG_SAMPLE_INTERVAL")  # seconds
+    slow_callback_threshold: float = Field(default=0.1, env="SLOW_CALLBACK_THRESHOLD")  # seconds
+    coroutine_attribution_rate: float = Field(default=0.1, env="COROUTINE_ATTRIBUTION_RATE")  # 0 disables
 
 
 class FrameworkSettings(BaseSettings):
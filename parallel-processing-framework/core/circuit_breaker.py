@@ -7,9 +7,11 @@ import time
 from datetime import datetime, timedelta
 from typing import Any, Callable, Dict, Optional, Union, List
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import functools
 
+import redis.asyncio as aioredis
+
 from .interfaces import ICircuitBreaker
 from config.settings import settings
 
@@ -25,86 +27,285 @@ class CircuitState(Enum):
 
 @dataclass
 class CircuitBreakerConfig:
-    """Circuit breaker configuration"""
+    """Circuit breaker configuration.
+    
+    The circuit opens on ``failure_threshold`` consecutive failures, or when
+    at least ``minimum_calls`` calls in the last ``window_seconds`` failed at
+    ``failure_rate_threshold`` or more. ``half_open_max_calls`` bounds the
+    number of concurrent recovery probes.
+    """
     failure_threshold: int = 5
     recovery_timeout: int = 60  # seconds
     half_open_max_calls: int = 3
     expected_exception: type = Exception
     success_threshold: int = 2  # consecutive successes needed to close from half-open
+    failure_rate_threshold: float = field(default_factory=lambda: settings.processing.failure_rate_threshold)
+    window_seconds: float = field(default_factory=lambda: settings.processing.failure_window_seconds)
+    window_buckets: int = field(default_factory=lambda: settings.processing.failure_window_buckets)
+    minimum_calls: int = field(default_factory=lambda: settings.processing.failure_minimum_calls)
+
+
+class RollingWindow:
+    """Success and failure counts over the last ``window_seconds``, kept in time buckets.
+    
+    The current bucket is a pair of plain counters; when time moves past its
+    end it is folded into a fixed ring and buckets older than the window are
+    subtracted, so recording a call is one comparison and one increment.
+    """
+    
+    __slots__ = ('bucket_width', 'bucket_count', 'bucket_end', 'current_successes', 'current_failures',
+                 '_bucket', '_ring_successes', '_ring_failures', '_past_successes', '_past_failures')
+    
+    def __init__(self, window_seconds: float, buckets: int, now: Optional[float] = None):
+        self.bucket_width = window_seconds / buckets
+        self.bucket_count = buckets
+        self._ring_successes = [0] * buckets
+        self._ring_failures = [0] * buckets
+        self._past_successes = 0  # totals of the ring buckets still inside the window
+        self._past_failures = 0
+        self.current_successes = 0
+        self.current_failures = 0
+        self._bucket = int((time.monotonic() if now is None else now) / self.bucket_width)
+        self.bucket_end = (self._bucket + 1) * self.bucket_width
+    
+    def advance(self, now: float) -> None:
+        """Close the current bucket and expire ring buckets that left the window"""
+        bucket = int(now / self.bucket_width)
+        if bucket <= self._bucket:
+            return
+        
+        index = self._bucket % self.bucket_count
+        self._ring_successes[index] = self.current_successes
+        self._ring_failures[index] = self.current_failures
+        self._past_successes += self.current_successes
+        self._past_failures += self.current_failures
+        self.current_successes = 0
+        self.current_failures = 0
+        
+        # Slots for buckets _bucket+1 .. bucket now hold data older than the window
+        for expired in range(self._bucket + 1, min(bucket, self._bucket + self.bucket_count) + 1):
+            index = expired % self.bucket_count
+            self._past_successes -= self._ring_successes[index]
+            self._past_failures -= self._ring_failures[index]
+            self._ring_successes[index] = 0
+            self._ring_failures[index] = 0
+        
+        self._bucket = bucket
+        self.bucket_end = (bucket + 1) * self.bucket_width
+    
+    def add_success(self, now: float) -> None:
+        if now >= self.bucket_end:
+            self.advance(now)
+        self.current_successes += 1
+    
+    def add_failure(self, now: float) -> None:
+        if now >= self.bucket_end:
+            self.advance(now)
+        self.current_failures += 1
+    
+    def clear(self) -> None:
+        for index in range(self.bucket_count):
+            self._ring_successes[index] = 0
+            self._ring_failures[index] = 0
+        self._past_successes = 0
+        self._past_failures = 0
+        self.current_successes = 0
+        self.current_failures = 0
+    
+    @property
+    def successes(self) -> int:
+        return self._past_successes + self.current_successes
+    
+    @property
+    def failures(self) -> int:
+        return self._past_failures + self.current_failures
+    
+    @property
+    def total(self) -> int:
+        return self.successes + self.failures
+    
+    @property
+    def failure_rate(self) -> float:
+        total = self.total
+        return self.failures / total if total else 0.0
 
 
 class CircuitBreakerStats:
-    """Circuit breaker statistics"""
+    """Circuit breaker statistics: lifetime counters plus a rolling window for the failure rate"""
     
-    def __init__(self):
-        self.total_calls = 0
+    def __init__(self, window_seconds: float = 60.0, window_buckets: int = 10):
+        self.window = RollingWindow(window_seconds, window_buckets)
         self.successful_calls = 0
         self.failed_calls = 0
+        self.rejected_calls = 0
         self.consecutive_failures = 0
         self.consecutive_successes = 0
         self.last_failure_time: Optional[datetime] = None
-        self.last_success_time: Optional[datetime] = None
+        self._last_success_monotonic = 0.0
         self.state_changes = 0
         self.total_open_time = 0.0
         self.last_state_change: Optional[datetime] = None
+        self._previous_state: Optional[CircuitState] = None
+    
+    @property
+    def total_calls(self) -> int:
+        return self.successful_calls + self.failed_calls
+    
+    @property
+    def last_success_time(self) -> Optional[datetime]:
+        # Kept as a monotonic reading so the success path skips the wall clock
+        if not self._last_success_monotonic:
+            return None
+        return datetime.utcnow() - timedelta(seconds=time.monotonic() - self._last_success_monotonic)
     
-    def record_success(self):
-        """Record a successful call"""
-        self.total_calls += 1
+    def record_success(self, now: float):
+        """Record a successful call (``now`` is ``time.monotonic()``)"""
         self.successful_calls += 1
         self.consecutive_successes += 1
         self.consecutive_failures = 0
-        self.last_success_time = datetime.utcnow()
+        self._last_success_monotonic = now
+        window = self.window
+        if now >= window.bucket_end:
+            window.advance(now)
+        window.current_successes += 1
     
-    def record_failure(self):
-        """Record a failed call"""
-        self.total_calls += 1
+    def record_failure(self, now: float):
+        """Record a failed call (``now`` is ``time.monotonic()``)"""
         self.failed_calls += 1
         self.consecutive_failures += 1
         self.consecutive_successes = 0
         self.last_failure_time = datetime.utcnow()
+        self.window.add_failure(now)
     
     def record_state_change(self, new_state: CircuitState):
         """Record a state change"""
         now = datetime.utcnow()
-        if self.last_state_change:
-            time_in_previous_state = (now - self.last_state_change).total_seconds()
-            # If previous state was OPEN, add to total open time
-            if hasattr(self, '_previous_state') and self._previous_state == CircuitState.OPEN:
-                self.total_open_time += time_in_previous_state
+        if self.last_state_change and self._previous_state == CircuitState.OPEN:
+            self.total_open_time += (now - self.last_state_change).total_seconds()
         
         self.state_changes += 1
         self.last_state_change = now
         self._previous_state = new_state
     
     def get_failure_rate(self) -> float:
-        """Get failure rate (0.0 to 1.0)"""
-        if self.total_calls == 0:
-            return 0.0
-        return self.failed_calls / self.total_calls
+        """Failure rate over the rolling window (0.0 to 1.0)"""
+        self.window.advance(time.monotonic())
+        return self.window.failure_rate
     
     def get_success_rate(self) -> float:
-        """Get success rate (0.0 to 1.0)"""
+        """Success rate over the rolling window (0.0 to 1.0)"""
         return 1.0 - self.get_failure_rate()
 
 
+class RedisCircuitState:
+    """Circuit state shared through Redis so one process tripping protects the fleet.
+    
+    An open circuit is a key whose TTL is the remaining recovery time, and
+    half-open probes take slots from a per-circuit counter so the fleet as a
+    whole sends at most ``half_open_max_calls`` concurrent probes.
+    """
+    
+    def __init__(self,
+                 redis_url: Optional[str] = None,
+                 key_prefix: str = "ppf"):
+        self.redis_url = redis_url or settings.redis.connection_url
+        self.key_prefix = f"{key_prefix}:circuit:"
+        self.redis: Optional[aioredis.Redis] = None
+    
+    async def connect(self) -> None:
+        """Connect to Redis"""
+        if self.redis is None:
+            self.redis = aioredis.from_url(
+                self.redis_url,
+                max_connections=settings.redis.max_connections,
+                retry_on_timeout=True,
+                decode_responses=False
+            )
+    
+    def _open_key(self, name: str) -> str:
+        return f"{self.key_prefix}{name}:open"
+    
+    def _probes_key(self, name: str) -> str:
+        return f"{self.key_prefix}{name}:probes"
+    
+    async def open_remaining(self, name: str) -> float:
+        """Seconds until the shared open state expires (0 when closed)"""
+        await self.connect()
+        remaining_ms = await self.redis.pttl(self._open_key(name))
+        return remaining_ms / 1000.0 if remaining_ms > 0 else 0.0
+    
+    async def mark_open(self, name: str, recovery_timeout: float) -> None:
+        await self.connect()
+        await self.redis.set(self._open_key(name), b"1", px=max(1, int(recovery_timeout * 1000)))
+    
+    async def mark_closed(self, name: str) -> None:
+        await self.connect()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.delete(self._open_key(name))
+            pipe.delete(self._probes_key(name))
+            await pipe.execute()
+    
+    async def acquire_probe(self, name: str, limit: int, ttl: float) -> bool:
+        """Take one fleet-wide probe slot; the counter expires in case a holder dies"""
+        await self.connect()
+        key = self._probes_key(name)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.incr(key)
+            pipe.pexpire(key, max(1, int(ttl * 1000)))
+            taken, _ = await pipe.execute()
+        if taken > limit:
+            await self._decrement_probes(key)
+            return False
+        return True
+    
+    async def release_probe(self, name: str) -> None:
+        await self.connect()
+        await self._decrement_probes(self._probes_key(name))
+    
+    async def _decrement_probes(self, key: str) -> None:
+        """Give back a probe slot without taking the counter below zero.
+        
+        A successful probe closes the circuit, which deletes the counter while
+        other probes may still be in flight; a plain DECR of the missing key
+        would leave a negative count that over-admits the next half-open window.
+        """
+        async def decrement(pipe) -> None:
+            if int(await pipe.get(key) or 0) > 0:
+                pipe.multi()
+                pipe.decr(key)
+        
+        await self.redis.transaction(decrement, key)
+
+
 class AsyncCircuitBreaker(ICircuitBreaker):
-    """Async circuit breaker implementation"""
+    """Async circuit breaker implementation.
+    
+    A closed circuit takes no locks: the state check, the call and the
+    rolling-window update run without awaiting anything but the guarded
+    function. State transitions happen on the failure path and, with a
+    ``shared_state``, on a sync with Redis at most every ``sync_interval``.
+    """
     
     def __init__(self, 
                  name: str,
-                 config: Optional[CircuitBreakerConfig] = None):
+                 config: Optional[CircuitBreakerConfig] = None,
+                 shared_state: Optional[RedisCircuitState] = None,
+                 sync_interval: float = None):
         self.name = name
         self.config = config or CircuitBreakerConfig(
             failure_threshold=settings.processing.failure_threshold,
             recovery_timeout=settings.processing.recovery_timeout,
             half_open_max_calls=settings.processing.half_open_max_calls
         )
+        self.shared_state = shared_state
+        self.sync_interval = sync_interval or settings.processing.circuit_sync_interval
         
         self.state = CircuitState.CLOSED
-        self.stats = CircuitBreakerStats()
-        self.half_open_calls = 0
-        self._lock = asyncio.Lock()
+        self.stats = CircuitBreakerStats(self.config.window_seconds, self.config.window_buckets)
+        self.half_open_calls = 0  # probes in flight
+        self._opened_at = 0.0
+        self._next_sync = 0.0
+        self._coroutine_functions: Dict[Callable, bool] = {}
         
         # Event hooks
         self.on_state_change: Optional[Callable[[CircuitState, CircuitState], None]] = None
@@ -113,99 +314,171 @@ class AsyncCircuitBreaker(ICircuitBreaker):
     
     async def call(self, func: Callable, *args, **kwargs) -> Any:
         """Execute a function with circuit breaker protection"""
-        async with self._lock:
-            # Check if we should allow the call
-            if not await self._should_allow_call():
-                raise CircuitBreakerOpenException(
-                    f"Circuit breaker '{self.name}' is OPEN"
-                )
-        
-        # Execute the function
+        if self.shared_state is not None and time.monotonic() >= self._next_sync:
+            await self._sync_shared_state()
+        
+        if self.state is not CircuitState.CLOSED:
+            return await self._call_guarded(func, args, kwargs)
+        
+        # Fast path: closed circuit
         try:
-            if asyncio.iscoroutinefunction(func):
+            is_coroutine = self._coroutine_functions.get(func)
+            if is_coroutine is None:
+                is_coroutine = self._remember_function(func)
+            if is_coroutine:
                 result = await func(*args, **kwargs)
             else:
-                # Run sync function in thread pool
-                loop = asyncio.get_event_loop()
-                result = await loop.run_in_executor(None, func, *args, **kwargs)
-            
-            # Record success
-            await self._record_success()
-            return result
-            
+                result = await self._invoke(func, args, kwargs)
         except self.config.expected_exception as e:
-            # Record failure
             await self._record_failure(e)
             raise
+        
+        self.stats.record_success(time.monotonic())
+        if self.on_success is not None:
+            self._notify_success()
+        return result
     
-    async def _should_allow_call(self) -> bool:
-        """Check if a call should be allowed based on circuit state"""
-        if self.state == CircuitState.CLOSED:
-            return True
+    def _remember_function(self, func: Callable) -> bool:
+        """Memoize ``asyncio.iscoroutinefunction``; it costs more than the rest of a guarded call"""
+        is_coroutine = asyncio.iscoroutinefunction(func)
+        if len(self._coroutine_functions) >= 1024:
+            self._coroutine_functions.clear()
+        self._coroutine_functions[func] = is_coroutine
+        return is_coroutine
+    
+    async def _invoke(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        if asyncio.iscoroutinefunction(func):
+            return await func(*args, **kwargs)
+        # Run sync function in thread pool
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+    
+    async def _call_guarded(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        """Open or half-open circuit: reject, or run the call as a recovery probe"""
+        if self.state is CircuitState.OPEN:
+            if time.monotonic() - self._opened_at < self.config.recovery_timeout:
+                self.stats.rejected_calls += 1
+                raise CircuitBreakerOpenException(f"Circuit breaker '{self.name}' is OPEN")
+            await self._change_state(CircuitState.HALF_OPEN)
         
-        elif self.state == CircuitState.OPEN:
-            # Check if recovery timeout has passed
-            if (self.stats.last_failure_time and 
-                datetime.utcnow() - self.stats.last_failure_time > 
-                timedelta(seconds=self.config.recovery_timeout)):
-                await self._change_state(CircuitState.HALF_OPEN)
-                self.half_open_calls = 0
-                return True
-            return False
+        if self.state is CircuitState.CLOSED:
+            return await self.call(func, *args, **kwargs)
+        
+        if not await self._acquire_probe():
+            self.stats.rejected_calls += 1
+            raise CircuitBreakerOpenException(
+                f"Circuit breaker '{self.name}' is HALF_OPEN with "
+                f"{self.config.half_open_max_calls} probes in flight"
+            )
         
-        elif self.state == CircuitState.HALF_OPEN:
-            # Allow limited calls to test recovery
-            if self.half_open_calls < self.config.half_open_max_calls:
-                self.half_open_calls += 1
-                return True
+        try:
+            try:
+                result = await self._invoke(func, args, kwargs)
+            except self.config.expected_exception as e:
+                await self._record_failure(e)
+                raise
+            await self._record_success()
+            return result
+        finally:
+            await self._release_probe()
+    
+    async def _acquire_probe(self) -> bool:
+        if self.half_open_calls >= self.config.half_open_max_calls:
             return False
+        self.half_open_calls += 1
         
-        return False
+        if self.shared_state is not None:
+            try:
+                if not await self.shared_state.acquire_probe(
+                    self.name, self.config.half_open_max_calls, self.config.recovery_timeout
+                ):
+                    self.half_open_calls -= 1
+                    return False
+            except Exception as e:
+                logger.warning(f"Circuit breaker '{self.name}' could not reach shared state: {e}")
+        return True
+    
+    async def _release_probe(self) -> None:
+        self.half_open_calls -= 1
+        if self.shared_state is not None:
+            try:
+                await self.shared_state.release_probe(self.name)
+            except Exception as e:
+                logger.warning(f"Circuit breaker '{self.name}' could not reach shared state: {e}")
+    
+    async def _sync_shared_state(self) -> None:
+        """Adopt an open state published by another process"""
+        now = time.monotonic()
+        self._next_sync = now + self.sync_interval
+        try:
+            remaining = await self.shared_state.open_remaining(self.name)
+        except Exception as e:
+            logger.warning(f"Circuit breaker '{self.name}' could not reach shared state: {e}")
+            return
+        
+        if remaining > 0 and self.state is CircuitState.CLOSED:
+            await self._change_state(CircuitState.OPEN, publish=False)
+            # Recover when the shared open state expires rather than a full timeout from now
+            self._opened_at = now - self.config.recovery_timeout + remaining
+    
+    def _notify_success(self) -> None:
+        try:
+            self.on_success()
+        except Exception as e:
+            logger.warning(f"Error in success callback: {e}")
+    
+    def _should_trip(self) -> bool:
+        if self.stats.consecutive_failures >= self.config.failure_threshold:
+            return True
+        window = self.stats.window
+        return (window.total >= self.config.minimum_calls and
+                window.failure_rate >= self.config.failure_rate_threshold)
     
     async def _record_success(self):
-        """Record a successful call and update state if needed"""
-        async with self._lock:
-            self.stats.record_success()
-            
-            if self.on_success:
-                try:
-                    self.on_success()
-                except Exception as e:
-                    logger.warning(f"Error in success callback: {e}")
-            
-            # State transitions on success
-            if self.state == CircuitState.HALF_OPEN:
-                if self.stats.consecutive_successes >= self.config.success_threshold:
-                    await self._change_state(CircuitState.CLOSED)
-                    self.half_open_calls = 0
+        """Record a successful probe and close the circuit once enough have succeeded"""
+        self.stats.record_success(time.monotonic())
+        if self.on_success is not None:
+            self._notify_success()
+        
+        if (self.state is CircuitState.HALF_OPEN and
+                self.stats.consecutive_successes >= self.config.success_threshold):
+            await self._change_state(CircuitState.CLOSED)
     
     async def _record_failure(self, exception: Exception):
         """Record a failed call and update state if needed"""
-        async with self._lock:
-            self.stats.record_failure()
-            
-            if self.on_failure:
-                try:
-                    self.on_failure(exception)
-                except Exception as e:
-                    logger.warning(f"Error in failure callback: {e}")
-            
-            # State transitions on failure
-            if self.state == CircuitState.CLOSED:
-                if self.stats.consecutive_failures >= self.config.failure_threshold:
-                    await self._change_state(CircuitState.OPEN)
-            
-            elif self.state == CircuitState.HALF_OPEN:
-                # Any failure in half-open state goes back to open
+        self.stats.record_failure(time.monotonic())
+        
+        if self.on_failure:
+            try:
+                self.on_failure(exception)
+            except Exception as e:
+                logger.warning(f"Error in failure callback: {e}")
+        
+        # State transitions on failure
+        if self.state is CircuitState.CLOSED:
+            if self._should_trip():
                 await self._change_state(CircuitState.OPEN)
-                self.half_open_calls = 0
+        
+        elif self.state is CircuitState.HALF_OPEN:
+            # Any failure in half-open state goes back to open
+            await self._change_state(CircuitState.OPEN)
     
-    async def _change_state(self, new_state: CircuitState):
-        """Change circuit breaker state"""
+    async def _change_state(self, new_state: CircuitState, publish: bool = True):
+        """Change circuit breaker state, publishing opens and closes to the shared state"""
         old_state = self.state
+        if old_state is new_state:
+            return
         self.state = new_state
         self.stats.record_state_change(new_state)
         
+        if new_state is CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+        elif new_state is CircuitState.HALF_OPEN:
+            self.stats.consecutive_successes = 0
+        elif new_state is CircuitState.CLOSED:
+            # Start the closed period with a clean window
+            self.stats.window.clear()
+        
         logger.info(f"Circuit breaker '{self.name}' state changed: {old_state.value} -> {new_state.value}")
         
         if self.on_state_change:
@@ -213,6 +486,15 @@ class AsyncCircuitBreaker(ICircuitBreaker):
                 self.on_state_change(old_state, new_state)
             except Exception as e:
                 logger.warning(f"Error in state change callback: {e}")
+        
+        if publish and self.shared_state is not None:
+            try:
+                if new_state is CircuitState.OPEN:
+                    await self.shared_state.mark_open(self.name, self.config.recovery_timeout)
+                elif new_state is CircuitState.CLOSED:
+                    await self.shared_state.mark_closed(self.name)
+            except Exception as e:
+                logger.warning(f"Circuit breaker '{self.name}' could not reach shared state: {e}")
     
     def get_state(self) -> str:
         """Get current circuit breaker state"""
@@ -220,16 +502,23 @@ class AsyncCircuitBreaker(ICircuitBreaker):
     
     def get_stats(self) -> Dict[str, Any]:
         """Get circuit breaker statistics"""
+        window = self.stats.window
+        failure_rate = self.stats.get_failure_rate()
         return {
             'name': self.name,
             'state': self.state.value,
             'total_calls': self.stats.total_calls,
             'successful_calls': self.stats.successful_calls,
             'failed_calls': self.stats.failed_calls,
+            'rejected_calls': self.stats.rejected_calls,
             'consecutive_failures': self.stats.consecutive_failures,
             'consecutive_successes': self.stats.consecutive_successes,
-            'failure_rate': self.stats.get_failure_rate(),
-            'success_rate': self.stats.get_success_rate(),
+            'failure_rate': failure_rate,
+            'success_rate': 1.0 - failure_rate,
+            'window_calls': window.total,
+            'window_failures': window.failures,
+            'half_open_in_flight': self.half_open_calls,
+            'shared_state': self.shared_state is not None,
             'last_failure_time': self.stats.last_failure_time.isoformat() if self.stats.last_failure_time else None,
             'last_success_time': self.stats.last_success_time.isoformat() if self.stats.last_success_time else None,
             'state_changes': self.stats.state_changes,
@@ -238,29 +527,33 @@ class AsyncCircuitBreaker(ICircuitBreaker):
                 'failure_threshold': self.config.failure_threshold,
                 'recovery_timeout': self.config.recovery_timeout,
                 'half_open_max_calls': self.config.half_open_max_calls,
-                'success_threshold': self.config.success_threshold
+                'success_threshold': self.config.success_threshold,
+                'failure_rate_threshold': self.config.failure_rate_threshold,
+                'window_seconds': self.config.window_seconds,
+                'minimum_calls': self.config.minimum_calls
             }
         }
     
     async def reset(self):
         """Reset circuit breaker to closed state"""
-        async with self._lock:
-            old_state = self.state
-            self.state = CircuitState.CLOSED
-            self.stats = CircuitBreakerStats()
-            self.half_open_calls = 0
-            logger.info(f"Circuit breaker '{self.name}' reset from {old_state.value} to CLOSED")
+        old_state = self.state
+        self.state = CircuitState.CLOSED
+        self.stats = CircuitBreakerStats(self.config.window_seconds, self.config.window_buckets)
+        self.half_open_calls = 0
+        if self.shared_state is not None:
+            try:
+                await self.shared_state.mark_closed(self.name)
+            except Exception as e:
+                logger.warning(f"Circuit breaker '{self.name}' could not reach shared state: {e}")
+        logger.info(f"Circuit breaker '{self.name}' reset from {old_state.value} to CLOSED")
     
     async def force_open(self):
         """Force circuit breaker to open state"""
-        async with self._lock:
-            await self._change_state(CircuitState.OPEN)
+        await self._change_state(CircuitState.OPEN)
     
     async def force_half_open(self):
         """Force circuit breaker to half-open state"""
-        async with self._lock:
-            await self._change_state(CircuitState.HALF_OPEN)
-            self.half_open_calls = 0
+        await self._change_state(CircuitState.HALF_OPEN)
 
 
 class CircuitBreakerOpenException(Exception):
@@ -269,25 +562,29 @@ class CircuitBreakerOpenException(Exception):
 
 
 class CircuitBreakerRegistry:
-    """Registry for managing multiple circuit breakers"""
+    """Registry for managing multiple circuit breakers.
     
-    def __init__(self):
+    Lookups and creation never await, so they need no lock on a single
+    event loop. Breakers created here share ``shared_state`` if one is given.
+    """
+    
+    def __init__(self, shared_state: Optional[RedisCircuitState] = None):
         self.breakers: Dict[str, AsyncCircuitBreaker] = {}
-        self._lock = asyncio.Lock()
+        self.shared_state = shared_state
     
     async def get_breaker(self, 
                          name: str, 
                          config: Optional[CircuitBreakerConfig] = None) -> AsyncCircuitBreaker:
         """Get or create a circuit breaker"""
-        async with self._lock:
-            if name not in self.breakers:
-                self.breakers[name] = AsyncCircuitBreaker(name, config)
-            return self.breakers[name]
+        breaker = self.breakers.get(name)
+        if breaker is None:
+            breaker = AsyncCircuitBreaker(name, config, shared_state=self.shared_state)
+            self.breakers[name] = breaker
+        return breaker
     
     async def remove_breaker(self, name: str) -> bool:
         """Remove a circuit breaker"""
-        async with self._lock:
-            return self.breakers.pop(name, None) is not None
+        return self.breakers.pop(name, None) is not None
     
     def list_breakers(self) -> List[str]:
         """List all circuit breaker names"""
@@ -337,8 +634,8 @@ async def get_all_circuit_breaker_stats() -> Dict[str, Dict[str, Any]]:
 class CircuitBreakerManager:
     """High-level manager for circuit breakers"""
     
-    def __init__(self):
-        self.registry = CircuitBreakerRegistry()
+    def __init__(self, shared_state: Optional[RedisCircuitState] = None):
+        self.registry = CircuitBreakerRegistry(shared_state)
     
     async def create_external_service_breaker(self, 
                                             service_name: str,
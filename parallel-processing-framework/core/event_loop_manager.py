@@ -7,7 +7,7 @@ import signal
 import sys
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Any, Awaitable, Callable, Dict, List, Optional, Union, Coroutine
 import uvloop
@@ -15,6 +15,8 @@ import os
 from contextlib import asynccontextmanager
 
 from config.settings import settings
+from .execution_backend import ExecutionRouter, ProcessPoolBackend
+from .loop_monitor import LoopMonitor
 
 logger = logging.getLogger(__name__)
 
@@ -36,7 +38,15 @@ class EventLoopManager:
         # Event loop and executors
         self.loop: Optional[asyncio.AbstractEventLoop] = None
         self.thread_executor: Optional[ThreadPoolExecutor] = None
-        self.process_executor: Optional[ProcessPoolExecutor] = None
+        self.execution_router: Optional[ExecutionRouter] = None
+        self.loop_monitor: Optional[LoopMonitor] = None
+        if settings.event_loop.monitor_loop:
+            self.loop_monitor = LoopMonitor(
+                sample_interval=settings.event_loop.loop_lag_sample_interval,
+                slow_threshold=settings.event_loop.slow_callback_threshold,
+                attribution_sample_rate=settings.event_loop.coroutine_attribution_rate,
+                metric_prefix="ppf"
+            )
         
         # State management
         self.is_running = False
@@ -99,6 +109,8 @@ class EventLoopManager:
     
     def _task_factory(self, loop: asyncio.AbstractEventLoop, coro: Coroutine) -> asyncio.Task:
         """Custom task factory for tracking tasks"""
+        if self.loop_monitor is not None:
+            coro = self.loop_monitor.wrap_coroutine(coro)
         task = asyncio.Task(coro, loop=loop)
         task_id = id(task)
         
@@ -140,8 +152,10 @@ class EventLoopManager:
                 thread_name_prefix="PPF-Thread"
             )
             
-            self.process_executor = ProcessPoolExecutor(
-                max_workers=self.process_pool_size
+            # Task dispatch shares the thread pool; the process pool boots lazily
+            self.execution_router = ExecutionRouter(
+                thread_executor=self.thread_executor,
+                process_backend=ProcessPoolBackend(max_workers=self.process_pool_size)
             )
             
             # Set default executors for the loop
@@ -150,6 +164,10 @@ class EventLoopManager:
             # Set up signal handlers
             self._setup_signal_handlers()
             
+            # Lag sampling starts with the loop; task timing is in _task_factory
+            if self.loop_monitor is not None:
+                self.loop_monitor.start_soon(self.loop)
+            
             self.is_running = True
             self.start_time = datetime.utcnow()
             
@@ -191,14 +209,17 @@ class EventLoopManager:
                     if not task.done():
                         task.cancel()
             
+            if self.loop_monitor is not None:
+                self.loop_monitor.stop()
+            
             # Shutdown executors
             if self.thread_executor:
                 self.thread_executor.shutdown(wait=True)
                 self.thread_executor = None
             
-            if self.process_executor:
-                self.process_executor.shutdown(wait=True)
-                self.process_executor = None
+            if self.execution_router:
+                self.execution_router.shutdown(wait=True)
+                self.execution_router = None
             
             # Restore signal handlers
             self._restore_signal_handlers()
@@ -284,7 +305,16 @@ class EventLoopManager:
         if not self.loop:
             raise RuntimeError("Event loop is not available")
         
-        return await self.loop.run_in_executor(self.process_executor, func, *args, **kwargs)
+        return await self.get_execution_router().process_backend.run(func, args, kwargs)
+    
+    def get_execution_router(self) -> ExecutionRouter:
+        """Get the router workers use to dispatch tasks to loop, threads or processes"""
+        if self.execution_router is None:
+            self.execution_router = ExecutionRouter(
+                thread_executor=self.thread_executor,
+                process_backend=ProcessPoolBackend(max_workers=self.process_pool_size)
+            )
+        return self.execution_router
     
     async def gather(*coros: Awaitable[Any], return_exceptions: bool = False) -> List[Any]:
         """Gather multiple coroutines with enhanced error handling"""
@@ -337,7 +367,9 @@ class EventLoopManager:
             'thread_pool_size': self.thread_pool_size,
             'process_pool_size': self.process_pool_size,
             'success_rate': self.completed_tasks / max(1, self.task_count),
-            'loop_info': loop_info
+            'loop_info': loop_info,
+            'execution_backends': self.execution_router.get_stats() if self.execution_router else {},
+            'loop_monitor': self.loop_monitor.get_stats() if self.loop_monitor else {}
         }
     
     async def health_check(self) -> Dict[str, Any]:
@@ -364,6 +396,19 @@ class EventLoopManager:
             }
             health['status'] = 'unhealthy'
         
+        # Sustained lag seen by the monitor, not just this one probe
+        if self.loop_monitor is not None and self.loop_monitor.total_samples:
+            monitor_stats = self.loop_monitor.get_stats()
+            lag_degraded = monitor_stats['lag_p95'] >= self.loop_monitor.slow_threshold
+            health['checks']['loop_lag'] = {
+                'status': 'degraded' if lag_degraded else 'healthy',
+                'lag_p95': monitor_stats['lag_p95'],
+                'lag_max': monitor_stats['lag_max'],
+                'slow_callbacks': monitor_stats['slow_callbacks']
+            }
+            if lag_degraded and health['status'] == 'healthy':
+                health['status'] = 'degraded'
+        
         # Check executor health
         if self.thread_executor:
             try:
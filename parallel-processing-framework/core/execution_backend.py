@@ -0,0 +1,272 @@
+"""
+Execution backends that route tasks to the event loop, a thread pool or a warm process pool
+"""
+import asyncio
+import functools
+import hashlib
+import logging
+import multiprocessing
+import os
+import pickle
+import weakref
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import psutil
+
+from .interfaces import Task, ExecutionMode
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class IExecutionBackend(ABC):
+    """Interface for the places a task callable can run"""
+
+    @abstractmethod
+    async def run(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        """Run ``func(*args, **kwargs)`` and return its result"""
+        pass
+
+    @abstractmethod
+    def shutdown(self, wait: bool = True) -> None:
+        """Release any pooled resources"""
+        pass
+
+    @abstractmethod
+    def get_stats(self) -> Dict[str, Any]:
+        """Get backend statistics"""
+        pass
+
+
+class EventLoopBackend(IExecutionBackend):
+    """Runs coroutine functions directly on the calling event loop"""
+
+    def __init__(self):
+        self.tasks_executed = 0
+
+    async def run(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        self.tasks_executed += 1
+        result = func(*args, **kwargs)
+        if asyncio.iscoroutine(result) or isinstance(result, asyncio.Future):
+            result = await result
+        return result
+
+    def shutdown(self, wait: bool = True) -> None:
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'backend': 'event_loop', 'tasks_executed': self.tasks_executed}
+
+
+class ThreadPoolBackend(IExecutionBackend):
+    """Runs blocking I/O callables in a thread pool (the loop default if none is given)"""
+
+    def __init__(self, executor: Optional[Executor] = None):
+        self.executor = executor
+        self.tasks_executed = 0
+
+    async def run(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        self.tasks_executed += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True) -> None:
+        # The executor is owned by whoever passed it in
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'backend': 'thread_pool', 'tasks_executed': self.tasks_executed}
+
+
+# Per-process state of pool workers
+_function_cache: Dict[str, Callable] = {}
+_worker_process: Optional[psutil.Process] = None
+
+
+def _init_process_worker() -> None:
+    """Pool worker initializer: keep a handle for cheap RSS sampling"""
+    global _worker_process
+    _worker_process = psutil.Process(os.getpid())
+
+
+def _warm_process_worker() -> int:
+    """No-op submitted to every worker on start so the first real task finds it booted"""
+    return os.getpid()
+
+
+def _call_in_process_worker(func_key: str, func_payload: bytes, args: tuple, kwargs: dict) -> Tuple[Any, float]:
+    """Run a task callable in a pool worker, unpickling each distinct callable once per process"""
+    func = _function_cache.get(func_key)
+    if func is None:
+        func = pickle.loads(func_payload)
+        _function_cache[func_key] = func
+
+    result = func(*args, **kwargs)
+
+    rss_mb = 0.0
+    if _worker_process is not None:
+        rss_mb = _worker_process.memory_info().rss / 1024 / 1024
+    return result, rss_mb
+
+
+class ProcessPoolBackend(IExecutionBackend):
+    """Warm process pool for CPU-bound callables.
+
+    Workers are started with ``spawn`` and booted eagerly by ``start``. Each
+    callable is pickled once in the parent and unpickled once per worker.
+    Workers are replaced after ``max_tasks_per_process`` tasks, and the whole
+    pool is recycled when a worker reports an RSS above ``memory_limit_mb``.
+    """
+
+    def __init__(self,
+                 max_workers: Optional[int] = None,
+                 max_tasks_per_process: Optional[int] = None,
+                 memory_limit_mb: Optional[float] = None,
+                 start_method: str = "spawn"):
+        self.max_workers = max_workers or settings.processing.process_pool_size or (os.cpu_count() or 1)
+        self.max_tasks_per_process = max_tasks_per_process or settings.processing.process_max_tasks_per_child
+        self.memory_limit_mb = memory_limit_mb or settings.processing.process_memory_limit_mb
+        self.start_method = start_method
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._payloads: "weakref.WeakKeyDictionary[Callable, Tuple[str, bytes]]" = weakref.WeakKeyDictionary()
+
+        # Statistics
+        self.tasks_executed = 0
+        self.recycles = 0
+        self.peak_worker_rss_mb = 0.0
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_init_process_worker,
+            max_tasks_per_child=self.max_tasks_per_process
+        )
+
+    async def start(self) -> None:
+        """Create the pool and boot every worker"""
+        if self._executor is None:
+            self._executor = self._new_executor()
+
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self._executor, _warm_process_worker)
+            for _ in range(self.max_workers)
+        ))
+        logger.info(f"Process pool warmed with {self.max_workers} workers")
+
+    def _payload_for(self, func: Callable) -> Tuple[str, bytes]:
+        """Pickled callable plus its cache key, memoized per callable object"""
+        try:
+            cached = self._payloads.get(func)
+        except TypeError:
+            cached = None
+        if cached is not None:
+            return cached
+
+        payload = pickle.dumps(func)
+        cached = (hashlib.sha1(payload).hexdigest(), payload)
+        try:
+            self._payloads[func] = cached
+        except TypeError:
+            pass  # not weak-referenceable, pickle it again next time
+        return cached
+
+    async def run(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        if self._executor is None:
+            self._executor = self._new_executor()
+
+        func_key, func_payload = self._payload_for(func)
+        loop = asyncio.get_running_loop()
+        executor = self._executor
+        result, rss_mb = await loop.run_in_executor(
+            executor, _call_in_process_worker, func_key, func_payload, args, kwargs
+        )
+
+        self.tasks_executed += 1
+        self.peak_worker_rss_mb = max(self.peak_worker_rss_mb, rss_mb)
+        if self.memory_limit_mb and rss_mb > self.memory_limit_mb:
+            logger.warning(f"Process worker RSS {rss_mb:.1f}MB over limit "
+                           f"{self.memory_limit_mb}MB, recycling pool")
+            self.recycle(expected=executor)
+
+        return result
+
+    def recycle(self, expected: Optional[ProcessPoolExecutor] = None) -> None:
+        """Swap in a fresh pool; work already queued on the old one still finishes.
+
+        With ``expected``, only recycle if that pool is still the current one,
+        so tasks finishing on an already recycled pool don't recycle again.
+        """
+        if expected is not None and expected is not self._executor:
+            return
+        old_executor, self._executor = self._executor, self._new_executor()
+        self.recycles += 1
+        if old_executor is not None:
+            old_executor.shutdown(wait=False)
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'backend': 'process_pool',
+            'max_workers': self.max_workers,
+            'max_tasks_per_process': self.max_tasks_per_process,
+            'memory_limit_mb': self.memory_limit_mb,
+            'tasks_executed': self.tasks_executed,
+            'recycles': self.recycles,
+            'peak_worker_rss_mb': self.peak_worker_rss_mb
+        }
+
+
+class ExecutionRouter:
+    """Routes each task to a backend based on its ``execution`` hint.
+
+    ``ASYNC`` and coroutine functions run on the event loop, ``IO`` runs in
+    the thread pool and ``CPU`` in the process pool. ``AUTO`` keeps the
+    historical behaviour: coroutines on the loop, everything else in threads.
+    """
+
+    def __init__(self,
+                 thread_executor: Optional[Executor] = None,
+                 process_backend: Optional[ProcessPoolBackend] = None):
+        self.event_loop_backend = EventLoopBackend()
+        self.thread_backend = ThreadPoolBackend(thread_executor)
+        self.process_backend = process_backend or ProcessPoolBackend()
+
+    def select_backend(self, task: Task) -> IExecutionBackend:
+        """Pick the backend a task should run on"""
+        if asyncio.iscoroutinefunction(task.func):
+            return self.event_loop_backend
+
+        if task.execution == ExecutionMode.CPU:
+            return self.process_backend
+        if task.execution == ExecutionMode.ASYNC:
+            return self.event_loop_backend
+        return self.thread_backend
+
+    async def run(self, task: Task) -> Any:
+        """Run a task on its backend and return the callable's result"""
+        backend = self.select_backend(task)
+        return await backend.run(task.func, task.args, task.kwargs)
+
+    async def start(self) -> None:
+        """Warm up pooled backends"""
+        await self.process_backend.start()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down pooled backends"""
+        self.process_backend.shutdown(wait=wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'event_loop': self.event_loop_backend.get_stats(),
+            'thread_pool': self.thread_backend.get_stats(),
+            'process_pool': self.process_backend.get_stats()
+        }
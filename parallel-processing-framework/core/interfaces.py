@@ -28,6 +28,14 @@ class TaskPriority(Enum):
     URGENT = 9
 
 
+class ExecutionMode(Enum):
+    """Where a task callable should run"""
+    AUTO = "auto"    # coroutines on the event loop, everything else in threads
+    ASYNC = "async"  # on the event loop (sync callables run inline)
+    IO = "io"        # thread pool, for blocking I/O
+    CPU = "cpu"      # warm process pool, for CPU-bound work
+
+
 @dataclass
 class Task:
     """Represents a task to be executed"""
@@ -40,6 +48,8 @@ class Task:
     max_retries: int = 3
     metadata: Dict[str, Any] = None
     created_at: datetime = None
+    execution: ExecutionMode = ExecutionMode.AUTO
+    enqueued_at: Optional[datetime] = None  # set by the task queue on each enqueue
     
     def __post_init__(self):
         if self.id is None:
@@ -52,6 +62,17 @@ class Task:
             self.created_at = datetime.utcnow()
 
 
+@dataclass(frozen=True)
+class ResultRef:
+    """Placeholder in task args for the result of another task.
+    
+    Workers swap it for the referenced result's value just before running
+    the task, so intermediate data stays in the result store instead of
+    passing through whoever submitted the task.
+    """
+    task_id: str
+
+
 @dataclass
 class TaskResult:
     """Represents the result of a task execution"""
@@ -183,8 +204,21 @@ class IResultStore(ABC):
         """Delete a task result"""
         pass
     
+    async def get_results_many(self, task_ids: List[str]) -> Dict[str, TaskResult]:
+        """Retrieve every available result for ``task_ids``"""
+        found = {}
+        for task_id in task_ids:
+            result = await self.get_result(task_id)
+            if result:
+                found[task_id] = result
+        return found
+    
     @abstractmethod
-    async def get_results_stream(self, task_ids: List[str]) -> AsyncGenerator[TaskResult, None]:
+    async def get_results_stream(self,
+                                 task_ids: List[str],
+                                 batch_id: Optional[str] = None,
+                                 ordered: bool = False,
+                                 timeout: Optional[float] = None) -> AsyncGenerator[TaskResult, None]:
         """Stream results for multiple tasks"""
         pass
 
@@ -4,8 +4,9 @@ Result storage and aggregation with streaming support
 import asyncio
 import json
 import logging
+import time
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List, AsyncGenerator, Set, Callable
+from typing import Optional, Dict, Any, List, AsyncGenerator, Set, Callable, Tuple
 import redis.asyncio as aioredis
 import pickle
 import base64
@@ -18,22 +19,41 @@ logger = logging.getLogger(__name__)
 
 
 class RedisResultStore(IResultStore):
-    """Redis-based result store with streaming capabilities"""
+    """Redis-based result store with streaming capabilities.
+    
+    Every result lives under its own key (``{prefix}:result:{task_id}``) with a
+    native TTL, so expiry costs nothing on our side and results shard naturally
+    across a cluster. Statistics are kept as counters bucketed by store time;
+    a bucket expires together with the results it counted, so summing the live
+    buckets gives the number of results still held without scanning them.
+    Storing a result for a task id that already has one replaces it and moves
+    its counts instead of adding to them.
+    """
     
     def __init__(self, 
                  redis_url: Optional[str] = None,
                  key_prefix: str = "ppf",
-                 result_ttl: int = None):
+                 result_ttl: int = None,
+                 batch_size: int = None,
+                 stats_bucket_seconds: int = None):
         self.redis_url = redis_url or settings.redis.connection_url
         self.key_prefix = key_prefix
         self.result_ttl = result_ttl or settings.processing.result_ttl
+        self.batch_size = batch_size or settings.processing.result_batch_size
+        self.stats_bucket_seconds = stats_bucket_seconds or settings.processing.result_stats_bucket
         
         self.redis: Optional[aioredis.Redis] = None
         
         # Keys for different data types
-        self.results_key = f"{key_prefix}:results"
+        self.result_key_prefix = f"{key_prefix}:result:"
+        self.stats_key_prefix = f"{key_prefix}:results:stats:"
+        self.counters_key = f"{key_prefix}:results:counters"
         self.notifications_key = f"{key_prefix}:notifications"
         self.streams_key = f"{key_prefix}:streams"
+        self.batch_key_prefix = f"{key_prefix}:batch:"
+        
+        # Single hash used by earlier versions, only touched by cleanup
+        self.legacy_results_key = f"{key_prefix}:results"
         
         # Active result streams
         self.active_streams: Dict[str, Set[str]] = defaultdict(set)
@@ -58,7 +78,28 @@ class RedisResultStore(IResultStore):
             self.redis = None
             logger.info("Result store disconnected from Redis")
     
-    def _serialize_result(self, result: TaskResult) -> bytes:
+    def _result_key(self, task_id: str) -> str:
+        """Redis key holding a single task result"""
+        return f"{self.result_key_prefix}{task_id}"
+    
+    def _batch_stream_key(self, batch_id: str) -> str:
+        """Redis stream that workers append completed task ids of a batch to"""
+        return f"{self.batch_key_prefix}{batch_id}:done"
+    
+    def _batch_progress_key(self, batch_id: str) -> str:
+        """Redis hash with the total/completed/failed counters of a batch"""
+        return f"{self.batch_key_prefix}{batch_id}:progress"
+    
+    def _stats_bucket(self, timestamp: float) -> int:
+        """Stats bucket index for a store timestamp"""
+        return int(timestamp // self.stats_bucket_seconds)
+    
+    def _stats_bucket_ttl(self, bucket: int, now: float) -> int:
+        """Seconds until a stats bucket's results have all expired"""
+        bucket_end = (bucket + 1) * self.stats_bucket_seconds
+        return int(bucket_end + self.result_ttl - now) + 1
+    
+    def _serialize_result(self, result: TaskResult, stored_at: Optional[float] = None) -> bytes:
         """Serialize result to bytes for Redis storage"""
         result_data = {
             'task_id': result.task_id,
@@ -70,7 +111,8 @@ class RedisResultStore(IResultStore):
             'execution_time': result.execution_time,
             'worker_id': result.worker_id,
             'retry_count': result.retry_count,
-            'metadata': result.metadata
+            'metadata': result.metadata,
+            'stored_at': stored_at
         }
         return json.dumps(result_data).encode('utf-8')
     
@@ -104,12 +146,36 @@ class RedisResultStore(IResultStore):
         await self.connect()
         
         try:
-            serialized_result = self._serialize_result(result)
+            now = time.time()
+            serialized_result = self._serialize_result(result, stored_at=now)
             
-            # Store result with TTL
-            async with self.redis.pipeline() as pipe:
-                await pipe.hset(self.results_key, result.task_id, serialized_result)
-                await pipe.expire(f"{self.results_key}:{result.task_id}", self.result_ttl)
+            bucket = self._stats_bucket(now)
+            stats_key = f"{self.stats_key_prefix}{bucket}"
+            status_field = f"status:{result.status.value}"
+            
+            # Store result with TTL and update counters in one round-trip; GET returns
+            # any result it replaced, whose counts are taken back out below
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.set(self._result_key(result.task_id), serialized_result, ex=self.result_ttl, get=True)
+                
+                pipe.hincrby(stats_key, status_field, 1)
+                pipe.expire(stats_key, self._stats_bucket_ttl(bucket, now))
+                pipe.hincrby(self.counters_key, 'total_stored', 1)
+                pipe.hincrby(self.counters_key, status_field, 1)
+                
+                # Append to the batch completion stream, if the task has one
+                batch_id = result.metadata.get('batch_id') if result.metadata else None
+                if batch_id:
+                    stream_key = self._batch_stream_key(batch_id)
+                    progress_key = self._batch_progress_key(batch_id)
+                    pipe.xadd(stream_key, {
+                        'task_id': result.task_id,
+                        'status': result.status.value,
+                        'execution_time': result.execution_time or 0.0
+                    })
+                    pipe.expire(stream_key, self.result_ttl)
+                    pipe.hincrby(progress_key, result.status.value, 1)
+                    pipe.expire(progress_key, self.result_ttl)
                 
                 # Publish notification for streaming
                 notification = {
@@ -117,9 +183,12 @@ class RedisResultStore(IResultStore):
                     'status': result.status.value,
                     'timestamp': datetime.utcnow().isoformat()
                 }
-                await pipe.publish(self.notifications_key, json.dumps(notification))
+                pipe.publish(self.notifications_key, json.dumps(notification))
                 
-                await pipe.execute()
+                replaced = (await pipe.execute())[0]
+            
+            if replaced:
+                await self._uncount(result.task_id, replaced, now, replaced=True)
             
             logger.debug(f"Stored result for task {result.task_id}")
             return True
@@ -133,7 +202,7 @@ class RedisResultStore(IResultStore):
         await self.connect()
         
         try:
-            data = await self.redis.hget(self.results_key, task_id)
+            data = await self.redis.get(self._result_key(task_id))
             if data:
                 return self._deserialize_result(data)
             return None
@@ -142,118 +211,307 @@ class RedisResultStore(IResultStore):
             logger.error(f"Failed to get result for task {task_id}: {e}")
             return None
     
+    async def get_results_many(self, task_ids: List[str]) -> Dict[str, TaskResult]:
+        """Fetch every available result for ``task_ids``, one MGET per chunk"""
+        await self.connect()
+        
+        found: Dict[str, TaskResult] = {}
+        for i in range(0, len(task_ids), self.batch_size):
+            chunk = task_ids[i:i + self.batch_size]
+            try:
+                values = await self.redis.mget([self._result_key(task_id) for task_id in chunk])
+            except Exception as e:
+                logger.error(f"Failed to fetch results batch: {e}")
+                continue
+            
+            for task_id, data in zip(chunk, values):
+                if not data:
+                    continue
+                try:
+                    found[task_id] = self._deserialize_result(data)
+                except Exception as e:
+                    logger.warning(f"Failed to decode result for task {task_id}: {e}")
+        
+        return found
+    
     async def delete_result(self, task_id: str) -> bool:
         """Delete a task result"""
         await self.connect()
         
         try:
-            deleted = await self.redis.hdel(self.results_key, task_id)
-            return deleted > 0
+            key = self._result_key(task_id)
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.get(key)
+                pipe.delete(key)
+                data, deleted = await pipe.execute()
+            
+            if not deleted:
+                return False
+            
+            await self._uncount(task_id, data, time.time())
+            return True
             
         except Exception as e:
             logger.error(f"Failed to delete result for task {task_id}: {e}")
             return False
     
-    async def get_results_stream(self, task_ids: List[str]) -> AsyncGenerator[TaskResult, None]:
-        """Stream results for multiple tasks as they become available"""
+    async def _uncount(self, task_id: str, data: bytes, now: float, replaced: bool = False) -> None:
+        """Take a stored result that was deleted or replaced back out of the counters.
+        
+        Its store-time bucket always loses it. A replaced result also leaves the
+        lifetime counters and its batch's progress, which its replacement was
+        counted in again.
+        """
+        try:
+            result_data = json.loads(data.decode('utf-8'))
+            status_field = f"status:{result_data['status']}"
+            async with self.redis.pipeline(transaction=False) as pipe:
+                stored_at = result_data.get('stored_at')
+                if stored_at is not None:
+                    bucket = self._stats_bucket(stored_at)
+                    ttl = self._stats_bucket_ttl(bucket, now)
+                    if ttl > 0:
+                        stats_key = f"{self.stats_key_prefix}{bucket}"
+                        pipe.hincrby(stats_key, status_field, -1)
+                        pipe.expire(stats_key, ttl)
+                if replaced:
+                    pipe.hincrby(self.counters_key, 'total_stored', -1)
+                    pipe.hincrby(self.counters_key, status_field, -1)
+                    batch_id = (result_data.get('metadata') or {}).get('batch_id')
+                    if batch_id:
+                        pipe.hincrby(self._batch_progress_key(batch_id), result_data['status'], -1)
+                await pipe.execute()
+        except Exception as e:
+            logger.debug(f"Could not adjust stats for task {task_id}: {e}")
+    
+    async def register_batch(self, batch_id: str, total: int) -> None:
+        """Record the expected size of a batch so progress can be reported"""
+        await self.connect()
+        
+        progress_key = self._batch_progress_key(batch_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(progress_key, 'total', total)
+            pipe.expire(progress_key, self.result_ttl)
+            await pipe.execute()
+    
+    async def get_batch_progress(self, batch_id: str) -> Dict[str, int]:
+        """Get completion counters for a batch"""
+        await self.connect()
+        
+        counters = await self.redis.hgetall(self._batch_progress_key(batch_id))
+        counters = {k.decode(): int(v) for k, v in counters.items()}
+        
+        total = counters.pop('total', 0)
+        finished = sum(counters.values())
+        return {
+            'total': total,
+            'finished': finished,
+            'remaining': max(0, total - finished),
+            'status_distribution': counters
+        }
+    
+    async def delete_batch(self, batch_id: str) -> None:
+        """Drop a batch's completion stream and counters before their TTL"""
+        await self.connect()
+        await self.redis.unlink(self._batch_stream_key(batch_id), self._batch_progress_key(batch_id))
+    
+    async def read_batch_completions(self,
+                                     batch_id: str,
+                                     last_id: bytes = b'0',
+                                     count: Optional[int] = None,
+                                     block_ms: Optional[int] = None) -> Tuple[bytes, List[Tuple[str, str, float]]]:
+        """Read completions appended to a batch stream after ``last_id``.
+        
+        Blocks up to ``block_ms`` when nothing is there yet. Returns the new
+        cursor and ``(task_id, status, execution_time)`` tuples in completion
+        order.
+        """
         await self.connect()
         
+        reply = await self.redis.xread(
+            {self._batch_stream_key(batch_id): last_id},
+            count=count or self.batch_size,
+            block=block_ms
+        )
+        if not reply:
+            return last_id, []
+        
+        entries = reply[0][1]
+        completions = [
+            (
+                fields[b'task_id'].decode(),
+                fields[b'status'].decode(),
+                float(fields.get(b'execution_time', 0.0))
+            )
+            for _, fields in entries
+        ]
+        return entries[-1][0], completions
+    
+    async def trim_batch_completions(self, batch_id: str, last_id: bytes) -> None:
+        """Drop completions before ``last_id`` once a consumer has processed them"""
+        await self.connect()
+        await self.redis.xtrim(self._batch_stream_key(batch_id), minid=last_id)
+    
+    async def get_results_stream(self,
+                                 task_ids: List[str],
+                                 batch_id: Optional[str] = None,
+                                 ordered: bool = False,
+                                 timeout: Optional[float] = None) -> AsyncGenerator[TaskResult, None]:
+        """Stream results for multiple tasks as they become available.
+        
+        With a ``batch_id`` the results are read from the batch completion
+        stream using blocking reads, otherwise pubsub notifications are used.
+        ``ordered`` yields results in the order of ``task_ids``; ``timeout``
+        bounds the total time spent waiting.
+        """
+        await self.connect()
+        
+        if batch_id:
+            stream = self._stream_batch(task_ids, batch_id, timeout)
+        else:
+            stream = self._stream_notifications(task_ids, timeout)
+        
+        if not ordered:
+            async for result in stream:
+                yield result
+            return
+        
+        # Hold back results that finish ahead of their turn
+        buffered: Dict[str, TaskResult] = {}
+        next_index = 0
+        async for result in stream:
+            buffered[result.task_id] = result
+            while next_index < len(task_ids) and task_ids[next_index] in buffered:
+                yield buffered.pop(task_ids[next_index])
+                next_index += 1
+        
+        # Whatever is left was stuck behind a result that never arrived
+        for task_id in task_ids[next_index:]:
+            if task_id in buffered:
+                yield buffered.pop(task_id)
+    
+    async def _stream_batch(self,
+                            task_ids: List[str],
+                            batch_id: str,
+                            timeout: Optional[float]) -> AsyncGenerator[TaskResult, None]:
+        """Read completions of a batch off its stream, one MGET per chunk"""
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout if timeout else None
+        
         remaining_tasks = set(task_ids)
-        yielded_tasks = set()
+        last_id = b'0'
         
-        # First, yield any results that are already available
-        for task_id in task_ids:
-            if task_id in yielded_tasks:
+        while remaining_tasks:
+            block_ms = 5000
+            if deadline is not None:
+                time_left = deadline - loop.time()
+                if time_left <= 0:
+                    logger.debug(f"Batch {batch_id}: timed out with {len(remaining_tasks)} results pending")
+                    return
+                block_ms = max(1, min(block_ms, int(time_left * 1000)))
+            
+            last_id, completions = await self.read_batch_completions(batch_id, last_id, block_ms=block_ms)
+            
+            completed_ids = []
+            for task_id, _, _ in completions:
+                if task_id in remaining_tasks:
+                    remaining_tasks.discard(task_id)
+                    completed_ids.append(task_id)
+            
+            if not completed_ids:
                 continue
-                
-            result = await self.get_result(task_id)
-            if result:
-                yielded_tasks.add(task_id)
-                remaining_tasks.discard(task_id)
-                yield result
+            
+            available = await self.get_results_many(completed_ids)
+            for task_id in completed_ids:
+                result = available.get(task_id)
+                if result:
+                    yield result
+                else:
+                    logger.warning(f"Result for task {task_id} in batch {batch_id} expired before it was read")
+    
+    async def _stream_notifications(self,
+                                    task_ids: List[str],
+                                    timeout: Optional[float]) -> AsyncGenerator[TaskResult, None]:
+        """Stream results of unrelated tasks using pubsub notifications"""
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout if timeout else None
         
-        if not remaining_tasks:
-            return
+        remaining_tasks = set(task_ids)
         
-        # Subscribe to notifications for remaining tasks
+        # Subscribe before the first read so no completion can slip between
         pubsub = self.redis.pubsub()
         await pubsub.subscribe(self.notifications_key)
         
         try:
+            # First, yield any results that are already available
+            available = await self.get_results_many(list(remaining_tasks))
+            for task_id, result in available.items():
+                remaining_tasks.discard(task_id)
+                yield result
+            
             while remaining_tasks:
-                try:
-                    # Wait for notification with timeout
-                    message = await asyncio.wait_for(pubsub.get_message(ignore_subscribe_messages=True), timeout=30.0)
-                    
-                    if message and message['type'] == 'message':
-                        notification = json.loads(message['data'].decode('utf-8'))
-                        task_id = notification['task_id']
-                        
-                        if task_id in remaining_tasks:
-                            result = await self.get_result(task_id)
-                            if result:
-                                yielded_tasks.add(task_id)
-                                remaining_tasks.discard(task_id)
-                                yield result
+                wait = 30.0
+                if deadline is not None:
+                    wait = min(wait, deadline - loop.time())
+                    if wait <= 0:
+                        return
+                
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=wait)
                 
-                except asyncio.TimeoutError:
+                if message is None:
                     # Check for any new results that might have been missed
-                    for task_id in list(remaining_tasks):
-                        if task_id not in yielded_tasks:
-                            result = await self.get_result(task_id)
-                            if result:
-                                yielded_tasks.add(task_id)
-                                remaining_tasks.discard(task_id)
-                                yield result
+                    missed = await self.get_results_many(list(remaining_tasks))
+                    for task_id, result in missed.items():
+                        remaining_tasks.discard(task_id)
+                        yield result
                     
                     if remaining_tasks:
                         logger.debug(f"Still waiting for {len(remaining_tasks)} results")
+                    continue
+                
+                if message['type'] == 'message':
+                    notification = json.loads(message['data'].decode('utf-8'))
+                    task_id = notification['task_id']
+                    
+                    if task_id in remaining_tasks:
+                        result = await self.get_result(task_id)
+                        if result:
+                            remaining_tasks.discard(task_id)
+                            yield result
                 
         finally:
             await pubsub.unsubscribe(self.notifications_key)
             await pubsub.close()
     
-    async def get_results_batch(self, task_ids: List[str], timeout: Optional[float] = None) -> List[TaskResult]:
+    async def get_results_batch(self,
+                                task_ids: List[str],
+                                timeout: Optional[float] = None,
+                                batch_id: Optional[str] = None) -> List[TaskResult]:
         """Get results for multiple tasks, waiting up to timeout seconds"""
-        results = []
-        
         if timeout is None:
             # Get all available results immediately
-            for task_id in task_ids:
-                result = await self.get_result(task_id)
-                if result:
-                    results.append(result)
-        else:
-            # Stream results with timeout
-            start_time = asyncio.get_event_loop().time()
-            async for result in self.get_results_stream(task_ids):
-                results.append(result)
-                
-                # Check timeout
-                if asyncio.get_event_loop().time() - start_time > timeout:
-                    break
+            available = await self.get_results_many(task_ids)
+            return [available[task_id] for task_id in task_ids if task_id in available]
         
-        return results
+        # Stream results with timeout
+        return [
+            result async for result in
+            self.get_results_stream(task_ids, batch_id=batch_id, timeout=timeout)
+        ]
     
-    async def wait_for_results(self, task_ids: List[str], timeout: Optional[float] = None) -> List[TaskResult]:
+    async def wait_for_results(self,
+                               task_ids: List[str],
+                               timeout: Optional[float] = None,
+                               batch_id: Optional[str] = None,
+                               ordered: bool = False) -> List[TaskResult]:
         """Wait for all specified task results to be available"""
-        results = []
-        completed_tasks = set()
+        results = [
+            result async for result in
+            self.get_results_stream(task_ids, batch_id=batch_id, ordered=ordered, timeout=timeout)
+        ]
         
-        start_time = asyncio.get_event_loop().time()
-        
-        async for result in self.get_results_stream(task_ids):
-            results.append(result)
-            completed_tasks.add(result.task_id)
-            
-            # Check if all tasks are completed
-            if len(completed_tasks) >= len(task_ids):
-                break
-            
-            # Check timeout
-            if timeout and (asyncio.get_event_loop().time() - start_time > timeout):
-                logger.warning(f"Timeout waiting for results. Got {len(results)}/{len(task_ids)} results")
-                break
+        if len(results) < len(set(task_ids)):
+            logger.warning(f"Timeout waiting for results. Got {len(results)}/{len(task_ids)} results")
         
         return results
     
@@ -262,29 +520,37 @@ class RedisResultStore(IResultStore):
         await self.connect()
         
         try:
-            # Get total stored results
-            total_results = await self.redis.hlen(self.results_key)
+            # Only buckets younger than the TTL can still hold live results
+            now = time.time()
+            newest = self._stats_bucket(now)
+            oldest = self._stats_bucket(now - self.result_ttl) - 1
+            
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for bucket in range(oldest, newest + 1):
+                    pipe.hgetall(f"{self.stats_key_prefix}{bucket}")
+                pipe.hgetall(self.counters_key)
+                replies = await pipe.execute()
             
             # Get status distribution
             status_counts = defaultdict(int)
-            cursor = 0
-            while True:
-                cursor, results = await self.redis.hscan(self.results_key, cursor, count=100)
-                
-                for task_id, data in results.items():
-                    try:
-                        result_data = json.loads(data.decode('utf-8'))
-                        status = result_data['status']
-                        status_counts[status] += 1
-                    except Exception:
-                        continue
-                
-                if cursor == 0:
-                    break
+            for bucket_counts in replies[:-1]:
+                for field, value in bucket_counts.items():
+                    field = field.decode()
+                    if field.startswith('status:'):
+                        status_counts[field[len('status:'):]] += int(value)
+            status_counts = {status: count for status, count in status_counts.items() if count > 0}
+            
+            lifetime = {k.decode(): int(v) for k, v in replies[-1].items()}
             
             return {
-                'total_results': total_results,
-                'status_distribution': dict(status_counts),
+                'total_results': sum(status_counts.values()),
+                'status_distribution': status_counts,
+                'total_stored': lifetime.get('total_stored', 0),
+                'lifetime_status_distribution': {
+                    field[len('status:'):]: count
+                    for field, count in lifetime.items()
+                    if field.startswith('status:') and count > 0
+                },
                 'active_streams': len(self.active_streams),
                 'result_ttl': self.result_ttl
             }
@@ -294,32 +560,39 @@ class RedisResultStore(IResultStore):
             return {'error': str(e)}
     
     async def cleanup_expired_results(self) -> int:
-        """Clean up expired results (manual cleanup)"""
+        """Clean up expired results.
+        
+        Results expire natively, so the only thing left to clean is the single
+        ``results`` hash written by earlier versions of the store. Entries in
+        it whose ``end_time`` is older than the TTL are removed, one HDEL per
+        scanned page; entries that are still live, or that carry no end time,
+        are kept. Returns the number of legacy entries dropped.
+        """
         await self.connect()
         
         try:
             expired_count = 0
+            cutoff = datetime.utcnow() - timedelta(seconds=self.result_ttl)
             cursor = 0
-            current_time = datetime.utcnow()
             
             while True:
-                cursor, results = await self.redis.hscan(self.results_key, cursor, count=100)
-                
-                for task_id, data in results.items():
+                cursor, entries = await self.redis.hscan(self.legacy_results_key, cursor, count=self.batch_size)
+                expired = []
+                for task_id, data in entries.items():
                     try:
-                        result_data = json.loads(data.decode('utf-8'))
-                        if result_data.get('end_time'):
-                            end_time = datetime.fromisoformat(result_data['end_time'])
-                            if current_time - end_time > timedelta(seconds=self.result_ttl):
-                                await self.redis.hdel(self.results_key, task_id.decode())
-                                expired_count += 1
+                        end_time = json.loads(data).get('end_time')
+                        if end_time and datetime.fromisoformat(end_time) < cutoff:
+                            expired.append(task_id)
                     except Exception:
                         continue
+                if expired:
+                    expired_count += await self.redis.hdel(self.legacy_results_key, *expired)
                 
                 if cursor == 0:
                     break
             
-            logger.info(f"Cleaned up {expired_count} expired results")
+            if expired_count:
+                logger.info(f"Dropped {expired_count} expired results from legacy hash {self.legacy_results_key}")
             return expired_count
             
         except Exception as e:
@@ -336,9 +609,10 @@ class ResultAggregator:
     async def aggregate_results(self, 
                               task_ids: List[str],
                               aggregation_func: Callable[[List[TaskResult]], Any],
-                              timeout: Optional[float] = None) -> Any:
+                              timeout: Optional[float] = None,
+                              batch_id: Optional[str] = None) -> Any:
         """Aggregate results using a custom function"""
-        results = await self.result_store.wait_for_results(task_ids, timeout)
+        results = await self.result_store.wait_for_results(task_ids, timeout, batch_id=batch_id)
         
         # Filter only successful results
         successful_results = [r for r in results if r.status == TaskStatus.COMPLETED]
@@ -351,30 +625,30 @@ class ResultAggregator:
     async def collect_streaming_results(self,
                                       task_ids: List[str],
                                       callback: Callable[[TaskResult], None],
-                                      timeout: Optional[float] = None) -> None:
+                                      timeout: Optional[float] = None,
+                                      batch_id: Optional[str] = None,
+                                      ordered: bool = False) -> None:
         """Collect results with streaming callback"""
-        start_time = asyncio.get_event_loop().time()
-        
-        async for result in self.result_store.get_results_stream(task_ids):
+        stream = self.result_store.get_results_stream(
+            task_ids, batch_id=batch_id, ordered=ordered, timeout=timeout
+        )
+        async for result in stream:
             try:
                 callback(result)
             except Exception as e:
                 logger.error(f"Callback error for task {result.task_id}: {e}")
-            
-            # Check timeout
-            if timeout and (asyncio.get_event_loop().time() - start_time > timeout):
-                break
     
     async def batch_process_results(self,
                                   task_ids: List[str],
                                   batch_size: int = 10,
-                                  processor: Callable[[List[TaskResult]], Any] = None) -> List[Any]:
+                                  processor: Callable[[List[TaskResult]], Any] = None,
+                                  batch_id: Optional[str] = None) -> List[Any]:
         """Process results in batches as they arrive"""
         results = []
         batch = []
         processed_results = []
         
-        async for result in self.result_store.get_results_stream(task_ids):
+        async for result in self.result_store.get_results_stream(task_ids, batch_id=batch_id):
             batch.append(result)
             
             if len(batch) >= batch_size:
@@ -10,7 +10,7 @@ import redis.asyncio as aioredis
 import pickle
 import base64
 
-from .interfaces import ITaskQueue, Task, TaskPriority
+from .interfaces import ITaskQueue, Task, TaskPriority, ExecutionMode
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -41,6 +41,7 @@ class RedisTaskQueue(ITaskQueue):
         self.task_metadata_key = f"{queue_prefix}:tasks:metadata"
         self.stats_key = f"{queue_prefix}:stats"
         self.processing_key = f"{queue_prefix}:processing"
+        self.cancelled_key = f"{queue_prefix}:tasks:cancelled"
         
         self._stats = {
             'total_enqueued': 0,
@@ -80,7 +81,9 @@ class RedisTaskQueue(ITaskQueue):
             'timeout': task.timeout,
             'max_retries': task.max_retries,
             'metadata': task.metadata,
-            'created_at': task.created_at.isoformat()
+            'created_at': task.created_at.isoformat(),
+            'enqueued_at': task.enqueued_at.isoformat() if task.enqueued_at else None,
+            'execution': task.execution.value
         }
         return json.dumps(task_data).encode('utf-8')
     
@@ -102,7 +105,9 @@ class RedisTaskQueue(ITaskQueue):
             timeout=task_data['timeout'],
             max_retries=task_data['max_retries'],
             metadata=task_data['metadata'],
-            created_at=datetime.fromisoformat(task_data['created_at'])
+            created_at=datetime.fromisoformat(task_data['created_at']),
+            execution=ExecutionMode(task_data.get('execution', ExecutionMode.AUTO.value)),
+            enqueued_at=datetime.fromisoformat(task_data['enqueued_at']) if task_data.get('enqueued_at') else None
         )
         return task
     
@@ -111,7 +116,8 @@ class RedisTaskQueue(ITaskQueue):
         await self.connect()
         
         try:
-            # Serialize task
+            # Serialize task, stamped with the time it entered the queue
+            task.enqueued_at = datetime.utcnow()
             serialized_task = self._serialize_task(task)
             
             # Get the appropriate queue for this priority
@@ -128,7 +134,7 @@ class RedisTaskQueue(ITaskQueue):
                     task.id,
                     json.dumps({
                         'status': 'enqueued',
-                        'enqueued_at': datetime.utcnow().isoformat(),
+                        'enqueued_at': task.enqueued_at.isoformat(),
                         'priority': task.priority.value,
                         'queue': queue_name
                     })
@@ -203,11 +209,22 @@ class RedisTaskQueue(ITaskQueue):
                 await pipe.hincrby(self.stats_key, 'total_dequeued', 1)
                 await pipe.hincrby(self.stats_key, 'current_size', -1)
                 
-                await pipe.execute()
+                # Learn whether the submitter gave up on the task, in the same round-trip
+                await pipe.srem(self.cancelled_key, task.id)
+                
+                replies = await pipe.execute()
             
             self._stats['total_dequeued'] += 1
             self._stats['current_size'] = max(0, self._stats['current_size'] - 1)
             
+            if replies[-1]:
+                async with self.redis.pipeline() as pipe:
+                    await pipe.srem(self.processing_key, task.id)
+                    await pipe.hdel(self.task_metadata_key, task.id)
+                    await pipe.execute()
+                logger.debug(f"Dropped cancelled task {task.id}")
+                return None
+            
             logger.debug(f"Dequeued task {task.id} from {queue_name.decode()}")
             return task
             
@@ -259,6 +276,34 @@ class RedisTaskQueue(ITaskQueue):
         except Exception as e:
             logger.error(f"Failed to mark task {task_id} as failed: {e}")
     
+    async def forget_task(self, task_id: str) -> None:
+        """Drop the metadata kept for a finished task"""
+        await self.connect()
+        
+        try:
+            await self.redis.hdel(self.task_metadata_key, task_id)
+        except Exception as e:
+            logger.error(f"Failed to forget task {task_id}: {e}")
+    
+    async def cancel_tasks(self, task_ids: List[str]) -> None:
+        """Cancel tasks nobody will read the results of.
+        
+        Tasks still queued are dropped when a worker dequeues them; tasks
+        already running finish and their results expire with the result TTL.
+        """
+        if not task_ids:
+            return
+        await self.connect()
+        
+        try:
+            async with self.redis.pipeline() as pipe:
+                await pipe.sadd(self.cancelled_key, *task_ids)
+                await pipe.expire(self.cancelled_key, settings.processing.result_ttl)
+                await pipe.hdel(self.task_metadata_key, *task_ids)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to cancel {len(task_ids)} tasks: {e}")
+    
     async def size(self) -> int:
         """Get the total number of tasks in all queues"""
         await self.connect()
@@ -278,17 +323,33 @@ class RedisTaskQueue(ITaskQueue):
         """Get queue sizes by priority"""
         await self.connect()
         
-        sizes = {}
         try:
-            for priority, queue_name in self.priority_queues.items():
-                size = await self.redis.llen(queue_name)
-                sizes[priority.name] = size
-            return sizes
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for queue_name in self.priority_queues.values():
+                    pipe.llen(queue_name)
+                lengths = await pipe.execute()
+            
+            return {
+                priority.name: size
+                for priority, size in zip(self.priority_queues.keys(), lengths)
+            }
             
         except Exception as e:
             logger.error(f"Failed to get queue sizes by priority: {e}")
             return {}
     
+    async def get_counters(self) -> Dict[str, int]:
+        """Get the cumulative enqueue/dequeue/failure counters shared by all producers"""
+        await self.connect()
+        
+        try:
+            counters = await self.redis.hgetall(self.stats_key)
+            return {k.decode(): int(v) for k, v in counters.items()}
+            
+        except Exception as e:
+            logger.error(f"Failed to get queue counters: {e}")
+            return {}
+    
     async def clear(self) -> None:
         """Clear all tasks from all queues"""
         await self.connect()
@@ -302,6 +363,7 @@ class RedisTaskQueue(ITaskQueue):
                 # Clear metadata and processing sets
                 await pipe.delete(self.task_metadata_key)
                 await pipe.delete(self.processing_key)
+                await pipe.delete(self.cancelled_key)
                 await pipe.delete(self.stats_key)
                 
                 await pipe.execute()
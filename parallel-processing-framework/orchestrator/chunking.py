@@ -0,0 +1,140 @@
+"""
+Chunk helpers for map/filter/reduce: adaptive chunk sizing and the functions workers run per chunk
+"""
+import functools
+from typing import Any, Callable, List, Optional, Tuple
+
+from config.settings import settings
+
+
+class AdaptiveChunker:
+    """Sizes chunks so each one takes roughly ``target_seconds`` on a worker.
+
+    Per-item cost is an exponentially weighted average of completed chunks'
+    execution time divided by their length. A fixed ``chunk_size`` disables
+    adaptation.
+    """
+
+    def __init__(self,
+                 chunk_size: Optional[int] = None,
+                 initial_size: Optional[int] = None,
+                 max_size: Optional[int] = None,
+                 target_seconds: Optional[float] = None,
+                 smoothing: float = 0.3):
+        self.fixed_size = chunk_size
+        self.max_size = max_size or settings.processing.map_max_chunk_size
+        self.target_seconds = target_seconds or settings.processing.map_target_chunk_seconds
+        self.smoothing = smoothing
+
+        self.size = chunk_size or initial_size or settings.processing.map_initial_chunk_size
+        self.item_cost: Optional[float] = None
+
+    def next_size(self) -> int:
+        """Number of items to put in the next chunk"""
+        return self.size
+
+    def observe(self, items: int, execution_time: float) -> None:
+        """Feed back the measured execution time of a completed chunk"""
+        if self.fixed_size or items <= 0 or execution_time is None:
+            return
+
+        cost = execution_time / items
+        if self.item_cost is None:
+            self.item_cost = cost
+        else:
+            self.item_cost += self.smoothing * (cost - self.item_cost)
+
+        if self.item_cost > 0:
+            ideal = int(self.target_seconds / self.item_cost)
+        else:
+            ideal = self.max_size
+        # Grow at most 4x per observation so one fast chunk can't overshoot
+        self.size = max(1, min(self.max_size, ideal, self.size * 4))
+
+
+def map_chunk(func: Callable, items: List[Any]) -> List[Tuple[bool, Any]]:
+    """Apply ``func`` to every item, recording ``(ok, value_or_error)`` per item"""
+    outcomes = []
+    for item in items:
+        try:
+            outcomes.append((True, func(item)))
+        except Exception as e:
+            outcomes.append((False, f"{type(e).__name__}: {e}"))
+    return outcomes
+
+
+def filter_chunk(predicate: Callable, items: List[Any]) -> List[Any]:
+    """Items of the chunk for which ``predicate`` holds; items that raise are dropped"""
+    kept = []
+    for item in items:
+        try:
+            if predicate(item):
+                kept.append(item)
+        except Exception:
+            continue
+    return kept
+
+
+def reduce_chunk(func: Callable, items: List[Any]) -> Any:
+    """Left fold of one chunk"""
+    return functools.reduce(func, items)
+
+
+class _Empty:
+    """Placeholder for a reduction segment that contributed nothing"""
+
+
+EMPTY = _Empty()
+
+
+class SegmentReducer:
+    """Combines per-chunk partial results as they arrive, keeping chunk order.
+
+    A partial is merged with its already-finished neighbours immediately, so
+    the reduction forms a tree over chunk indices and only assumes ``func``
+    is associative. Memory is bounded by the number of disjoint finished
+    segments.
+    """
+
+    def __init__(self, func: Callable):
+        self.func = func
+        self._by_start = {}  # start index -> (end index, value)
+        self._by_end = {}    # end index -> start index
+
+    def _combine(self, left: Any, right: Any) -> Any:
+        if left is EMPTY:
+            return right
+        if right is EMPTY:
+            return left
+        return self.func(left, right)
+
+    def add(self, index: int, value: Any) -> None:
+        """Add the partial result of chunk ``index`` (``EMPTY`` if it failed)"""
+        start, end = index, index
+
+        left_start = self._by_end.pop(index - 1, None)
+        if left_start is not None:
+            _, left = self._by_start.pop(left_start)
+            value = self._combine(left, value)
+            start = left_start
+
+        right = self._by_start.pop(index + 1, None)
+        if right is not None:
+            right_end, right_value = right
+            del self._by_end[right_end]
+            value = self._combine(value, right_value)
+            end = right_end
+
+        self._by_start[start] = (end, value)
+        self._by_end[end] = start
+
+    @property
+    def segments(self) -> int:
+        return len(self._by_start)
+
+    def result(self) -> Any:
+        """Combine whatever segments remain, in order"""
+        value = EMPTY
+        for start in sorted(self._by_start):
+            value = self._combine(value, self._by_start[start][1])
+        return value
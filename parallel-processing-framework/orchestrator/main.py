@@ -2,17 +2,22 @@
 Main orchestrator for the parallel processing framework
 """
 import asyncio
+import itertools
 import logging
 from datetime import datetime
-from typing import Any, List, Optional, Dict, Callable
+from typing import Any, AsyncGenerator, List, Optional, Dict, Callable, Iterable, Tuple
 import uuid
 
-from core.interfaces import IOrchestrator, Task, TaskResult, TaskStatus, TaskPriority
+from core.interfaces import IOrchestrator, Task, TaskResult, TaskStatus, TaskPriority, ExecutionMode
 from core.task_queue import RedisTaskQueue
 from core.result_store import RedisResultStore, ResultAggregator
 from core.event_loop_manager import EventLoopManager, get_event_loop_manager
 from core.circuit_breaker import CircuitBreakerManager
 from workers.worker_pool import DynamicWorkerPool
+from orchestrator.workflow import Workflow, WorkflowResult, WorkflowRunner
+from orchestrator.chunking import (
+    AdaptiveChunker, SegmentReducer, EMPTY, map_chunk, filter_chunk, reduce_chunk
+)
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -43,7 +48,8 @@ class ParallelProcessingOrchestrator(IOrchestrator):
             task_queue=self.task_queue,
             result_store=self.result_store,
             min_workers=min_workers,
-            max_workers=max_workers
+            max_workers=max_workers,
+            execution_router=self.event_loop_manager.get_execution_router()
         )
         
         # State
@@ -71,6 +77,9 @@ class ParallelProcessingOrchestrator(IOrchestrator):
         await self.task_queue.connect()
         await self.result_store.connect()
         
+        # Boot the process pool before the first CPU-bound task arrives
+        await self.event_loop_manager.get_execution_router().start()
+        
         # Start worker pool
         await self.worker_pool.start()
         
@@ -111,10 +120,20 @@ class ParallelProcessingOrchestrator(IOrchestrator):
         logger.debug(f"Submitted task {task_id} with priority {task.priority.name}")
         return task_id
     
-    async def submit_batch(self, tasks: List[Task]) -> List[str]:
-        """Submit multiple tasks for processing"""
+    async def submit_batch(self, tasks: List[Task], batch_id: Optional[str] = None) -> List[str]:
+        """Submit multiple tasks for processing.
+        
+        With a ``batch_id`` every task is tagged so its result is appended to
+        the batch completion stream, which ``get_results``/``stream_results``
+        read with blocking reads instead of polling.
+        """
+        if batch_id:
+            await self.result_store.register_batch(batch_id, len(tasks))
+        
         task_ids = []
         for task in tasks:
+            if batch_id:
+                task.metadata['batch_id'] = batch_id
             task_id = await self.submit_task(task)
             task_ids.append(task_id)
         
@@ -134,27 +153,45 @@ class ParallelProcessingOrchestrator(IOrchestrator):
                 raise ValueError(f"Result for task {task_id} not found")
             return result
     
-    async def get_results(self, task_ids: List[str], timeout: Optional[float] = None) -> List[TaskResult]:
+    async def get_results(self,
+                          task_ids: List[str],
+                          timeout: Optional[float] = None,
+                          batch_id: Optional[str] = None,
+                          ordered: bool = False) -> List[TaskResult]:
         """Get results for multiple tasks"""
-        return await self.result_store.wait_for_results(task_ids, timeout)
+        return await self.result_store.wait_for_results(
+            task_ids, timeout, batch_id=batch_id, ordered=ordered
+        )
     
-    async def stream_results(self, task_ids: List[str]):
+    async def stream_results(self,
+                             task_ids: List[str],
+                             batch_id: Optional[str] = None,
+                             ordered: bool = False,
+                             timeout: Optional[float] = None):
         """Stream results as they become available"""
-        async for result in self.result_store.get_results_stream(task_ids):
+        stream = self.result_store.get_results_stream(
+            task_ids, batch_id=batch_id, ordered=ordered, timeout=timeout
+        )
+        async for result in stream:
             yield result
     
+    async def get_batch_progress(self, batch_id: str) -> Dict[str, int]:
+        """Get completion counters for a submitted batch"""
+        return await self.result_store.get_batch_progress(batch_id)
+    
     async def execute_parallel_workflow(self,
                                       tasks: List[Task],
                                       aggregation_func: Optional[Callable] = None,
                                       timeout: Optional[float] = None) -> Any:
         """Execute a complete parallel workflow"""
         # Submit all tasks
-        task_ids = await self.submit_batch(tasks)
+        batch_id = uuid.uuid4().hex
+        task_ids = await self.submit_batch(tasks, batch_id=batch_id)
         
         logger.info(f"Executing parallel workflow with {len(tasks)} tasks")
         
         # Wait for all results
-        results = await self.get_results(task_ids, timeout)
+        results = await self.get_results(task_ids, timeout, batch_id=batch_id, ordered=True)
         
         # Update statistics
         successful_results = [r for r in results if r.status == TaskStatus.COMPLETED]
@@ -171,6 +208,31 @@ class ParallelProcessingOrchestrator(IOrchestrator):
         
         return results
     
+    async def execute_workflow(self,
+                               workflow: Workflow,
+                               timeout: Optional[float] = None,
+                               fetch: Optional[List[str]] = None) -> WorkflowResult:
+        """Execute a DAG workflow.
+        
+        Each node is submitted as soon as all of its dependencies completed;
+        intermediate results are read by downstream workers straight from the
+        result store. Only the sink nodes (or ``fetch``) are returned.
+        """
+        logger.info(f"Executing workflow {workflow.name} with {len(workflow.nodes)} nodes")
+        
+        result = await WorkflowRunner(self).run(workflow, timeout=timeout, fetch=fetch)
+        
+        self.total_tasks_completed += sum(
+            1 for timing in result.timings.values() if timing.status == TaskStatus.COMPLETED.value
+        )
+        self.total_tasks_failed += len(result.failed)
+        
+        logger.info(f"Workflow {workflow.name} finished in {result.makespan:.3f}s: "
+                    f"{len(result.failed)} failed, {len(result.skipped)} skipped, "
+                    f"{len(result.timed_out)} timed out, "
+                    f"critical path {' -> '.join(result.critical_path)}")
+        return result
+    
     async def create_task(self,
                          func: Callable,
                          *args,
@@ -178,6 +240,7 @@ class ParallelProcessingOrchestrator(IOrchestrator):
                          timeout: Optional[int] = None,
                          max_retries: int = 3,
                          metadata: Optional[Dict[str, Any]] = None,
+                         execution: ExecutionMode = ExecutionMode.AUTO,
                          **kwargs) -> Task:
         """Create a task with the given parameters"""
         return Task(
@@ -188,7 +251,8 @@ class ParallelProcessingOrchestrator(IOrchestrator):
             priority=priority,
             timeout=timeout,
             max_retries=max_retries,
-            metadata=metadata or {}
+            metadata=metadata or {},
+            execution=execution
         )
     
     async def submit_function(self,
@@ -196,92 +260,287 @@ class ParallelProcessingOrchestrator(IOrchestrator):
                             *args,
                             priority: TaskPriority = TaskPriority.NORMAL,
                             timeout: Optional[int] = None,
+                            execution: ExecutionMode = ExecutionMode.AUTO,
                             **kwargs) -> str:
         """Submit a function for execution"""
         task = await self.create_task(
             func, *args,
             priority=priority,
             timeout=timeout,
+            execution=execution,
             **kwargs
         )
         return await self.submit_task(task)
     
     async def map_async(self,
                        func: Callable,
-                       items: List[Any],
+                       items: Iterable[Any],
                        priority: TaskPriority = TaskPriority.NORMAL,
-                       timeout: Optional[float] = None) -> List[TaskResult]:
-        """Map a function over a list of items in parallel"""
-        tasks = []
-        for item in items:
-            task = await self.create_task(func, item, priority=priority)
-            tasks.append(task)
-        
-        return await self.execute_parallel_workflow(tasks, timeout=timeout)
+                       timeout: Optional[float] = None,
+                       execution: ExecutionMode = ExecutionMode.AUTO,
+                       chunk_size: Optional[int] = None,
+                       max_in_flight: Optional[int] = None) -> List[TaskResult]:
+        """Map a function over items in parallel, one TaskResult per item in input order"""
+        return [
+            result async for result in self.map_stream(
+                func, items,
+                priority=priority,
+                timeout=timeout,
+                execution=execution,
+                chunk_size=chunk_size,
+                max_in_flight=max_in_flight
+            )
+        ]
+    
+    async def map_stream(self,
+                         func: Callable,
+                         items: Iterable[Any],
+                         priority: TaskPriority = TaskPriority.NORMAL,
+                         timeout: Optional[float] = None,
+                         execution: ExecutionMode = ExecutionMode.AUTO,
+                         chunk_size: Optional[int] = None,
+                         max_in_flight: Optional[int] = None,
+                         ordered: bool = True) -> AsyncGenerator[TaskResult, None]:
+        """Map a function over items, yielding per-item results as chunks finish.
+        
+        Items are pulled from ``items`` lazily, so generators of any length
+        are fine: only ``max_in_flight`` chunks are queued or buffered at once.
+        """
+        chunks = self._run_chunked(
+            map_chunk, func, items,
+            priority=priority,
+            timeout=timeout,
+            execution=execution,
+            chunk_size=chunk_size,
+            max_in_flight=max_in_flight,
+            ordered=ordered
+        )
+        async for chunk_index, chunk_len, chunk_result in chunks:
+            for item_result in self._expand_chunk(chunk_index, chunk_len, chunk_result):
+                if item_result.status == TaskStatus.COMPLETED:
+                    self.total_tasks_completed += 1
+                else:
+                    self.total_tasks_failed += 1
+                yield item_result
     
     async def filter_async(self,
                           predicate: Callable,
-                          items: List[Any],
+                          items: Iterable[Any],
                           priority: TaskPriority = TaskPriority.NORMAL,
-                          timeout: Optional[float] = None) -> List[Any]:
-        """Filter items using a predicate function in parallel"""
-        # Create tasks that return (item, predicate_result) pairs
-        async def filter_task(item):
-            result = predicate(item)
-            return (item, result)
-        
-        tasks = []
-        for item in items:
-            task = await self.create_task(filter_task, item, priority=priority)
-            tasks.append(task)
-        
-        results = await self.execute_parallel_workflow(tasks, timeout=timeout)
-        
-        # Extract items where predicate returned True
+                          timeout: Optional[float] = None,
+                          execution: ExecutionMode = ExecutionMode.AUTO,
+                          chunk_size: Optional[int] = None,
+                          max_in_flight: Optional[int] = None) -> List[Any]:
+        """Filter items using a predicate function in parallel, keeping input order"""
         filtered_items = []
-        for result in results:
-            if result.status == TaskStatus.COMPLETED and result.result:
-                item, passed = result.result
-                if passed:
-                    filtered_items.append(item)
+        chunks = self._run_chunked(
+            filter_chunk, predicate, items,
+            priority=priority,
+            timeout=timeout,
+            execution=execution,
+            chunk_size=chunk_size,
+            max_in_flight=max_in_flight,
+            ordered=True
+        )
+        async for chunk_index, chunk_len, chunk_result in chunks:
+            if chunk_result.status == TaskStatus.COMPLETED and chunk_result.result:
+                filtered_items.extend(chunk_result.result)
+            elif chunk_result.status != TaskStatus.COMPLETED:
+                logger.warning(f"Filter chunk {chunk_index} failed: {chunk_result.error}")
         
         return filtered_items
     
     async def reduce_async(self,
                           func: Callable,
-                          items: List[Any],
+                          items: Iterable[Any],
                           initial: Any = None,
-                          chunk_size: int = 100) -> Any:
-        """Reduce items using a function with parallel processing"""
-        if not items:
+                          chunk_size: Optional[int] = None,
+                          priority: TaskPriority = TaskPriority.NORMAL,
+                          timeout: Optional[float] = None,
+                          execution: ExecutionMode = ExecutionMode.AUTO,
+                          max_in_flight: Optional[int] = None) -> Any:
+        """Reduce items with an associative function.
+        
+        Chunks are folded on the workers and the partial results are combined
+        with their finished neighbours as soon as they arrive, so the final
+        step only has a handful of segments left to join.
+        """
+        reducer = SegmentReducer(func)
+        failed_chunks = 0
+        
+        chunks = self._run_chunked(
+            reduce_chunk, func, items,
+            priority=priority,
+            timeout=timeout,
+            execution=execution,
+            chunk_size=chunk_size,
+            max_in_flight=max_in_flight,
+            ordered=False
+        )
+        async for chunk_index, chunk_len, chunk_result in chunks:
+            if chunk_result.status == TaskStatus.COMPLETED:
+                reducer.add(chunk_index, chunk_result.result)
+            else:
+                failed_chunks += 1
+                logger.warning(f"Reduce chunk {chunk_index} failed: {chunk_result.error}")
+                reducer.add(chunk_index, EMPTY)
+        
+        if failed_chunks:
+            logger.warning(f"Reduction skipped {failed_chunks} failed chunks")
+        
+        final_result = reducer.result()
+        if final_result is EMPTY:
             return initial
+        if initial is not None:
+            return func(initial, final_result)
+        return final_result
+    
+    async def _run_chunked(self,
+                           chunk_func: Callable,
+                           func: Callable,
+                           items: Iterable[Any],
+                           priority: TaskPriority,
+                           timeout: Optional[float],
+                           execution: ExecutionMode,
+                           chunk_size: Optional[int],
+                           max_in_flight: Optional[int],
+                           ordered: bool) -> AsyncGenerator[Tuple[int, int, TaskResult], None]:
+        """Submit ``chunk_func(func, chunk)`` tasks over ``items`` with a bounded window.
+        
+        Yields ``(chunk_index, chunk_len, result)`` as chunks finish, or in
+        chunk order when ``ordered``. A new chunk is only cut from ``items``
+        when a slot frees up, and every finished chunk's result, queue
+        metadata and completion entry are deleted once read, so memory and
+        Redis keys stay bounded by the window however long the input is.
+        
+        When ``timeout`` passes, chunks still in flight are cancelled and
+        reported as FAILED, and chunks already read are still yielded (in
+        order when ``ordered``), so no finished work is dropped.
+        """
+        chunker = AdaptiveChunker(chunk_size=chunk_size)
+        window = (
+            max_in_flight
+            or settings.processing.map_max_in_flight
+            or 2 * self.worker_pool.max_workers
+        )
         
-        # Process in chunks for large datasets
-        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout if timeout else None
         
-        # Reduce each chunk in parallel
-        async def reduce_chunk(chunk):
-            result = initial
-            for item in chunk:
-                if result is None:
-                    result = item
-                else:
-                    result = func(result, item)
-            return result
+        batch_id = uuid.uuid4().hex
+        source = iter(items)
+        exhausted = False
         
-        # Process chunks in parallel
-        chunk_results = await self.map_async(reduce_chunk, chunks)
+        in_flight: Dict[str, Tuple[int, int]] = {}         # task id -> (chunk index, chunk length)
+        finished: Dict[int, Tuple[int, TaskResult]] = {}   # ordered mode: chunks waiting for their turn
+        next_chunk = 0
+        next_yield = 0
+        cursor = b'0'
+        timed_out = False
         
-        # Final reduction of chunk results
-        final_result = initial
-        for result in chunk_results:
-            if result.status == TaskStatus.COMPLETED:
-                if final_result is None:
-                    final_result = result.result
-                else:
-                    final_result = func(final_result, result.result)
+        try:
+            while True:
+                # Top up the window; this is where backpressure applies
+                while not exhausted and len(in_flight) + len(finished) < window:
+                    chunk = list(itertools.islice(source, chunker.next_size()))
+                    if not chunk:
+                        exhausted = True
+                        break
+                    
+                    task = await self.create_task(
+                        chunk_func, func, chunk,
+                        priority=priority,
+                        execution=execution,
+                        metadata={'batch_id': batch_id, 'chunk_index': next_chunk}
+                    )
+                    await self.submit_task(task)
+                    in_flight[task.id] = (next_chunk, len(chunk))
+                    next_chunk += 1
+                
+                if not in_flight:
+                    break
+                
+                block_ms = 1000
+                if deadline is not None:
+                    time_left = deadline - loop.time()
+                    if time_left <= 0:
+                        logger.warning(f"Chunked run timed out with {len(in_flight)} chunks in flight")
+                        timed_out = True
+                        break
+                    block_ms = max(1, min(block_ms, int(time_left * 1000)))
+                
+                cursor, completions = await self.result_store.read_batch_completions(
+                    batch_id, cursor, block_ms=block_ms
+                )
+                done_ids = [task_id for task_id, _, _ in completions if task_id in in_flight]
+                if not done_ids:
+                    continue
+                
+                results = await self.result_store.get_results_many(done_ids)
+                for task_id in done_ids:
+                    chunk_index, chunk_len = in_flight.pop(task_id)
+                    result = results.get(task_id) or TaskResult(
+                        task_id=task_id,
+                        status=TaskStatus.FAILED,
+                        error=Exception("Chunk result expired before it was read")
+                    )
+                    if result.status == TaskStatus.COMPLETED:
+                        chunker.observe(chunk_len, result.execution_time)
+                    
+                    await self.result_store.delete_result(task_id)
+                    await self.task_queue.forget_task(task_id)
+                    
+                    if ordered:
+                        finished[chunk_index] = (chunk_len, result)
+                    else:
+                        yield chunk_index, chunk_len, result
+                
+                while next_yield in finished:
+                    chunk_len, result = finished.pop(next_yield)
+                    yield next_yield, chunk_len, result
+                    next_yield += 1
+                
+                await self.result_store.trim_batch_completions(batch_id, cursor)
+            
+            if timed_out:
+                await self.task_queue.cancel_tasks(list(in_flight))
+                for task_id, (chunk_index, chunk_len) in in_flight.items():
+                    finished[chunk_index] = (chunk_len, TaskResult(
+                        task_id=task_id,
+                        status=TaskStatus.FAILED,
+                        error=TimeoutError(f"Chunk {chunk_index} did not finish within {timeout}s")
+                    ))
+                in_flight.clear()
+                # Ordered mode: everything from next_yield on is either read or cancelled
+                for chunk_index in sorted(finished):
+                    chunk_len, result = finished.pop(chunk_index)
+                    yield chunk_index, chunk_len, result
+        finally:
+            # The caller stopped early: nobody will read what is still running
+            await self.task_queue.cancel_tasks(list(in_flight))
+            await self.result_store.delete_batch(batch_id)
+    
+    def _expand_chunk(self, chunk_index: int, chunk_len: int, chunk_result: TaskResult) -> List[TaskResult]:
+        """Turn a map chunk's result into one TaskResult per item"""
+        per_item_time = (chunk_result.execution_time or 0.0) / max(1, chunk_len)
         
-        return final_result
+        if chunk_result.status != TaskStatus.COMPLETED or chunk_result.result is None:
+            outcomes = [(False, str(chunk_result.error or "Chunk failed"))] * chunk_len
+        else:
+            outcomes = chunk_result.result
+        
+        item_results = []
+        for offset, (ok, value) in enumerate(outcomes):
+            item_results.append(TaskResult(
+                task_id=f"{chunk_result.task_id}:{offset}",
+                status=TaskStatus.COMPLETED if ok else TaskStatus.FAILED,
+                result=value if ok else None,
+                error=None if ok else Exception(value),
+                execution_time=per_item_time,
+                worker_id=chunk_result.worker_id,
+                metadata={'chunk_index': chunk_index, 'chunk_offset': offset}
+            ))
+        return item_results
     
     def get_stats(self) -> Dict[str, Any]:
         """Get comprehensive orchestrator statistics"""
@@ -0,0 +1,301 @@
+"""
+DAG workflows: tasks that depend on other tasks' outputs, released as soon as their inputs complete
+"""
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from core.interfaces import Task, TaskResult, TaskStatus, TaskPriority, ExecutionMode, ResultRef
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WorkflowNode:
+    """One task in a workflow"""
+    name: str
+    task: Task
+    depends_on: Set[str] = field(default_factory=set)
+
+    @property
+    def output(self) -> ResultRef:
+        """Reference to this node's result, for use in downstream task args"""
+        return ResultRef(self.task.id)
+
+
+@dataclass
+class NodeTiming:
+    """When a node became ready, was submitted and was seen to finish (seconds from workflow start)"""
+    ready_at: float = 0.0
+    submitted_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    execution_time: float = 0.0
+    status: str = TaskStatus.PENDING.value
+
+
+@dataclass
+class WorkflowResult:
+    """Outcome of a workflow run"""
+    outputs: Dict[str, TaskResult]
+    timings: Dict[str, NodeTiming]
+    critical_path: List[str]
+    makespan: float
+    failed: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    timed_out: List[str] = field(default_factory=list)  # still running or never released at the timeout
+
+    @property
+    def succeeded(self) -> bool:
+        return not self.failed and not self.skipped and not self.timed_out
+
+    def critical_path_report(self) -> Dict[str, Any]:
+        """Per-node execution and queue time along the critical path"""
+        steps = []
+        for name in self.critical_path:
+            timing = self.timings[name]
+            wait = (timing.finished_at or 0.0) - (timing.submitted_at or 0.0) - timing.execution_time
+            steps.append({
+                'node': name,
+                'execution_time': timing.execution_time,
+                'queue_and_dispatch_time': max(0.0, wait),
+                'finished_at': timing.finished_at
+            })
+        return {
+            'makespan': self.makespan,
+            'execution_time': sum(step['execution_time'] for step in steps),
+            'steps': steps
+        }
+
+
+class Workflow:
+    """Builder for a DAG of tasks.
+
+    Pass one node's ``output`` as an argument of another to make it a
+    dependency; the worker running the downstream task fetches the value
+    from the result store itself. ``after`` adds ordering-only dependencies.
+    """
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name or f"workflow-{uuid.uuid4().hex[:8]}"
+        self.nodes: Dict[str, WorkflowNode] = {}
+        self._names_by_task_id: Dict[str, str] = {}
+
+    def add(self,
+            name: str,
+            func: Callable,
+            *args,
+            after: Optional[List[str]] = None,
+            priority: TaskPriority = TaskPriority.NORMAL,
+            timeout: Optional[int] = None,
+            execution: ExecutionMode = ExecutionMode.AUTO,
+            **kwargs) -> WorkflowNode:
+        """Add a node running ``func(*args, **kwargs)``"""
+        if name in self.nodes:
+            raise ValueError(f"Workflow node '{name}' already exists")
+
+        refs: Set[str] = set()
+        _collect_refs(args, refs)
+        _collect_refs(kwargs, refs)
+
+        depends_on = set(after or [])
+        for ref_id in refs:
+            if ref_id not in self._names_by_task_id:
+                raise ValueError(f"Node '{name}' refers to a result outside this workflow")
+            depends_on.add(self._names_by_task_id[ref_id])
+
+        task = Task(
+            id=str(uuid.uuid4()),
+            func=func,
+            args=args,
+            kwargs=kwargs,
+            priority=priority,
+            timeout=timeout,
+            metadata={'workflow': self.name, 'node': name},
+            execution=execution
+        )
+        if refs:
+            task.metadata['result_refs'] = sorted(refs)
+
+        node = WorkflowNode(name=name, task=task, depends_on=depends_on)
+        self.nodes[name] = node
+        self._names_by_task_id[task.id] = name
+        return node
+
+    def dependents(self) -> Dict[str, List[str]]:
+        """Map each node to the nodes waiting on it"""
+        downstream: Dict[str, List[str]] = {name: [] for name in self.nodes}
+        for node in self.nodes.values():
+            for dependency in node.depends_on:
+                downstream[dependency].append(node.name)
+        return downstream
+
+    def sinks(self) -> List[str]:
+        """Nodes nothing depends on"""
+        return [name for name, children in self.dependents().items() if not children]
+
+    def validate(self) -> None:
+        """Raise ValueError on unknown dependencies or cycles"""
+        for node in self.nodes.values():
+            unknown = node.depends_on - self.nodes.keys()
+            if unknown:
+                raise ValueError(f"Node '{node.name}' depends on unknown nodes {sorted(unknown)}")
+
+        downstream = self.dependents()
+        indegree = {name: len(node.depends_on) for name, node in self.nodes.items()}
+        ready = [name for name, degree in indegree.items() if degree == 0]
+        visited = 0
+        while ready:
+            name = ready.pop()
+            visited += 1
+            for child in downstream[name]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    ready.append(child)
+        if visited != len(self.nodes):
+            raise ValueError(f"Workflow '{self.name}' contains a cycle")
+
+
+def _collect_refs(value: Any, refs: Set[str]) -> None:
+    """Gather task ids of ResultRef placeholders, also inside lists, tuples and dicts"""
+    if isinstance(value, ResultRef):
+        refs.add(value.task_id)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _collect_refs(item, refs)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _collect_refs(item, refs)
+
+
+class WorkflowRunner:
+    """Releases workflow nodes as their dependencies complete.
+
+    Only ``(task_id, status, execution_time)`` completions are read back from
+    the batch stream while the workflow runs; results themselves stay in the
+    result store until the sinks (or ``fetch`` nodes) are collected at the end.
+    """
+
+    def __init__(self, orchestrator):
+        self.orchestrator = orchestrator
+
+    async def run(self,
+                  workflow: Workflow,
+                  timeout: Optional[float] = None,
+                  fetch: Optional[List[str]] = None) -> WorkflowResult:
+        workflow.validate()
+        orchestrator = self.orchestrator
+        result_store = orchestrator.result_store
+
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        deadline = start + timeout if timeout else None
+
+        batch_id = uuid.uuid4().hex
+        downstream = workflow.dependents()
+        waiting_on = {name: set(node.depends_on) for name, node in workflow.nodes.items()}
+        timings = {name: NodeTiming() for name in workflow.nodes}
+        names_by_task_id = {node.task.id: name for name, node in workflow.nodes.items()}
+
+        in_flight: Set[str] = set()
+        failed: List[str] = []
+        skipped: List[str] = []
+
+        async def release(name: str) -> None:
+            node = workflow.nodes[name]
+            node.task.metadata['batch_id'] = batch_id
+            timings[name].submitted_at = loop.time() - start
+            await orchestrator.submit_task(node.task)
+            in_flight.add(name)
+
+        def skip_downstream(name: str) -> None:
+            for child in downstream[name]:
+                if timings[child].status == TaskStatus.PENDING.value:
+                    timings[child].status = TaskStatus.CANCELLED.value
+                    skipped.append(child)
+                    skip_downstream(child)
+
+        await result_store.register_batch(batch_id, len(workflow.nodes))
+        try:
+            for name, pending in waiting_on.items():
+                if not pending:
+                    await release(name)
+
+            cursor = b'0'
+            while in_flight:
+                block_ms = 1000
+                if deadline is not None:
+                    time_left = deadline - loop.time()
+                    if time_left <= 0:
+                        logger.warning(f"Workflow {workflow.name} timed out with {len(in_flight)} nodes running")
+                        break
+                    block_ms = max(1, min(block_ms, int(time_left * 1000)))
+
+                cursor, completions = await result_store.read_batch_completions(
+                    batch_id, cursor, block_ms=block_ms
+                )
+                for task_id, status, execution_time in completions:
+                    name = names_by_task_id.get(task_id)
+                    if name is None or name not in in_flight:
+                        continue
+                    in_flight.discard(name)
+
+                    now = loop.time() - start
+                    timing = timings[name]
+                    timing.finished_at = now
+                    timing.execution_time = execution_time
+                    timing.status = status
+
+                    if status != TaskStatus.COMPLETED.value:
+                        failed.append(name)
+                        skip_downstream(name)
+                        continue
+
+                    for child in downstream[name]:
+                        waiting_on[child].discard(name)
+                        if not waiting_on[child] and timings[child].status == TaskStatus.PENDING.value:
+                            timings[child].ready_at = now
+                            await release(child)
+        finally:
+            await result_store.delete_batch(batch_id)
+
+        # Only a timeout leaves nodes unfinished: those in flight and those never released
+        timed_out = sorted(in_flight) + [
+            name for name, timing in timings.items()
+            if timing.status == TaskStatus.PENDING.value and name not in in_flight
+        ]
+
+        makespan = loop.time() - start
+        wanted = fetch if fetch is not None else workflow.sinks()
+        wanted_ids = [workflow.nodes[name].task.id for name in wanted if name in workflow.nodes]
+        fetched = await result_store.get_results_many(wanted_ids)
+        outputs = {
+            names_by_task_id[task_id]: result for task_id, result in fetched.items()
+        }
+
+        return WorkflowResult(
+            outputs=outputs,
+            timings=timings,
+            critical_path=self._critical_path(workflow, timings),
+            makespan=makespan,
+            failed=failed,
+            skipped=skipped,
+            timed_out=timed_out
+        )
+
+    @staticmethod
+    def _critical_path(workflow: Workflow, timings: Dict[str, NodeTiming]) -> List[str]:
+        """Walk back from the last node to finish through its latest-finishing dependency"""
+        finished = {name: timing.finished_at for name, timing in timings.items() if timing.finished_at is not None}
+        if not finished:
+            return []
+
+        path = [max(finished, key=finished.get)]
+        while True:
+            dependencies = [dep for dep in workflow.nodes[path[-1]].depends_on if dep in finished]
+            if not dependencies:
+                break
+            path.append(max(dependencies, key=finished.get))
+        path.reverse()
+        return path
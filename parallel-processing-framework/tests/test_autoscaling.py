@@ -0,0 +1,105 @@
+"""
+Tests for queue-latency autoscaling
+"""
+from datetime import datetime, timedelta
+
+import fakeredis
+import pytest
+
+from core.interfaces import Task, TaskResult, TaskStatus
+from core.task_queue import RedisTaskQueue
+from workers.autoscaling import QueueLatencyScalingController, ScalingObservation
+from workers.worker_pool import DynamicWorkerPool
+
+
+def controller(**overrides):
+    options = dict(min_workers=1, max_workers=50, target_p95_wait=2.0, evaluation_interval=2.0,
+                   up_cooldown=0.0, down_cooldown=10.0, hysteresis=0.2, down_stable_evaluations=3,
+                   max_step_up=8, max_step_down=1, default_service_time=1.0)
+    options.update(overrides)
+    return QueueLatencyScalingController(**options)
+
+
+def observation(timestamp, workers, enqueued_total, depth=0, p95_wait=None):
+    return ScalingObservation(timestamp=timestamp, worker_count=workers, busy_workers=workers,
+                              queue_depths={'NORMAL': depth}, enqueued_total=enqueued_total,
+                              service_time=1.0, observed_p95_wait=p95_wait)
+
+
+class TestQueueLatencyScalingController:
+    def test_trend_scales_ahead_of_rising_arrivals(self):
+        def run(policy):
+            workers, enqueued, targets = 2, 0, []
+            for step in range(1, 8):
+                enqueued += 4 * step  # arrival rate grows by 2 tasks/s every evaluation
+                workers = policy.desired_workers(observation(2.0 * step, workers, enqueued))
+                targets.append(workers)
+            return targets
+
+        trending, level_only = controller(), controller(trend_smoothing=0.0)
+        with_trend, without_trend = run(trending), run(level_only)
+
+        assert with_trend == sorted(with_trend)
+        assert trending.forecast_rate() > trending.rate_level
+        assert with_trend[-1] > without_trend[-1]
+
+    def test_steady_load_holds_the_pool_size(self):
+        policy = controller()
+        targets = [policy.desired_workers(observation(2.0 * step, 10, 16 * step)) for step in range(12)]
+        assert set(targets[2:]) == {10}
+
+    def test_scale_down_waits_for_stable_low_demand_and_cooldown(self):
+        policy = controller()
+        policy.desired_workers(observation(0.0, 1, 0))
+        assert policy.desired_workers(observation(2.0, 1, 20)) == 9  # 10 tasks/s: scale up by max_step_up
+
+        # Arrivals stop: three low evaluations are needed, then the down cooldown from t=2
+        targets = [policy.desired_workers(observation(2.0 + 2.0 * step, 9, 20)) for step in range(1, 5)]
+        assert targets == [9, 9, 9, 9]
+        assert policy.desired_workers(observation(12.0, 9, 20)) == 8
+
+        # Each further step down needs another three low evaluations
+        targets = [policy.desired_workers(observation(12.0 + 2.0 * step, 8, 20)) for step in range(1, 4)]
+        assert targets == [8, 8, 7]
+
+    def test_wait_over_target_adds_a_worker_only_with_queued_work(self):
+        policy = controller()
+        policy.desired_workers(observation(0.0, 4, 0))
+        assert policy.desired_workers(observation(2.0, 4, 0, depth=1, p95_wait=30.0)) == 5
+        assert policy.desired_workers(observation(4.0, 5, 0, depth=0, p95_wait=30.0)) == 5
+
+
+class OneShotWorker:
+    """Runs a single task, then stops the worker loop"""
+    worker_id = "worker-0"
+    is_running = True
+    current_tasks = {}
+
+    def can_accept_task(self):
+        return True
+
+    async def execute_task(self, task):
+        self.is_running = False
+        return TaskResult(task_id=task.id, status=TaskStatus.COMPLETED, result=None, execution_time=0.01)
+
+
+class DiscardingResultStore:
+    async def store_result(self, result):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_queue_wait_is_measured_from_enqueue_not_creation():
+    queue = RedisTaskQueue(redis_url="redis://localhost")
+    queue.redis = fakeredis.aioredis.FakeRedis()
+    # Created an hour ago, e.g. built by a workflow long before its dependencies finished
+    task = Task(id="late", func=print, created_at=datetime.utcnow() - timedelta(hours=1))
+    await queue.enqueue(task)
+
+    pool = DynamicWorkerPool(queue, DiscardingResultStore(), min_workers=1, max_workers=4,
+                             scaling_policy=controller())
+    pool.is_running = True
+    await pool._worker_loop(OneShotWorker())
+
+    assert len(pool.queue_waits) == 1
+    assert 0 <= pool.queue_waits[0] < 5.0
@@ -0,0 +1,96 @@
+"""
+Tests for the rolling-window circuit breaker and its shared Redis state
+"""
+import asyncio
+import time
+
+import fakeredis
+import pytest
+
+from core.circuit_breaker import (
+    AsyncCircuitBreaker, CircuitBreakerConfig, CircuitBreakerOpenException, CircuitState,
+    RedisCircuitState, RollingWindow
+)
+
+
+def test_rolling_window_counts_and_expires():
+    window = RollingWindow(window_seconds=10, buckets=10, now=0.0)
+    for now in (0.1, 0.2, 1.5):
+        window.add_success(now)
+    window.add_failure(2.5)
+
+    assert (window.successes, window.failures) == (3, 1)
+    assert window.failure_rate == 0.25
+
+    window.advance(10.5)  # the bucket holding 0.1 and 0.2 has left the window
+    assert (window.successes, window.failures) == (1, 1)
+
+    window.advance(100.0)
+    assert window.total == 0
+
+
+def test_rolling_window_clear():
+    window = RollingWindow(window_seconds=10, buckets=5, now=0.0)
+    window.add_failure(0.0)
+    window.add_failure(3.0)
+    window.clear()
+    assert window.total == 0
+    window.add_success(4.0)
+    assert window.failure_rate == 0.0
+
+
+def shared_breakers(server, count, **config):
+    """Breakers in ``count`` processes sharing one Redis"""
+    breakers = []
+    for _ in range(count):
+        state = RedisCircuitState(redis_url="redis://localhost")
+        state.redis = fakeredis.aioredis.FakeRedis(server=server)
+        breakers.append(AsyncCircuitBreaker("svc", CircuitBreakerConfig(**config), shared_state=state,
+                                            sync_interval=3600))
+    return breakers
+
+
+async def reopen_for_probing(breakers):
+    """Open every breaker with its recovery timeout already elapsed"""
+    for breaker in breakers:
+        await breaker._change_state(CircuitState.OPEN)
+        breaker._opened_at = time.monotonic() - breaker.config.recovery_timeout - 1
+
+
+async def probe(breaker, delay):
+    async def call():
+        await asyncio.sleep(delay)
+        return "ok"
+    try:
+        return await breaker.call(call)
+    except CircuitBreakerOpenException:
+        return "rejected"
+
+
+@pytest.mark.asyncio
+async def test_closing_probe_does_not_leave_negative_probe_count():
+    server = fakeredis.FakeServer()
+    breaker, = shared_breakers(server, 1, half_open_max_calls=2, success_threshold=1)
+    redis = breaker.shared_state.redis
+    probes_key = breaker.shared_state._probes_key("svc")
+
+    await reopen_for_probing([breaker])
+    # The fast probe closes the circuit (deleting the counter) while the slow one is in flight
+    assert await asyncio.gather(probe(breaker, 0.0), probe(breaker, 0.05)) == ["ok", "ok"]
+
+    assert breaker.state is CircuitState.CLOSED
+    assert int(await redis.get(probes_key) or 0) == 0
+
+
+@pytest.mark.asyncio
+async def test_fleet_admits_half_open_max_calls_probes_after_recovery():
+    server = fakeredis.FakeServer()
+    first, second = shared_breakers(server, 2, half_open_max_calls=2, success_threshold=1)
+
+    await reopen_for_probing([first])
+    await asyncio.gather(probe(first, 0.0), probe(first, 0.05))
+
+    # Next half-open window: three probes across the fleet, only two admitted
+    await reopen_for_probing([first, second])
+    outcomes = await asyncio.gather(probe(first, 0.05), probe(second, 0.05), probe(second, 0.05))
+    assert sorted(outcomes) == ["ok", "ok", "rejected"]
@@ -0,0 +1,61 @@
+"""
+Tests for chunked map execution in the orchestrator
+"""
+import asyncio
+
+import fakeredis
+import pytest
+
+from core.interfaces import TaskResult, TaskStatus
+from orchestrator.chunking import map_chunk
+from orchestrator.main import ParallelProcessingOrchestrator
+
+
+def double(x):
+    return 2 * x
+
+
+def fake_orchestrator():
+    """An orchestrator on a fake Redis whose workers are driven by the test"""
+    orchestrator = ParallelProcessingOrchestrator(redis_url="redis://localhost")
+    server = fakeredis.FakeServer()
+    orchestrator.task_queue.redis = fakeredis.aioredis.FakeRedis(server=server)
+    orchestrator.result_store.redis = fakeredis.aioredis.FakeRedis(server=server)
+    orchestrator.is_running = orchestrator.worker_pool.is_running = True
+    return orchestrator
+
+
+async def complete(orchestrator, task):
+    result = TaskResult(task_id=task.id, status=TaskStatus.COMPLETED, result=map_chunk(*task.args),
+                        execution_time=0.001, metadata={'batch_id': task.metadata['batch_id']})
+    await orchestrator.result_store.store_result(result)
+
+
+@pytest.mark.asyncio
+async def test_timeout_yields_finished_chunks_in_order_and_cancels_the_rest():
+    orchestrator = fake_orchestrator()
+
+    async def workers():
+        # Chunks 0-2 are picked up; 2 and 1 finish, 0 hangs, 3 stays queued
+        tasks = [await orchestrator.task_queue.dequeue() for _ in range(3)]
+        while None in tasks:
+            await asyncio.sleep(0.01)
+            tasks = [task or await orchestrator.task_queue.dequeue() for task in tasks]
+        await complete(orchestrator, tasks[2])
+        await complete(orchestrator, tasks[1])
+
+    stream = orchestrator.map_stream(double, range(4), timeout=0.5, chunk_size=1, max_in_flight=4, ordered=True)
+    worker = asyncio.create_task(workers())
+    results = [result async for result in stream]
+    await worker
+
+    assert [result.metadata['chunk_index'] for result in results] == [0, 1, 2, 3]
+    assert [result.status for result in results] == [
+        TaskStatus.FAILED, TaskStatus.COMPLETED, TaskStatus.COMPLETED, TaskStatus.FAILED
+    ]
+    assert [result.result for result in results[1:3]] == [2, 4]
+    assert "did not finish" in str(results[0].error)
+
+    # The chunk that was never started is dropped instead of being run
+    assert await orchestrator.task_queue.dequeue() is None
+    assert await orchestrator.task_queue.redis.hlen(orchestrator.task_queue.task_metadata_key) == 0
@@ -0,0 +1,89 @@
+"""
+Tests for the Redis result store
+"""
+import json
+from datetime import datetime, timedelta
+
+import fakeredis
+import pytest
+
+from core.interfaces import TaskResult, TaskStatus
+from core.result_store import RedisResultStore
+
+
+def legacy_entry(age_seconds=None):
+    end_time = datetime.utcnow() - timedelta(seconds=age_seconds) if age_seconds is not None else None
+    return json.dumps({'status': 'completed', 'result': None,
+                       'end_time': end_time.isoformat() if end_time else None})
+
+
+@pytest.mark.asyncio
+async def test_cleanup_drops_only_expired_legacy_results():
+    store = RedisResultStore(redis_url="redis://localhost", result_ttl=3600, batch_size=10)
+    store.redis = fakeredis.aioredis.FakeRedis()
+    entries = {f"old-{i}": legacy_entry(7200) for i in range(25)}
+    entries.update({f"live-{i}": legacy_entry(60) for i in range(5)})
+    entries["running"] = legacy_entry()
+    entries["corrupt"] = "not json"
+    await store.redis.hset(store.legacy_results_key, mapping=entries)
+
+    assert await store.cleanup_expired_results() == 25
+
+    remaining = sorted(key.decode() for key in await store.redis.hkeys(store.legacy_results_key))
+    assert remaining == sorted(["corrupt", "running"] + [f"live-{i}" for i in range(5)])
+    assert await store.cleanup_expired_results() == 0
+
+
+def result(task_id, status=TaskStatus.COMPLETED, batch_id=None):
+    return TaskResult(task_id=task_id, status=status, result={'id': task_id}, execution_time=0.1,
+                      metadata={'batch_id': batch_id} if batch_id else {})
+
+
+@pytest.fixture
+def store():
+    store = RedisResultStore(redis_url="redis://localhost", result_ttl=3600, batch_size=3)
+    store.redis = fakeredis.aioredis.FakeRedis()
+    return store
+
+
+@pytest.mark.asyncio
+async def test_storing_a_task_twice_counts_it_once(store):
+    await store.store_result(result("a"))
+    await store.store_result(result("a"))
+    await store.store_result(result("b"))
+
+    stats = await store.get_stats()
+    assert stats['total_results'] == 2
+    assert stats['total_stored'] == 2
+    assert stats['status_distribution'] == {'completed': 2}
+    assert stats['lifetime_status_distribution'] == {'completed': 2}
+
+
+@pytest.mark.asyncio
+async def test_retried_result_moves_between_statuses(store):
+    await store.register_batch("batch", 2)
+    await store.store_result(result("a", TaskStatus.FAILED, batch_id="batch"))
+    await store.store_result(result("a", TaskStatus.COMPLETED, batch_id="batch"))
+
+    stats = await store.get_stats()
+    assert stats['status_distribution'] == {'completed': 1}
+    assert stats['lifetime_status_distribution'] == {'completed': 1}
+    progress = await store.get_batch_progress("batch")
+    assert (progress['finished'], progress['remaining']) == (1, 1)
+
+    assert await store.delete_result("a")
+    assert (await store.get_stats())['total_results'] == 0
+
+
+@pytest.mark.asyncio
+async def test_get_results_many_skips_missing_and_corrupt_entries(store):
+    for i in range(7):
+        await store.store_result(result(f"task-{i}"))
+    await store.redis.set(store._result_key("corrupt"), b"not json")
+
+    requested = [f"task-{i}" for i in range(0, 7, 2)] + ["missing", "corrupt", "task-5"]
+    found = await store.get_results_many(requested)
+
+    assert sorted(found) == ["task-0", "task-2", "task-4", "task-5", "task-6"]
+    assert found["task-4"].result == {'id': "task-4"}
+    assert await store.get_results_many([]) == {}
@@ -0,0 +1,99 @@
+"""
+Tests for DAG workflow execution
+"""
+import asyncio
+
+import pytest
+
+from core.interfaces import TaskResult, TaskStatus
+from orchestrator.workflow import Workflow, WorkflowRunner
+
+
+def step(value=None):
+    return value
+
+
+class StubResultStore:
+    """Batch completion stream fed by StubOrchestrator"""
+
+    def __init__(self):
+        self.completions = []
+        self.results = {}
+
+    async def register_batch(self, batch_id, total):
+        pass
+
+    async def delete_batch(self, batch_id):
+        pass
+
+    async def read_batch_completions(self, batch_id, cursor, block_ms=1000):
+        position = int(cursor)
+        if position >= len(self.completions):
+            await asyncio.sleep(block_ms / 1000)
+        return str(len(self.completions)).encode(), self.completions[position:]
+
+    async def get_results_many(self, task_ids):
+        return {task_id: self.results[task_id] for task_id in task_ids if task_id in self.results}
+
+
+class StubOrchestrator:
+    """Completes submitted tasks at once, except nodes listed in ``hang`` or ``fail``"""
+
+    def __init__(self, hang=(), fail=()):
+        self.result_store = StubResultStore()
+        self.hang = set(hang)
+        self.fail = set(fail)
+        self.submitted = []
+
+    async def submit_task(self, task):
+        node = task.metadata['node']
+        self.submitted.append(node)
+        if node in self.hang:
+            return
+        status = TaskStatus.FAILED if node in self.fail else TaskStatus.COMPLETED
+        self.result_store.results[task.id] = TaskResult(task_id=task.id, status=status, result=node)
+        self.result_store.completions.append((task.id, status.value, 0.0))
+
+
+def chain():
+    """a -> b -> c, plus d independent"""
+    workflow = Workflow("chain")
+    a = workflow.add("a", step, 1)
+    b = workflow.add("b", step, a.output)
+    workflow.add("c", step, b.output)
+    workflow.add("d", step, 2)
+    return workflow
+
+
+@pytest.mark.asyncio
+async def test_workflow_completes():
+    orchestrator = StubOrchestrator()
+    result = await WorkflowRunner(orchestrator).run(chain(), timeout=5)
+
+    assert result.succeeded
+    assert result.timed_out == []
+    assert set(result.outputs) == {"c", "d"}
+    assert result.critical_path[-1] in ("c", "d")
+
+
+@pytest.mark.asyncio
+async def test_failure_skips_downstream():
+    result = await WorkflowRunner(StubOrchestrator(fail={"a"})).run(chain(), timeout=5)
+
+    assert not result.succeeded
+    assert result.failed == ["a"]
+    assert sorted(result.skipped) == ["b", "c"]
+    assert result.timed_out == []
+
+
+@pytest.mark.asyncio
+async def test_timeout_reports_unfinished_nodes():
+    orchestrator = StubOrchestrator(hang={"b"})
+    result = await WorkflowRunner(orchestrator).run(chain(), timeout=0.2)
+
+    assert not result.succeeded
+    assert result.timed_out == ["b", "c"]  # b still running, c never released
+    assert result.failed == [] and result.skipped == []
+    assert "c" not in orchestrator.submitted
+    completed = [name for name, timing in result.timings.items() if timing.status == TaskStatus.COMPLETED.value]
+    assert sorted(completed) == ["a", "d"]
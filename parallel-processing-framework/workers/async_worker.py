@@ -12,6 +12,8 @@ import psutil
 import os
 
 from core.interfaces import IWorker, Task, TaskResult, TaskStatus
+from core.execution_backend import ExecutionRouter
+from core.event_loop_manager import get_event_loop_manager
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -23,11 +25,15 @@ class AsyncWorker(IWorker):
     def __init__(self, 
                  worker_id: Optional[str] = None,
                  max_concurrent_tasks: int = 10,
-                 heartbeat_interval: int = 30):
+                 heartbeat_interval: int = 30,
+                 execution_router: Optional[ExecutionRouter] = None):
         self.worker_id = worker_id or f"worker-{uuid.uuid4().hex[:8]}"
         self.max_concurrent_tasks = max_concurrent_tasks
         self.heartbeat_interval = heartbeat_interval
         
+        # Routes tasks to the event loop, thread pool or process pool
+        self.execution_router = execution_router or get_event_loop_manager().get_execution_router()
+        
         # Worker state
         self.is_running = False
         self._health_status = True
@@ -169,19 +175,11 @@ class AsyncWorker(IWorker):
             # Apply timeout if specified
             timeout = task.timeout or settings.processing.task_timeout
             
-            if asyncio.iscoroutinefunction(task.func):
-                # Async function
-                result = await asyncio.wait_for(
-                    task.func(*task.args, **task.kwargs),
-                    timeout=timeout
-                )
-            else:
-                # Sync function - run in thread pool
-                loop = asyncio.get_event_loop()
-                result = await asyncio.wait_for(
-                    loop.run_in_executor(None, task.func, *task.args, **task.kwargs),
-                    timeout=timeout
-                )
+            # Dispatch to the backend matching the task's execution hint
+            result = await asyncio.wait_for(
+                self.execution_router.run(task),
+                timeout=timeout
+            )
             
             return TaskResult(
                 task_id=task.id,
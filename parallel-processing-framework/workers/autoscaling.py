@@ -0,0 +1,256 @@
+"""
+Scaling policies for DynamicWorkerPool
+"""
+import logging
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from core.interfaces import TaskPriority
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Queued work counts more when it sits in a queue that is served first
+PRIORITY_BACKLOG_WEIGHTS = {
+    TaskPriority.URGENT.name: 2.0,
+    TaskPriority.CRITICAL.name: 1.5,
+    TaskPriority.HIGH.name: 1.25,
+    TaskPriority.NORMAL.name: 1.0,
+    TaskPriority.LOW.name: 0.5,
+}
+
+
+@dataclass
+class ScalingObservation:
+    """Snapshot of pool and queue state handed to a scaling policy"""
+    timestamp: float
+    worker_count: int
+    busy_workers: int
+    queue_depths: Dict[str, int] = field(default_factory=dict)
+    enqueued_total: int = 0
+    service_time: Optional[float] = None       # recent mean seconds per task
+    observed_p95_wait: Optional[float] = None  # recent p95 queue wait, seconds
+    avg_worker_load: Optional[float] = None    # 0.0-1.0, as reported by AsyncWorker
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(self.queue_depths.values())
+
+
+class IScalingPolicy(ABC):
+    """Decides how many workers the pool should run"""
+
+    evaluation_interval: float = 15.0
+
+    @abstractmethod
+    def desired_workers(self, observation: ScalingObservation) -> int:
+        """Return the target worker count for this observation"""
+        pass
+
+
+class UtilizationThresholdPolicy(IScalingPolicy):
+    """The original policy: average of the last three combined-load samples against thresholds.
+
+    Combined load is 70% worker load and 30% queue depth (saturating at 100
+    tasks). Scaling events are at least ``cooldown`` seconds apart.
+    """
+
+    def __init__(self,
+                 min_workers: int,
+                 max_workers: int,
+                 scale_up_threshold: float = None,
+                 scale_down_threshold: float = None,
+                 evaluation_interval: float = 15.0,
+                 cooldown: float = 30.0):
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.scale_up_threshold = scale_up_threshold or settings.workers.scale_up_threshold
+        self.scale_down_threshold = scale_down_threshold or settings.workers.scale_down_threshold
+        self.evaluation_interval = evaluation_interval
+        self.cooldown = cooldown
+
+        self.load_history = deque(maxlen=60)
+        self.last_scale_time: Optional[float] = None
+
+    def desired_workers(self, observation: ScalingObservation) -> int:
+        current = observation.worker_count
+        avg_load = observation.avg_worker_load
+        if avg_load is None:
+            avg_load = observation.busy_workers / max(1, current)
+
+        queue_factor = min(1.0, observation.queue_depth / 100.0)
+        self.load_history.append((avg_load * 0.7) + (queue_factor * 0.3))
+
+        if len(self.load_history) < 3:
+            return current
+        if self.last_scale_time is not None and observation.timestamp - self.last_scale_time < self.cooldown:
+            return current
+
+        recent = list(self.load_history)[-3:]
+        avg_recent_load = sum(recent) / len(recent)
+
+        target = current
+        if avg_recent_load > self.scale_up_threshold and current < self.max_workers:
+            target = min(
+                self.max_workers,
+                current + max(1, int((avg_recent_load - self.scale_up_threshold) * 4))
+            )
+        elif avg_recent_load < self.scale_down_threshold and current > self.min_workers:
+            target = max(
+                self.min_workers,
+                current - max(1, int((self.scale_down_threshold - avg_recent_load) * 2))
+            )
+
+        if target != current:
+            self.last_scale_time = observation.timestamp
+        return target
+
+
+class QueueLatencyScalingController(IScalingPolicy):
+    """Sizes the pool to keep p95 queue wait under a target.
+
+    The arrival rate is tracked with Holt's linear smoothing so a rising
+    trend is acted on before the backlog builds. The worker count is what
+    it takes to absorb the forecast arrivals at ``target_utilization`` plus
+    drain the priority-weighted backlog within the wait target. If the
+    measured p95 wait is over target while work is still queued, at least
+    one worker is added.
+    Scaling up is limited only by a short cooldown. Scaling down waits a
+    longer cooldown after the last scale-up, then needs the demand to stay
+    below the current size by the ``hysteresis`` margin for
+    ``down_stable_evaluations`` evaluations per step.
+    """
+
+    def __init__(self,
+                 min_workers: int,
+                 max_workers: int,
+                 target_p95_wait: float = None,
+                 evaluation_interval: float = None,
+                 up_cooldown: float = None,
+                 down_cooldown: float = None,
+                 hysteresis: float = None,
+                 down_stable_evaluations: int = None,
+                 max_step_up: int = None,
+                 max_step_down: int = None,
+                 target_utilization: float = 0.85,
+                 forecast_horizon: float = 6.0,
+                 default_service_time: float = 1.0,
+                 level_smoothing: float = 0.3,
+                 trend_smoothing: float = 0.1):
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.target_p95_wait = target_p95_wait or settings.workers.target_p95_queue_wait
+        self.evaluation_interval = evaluation_interval or settings.workers.scaling_interval
+        self.up_cooldown = up_cooldown if up_cooldown is not None else settings.workers.scale_up_cooldown
+        self.down_cooldown = down_cooldown if down_cooldown is not None else settings.workers.scale_down_cooldown
+        self.hysteresis = hysteresis if hysteresis is not None else settings.workers.scaling_hysteresis
+        self.down_stable_evaluations = down_stable_evaluations or settings.workers.scale_down_stable_evaluations
+        self.max_step_up = max_step_up or settings.workers.max_scale_up_step
+        self.max_step_down = max_step_down or settings.workers.max_scale_down_step
+        self.target_utilization = target_utilization
+        self.forecast_horizon = forecast_horizon
+        self.level_smoothing = level_smoothing
+        self.trend_smoothing = trend_smoothing
+
+        # Smoothed inputs
+        self.service_time = default_service_time
+        self.rate_level: Optional[float] = None
+        self.rate_trend = 0.0
+
+        # Decision state
+        self._last_observation: Optional[ScalingObservation] = None
+        self._last_scale_up: Optional[float] = None
+        self._low_demand_evaluations = 0
+        self.last_demand: float = 0.0
+
+    def _update_rate(self, observation: ScalingObservation) -> None:
+        previous = self._last_observation
+        self._last_observation = observation
+        if previous is None:
+            return
+
+        elapsed = observation.timestamp - previous.timestamp
+        if elapsed <= 0:
+            return
+        rate = max(0, observation.enqueued_total - previous.enqueued_total) / elapsed
+
+        if self.rate_level is None:
+            self.rate_level = rate
+            return
+        level = self.level_smoothing * rate + (1 - self.level_smoothing) * (self.rate_level + self.rate_trend)
+        self.rate_trend = self.trend_smoothing * (level - self.rate_level) + (1 - self.trend_smoothing) * self.rate_trend
+        self.rate_level = level
+
+    def forecast_rate(self) -> float:
+        """Arrival rate expected ``forecast_horizon`` seconds ahead"""
+        if self.rate_level is None:
+            return 0.0
+        steps = self.forecast_horizon / self.evaluation_interval
+        return max(0.0, self.rate_level + self.rate_trend * steps)
+
+    def demand(self, observation: ScalingObservation) -> float:
+        """Workers needed for forecast arrivals plus draining the backlog in time"""
+        backlog = sum(
+            depth * PRIORITY_BACKLOG_WEIGHTS.get(priority, 1.0)
+            for priority, depth in observation.queue_depths.items()
+        )
+        flow = self.forecast_rate() * self.service_time / self.target_utilization
+        drain = backlog * self.service_time / self.target_p95_wait
+        return flow + drain
+
+    def desired_workers(self, observation: ScalingObservation) -> int:
+        now = observation.timestamp
+        current = observation.worker_count
+
+        if observation.service_time:
+            self.service_time = observation.service_time
+        self._update_rate(observation)
+
+        demand = self.demand(observation)
+        self.last_demand = demand
+        wanted = math.ceil(demand)
+        if (observation.queue_depth and observation.observed_p95_wait is not None
+                and observation.observed_p95_wait > self.target_p95_wait):
+            wanted = max(wanted, current + 1)
+        wanted = max(self.min_workers, min(self.max_workers, wanted))
+
+        if wanted > current:
+            self._low_demand_evaluations = 0
+            if self._last_scale_up is not None and now - self._last_scale_up < self.up_cooldown:
+                return current
+            target = min(wanted, current + self.max_step_up)
+            self._last_scale_up = now
+            return target
+
+        if wanted < current and demand < current * (1 - self.hysteresis):
+            self._low_demand_evaluations += 1
+            if self._low_demand_evaluations < self.down_stable_evaluations:
+                return current
+            if self._last_scale_up is not None and now - self._last_scale_up < self.down_cooldown:
+                return current
+            self._low_demand_evaluations = 0
+            return max(wanted, current - self.max_step_down)
+
+        self._low_demand_evaluations = 0
+        return current
+
+
+def make_scaling_policy(name: str,
+                        min_workers: int,
+                        max_workers: int,
+                        scale_up_threshold: float = None,
+                        scale_down_threshold: float = None) -> IScalingPolicy:
+    """Build a scaling policy by its settings name"""
+    if name == "utilization":
+        return UtilizationThresholdPolicy(
+            min_workers, max_workers,
+            scale_up_threshold=scale_up_threshold,
+            scale_down_threshold=scale_down_threshold
+        )
+    if name == "queue_latency":
+        return QueueLatencyScalingController(min_workers, max_workers)
+    raise ValueError(f"Unknown scaling policy: {name}")
@@ -2,22 +2,45 @@
 Dynamic worker pool with auto-scaling capabilities
 """
 import asyncio
+import json
 import logging
 import time
-from datetime import datetime, timedelta
+from dataclasses import asdict
+from datetime import datetime
 from typing import Dict, List, Optional, Any, Callable
 import uuid
 from collections import deque
 
-from core.interfaces import IWorkerPool, ITaskQueue, IResultStore, Task, TaskResult, TaskStatus
+from core.interfaces import IWorkerPool, ITaskQueue, IResultStore, Task, TaskResult, TaskStatus, ResultRef
+from core.execution_backend import ExecutionRouter
 from .async_worker import AsyncWorker
+from .autoscaling import IScalingPolicy, ScalingObservation, make_scaling_policy
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
 
+def _substitute_refs(value: Any, values: Dict[str, Any]) -> Any:
+    """Replace ResultRef placeholders (also inside lists, tuples and dicts) with resolved values"""
+    if isinstance(value, ResultRef):
+        return values[value.task_id]
+    if isinstance(value, tuple):
+        return tuple(_substitute_refs(v, values) for v in value)
+    if isinstance(value, list):
+        return [_substitute_refs(v, values) for v in value]
+    if isinstance(value, dict):
+        return {k: _substitute_refs(v, values) for k, v in value.items()}
+    return value
+
+
 class DynamicWorkerPool(IWorkerPool):
-    """Worker pool with dynamic scaling based on load"""
+    """Worker pool with dynamic scaling based on load.
+    
+    Scaling decisions are delegated to an ``IScalingPolicy``; by default the
+    one named by ``settings.workers.scaling_policy``. Each evaluation's
+    observation can be appended to ``trace_path`` as a JSON line for replay
+    in ``benchmarks.autoscaling_simulation``.
+    """
     
     def __init__(self,
                  task_queue: ITaskQueue,
@@ -25,10 +48,14 @@ class DynamicWorkerPool(IWorkerPool):
                  min_workers: int = None,
                  max_workers: int = None,
                  scale_up_threshold: float = None,
-                 scale_down_threshold: float = None):
+                 scale_down_threshold: float = None,
+                 execution_router: Optional[ExecutionRouter] = None,
+                 scaling_policy: Optional[IScalingPolicy] = None,
+                 trace_path: Optional[str] = None):
         
         self.task_queue = task_queue
         self.result_store = result_store
+        self.execution_router = execution_router
         
         # Scaling configuration
         self.min_workers = min_workers or settings.workers.min_workers
@@ -44,10 +71,19 @@ class DynamicWorkerPool(IWorkerPool):
         self.is_running = False
         self.start_time: Optional[datetime] = None
         
-        # Scaling metrics
-        self.load_history = deque(maxlen=60)  # 60 data points for scaling decisions
+        # Scaling policy and the signals it is fed
+        self.scaling_policy = scaling_policy or make_scaling_policy(
+            settings.workers.scaling_policy,
+            self.min_workers,
+            self.max_workers,
+            scale_up_threshold=self.scale_up_threshold,
+            scale_down_threshold=self.scale_down_threshold
+        )
+        self.trace_path = trace_path
+        self.load_history = deque(maxlen=60)  # recent scaling observations
+        self.queue_waits = deque(maxlen=1000)  # seconds from enqueue to dequeue
+        self.service_time: Optional[float] = None  # EWMA of task execution time
         self.last_scale_event: Optional[datetime] = None
-        self.scale_cooldown = timedelta(seconds=30)  # Minimum time between scaling events
         
         # Tasks and monitoring
         self._monitor_task: Optional[asyncio.Task] = None
@@ -144,7 +180,8 @@ class DynamicWorkerPool(IWorkerPool):
     async def _add_worker(self) -> None:
         """Add a new worker to the pool"""
         worker = AsyncWorker(
-            max_concurrent_tasks=settings.workers.max_tasks_per_worker
+            max_concurrent_tasks=settings.workers.max_tasks_per_worker,
+            execution_router=self.execution_router
         )
         
         await worker.start()
@@ -212,9 +249,29 @@ class DynamicWorkerPool(IWorkerPool):
                 task = await self.task_queue.dequeue(timeout=1.0)
                 if not task:
                     continue
+                self.queue_waits.append((datetime.utcnow() - (task.enqueued_at or task.created_at)).total_seconds())
+                
+                # Pull in upstream results the task refers to, then execute
+                ref_error = await self._resolve_result_refs(task)
+                if ref_error:
+                    result = TaskResult(
+                        task_id=task.id,
+                        status=TaskStatus.FAILED,
+                        error=Exception(ref_error),
+                        worker_id=worker.worker_id
+                    )
+                else:
+                    result = await worker.execute_task(task)
+                
+                if result.execution_time:
+                    if self.service_time is None:
+                        self.service_time = result.execution_time
+                    else:
+                        self.service_time += 0.1 * (result.execution_time - self.service_time)
                 
-                # Execute task
-                result = await worker.execute_task(task)
+                # Route the result onto its batch completion stream
+                if task.metadata.get('batch_id'):
+                    result.metadata.setdefault('batch_id', task.metadata['batch_id'])
                 
                 # Store result
                 await self.result_store.store_result(result)
@@ -236,6 +293,31 @@ class DynamicWorkerPool(IWorkerPool):
                 logger.error(f"Worker {worker.worker_id} encountered error: {e}")
                 await asyncio.sleep(1.0)
     
+    async def _resolve_result_refs(self, task: Task) -> Optional[str]:
+        """Swap ResultRef arguments for the referenced results' values.
+        
+        Only tasks listing ``result_refs`` in their metadata are touched, so
+        ordinary tasks pay nothing. Returns an error message when a
+        referenced result is missing or did not complete.
+        """
+        ref_ids = task.metadata.get('result_refs')
+        if not ref_ids:
+            return None
+        
+        results = await self.result_store.get_results_many(list(ref_ids))
+        values = {}
+        for ref_id in ref_ids:
+            ref_result = results.get(ref_id)
+            if ref_result is None:
+                return f"Result of dependency {ref_id} is not available"
+            if ref_result.status != TaskStatus.COMPLETED:
+                return f"Dependency {ref_id} {ref_result.status.value}"
+            values[ref_id] = ref_result.result
+        
+        task.args = _substitute_refs(task.args, values)
+        task.kwargs = _substitute_refs(task.kwargs, values)
+        return None
+    
     async def _monitor_loop(self) -> None:
         """Monitor worker health and performance"""
         while self.is_running and not self._shutdown_event.is_set():
@@ -253,9 +335,6 @@ class DynamicWorkerPool(IWorkerPool):
                     if len(self.workers) < self.min_workers:
                         await self._add_worker()
                 
-                # Collect load metrics for scaling decisions
-                await self._collect_load_metrics()
-                
                 await asyncio.sleep(10)  # Monitor every 10 seconds
                 
             except asyncio.CancelledError:
@@ -265,97 +344,85 @@ class DynamicWorkerPool(IWorkerPool):
                 await asyncio.sleep(10)
     
     async def _scaling_loop(self) -> None:
-        """Auto-scaling loop"""
+        """Auto-scaling loop, run at the policy's evaluation interval"""
         while self.is_running and not self._shutdown_event.is_set():
+            interval = self.scaling_policy.evaluation_interval
             try:
                 await self._evaluate_scaling()
-                await asyncio.sleep(15)  # Check scaling every 15 seconds
+                await asyncio.sleep(interval)
                 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Scaling loop error: {e}")
-                await asyncio.sleep(15)
+                await asyncio.sleep(interval)
     
-    async def _collect_load_metrics(self) -> None:
-        """Collect load metrics for scaling decisions"""
-        if not self.workers:
-            return
-        
-        # Calculate overall load
+    async def _observe(self) -> ScalingObservation:
+        """Collect the queue and worker signals for one scaling decision"""
         total_load = 0.0
-        healthy_workers = 0
-        
+        busy_workers = 0
         for worker in self.workers.values():
-            if await worker.is_healthy():
-                load = await worker.get_current_load()
-                total_load += load
-                healthy_workers += 1
-        
-        if healthy_workers > 0:
-            avg_load = total_load / healthy_workers
+            load = await worker.get_current_load()
+            total_load += load
+            if worker.current_tasks:
+                busy_workers += 1
+        avg_load = total_load / len(self.workers) if self.workers else 1.0
+        
+        # Per-priority depths and cumulative enqueues when the queue exposes them
+        size_by_priority = getattr(self.task_queue, 'size_by_priority', None)
+        if size_by_priority is not None:
+            queue_depths = await size_by_priority()
         else:
-            avg_load = 1.0  # No healthy workers = high load
-        
-        # Get queue depth
-        queue_size = await self.task_queue.size()
-        
-        # Calculate combined load metric
-        queue_factor = min(1.0, queue_size / 100.0)  # Normalize queue size
-        combined_load = (avg_load * 0.7) + (queue_factor * 0.3)
-        
-        self.load_history.append({
-            'timestamp': datetime.utcnow(),
-            'avg_worker_load': avg_load,
-            'queue_size': queue_size,
-            'combined_load': combined_load,
-            'worker_count': len(self.workers),
-            'healthy_workers': healthy_workers
-        })
+            queue_depths = {'NORMAL': await self.task_queue.size()}
+        
+        enqueued_total = 0
+        get_counters = getattr(self.task_queue, 'get_counters', None)
+        if get_counters is not None:
+            enqueued_total = (await get_counters()).get('total_enqueued', 0)
+        
+        observed_p95_wait = None
+        if self.queue_waits:
+            waits = sorted(self.queue_waits)
+            observed_p95_wait = waits[min(len(waits) - 1, int(len(waits) * 0.95))]
+            self.queue_waits.clear()
+        
+        return ScalingObservation(
+            timestamp=time.time(),
+            worker_count=len(self.workers),
+            busy_workers=busy_workers,
+            queue_depths=queue_depths,
+            enqueued_total=enqueued_total,
+            service_time=self.service_time,
+            observed_p95_wait=observed_p95_wait,
+            avg_worker_load=avg_load
+        )
     
-    async def _evaluate_scaling(self) -> None:
-        """Evaluate if scaling is needed"""
-        if len(self.load_history) < 3:  # Need some history
-            return
-        
-        # Check cooldown period
-        if (self.last_scale_event and 
-            datetime.utcnow() - self.last_scale_event < self.scale_cooldown):
+    def _record_observation(self, observation: ScalingObservation) -> None:
+        """Keep the observation in memory and append it to the trace file, if any"""
+        self.load_history.append(asdict(observation))
+        if not self.trace_path:
             return
-        
-        # Get recent load average
-        recent_loads = [m['combined_load'] for m in list(self.load_history)[-3:]]
-        avg_recent_load = sum(recent_loads) / len(recent_loads)
+        try:
+            with open(self.trace_path, 'a') as trace:
+                trace.write(json.dumps(asdict(observation)) + '\n')
+        except OSError as e:
+            logger.error(f"Failed to write scaling trace: {e}")
+    
+    async def _evaluate_scaling(self) -> None:
+        """Ask the scaling policy for a worker count and apply it"""
+        observation = await self._observe()
+        self._record_observation(observation)
         
         current_workers = len(self.workers)
+        target_workers = self.scaling_policy.desired_workers(observation)
+        target_workers = max(self.min_workers, min(self.max_workers, target_workers))
+        if target_workers == current_workers:
+            return
         
-        # Scale up conditions
-        if (avg_recent_load > self.scale_up_threshold and 
-            current_workers < self.max_workers):
-            
-            # Calculate how many workers to add
-            target_workers = min(
-                self.max_workers,
-                current_workers + max(1, int((avg_recent_load - self.scale_up_threshold) * 4))
-            )
-            
-            logger.info(f"Scaling up: load={avg_recent_load:.2f}, "
-                       f"current={current_workers}, target={target_workers}")
-            await self._scale_to_target(target_workers)
-        
-        # Scale down conditions
-        elif (avg_recent_load < self.scale_down_threshold and 
-              current_workers > self.min_workers):
-            
-            # Calculate how many workers to remove
-            target_workers = max(
-                self.min_workers,
-                current_workers - max(1, int((self.scale_down_threshold - avg_recent_load) * 2))
-            )
-            
-            logger.info(f"Scaling down: load={avg_recent_load:.2f}, "
-                       f"current={current_workers}, target={target_workers}")
-            await self._scale_to_target(target_workers)
+        logger.info(f"Scaling {'up' if target_workers > current_workers else 'down'}: "
+                   f"queue={observation.queue_depth}, p95_wait={observation.observed_p95_wait}, "
+                   f"current={current_workers}, target={target_workers}")
+        await self._scale_to_target(target_workers)
     
     async def _stop_all_workers(self) -> None:
         """Stop all workers"""
@@ -400,7 +467,7 @@ class DynamicWorkerPool(IWorkerPool):
         # Get recent load metrics
         recent_load = 0.0
         if self.load_history:
-            recent_load = self.load_history[-1]['combined_load']
+            recent_load = self.load_history[-1]['avg_worker_load']
         
         return {
             'pool_id': id(self),
@@ -413,6 +480,8 @@ class DynamicWorkerPool(IWorkerPool):
             'current_load': recent_load,
             'scale_up_threshold': self.scale_up_threshold,
             'scale_down_threshold': self.scale_down_threshold,
+            'scaling_policy': type(self.scaling_policy).__name__,
+            'service_time': self.service_time,
             'total_current_tasks': total_current_tasks,
             'total_tasks_processed': self.total_tasks_processed,
             'total_tasks_failed': self.total_tasks_failed,